@@ -0,0 +1 @@
+# Benchmarks for discord-link-bot
@@ -0,0 +1,68 @@
+"""Measure memory, build time and lookup cost of the domain blocklist.
+
+Builds the hashed table from synthetic domains and compares its size with
+a ``set`` of the same strings, then times link lookups that miss (the
+common case) and that hit through a parent domain.
+
+Run with ``python -m benchmarks.bench_blocklist --domains 1000000``.
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from link_utils.blocklist import DomainBlocklist
+
+LOOKUPS = 100_000
+TLDS = ("com", "net", "org", "xyz", "top", "info", "co.uk", "ru", "click")
+
+
+def synthetic_domains(n: int, seed: int = 0) -> list[str]:
+    """Generate ``n`` phishing-looking domains."""
+    rng = random.Random(seed)
+    return [
+        f"{rng.getrandbits(48):x}-{rng.choice(('login', 'secure', 'gift', 'nitro'))}"
+        f".{rng.choice(TLDS)}"
+        for _ in range(n)
+    ]
+
+
+def _per_lookup_ns(blocklist: DomainBlocklist, urls: list[str]) -> float:
+    started = time.perf_counter()
+    for url in urls:
+        blocklist.match(url)
+    return (time.perf_counter() - started) / len(urls) * 1e9
+
+
+def main() -> None:
+    """Run the benchmark and print sizes and timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--domains", type=int, default=1_000_000)
+    args = parser.parse_args()
+    domains = synthetic_domains(args.domains)
+
+    tracemalloc.start()
+    as_set = set(domains)
+    set_bytes = tracemalloc.get_traced_memory()[0] + sum(map(sys.getsizeof, as_set))
+    tracemalloc.stop()
+    del as_set
+
+    started = time.perf_counter()
+    blocklist = DomainBlocklist(domains)
+    build_s = time.perf_counter() - started
+
+    rng = random.Random(1)
+    misses = [f"https://www.example{i}.com/watch?v={i}" for i in range(LOOKUPS)]
+    hits = [f"https://cdn.{rng.choice(domains)}/login" for _ in range(LOOKUPS)]
+    print(f"domains           {len(blocklist):>12,}")
+    print(f"set of str        {set_bytes / 2**20:>12.1f} MiB")
+    print(f"hashed table      {blocklist.nbytes / 2**20:>12.1f} MiB")
+    print(f"build             {build_s:>12.2f} s")
+    print(f"lookup (miss)     {_per_lookup_ns(blocklist, misses):>12.0f} ns")
+    print(f"lookup (hit)      {_per_lookup_ns(blocklist, hits):>12.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
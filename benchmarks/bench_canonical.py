@@ -0,0 +1,41 @@
+"""Benchmark URL canonicalization throughput.
+
+Run with ``python -m benchmarks.bench_canonical``.
+"""
+
+import timeit
+
+from link_utils.canonical import canonicalize_url
+from link_utils.categories import categorize_link
+
+URLS = [
+    "https://youtu.be/dQw4w9WgXcQ?si=abcdef123456",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&feature=share&t=42",
+    "https://twitter.com/user/status/1234567890?s=20&t=abc",
+    "https://www.reddit.com/r/python/comments/abc/title/?share_id=x&utm_source=share",
+    "https://github.com/user/repo/",
+    "https://example.com/article?id=5&utm_medium=social&fbclid=xyz",
+    "https://open.spotify.com/track/abc?si=123",
+    "https://example.org/",
+]
+ROUNDS = 20_000
+
+
+def main() -> None:
+    """Run the benchmark and print per-URL costs."""
+    n = len(URLS) * ROUNDS
+    rows = {
+        "categorize_link": lambda: [categorize_link(u) for u in URLS],
+        "canonicalize_url": lambda: [canonicalize_url(u) for u in URLS],
+        "canonicalize + categorize": lambda: [
+            categorize_link(canonicalize_url(u)) for u in URLS
+        ],
+    }
+    print(f"{'step':<28}{'us/url':>10}")
+    for name, fn in rows.items():
+        seconds = min(timeit.repeat(fn, number=ROUNDS, repeat=3))
+        print(f"{name:<28}{seconds / n * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
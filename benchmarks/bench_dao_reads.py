@@ -0,0 +1,282 @@
+"""Measure read payload and capacity of the output channel DAO queries.
+
+Runs the previous query pattern (whole items, first page only) and the
+current one (projected, fully paginated, eventually or strongly consistent)
+against an in-memory table that sizes items and bills read capacity units
+the way DynamoDB documents it.
+
+Run with ``python -m benchmarks.bench_dao_reads``.
+"""
+
+import asyncio
+import math
+from collections.abc import AsyncGenerator, Callable
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from typing import Any
+
+from boto3.dynamodb.conditions import ConditionBase, Key
+
+from core.db.daos.output_channel_dao import OutputChannelDAO
+
+RCU_BYTES = 4096
+PAGE_BYTES = 1024 * 1024
+
+
+def attribute_size(value: Any) -> int:
+    """Return the billed size of an attribute value in bytes."""
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, Decimal)):
+        digits = len(str(abs(value)).replace(".", "").lstrip("0")) or 1
+        return math.ceil(digits / 2) + 1
+    if isinstance(value, list):
+        return 3 + sum(1 + attribute_size(v) for v in value)
+    raise TypeError(f"Unsupported attribute type {type(value).__name__}")
+
+
+def item_size(item: dict[str, Any]) -> int:
+    """Return the billed size of an item: attribute names plus values."""
+    return sum(len(name.encode()) + attribute_size(v) for name, v in item.items())
+
+
+def read_units(size: int, consistent: bool) -> float:
+    """Return the read capacity units for reading ``size`` bytes."""
+    units = max(1, math.ceil(size / RCU_BYTES))
+    return units if consistent else units / 2
+
+
+def _matches(condition: ConditionBase, item: dict[str, Any]) -> bool:
+    """Evaluate the subset of key/filter conditions the DAO uses."""
+    expression = condition.get_expression()
+    operator, values = expression["operator"], expression["values"]
+    if operator == "AND":
+        return all(_matches(c, item) for c in values)
+    value = item.get(values[0].name)
+    if operator == "=":
+        return value == values[1]
+    if operator == "begins_with":
+        return isinstance(value, str) and value.startswith(values[1])
+    raise NotImplementedError(operator)
+
+
+def _project(item: dict[str, Any], kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Apply a ProjectionExpression to an item."""
+    projection = kwargs.get("ProjectionExpression")
+    if not projection:
+        return item
+    names = kwargs.get("ExpressionAttributeNames", {})
+    wanted = {names.get(p.strip(), p.strip()) for p in projection.split(",")}
+    return {k: v for k, v in item.items() if k in wanted}
+
+
+class SimulatedTable:
+    """In-memory table resource that bills reads like DynamoDB.
+
+    Queries and scans read items in key order until ``page_bytes`` of data
+    has been read, then return a ``LastEvaluatedKey``. Capacity is charged on
+    the full size of every item read, before filters and projections; the
+    payload returned is the size of the projected items.
+    """
+
+    def __init__(
+        self, items: list[dict[str, Any]], page_bytes: int = PAGE_BYTES
+    ) -> None:
+        self.items = {(i["pk"], i["sk"]): i for i in items}
+        self.page_bytes = page_bytes
+        self.requests = 0
+        self.consistent_requests = 0
+        self.payload_bytes = 0
+        self.read_units = 0.0
+
+    def _respond(
+        self, items: list[dict[str, Any]], size: int, kwargs: dict[str, Any]
+    ) -> dict[str, Any]:
+        consistent = bool(kwargs.get("ConsistentRead"))
+        units = read_units(size, consistent)
+        self.requests += 1
+        self.consistent_requests += consistent
+        self.read_units += units
+        self.payload_bytes += sum(item_size(item) for item in items)
+        response: dict[str, Any] = {"Items": items}
+        if kwargs.get("ReturnConsumedCapacity"):
+            response["ConsumedCapacity"] = {"CapacityUnits": units}
+        return response
+
+    def _page(
+        self,
+        keys: list[tuple[str, str]],
+        condition: ConditionBase | None,
+        kwargs: dict[str, Any],
+    ) -> dict[str, Any]:
+        start = kwargs.get("ExclusiveStartKey")
+        if start is not None:
+            keys = [k for k in keys if k > (start["pk"], start["sk"])]
+        items, size, last = [], 0, None
+        for key in keys:
+            if size >= self.page_bytes:
+                break
+            item = self.items[key]
+            size += item_size(item)
+            last = key
+            if condition is None or _matches(condition, item):
+                items.append(_project(item, kwargs))
+        response = self._respond(items, size, kwargs)
+        if last is not None and last != keys[-1]:
+            response["LastEvaluatedKey"] = {"pk": last[0], "sk": last[1]}
+        return response
+
+    async def query(self, **kwargs: Any) -> dict[str, Any]:
+        condition = kwargs["KeyConditionExpression"]
+        keys = sorted(k for k, item in self.items.items() if _matches(condition, item))
+        return self._page(keys, None, kwargs)
+
+    async def scan(self, **kwargs: Any) -> dict[str, Any]:
+        return self._page(sorted(self.items), kwargs.get("FilterExpression"), kwargs)
+
+    async def get_item(self, Key: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        item = self.items.get((Key["pk"], Key["sk"]))
+        found = [] if item is None else [_project(item, kwargs)]
+        response = self._respond(found, 0 if item is None else item_size(item), kwargs)
+        for found_item in response.pop("Items"):
+            response["Item"] = found_item
+        return response
+
+    async def delete_item(self, Key: dict[str, Any], **kwargs: Any) -> None:
+        self.items.pop((Key["pk"], Key["sk"]), None)
+
+    async def put_item(self, Item: dict[str, Any], **kwargs: Any) -> None:
+        self.items[(Item["pk"], Item["sk"])] = Item
+
+    @asynccontextmanager
+    async def batch_writer(self, **kwargs: Any) -> AsyncGenerator[Any]:
+        yield self
+
+
+class SimulatedSession:
+    """Stand-in for an aioboto3 session serving one simulated table."""
+
+    def __init__(self, table: SimulatedTable) -> None:
+        self.table = table
+
+    @asynccontextmanager
+    async def resource(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any]:
+        yield self
+
+    async def Table(self, name: str) -> SimulatedTable:
+        return self.table
+
+
+def output_channel_item(guild_id: int, channel_id: int) -> dict[str, Any]:
+    """Build an output channel item as ``add_output_channel`` writes it."""
+    return {
+        "pk": f"GUILD#{guild_id}",
+        "sk": f"CHANNEL#{channel_id}",
+        "guild_id": Decimal(guild_id),
+        "channel_id": Decimal(channel_id),
+        "webhook_url": (
+            f"https://discord.com/api/webhooks/{channel_id}/"
+            "k3Jd9sLq0ZrX2vTb7YwNc4HfGm8PeA1uRi6oSx5lDj-VyQhKt_BnMzWcEa0gFpUr"
+        ),
+        "acl": Decimal(0b101100101),
+        "created_at": "2024-01-01T00:00:00.000000+00:00",
+        "updated_at": "2024-06-01T12:30:00.000000+00:00",
+    }
+
+
+def build_table(guilds: dict[int, int], page_bytes: int = PAGE_BYTES) -> SimulatedTable:
+    """Build a table with the given number of output channels per guild."""
+    items = []
+    for guild_id, channels in guilds.items():
+        items.append(
+            {"pk": f"GUILD#{guild_id}", "sk": "SETTINGS", "guild_id": guild_id}
+        )
+        items.extend(
+            output_channel_item(guild_id, guild_id * 10_000 + c)
+            for c in range(channels)
+        )
+    return SimulatedTable(items, page_bytes)
+
+
+async def _previous_query(table: SimulatedTable, guild_id: int) -> int:
+    response = await table.query(
+        KeyConditionExpression=Key("pk").eq(f"GUILD#{guild_id}")
+        & Key("sk").begins_with("CHANNEL#")
+    )
+    return len(response["Items"])
+
+
+async def _previous_webhook(
+    table: SimulatedTable, guild_id: int, channel_id: int
+) -> int:
+    response = await table.get_item(
+        Key={"pk": f"GUILD#{guild_id}", "sk": f"CHANNEL#{channel_id}"}
+    )
+    return int("webhook_url" in response["Item"])
+
+
+async def _measure(
+    guilds: dict[int, int], run: Callable[[SimulatedTable, OutputChannelDAO], Any]
+) -> tuple[SimulatedTable, int]:
+    table = build_table(guilds)
+    dao = OutputChannelDAO(SimulatedSession(table), "links", "us-east-1")
+    returned = await run(table, dao)
+    return table, returned
+
+
+async def _report() -> None:
+    small, large = {1: 8}, {2: 5000}
+    webhook_channel = 10_000 + 3
+    cases: list[
+        tuple[str, dict[int, int], Callable[[SimulatedTable, OutputChannelDAO], Any]]
+    ] = [
+        ("query 8 ch, before", small, lambda t, d: _previous_query(t, 1)),
+        ("query 8 ch, eventual", small, lambda t, d: _count(d.get_output_channels(1))),
+        (
+            "query 8 ch, strong",
+            small,
+            lambda t, d: _count(d.get_output_channels(1, consistent_read=True)),
+        ),
+        ("query 5000 ch, before", large, lambda t, d: _previous_query(t, 2)),
+        (
+            "query 5000 ch, eventual",
+            large,
+            lambda t, d: _count(d.get_output_channels(2)),
+        ),
+        (
+            "webhook url, before",
+            small,
+            lambda t, d: _previous_webhook(t, 1, webhook_channel),
+        ),
+        (
+            "webhook url, eventual",
+            small,
+            lambda t, d: _present(d.get_webhook_url(1, webhook_channel)),
+        ),
+    ]
+    print(f"{'case':<26}{'items':>7}{'requests':>10}{'payload B':>11}{'RCU':>8}")
+    for name, guilds, run in cases:
+        table, returned = await _measure(guilds, run)
+        print(
+            f"{name:<26}{returned:>7}{table.requests:>10}"
+            f"{table.payload_bytes:>11}{table.read_units:>8.1f}"
+        )
+
+
+async def _count(result: Any) -> int:
+    return len(await result)
+
+
+async def _present(result: Any) -> int:
+    return int(await result is not None)
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    asyncio.run(_report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark OutputChannelRecord decoding against the pydantic model.
+
+Run with ``python -m benchmarks.bench_records``.
+"""
+
+import gc
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from decimal import Decimal
+from typing import Any
+
+from core.db.models import OutputChannel
+from core.db.records import OutputChannelRecord
+
+ITEMS = 10_000
+
+
+def _item(i: int) -> dict[str, Any]:
+    """Build a DynamoDB-shaped output channel item."""
+    return {
+        "pk": f"GUILD#{1000 + i}",
+        "sk": f"CHANNEL#{2000 + i}",
+        "guild_id": Decimal(1000 + i),
+        "channel_id": Decimal(2000 + i),
+        "webhook_url": f"https://discord.com/api/webhooks/{i}/token",
+        "acl": Decimal(0b101100101),
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "updated_at": "2024-06-01T12:30:00+00:00",
+    }
+
+
+def _bytes_per_object(decode: Callable[[dict[str, Any]], object]) -> float:
+    """Measure the average retained size of decoded objects."""
+    items = [_item(i) for i in range(ITEMS)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [decode(item) for item in items]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del objects
+    return total / ITEMS
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    items = [_item(i) for i in range(ITEMS)]
+    decoders: dict[str, Callable[[dict[str, Any]], object]] = {
+        "pydantic OutputChannel": lambda item: OutputChannel(**item),
+        "OutputChannelRecord": OutputChannelRecord.from_item,
+    }
+
+    print(f"{'decoder':<26}{'us/item':>10}{'bytes/obj':>12}")
+    for name, decode in decoders.items():
+        seconds = min(
+            timeit.repeat(
+                lambda decode=decode: [decode(item) for item in items],
+                number=1,
+                repeat=5,
+            )
+        )
+        size = _bytes_per_object(decode)
+        print(f"{name:<26}{seconds / ITEMS * 1e6:>10.2f}{size:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
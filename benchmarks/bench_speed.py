@@ -0,0 +1,220 @@
+"""Benchmark gateway dispatch plus LinkMonitor with and without speed mode.
+
+Each raw MESSAGE_CREATE frame is decoded with discord.py's JSON hook and
+handed to its ``ConnectionState`` parser, which builds the real
+``discord.Message`` and dispatches it through ``Client.dispatch`` as its own
+task. The listener is the real ``LinkMonitor.on_message``; output channel
+configuration comes from the in-memory replay fakes, webhook sends go to
+the replay sink and message deletes to a stubbed HTTP call.
+
+discord.py picks its JSON backend when it is imported, so each runtime is
+measured in its own interpreter: the baseline blocks the orjson import,
+speed mode runs on uvloop with orjson if installed. Run with
+``python -m benchmarks.bench_speed`` after ``uv sync --extra speed``.
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from collections.abc import Sequence
+from typing import Any
+
+EVENTS = 20_000
+BATCH = 256
+GUILD_ID = 300
+SOURCE_CHANNEL_ID = 200
+OUTPUT_CHANNEL_ID = 201
+
+
+def _guild_payload() -> dict[str, Any]:
+    """Build the GUILD_CREATE data of the benchmark guild."""
+    channels = [
+        {"id": str(channel_id), "type": 0, "name": name, "position": i}
+        for i, (channel_id, name) in enumerate(
+            ((SOURCE_CHANNEL_ID, "general"), (OUTPUT_CHANNEL_ID, "links"))
+        )
+    ]
+    return {
+        "id": str(GUILD_ID),
+        "name": "bench",
+        "owner_id": "1",
+        "channels": channels,
+        "roles": [
+            {
+                "id": str(GUILD_ID),
+                "name": "@everyone",
+                "permissions": "0",
+                "position": 0,
+            }
+        ],
+        "members": [],
+        "member_count": 50,
+    }
+
+
+def _payload(i: int) -> str:
+    """Build a raw gateway MESSAGE_CREATE frame."""
+    author = {
+        "id": str(100 + i % 50),
+        "username": f"user{i % 50}",
+        "global_name": None,
+        "avatar": "a" * 32,
+        "discriminator": "0",
+        "public_flags": 0,
+    }
+    return json.dumps(
+        {
+            "op": 0,
+            "s": i,
+            "t": "MESSAGE_CREATE",
+            "d": {
+                "id": str(10**18 + i),
+                "channel_id": str(SOURCE_CHANNEL_ID),
+                "guild_id": str(GUILD_ID),
+                "author": author,
+                "member": {"roles": [], "joined_at": "2024-01-01T00:00:00+00:00"},
+                "content": f"look https://youtu.be/video{i}?si=abc and https://example.com/{i}",
+                "timestamp": "2024-06-01T12:30:00.000000+00:00",
+                "edited_timestamp": None,
+                "tts": False,
+                "mention_everyone": False,
+                "mentions": [],
+                "mention_roles": [],
+                "attachments": [],
+                "embeds": [],
+                "pinned": False,
+                "type": 0,
+            },
+        }
+    )
+
+
+async def _run(frames: list[str]) -> tuple[float, int]:
+    """Parse and dispatch every frame through discord.py and LinkMonitor.
+
+    Returns:
+        Elapsed seconds and the number of webhook sends.
+    """
+    import discord
+    import discord.utils
+
+    from benchmarks.replay import FakeWebhook, InMemoryDatabase, Sink
+    from cogs.link_monitor import LinkMonitor
+    from core.db.records import OutputChannelRecord
+    from link_utils.categories import ALL_CATEGORIES_MASK
+
+    intents = discord.Intents.default()
+    intents.message_content = True
+    client = discord.Client(intents=intents)
+    await client._async_setup_hook()
+    state = client._connection
+    state._add_guild_from_data(_guild_payload())  # type: ignore[arg-type]
+
+    sink = Sink(0.0, 0.0)
+
+    async def delete_message(*args: Any, **kwargs: Any) -> None:
+        sink.deletes += 1
+
+    client.http.delete_message = delete_message  # type: ignore[method-assign]
+
+    db = InMemoryDatabase()
+    db.output_channels.configs[GUILD_ID] = [
+        OutputChannelRecord(GUILD_ID, OUTPUT_CHANNEL_ID, None, ALL_CATEGORIES_MASK)
+    ]
+    cog = LinkMonitor(db, client)  # type: ignore[arg-type]
+    cog._load_shedding = False
+    cog._webhooks[OUTPUT_CHANNEL_ID] = FakeWebhook(sink, OUTPUT_CHANNEL_ID)  # type: ignore[assignment]
+
+    handled = 0
+    caught_up = asyncio.Event()
+    target = 0
+
+    async def on_message(message: discord.Message) -> None:
+        nonlocal handled
+        await cog.on_message(message)
+        handled += 1
+        if handled >= target:
+            caught_up.set()
+
+    client.on_message = on_message  # type: ignore[attr-defined]
+    parsers = state.parsers
+    from_json = discord.utils._from_json
+
+    start = time.perf_counter()
+    for offset in range(0, len(frames), BATCH):
+        for frame in frames[offset : offset + BATCH]:
+            msg = from_json(frame)
+            parsers[msg["t"]](msg["d"])
+        target = min(offset + BATCH, len(frames))
+        caught_up.clear()
+        if handled < target:
+            await caught_up.wait()
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(sink.sends.values())
+
+
+def measure(speed: bool, events: int = EVENTS) -> dict[str, Any]:
+    """Measure one runtime in this interpreter; call before discord is imported."""
+    if not speed:
+        # discord.utils checks for orjson on import; a None entry blocks it.
+        sys.modules.setdefault("orjson", None)  # type: ignore[arg-type]
+
+    from core.speedups import describe_runtime, event_loop_factory
+
+    frames = [_payload(i) for i in range(events)]
+    factory = event_loop_factory(speed)
+
+    async def run() -> tuple[float, int, str]:
+        elapsed, sends = await _run(frames)
+        return elapsed, sends, describe_runtime()
+
+    results = [asyncio.run(run(), loop_factory=factory) for _ in range(3)]
+    elapsed, sends, runtime = min(results)
+    return {"runtime": runtime, "seconds": elapsed, "sends": sends}
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Run the benchmark on the default runtime and in speed mode."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=EVENTS)
+    parser.add_argument(
+        "--runtime",
+        choices=("default", "speed"),
+        help="Measure one runtime in this process and print it as JSON.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.runtime is not None:
+        print(json.dumps(measure(args.runtime == "speed", args.events)))
+        return
+
+    print(f"{'runtime':<50}{'events/s':>12}{'us/event':>10}")
+    for runtime in ("default", "speed"):
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_speed",
+                "--runtime",
+                runtime,
+                "--events",
+                str(args.events),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        seconds = result["seconds"]
+        assert result["sends"] == args.events, result
+        print(
+            f"{result['runtime']:<50}{args.events / seconds:>12.0f}"
+            f"{seconds / args.events * 1e6:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
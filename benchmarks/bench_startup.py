@@ -0,0 +1,177 @@
+"""Measure start-up: an import-time report and a cold-start benchmark.
+
+``imports`` runs a fresh interpreter with ``-X importtime`` over the modules
+the bot loads before it is ready and reports the slowest ones::
+
+    python -m benchmarks.bench_startup imports --top 20
+
+``cold-start`` launches ``main.py`` several times and measures process
+start to ``on_ready``, using the summary line the bot logs once ready. It
+needs a ``DISCORD_TOKEN`` and a reachable table (``DYNAMODB_ENDPOINT_URL``
+for DynamoDB Local) and exits non-zero if the median run is over budget::
+
+    python -m benchmarks.bench_startup cold-start --runs 5 --budget 8
+"""
+
+import argparse
+import os
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.startup import READY_MESSAGE
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Everything imported by the time the bot is ready: main, the database layer
+# it opens in a thread and the cogs loaded by setup_hook.
+STARTUP_MODULES = (
+    "main",
+    "core.db.db_manager",
+    "cogs.link_monitor",
+    "cogs.link_manager",
+    "cogs.link_export",
+    "cogs.general",
+    "cogs.owner",
+)
+FIRST_PARTY = ("main", "core", "cogs", "link_utils")
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+_READY = re.compile(re.escape(READY_MESSAGE) + r" ([\d.]+)s \((.*)\)")
+
+
+@dataclass(frozen=True, slots=True)
+class ImportTiming:
+    """One line of ``-X importtime`` output (times in microseconds)."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Parse the stderr of ``python -X importtime``."""
+    timings = []
+    for line in output.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(
+                ImportTiming(module, int(self_us), int(cumulative_us), len(indent) // 2)
+            )
+    return timings
+
+
+def measure_imports(modules: tuple[str, ...]) -> list[ImportTiming]:
+    """Import modules in a fresh interpreter and return its import timings."""
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def import_report(timings: list[ImportTiming], top: int) -> str:
+    """Summarize import timings by first-party module and by package."""
+    total = sum(t.self_us for t in timings)
+    by_package: Counter[str] = Counter()
+    for timing in timings:
+        by_package[timing.module.partition(".")[0]] += timing.self_us
+    first_party = sorted(
+        (t for t in timings if t.module.partition(".")[0] in FIRST_PARTY),
+        key=lambda t: t.cumulative_us,
+        reverse=True,
+    )
+    lines = [f"Total import time: {total / 1000:.0f} ms", "", "By package (self time):"]
+    lines += [
+        f"{us / 1000:8.1f} ms  {package}" for package, us in by_package.most_common(top)
+    ]
+    lines += ["", "First-party modules (cumulative):"]
+    lines += [
+        f"{t.cumulative_us / 1000:8.1f} ms  {t.module}" for t in first_party[:top]
+    ]
+    return "\n".join(lines)
+
+
+def cold_start(timeout: float) -> tuple[float, str]:
+    """Start the bot once and stop it when ready.
+
+    Returns:
+        ``(seconds, phases)``: time from spawning the process until it was
+        ready, and the phase timings the bot logged.
+
+    Raises:
+        RuntimeError: If the bot exited or timed out before becoming ready.
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py"],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    assert process.stderr is not None
+    try:
+        for line in process.stderr:
+            match = _READY.search(line)
+            if match:
+                return time.perf_counter() - started, match.group(2)
+            if time.perf_counter() - started > timeout:
+                break
+        raise RuntimeError("bot did not become ready")
+    finally:
+        process.send_signal(signal.SIGINT)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main() -> None:
+    """Run the selected benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    imports = commands.add_parser("imports", help="report import times")
+    imports.add_argument("--top", type=int, default=15)
+    imports.add_argument(
+        "modules", nargs="*", default=STARTUP_MODULES, help="modules to import"
+    )
+    cold = commands.add_parser("cold-start", help="time process start to on_ready")
+    cold.add_argument("--runs", type=int, default=5)
+    cold.add_argument("--timeout", type=float, default=120.0)
+    cold.add_argument(
+        "--budget", type=float, default=0.0, help="fail above this median"
+    )
+    args = parser.parse_args()
+
+    if args.command == "imports":
+        print(import_report(measure_imports(tuple(args.modules)), args.top))
+        return
+
+    durations = []
+    for run in range(1, args.runs + 1):
+        seconds, phases = cold_start(args.timeout)
+        durations.append(seconds)
+        print(f"run {run}: {seconds:.2f}s ({phases})")
+    median = statistics.median(durations)
+    print(f"min {min(durations):.2f}s  median {median:.2f}s  max {max(durations):.2f}s")
+    if args.budget and median > args.budget:
+        print(f"median over the {args.budget:.2f}s budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
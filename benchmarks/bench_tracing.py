@@ -0,0 +1,67 @@
+"""Benchmark the cost of tracing instrumentation per message.
+
+Simulates the spans one forwarded message opens (root, extraction, two DAO
+calls, categorization, two sends and a delete) with tracing off, with tail
+sampling recording every trace and with every trace exported.
+
+Run with ``python -m benchmarks.bench_tracing``.
+"""
+
+import asyncio
+import time
+
+from core.tracing import Span, Tracer, span, traced
+
+MESSAGES = 20_000
+
+
+class _NullExporter:
+    def export(self, spans: list[Span]) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+@traced()
+async def _dao_call() -> None:
+    pass
+
+
+async def _message(tracer: Tracer) -> None:
+    with tracer.start_trace("on_message", guild_id=1, channel_id=2, message_id=3):
+        with span("extract") as extract:
+            await _dao_call()
+            extract.set("urls", 2)
+        await _dao_call()
+        with span("categorize", urls=2):
+            pass
+        for i in range(2):
+            with span("webhook.send", channel_id=i, links=2, embeds=0):
+                pass
+        with span("delete", message_id=3):
+            pass
+
+
+async def _run(tracer: Tracer) -> float:
+    started = time.perf_counter()
+    for _ in range(MESSAGES):
+        await _message(tracer)
+    return (time.perf_counter() - started) / MESSAGES
+
+
+def main() -> None:
+    """Run the benchmark and print the per-message cost of each mode."""
+    modes = {
+        "off": Tracer(),
+        "tail sampling (kept 0%)": Tracer(_NullExporter(), slow_threshold=60.0),
+        "head sampling (kept 100%)": Tracer(_NullExporter(), sample_rate=1.0),
+    }
+    print(f"{'mode':<28}{'us/message':>12}")
+    for name, tracer in modes.items():
+        seconds = min(asyncio.run(_run(tracer)) for _ in range(3))
+        print(f"{name:<28}{seconds * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
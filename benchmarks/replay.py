@@ -0,0 +1,424 @@
+"""Replay recorded traffic through LinkMonitor against fake Discord objects.
+
+Feeds a recording made with ``TRAFFIC_RECORD_PATH`` (or synthetic traffic)
+into ``LinkMonitor.on_message`` at a multiple of real time. Webhook sends
+go to an in-memory sink with configurable latency, and output channel
+configuration comes from an in-memory store. Reports throughput, end-to-end
+latency percentiles and the number of sends.
+
+Run with ``python -m benchmarks.replay traffic.jsonl --speed 10`` or
+``python -m benchmarks.replay --synthetic 20000 --speed 100``.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime
+from itertools import count
+from typing import Any
+
+import discord
+
+from cogs.link_monitor import LinkMonitor
+from core.db.records import OutputChannelRecord
+from core.traffic import TrafficRecord, read_traffic
+from link_utils.blocklist import DEFAULT_BLOCKLIST_POLICY, BlocklistPolicy
+from link_utils.categories import ALL_CATEGORIES_MASK, CATEGORY_BITS
+from link_utils.extraction import DEFAULT_LINK_SOURCES, LinkSource
+
+SYNTHETIC_HOSTS = [
+    "https://youtu.be/{id}?si={id}",
+    "https://www.youtube.com/watch?v={id}&feature=share",
+    "https://twitter.com/user/status/{id}",
+    "https://www.reddit.com/r/python/comments/{id}/",
+    "https://github.com/user/{id}",
+    "https://www.twitch.tv/{id}",
+    "https://example.com/articles/{id}?utm_source=discord",
+]
+
+
+class FakeWebhook:
+    """Webhook sink that sleeps for a configurable latency per send."""
+
+    def __init__(self, sink: "Sink", channel_id: int) -> None:
+        self.sink = sink
+        self.channel_id = channel_id
+
+    async def send(self, content: str, **kwargs: Any) -> None:
+        await asyncio.sleep(self.sink.latency())
+        self.sink.sends[self.channel_id] += 1
+
+
+class Sink:
+    """Collects sends and deletes made by the cog."""
+
+    def __init__(self, latency: float, jitter: float) -> None:
+        self.base_latency = latency
+        self.jitter = jitter
+        self.sends: Counter[int] = Counter()
+        self.deletes = 0
+
+    def latency(self) -> float:
+        """Return the latency of one webhook call."""
+        if not self.jitter:
+            return self.base_latency
+        return max(0.0, random.gauss(self.base_latency, self.jitter))
+
+
+class FakeGuild:
+    """Just enough of ``discord.Guild`` for LinkMonitor."""
+
+    def __init__(self, guild_id: int) -> None:
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+        self.channels: dict[int, discord.TextChannel] = {}
+        self.me = FakeAuthor(0)
+
+    def get_channel(self, channel_id: int) -> discord.TextChannel | None:
+        return self.channels.get(channel_id)
+
+
+class FakeAvatar:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+
+class FakeAuthor:
+    """Just enough of ``discord.Member`` for LinkMonitor."""
+
+    bot = False
+    avatar = None
+    default_avatar = FakeAvatar()
+
+    def __init__(self, author_id: int) -> None:
+        self.id = author_id
+        self.display_name = f"user-{author_id % 10_000}"
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+    def __str__(self) -> str:
+        return self.display_name
+
+
+class FakeMessage:
+    """Just enough of ``discord.Message`` for LinkMonitor."""
+
+    def __init__(
+        self,
+        message_id: int,
+        content: str,
+        guild: FakeGuild,
+        channel: discord.TextChannel,
+        author: FakeAuthor,
+        sink: Sink,
+    ) -> None:
+        self.id = message_id
+        self.content = content
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+        self.created_at = datetime.now(UTC)
+        self.edited_at: datetime | None = None
+        self.webhook_id: int | None = None
+        self.embeds: list[discord.Embed] = []
+        self.attachments: list[discord.Attachment] = []
+        self.message_snapshots: list[discord.MessageSnapshot] = []
+        self._sink = sink
+
+    @property
+    def jump_url(self) -> str:
+        return (
+            f"https://discord.com/channels/{self.guild.id}/{self.channel.id}/{self.id}"
+        )
+
+    async def delete(self) -> None:
+        self._sink.deletes += 1
+
+
+class InMemoryOutputChannels:
+    """In-memory stand-in for ``OutputChannelDAO``."""
+
+    def __init__(self) -> None:
+        self.configs: dict[int, list[OutputChannelRecord]] = {}
+        self.removed: list[tuple[int, int | None]] = []
+        self.invalidated: list[int] = []
+
+    async def get_cached_output_channels(
+        self, guild_id: int
+    ) -> list[OutputChannelRecord]:
+        return self.configs.get(guild_id, [])
+
+    def queue_removal(self, guild_id: int, channel_id: int | None = None) -> None:
+        self.removed.append((guild_id, channel_id))
+
+    def invalidate_cached(self, guild_id: int) -> None:
+        self.invalidated.append(guild_id)
+
+    async def flush_removals(self) -> int:
+        return 0
+
+
+class InMemoryGuildSettings:
+    """In-memory stand-in for ``GuildSettingsDAO``."""
+
+    def __init__(self) -> None:
+        self.link_sources: dict[int, LinkSource] = {}
+        self.blocklist_policies: dict[int, BlocklistPolicy] = {}
+        self.invalidated: list[int] = []
+
+    async def get_cached_link_sources(self, guild_id: int) -> LinkSource:
+        return self.link_sources.get(guild_id, DEFAULT_LINK_SOURCES)
+
+    async def get_cached_blocklist_policy(self, guild_id: int) -> BlocklistPolicy:
+        return self.blocklist_policies.get(guild_id, DEFAULT_BLOCKLIST_POLICY)
+
+    def invalidate_cached(self, guild_id: int) -> None:
+        self.invalidated.append(guild_id)
+
+
+class InMemoryDatabase:
+    """In-memory stand-in for ``Database``."""
+
+    def __init__(self) -> None:
+        self.guild_settings = InMemoryGuildSettings()
+        self.output_channels = InMemoryOutputChannels()
+
+
+def _text_channel(guild: FakeGuild, channel_id: int) -> discord.TextChannel:
+    """Build a real ``discord.TextChannel`` so isinstance checks pass."""
+    return discord.TextChannel(
+        state=None,  # type: ignore[arg-type]
+        guild=guild,  # type: ignore[arg-type]
+        data={
+            "id": channel_id,
+            "name": f"channel-{channel_id}",
+            "type": 0,
+            "position": 0,
+        },  # type: ignore[typeddict-item]
+    )
+
+
+def synthesize(
+    n: int, guilds: int = 20, authors: int = 500, rate: float = 50.0, seed: int = 0
+) -> list[TrafficRecord]:
+    """Generate synthetic traffic with Poisson arrivals.
+
+    Args:
+        n: Number of messages.
+        guilds: Number of distinct guilds.
+        authors: Number of distinct authors.
+        rate: Average messages per second.
+        seed: Random seed.
+
+    Returns:
+        The generated records; about a third of them carry links.
+    """
+    rng = random.Random(seed)
+    ts = 0.0
+    records = []
+    for _ in range(n):
+        ts += rng.expovariate(rate)
+        urls = []
+        if rng.random() < 0.35:
+            urls = [
+                rng.choice(SYNTHETIC_HOSTS).format(id=f"{rng.getrandbits(40):x}")
+                for _ in range(rng.choice((1, 1, 1, 2, 3)))
+            ]
+        records.append(
+            TrafficRecord(
+                ts=ts,
+                guild=rng.randrange(guilds),
+                channel=rng.randrange(3),
+                author=rng.randrange(authors),
+                length=rng.randint(5, 200) + sum(len(u) + 1 for u in urls),
+                urls=urls,
+            )
+        )
+    return records
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+class Replayer:
+    """Drive LinkMonitor with recorded traffic."""
+
+    def __init__(
+        self,
+        records: Iterable[TrafficRecord],
+        *,
+        speed: float = 1.0,
+        webhook_latency: float = 0.05,
+        webhook_jitter: float = 0.0,
+        outputs_per_guild: int = 2,
+        load_shedding: bool = True,
+        seed: int = 0,
+    ) -> None:
+        """Build the fakes for a replay.
+
+        Args:
+            records: The traffic to replay.
+            speed: Time compression factor (10 replays ten times faster).
+            webhook_latency: Mean seconds per webhook send.
+            webhook_jitter: Standard deviation of webhook latency.
+            outputs_per_guild: Output channels configured per guild.
+            load_shedding: Whether LinkMonitor's rate limits apply.
+            seed: Random seed for output channel ACLs.
+        """
+        self.records = sorted(records, key=lambda r: r.ts)
+        self.speed = speed
+        self.sink = Sink(webhook_latency, webhook_jitter)
+        self.db = InMemoryDatabase()
+        self.cog = LinkMonitor(self.db, self)  # type: ignore[arg-type]
+        self.cog._load_shedding = load_shedding
+        self.outputs_per_guild = outputs_per_guild
+        self._guilds: dict[int, FakeGuild] = {}
+        self._sources: dict[tuple[int, int], discord.TextChannel] = {}
+        self._rng = random.Random(seed)
+        self._authors: dict[int, FakeAuthor] = {}
+        self._ids = count(1)
+        self.latencies: list[float] = []
+
+    def get_channel(self, channel_id: int) -> discord.TextChannel | None:
+        """Find a channel of any replayed guild, like ``Bot.get_channel``."""
+        for guild in self._guilds.values():
+            channel = guild.get_channel(channel_id)
+            if channel is not None:
+                return channel
+        return None
+
+    def _guild(self, guild_id: int) -> FakeGuild:
+        """Return the fake guild for an id, configuring it on first use."""
+        guild = self._guilds.get(guild_id)
+        if guild is None:
+            guild = self._guilds[guild_id] = FakeGuild(guild_id)
+            configs = []
+            bits = list(CATEGORY_BITS.values())
+            for i in range(self.outputs_per_guild):
+                channel_id = next(self._ids)
+                guild.channels[channel_id] = _text_channel(guild, channel_id)
+                # The first output takes everything, the rest a random subset.
+                acl = ALL_CATEGORIES_MASK if i == 0 else sum(self._rng.sample(bits, 3))
+                configs.append(OutputChannelRecord(guild_id, channel_id, None, acl))
+                self.cog._webhooks[channel_id] = FakeWebhook(self.sink, channel_id)  # type: ignore[assignment]
+            self.db.output_channels.configs[guild_id] = configs
+        return guild
+
+    def _message(self, record: TrafficRecord) -> FakeMessage:
+        """Rebuild a message with the recorded shape."""
+        guild = self._guild(record.guild)
+        source_key = (record.guild, record.channel)
+        channel = self._sources.get(source_key)
+        if channel is None:
+            channel = self._sources[source_key] = _text_channel(guild, next(self._ids))
+        author = self._authors.get(record.author)
+        if author is None:
+            author = self._authors[record.author] = FakeAuthor(record.author)
+        links = " ".join(record.urls)
+        filler = "x" * max(0, record.length - len(links) - 1)
+        content = f"{filler} {links}".strip() if links else filler
+        return FakeMessage(next(self._ids), content, guild, channel, author, self.sink)
+
+    async def _handle(self, message: FakeMessage, due: float) -> None:
+        """Run on_message and record end-to-end latency from the due time."""
+        await self.cog.on_message(message)  # type: ignore[arg-type]
+        self.latencies.append(time.perf_counter() - due)
+
+    async def run(self) -> dict[str, float]:
+        """Replay every record and return the report."""
+        if not self.records:
+            return {}
+        messages = [(r.ts, self._message(r)) for r in self.records]
+        first_ts = messages[0][0]
+        tasks: set[asyncio.Task[None]] = set()
+        start = time.perf_counter()
+        for ts, message in messages:
+            due = start + (ts - first_ts) / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self._handle(message, due))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        while tasks:
+            await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(self.latencies)
+        return {
+            "messages": len(messages),
+            "with_links": sum(1 for r in self.records if r.urls),
+            "elapsed_s": elapsed,
+            "throughput_msg_s": len(messages) / elapsed,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "p999_ms": percentile(latencies, 0.999) * 1000,
+            "sends": sum(self.sink.sends.values()),
+            "deletes": self.sink.deletes,
+            **{f"shed_{k}": v for k, v in self.cog.shed_stats.items()},
+        }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.replay", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("recording", nargs="?", help="JSONL recording to replay")
+    parser.add_argument(
+        "--synthetic", type=int, default=0, help="generate N messages instead"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=50.0, help="synthetic messages per second"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="replay speed (1, 10, 100)"
+    )
+    parser.add_argument("--webhook-latency", type=float, default=0.05)
+    parser.add_argument("--webhook-jitter", type=float, default=0.0)
+    parser.add_argument("--outputs-per-guild", type=int, default=2)
+    parser.add_argument("--no-load-shedding", action="store_true")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Run a replay and print the report."""
+    args = build_parser().parse_args(argv)
+    if args.recording:
+        records = list(read_traffic(args.recording))
+    elif args.synthetic:
+        records = synthesize(args.synthetic, rate=args.rate)
+    else:
+        build_parser().error("give a recording or --synthetic N")
+    logging.basicConfig(level=logging.WARNING)
+    replayer = Replayer(
+        records,
+        speed=args.speed,
+        webhook_latency=args.webhook_latency,
+        webhook_jitter=args.webhook_jitter,
+        outputs_per_guild=args.outputs_per_guild,
+        load_shedding=not args.no_load_shedding,
+    )
+    report = asyncio.run(replayer.run())
+    for key, value in report.items():
+        print(
+            f"{key:<20}{value:>14.2f}"
+            if isinstance(value, float)
+            else f"{key:<20}{value:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Link export cog for Discord bot.
+
+This module contains the LinkExport cog that dumps every link forwarded to an
+output channel into compressed CSV or JSONL attachments.
+"""
+
+import asyncio
+import logging
+from datetime import UTC, datetime
+from typing import Final, Literal
+
+import discord
+from discord.ext import commands
+
+from core.bot_setup import DiscordBot
+from link_utils.categories import categorize_link
+from link_utils.export import ChunkedExportWriter, ExportPart, ExportRecord
+from link_utils.extraction import LinkSource, extract_message_links
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+# Messages returned by a single history request.
+HISTORY_PAGE_SIZE: Final[int] = 100
+# Pause between history pages to stay well under the per-route rate limit.
+HISTORY_PAGE_DELAY: Final[float] = 1.0
+# Progress message is edited at most this often (in pages).
+PROGRESS_EVERY_PAGES: Final[int] = 25
+# Forwards carry their links in the content or, for embed-style forwards and
+# digests, in embeds.
+EXPORT_LINK_SOURCES: Final[LinkSource] = LinkSource.CONTENT | LinkSource.EMBEDS
+
+
+class ExportReplies:
+    """Where an export posts its parts and progress.
+
+    The interaction is answered once, replacing the deferred "thinking"
+    state; everything after that goes to the invoking channel with the bot
+    token, because interaction followups stop working once the token expires
+    15 minutes in, and a large export runs far longer than that.
+    """
+
+    def __init__(self, ctx: commands.Context[DiscordBot]) -> None:
+        """Initialize the replies.
+
+        Args:
+            ctx: The command context.
+        """
+        self.ctx = ctx
+        self.responded = False
+
+    async def send(
+        self,
+        content: str,
+        *,
+        file: discord.File | None = None,
+        ephemeral: bool = False,
+    ) -> discord.Message:
+        """Send a message for the export.
+
+        Args:
+            content: The message text.
+            file: An optional attachment.
+            ephemeral: Whether the reply should be ephemeral; only honoured
+                for the first reply, channel messages are always public.
+
+        Returns:
+            The sent message.
+        """
+        if not self.responded:
+            self.responded = True
+            try:
+                return await self.ctx.send(content, file=file, ephemeral=ephemeral)
+            except discord.NotFound:
+                # The interaction token has already expired.
+                logger.debug("Interaction expired, sending export to the channel")
+                if file is not None:
+                    file.reset()
+        return await self.ctx.channel.send(content, file=file)
+
+
+class LinkExport(commands.Cog):
+    """Export links that were forwarded to an output channel.
+
+    History is paged through with a fixed delay between pages, and links are
+    streamed into gzip parts that never exceed the guild's upload limit.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the LinkExport cog."""
+        self._running: set[int] = set()
+
+    @commands.hybrid_command(
+        name="export_links",
+        description="Export every link forwarded to a channel as a CSV or JSONL file.",
+    )
+    @commands.guild_only()
+    @commands.has_permissions(manage_messages=True)
+    async def export_links(
+        self,
+        ctx: commands.Context[DiscordBot],
+        channel: discord.TextChannel,
+        file_format: Literal["csv", "jsonl"] = "csv",
+    ) -> None:
+        """Export all forwarded links from an output channel.
+
+        Only messages posted by webhooks (the forwarded links) are exported.
+        Large exports are split into several gzip attachments.
+
+        Args:
+            ctx: The command context.
+            channel: The output channel to export.
+            file_format: The export format (csv or jsonl).
+        """
+        assert ctx.guild is not None
+        if ctx.guild.id in self._running:
+            await ctx.send(
+                "❌ An export is already running for this server.", ephemeral=True
+            )
+            return
+
+        self._running.add(ctx.guild.id)
+        replies = ExportReplies(ctx)
+        try:
+            await ctx.defer()
+            logger.info(
+                "User %s in guild %s exporting links from #%s as %s",
+                ctx.author,
+                ctx.guild.name,
+                channel.name,
+                file_format,
+            )
+            await self._export(ctx, replies, channel, file_format)
+        except discord.Forbidden:
+            await replies.send(
+                f"❌ I don't have permission to read the history of {channel.mention}!",
+                ephemeral=True,
+            )
+        finally:
+            self._running.discard(ctx.guild.id)
+
+    async def _export(
+        self,
+        ctx: commands.Context[DiscordBot],
+        replies: ExportReplies,
+        channel: discord.TextChannel,
+        file_format: str,
+    ) -> None:
+        """Page through a channel's history and upload export parts as they fill.
+
+        Args:
+            ctx: The command context.
+            replies: Where parts and progress are posted.
+            channel: The output channel to export.
+            file_format: The export format (csv or jsonl).
+        """
+        assert ctx.guild is not None
+        stamp = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
+        writer = ChunkedExportWriter(
+            file_format,
+            max_bytes=ctx.guild.filesize_limit,
+            basename=f"links-{channel.name}-{stamp}",
+        )
+        scanned = 0
+        progress: discord.Message | None = None
+
+        async for message in channel.history(limit=None, oldest_first=True):
+            scanned += 1
+            if scanned % HISTORY_PAGE_SIZE == 0:
+                pages = scanned // HISTORY_PAGE_SIZE
+                if pages % PROGRESS_EVERY_PAGES == 0:
+                    progress = await self._report_progress(
+                        replies, progress, scanned, writer.total_records
+                    )
+                await asyncio.sleep(HISTORY_PAGE_DELAY)
+
+            if message.webhook_id is None:
+                continue
+            urls = extract_message_links(message, EXPORT_LINK_SOURCES)
+            if not urls:
+                continue
+
+            timestamp = message.created_at.isoformat()
+            for url in urls:
+                part = writer.write(
+                    ExportRecord(
+                        timestamp=timestamp,
+                        message_id=message.id,
+                        author=message.author.display_name,
+                        category=categorize_link(url),
+                        url=url,
+                    )
+                )
+                if part is not None:
+                    await self._upload_part(replies, part)
+
+        part = writer.close()
+        if part is not None:
+            await self._upload_part(replies, part)
+
+        if writer.total_records == 0:
+            await replies.send(
+                f"ℹ️ No forwarded links found in {channel.mention}.", ephemeral=True
+            )
+            return
+
+        await replies.send(
+            f"✅ Export Complete\nExported {writer.total_records} links from "
+            f"{channel.mention} ({scanned} messages scanned) in "
+            f"{writer.parts_written} file(s)."
+        )
+        logger.info(
+            "Exported %d links from #%s in %d parts",
+            writer.total_records,
+            channel.name,
+            writer.parts_written,
+        )
+
+    async def _upload_part(self, replies: ExportReplies, part: ExportPart) -> None:
+        """Upload a finished export part and release its buffer.
+
+        Args:
+            replies: Where the part is posted.
+            part: The export part to upload.
+        """
+        try:
+            await replies.send(
+                f"📦 `{part.filename}` ({part.record_count} links)",
+                file=discord.File(part.fileobj, filename=part.filename),
+            )
+        finally:
+            part.close()
+
+    async def _report_progress(
+        self,
+        replies: ExportReplies,
+        progress: discord.Message | None,
+        scanned: int,
+        exported: int,
+    ) -> discord.Message | None:
+        """Create or update the export progress message.
+
+        A progress message that can no longer be edited, such as an
+        interaction followup after its token expired, is replaced by a new
+        one in the channel.
+
+        Args:
+            replies: Where the progress message is posted.
+            progress: The existing progress message, if any.
+            scanned: Number of messages scanned so far.
+            exported: Number of links exported so far.
+
+        Returns:
+            The progress message.
+        """
+        text = f"⏳ Exporting... {scanned} messages scanned, {exported} links found."
+        if progress is not None:
+            try:
+                return await progress.edit(content=text)
+            except discord.HTTPException as e:
+                logger.debug("Replacing export progress message: %s", e)
+        try:
+            return await replies.send(text)
+        except discord.HTTPException as e:
+            logger.warning("Could not update export progress: %s", e)
+            return progress
+
+
+async def setup(bot: DiscordBot) -> None:
+    """Load the LinkExport cog into the bot.
+
+    Args:
+        bot: The Discord bot instance.
+    """
+    await bot.add_cog(LinkExport())
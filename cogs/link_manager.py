@@ -5,23 +5,49 @@ This module contains the LinkManager cog that provides commands for configuring
 link forwarding channels and ACLs for different link types.
 """
 
+import asyncio
 import logging
+from collections.abc import Sequence
+from typing import Final, Literal
+
 import discord
+from discord import app_commands, ui
+from discord.abc import GuildChannel
 from discord.ext import commands
-from discord import ui
-from core.db.models import OutputChannel
-from core.db.db_manager import Database
+
+from core.bot_setup import DiscordBot
+from core.channel_index import GuildChannelIndexes
 from core.channel_utils import (
+    LINK_TYPES,
+    create_acls,
     get_or_create_channel,
     validate_acls,
-    create_acls,
-    LINK_TYPES,
 )
-from core.bot_setup import DiscordBot
+from core.db.db_manager import Database
+from core.db.records import OutputChannelRecord
+from core.digest import DIGEST_INTERVALS, interval_name
+from link_utils.blocklist import BlocklistAction, BlocklistPolicy
+from link_utils.extraction import LinkSource
+from link_utils.link_filters import MAX_RULES, parse_rule
 
 logger: logging.Logger = logging.getLogger(name=__name__)
 
 
+# Discord allows 25 autocomplete choices and drops responses after 3 seconds.
+MAX_CHOICES: Final[int] = 25
+AUTOCOMPLETE_CONFIG_BUDGET: Final[float] = 1.0
+
+
+def _describe_rules(allow: Sequence[str], deny: Sequence[str]) -> str:
+    """Return a one-line summary of a channel's domain and path rules."""
+    parts = []
+    if allow:
+        parts.append("only " + ", ".join(allow))
+    if deny:
+        parts.append("never " + ", ".join(deny))
+    return "; ".join(parts)
+
+
 class ChannelSelectView(ui.View):
     """View for selecting a channel or creating a new one."""
 
@@ -36,47 +62,52 @@ class ChannelSelectView(ui.View):
         self.ctx = ctx
         self.acls = acls
 
-    @ui.select(
-        placeholder="Select a channel or create a new one...",
-        options=[],
-    )
-    async def channel_select(
-        self, interaction: discord.Interaction, select: ui.Select
-    ) -> None:
-        """Handle channel selection."""
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only let the command author use the menu."""
         if interaction.user != self.ctx.author:
             await interaction.response.send_message(
                 "❌ Only the command author can use this menu!", ephemeral=True
             )
-            return
+            return False
+        return True
 
-        selected_value: str = select.values[0]
+    @ui.select(
+        cls=ui.ChannelSelect,
+        channel_types=[discord.ChannelType.text],
+        placeholder="Search for a channel...",
+    )
+    async def channel_select(
+        self, interaction: discord.Interaction, select: ui.ChannelSelect
+    ) -> None:
+        """Handle channel selection.
 
-        if selected_value == "create_new":
-            await interaction.response.send_modal(
-                ChannelNameModal(self.cog, self.ctx, self.acls)
+        Discord searches the guild's channels client-side, so the menu works
+        however many channels the guild has.
+        """
+        if self.ctx.guild is None:
+            await interaction.response.send_message(
+                "❌ This command can only be used in a server!", ephemeral=True
             )
-        elif selected_value == "too_many":
+            return
+        channel = self.ctx.guild.get_channel(select.values[0].id)
+        if channel is None or not isinstance(channel, discord.TextChannel):
             await interaction.response.send_message(
-                "❌ This server has too many channels to display in the menu. Please contact an administrator to create channels manually.",
-                ephemeral=True,
+                "❌ Channel not found or not a text channel!", ephemeral=True
             )
-        else:
-            # Use existing channel
-            if self.ctx.guild is None:
-                await interaction.response.send_message(
-                    "❌ This command can only be used in a server!", ephemeral=True
-                )
-                return
-            channel_id: int = int(selected_value)
-            channel = self.ctx.guild.get_channel(channel_id)
-            if channel is None or not isinstance(channel, discord.TextChannel):
-                await interaction.response.send_message(
-                    "❌ Channel not found or not a text channel!", ephemeral=True
-                )
-                return
+            return
 
-            await self.cog._configure_channel(interaction, channel, self.acls)
+        await self.cog._configure_channel(interaction, channel, self.acls)
+
+    @ui.button(
+        label="Create New Channel", emoji="➕", style=discord.ButtonStyle.secondary
+    )
+    async def create_channel(
+        self, interaction: discord.Interaction, button: ui.Button
+    ) -> None:
+        """Ask for the name of a new channel to create."""
+        await interaction.response.send_modal(
+            ChannelNameModal(self.cog, self.ctx, self.acls)
+        )
 
 
 class ChannelNameModal(ui.Modal, title="Create New Channel"):
@@ -134,6 +165,91 @@ class LinkManager(commands.Cog):
             db: The database instance for accessing configuration.
         """
         self.db = db
+        self.channel_index = GuildChannelIndexes()
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: GuildChannel) -> None:
+        """Add a new text channel to the autocomplete index."""
+        self.channel_index.update(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(
+        self, before: GuildChannel, after: GuildChannel
+    ) -> None:
+        """Re-index a renamed text channel."""
+        if before.name != after.name:
+            self.channel_index.update(after)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: GuildChannel) -> None:
+        """Remove a deleted channel from the autocomplete index."""
+        self.channel_index.remove(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        """Forget the autocomplete index of a guild the bot has left."""
+        self.channel_index.drop(guild.id)
+
+    def _resolve_channel(
+        self, guild: discord.Guild, value: str
+    ) -> discord.TextChannel | None:
+        """Resolve an autocomplete choice, mention, ID or exact name to a text channel."""
+        raw = value.strip().removeprefix("<#").removesuffix(">").lstrip("#")
+        if raw.isdigit():
+            channel = guild.get_channel(int(raw))
+        else:
+            index = self.channel_index.get(guild)
+            channel = next(
+                (
+                    guild.get_channel(channel_id)
+                    for channel_id in index.search(raw)
+                    if (index.name(channel_id) or "").lower() == raw.lower()
+                ),
+                None,
+            )
+        return channel if isinstance(channel, discord.TextChannel) else None
+
+    async def output_channel_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        """Suggest the guild's output channels matching what was typed.
+
+        Names come from the in-memory prefix index. The configured channels
+        normally come from the config cache; if loading them would risk the
+        three-second deadline, every matching text channel is suggested.
+        """
+        guild = interaction.guild
+        if guild is None:
+            return []
+        index = self.channel_index.get(guild)
+        try:
+            configs = await asyncio.wait_for(
+                self.db.output_channels.get_cached_output_channels(guild.id),
+                AUTOCOMPLETE_CONFIG_BUDGET,
+            )
+        except Exception:
+            logger.debug("Autocomplete without output channel filter", exc_info=True)
+            matches = index.search(current, MAX_CHOICES)
+        else:
+            configured = {config.channel_id for config in configs}
+            matches = [c for c in index.search(current, len(index)) if c in configured]
+        return [
+            app_commands.Choice(
+                name=f"#{index.name(channel_id)}", value=str(channel_id)
+            )
+            for channel_id in matches[:MAX_CHOICES]
+        ]
+
+    async def link_type_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        """Suggest link types from the category registry."""
+        current = current.strip().lower()
+        return [
+            app_commands.Choice(name=link_type.capitalize(), value=link_type)
+            for link_type in LINK_TYPES
+            if link_type.startswith(current)
+        ][:MAX_CHOICES]
 
     async def _configure_channel(
         self,
@@ -236,37 +352,7 @@ class LinkManager(commands.Cog):
             )
             return
 
-        options = []
-        for channel in ctx.guild.text_channels:
-            options.append(
-                discord.SelectOption(
-                    label=f"#{channel.name}",
-                    value=str(channel.id),
-                    description=f"Configure existing channel #{channel.name}",
-                )
-            )
-
-        options.append(
-            discord.SelectOption(
-                label="➕ Create New Channel",
-                value="create_new",
-                description="Create a new channel for link forwarding",
-            )
-        )
-
-        if len(options) > 25:
-            options = options[:24]
-            options.append(
-                discord.SelectOption(
-                    label="⚠️ Too many channels",
-                    value="too_many",
-                    description="Server has too many channels to display",
-                )
-            )
-
         view = ChannelSelectView(self, ctx, acls)
-        select_menu = view.channel_select
-        select_menu.options = options
 
         await ctx.send(
             "Select a channel to configure for link forwarding:",
@@ -282,7 +368,7 @@ class LinkManager(commands.Cog):
     async def remove_output(
         self,
         ctx: commands.Context[DiscordBot],
-        channel: discord.TextChannel,
+        channel: str,
     ) -> None:
         """Remove an output channel configuration.
 
@@ -291,38 +377,48 @@ class LinkManager(commands.Cog):
             channel: The channel to remove from output channel list.
         """
         assert ctx.guild is not None
+        resolved = self._resolve_channel(ctx.guild, channel)
+        if resolved is None:
+            await ctx.send(f"❌ Channel `{channel}` not found.", ephemeral=True)
+            return
         logger.info(
             "User %s in guild %s executing remove_output command for channel #%s",
             ctx.author,
             ctx.guild.name,
-            channel.name,
+            resolved.name,
         )
 
         success = await self.db.output_channels.remove_output_channel(
-            ctx.guild.id, channel.id
+            ctx.guild.id, resolved.id
         )
 
         if success:
             await ctx.send(
-                f"✅ Output Channel Removed\n{channel.mention} will no longer receive links.",
+                f"✅ Output Channel Removed\n{resolved.mention} will no longer receive links.",
                 ephemeral=True,
             )
             logger.info(
                 "Successfully removed output channel #%s in guild %s",
-                channel.name,
+                resolved.name,
                 ctx.guild.name,
             )
         else:
             await ctx.send(
-                f"❌ {channel.mention} is not configured as an output channel.",
+                f"❌ {resolved.mention} is not configured as an output channel.",
                 ephemeral=True,
             )
             logger.warning(
                 "Failed to remove output channel #%s in guild %s - not configured",
-                channel.name,
+                resolved.name,
                 ctx.guild.name,
             )
 
+    @remove_output.autocomplete("channel")
+    async def _remove_output_channel_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        return await self.output_channel_autocomplete(interaction, current)
+
     @commands.hybrid_command(
         name="list_link_channels",
         description="Show all channels set to receive forwarded links and their filters.",
@@ -336,8 +432,10 @@ class LinkManager(commands.Cog):
         """
         assert ctx.guild is not None
         output_channels: list[
-            OutputChannel
-        ] = await self.db.output_channels.get_output_channels(ctx.guild.id)
+            OutputChannelRecord
+        ] = await self.db.output_channels.get_output_channels(
+            ctx.guild.id, consistent_read=True
+        )
 
         if not output_channels:
             await ctx.send(
@@ -355,10 +453,15 @@ class LinkManager(commands.Cog):
 
             enabled_types = []
             for link_type in LINK_TYPES:
-                if getattr(config, link_type, False):
+                if config.allows(link_type):
                     enabled_types.append(link_type.capitalize())
 
             response += f"\n#{channel.name}: {', '.join(enabled_types) if enabled_types else 'None'}"
+            rules = _describe_rules(config.link_allow, config.link_deny)
+            if rules:
+                response += f" ({rules})"
+            if config.digest_interval:
+                response += f" [{interval_name(config.digest_interval)} digest]"
 
         await ctx.send(response, ephemeral=True)
 
@@ -371,7 +474,7 @@ class LinkManager(commands.Cog):
     async def update_acl(
         self,
         ctx: commands.Context[DiscordBot],
-        channel: discord.TextChannel,
+        channel: str,
         link_type: str,
         enabled: bool,
     ) -> None:
@@ -384,6 +487,10 @@ class LinkManager(commands.Cog):
             enabled: Whether to enable or disable this link type.
         """
         assert ctx.guild is not None
+        resolved = self._resolve_channel(ctx.guild, channel)
+        if resolved is None:
+            await ctx.send(f"❌ Channel `{channel}` not found.", ephemeral=True)
+            return
         valid_types = LINK_TYPES
         link_type = link_type.lower()
 
@@ -396,7 +503,7 @@ class LinkManager(commands.Cog):
 
         result = await self.db.output_channels.update_output_channel_acl(
             ctx.guild.id,
-            channel.id,
+            resolved.id,
             link_type,
             enabled,
         )
@@ -404,15 +511,27 @@ class LinkManager(commands.Cog):
         if result:
             status = "enabled" if enabled else "disabled"
             await ctx.send(
-                f"✅ ACL Updated\n{link_type.capitalize()} links are now {status} for {channel.mention}",
+                f"✅ ACL Updated\n{link_type.capitalize()} links are now {status} for {resolved.mention}",
                 ephemeral=True,
             )
         else:
             await ctx.send(
-                f"❌ {channel.mention} is not configured as an output channel. Use `/addoutput` first.",
+                f"❌ {resolved.mention} is not configured as an output channel. Use `/addoutput` first.",
                 ephemeral=True,
             )
 
+    @update_acl.autocomplete("channel")
+    async def _update_acl_channel_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        return await self.output_channel_autocomplete(interaction, current)
+
+    @update_acl.autocomplete("link_type")
+    async def _update_acl_link_type_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        return await self.link_type_autocomplete(interaction, current)
+
     @commands.hybrid_command(
         name="quick_link_setup",
         description="Create a channel that receives all link types in one step.",
@@ -462,6 +581,274 @@ class LinkManager(commands.Cog):
                 ephemeral=True,
             )
 
+    @commands.hybrid_command(
+        name="link_sources",
+        description="Choose which parts of messages links are taken from.",
+    )
+    @commands.guild_only()
+    @commands.has_permissions(manage_channels=True)
+    async def link_sources(
+        self,
+        ctx: commands.Context[DiscordBot],
+        content: bool | None = None,
+        embeds: bool | None = None,
+        attachments: bool | None = None,
+        forwards: bool | None = None,
+    ) -> None:
+        """Show or change the message parts this guild takes links from.
+
+        Args:
+            ctx: The command context.
+            content: Links in the message text.
+            embeds: Links in embeds posted by other bots.
+            attachments: URLs of uploaded files.
+            forwards: Links in the text of forwarded messages.
+        """
+        assert ctx.guild is not None
+        sources = await self.db.guild_settings.get_link_sources(
+            ctx.guild.id, consistent_read=True
+        )
+        changes = {
+            LinkSource.CONTENT: content,
+            LinkSource.EMBEDS: embeds,
+            LinkSource.ATTACHMENTS: attachments,
+            LinkSource.SNAPSHOTS: forwards,
+        }
+        updated = sources
+        for source, enabled in changes.items():
+            if enabled is True:
+                updated |= source
+            elif enabled is False:
+                updated &= ~source
+        if updated != sources:
+            await self.db.guild_settings.set_link_sources(ctx.guild.id, updated)
+
+        labels = {
+            LinkSource.CONTENT: "Message text",
+            LinkSource.EMBEDS: "Bot embeds",
+            LinkSource.ATTACHMENTS: "Attachments",
+            LinkSource.SNAPSHOTS: "Forwarded messages",
+        }
+        lines = [
+            f"{'✅' if source in updated else '❌'} {label}"
+            for source, label in labels.items()
+        ]
+        await ctx.send("🔎 Link sources\n" + "\n".join(lines), ephemeral=True)
+
+    @commands.hybrid_command(
+        name="blocklist_action",
+        description="Choose what happens to links to known malicious domains.",
+    )
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def blocklist_action(
+        self,
+        ctx: commands.Context[DiscordBot],
+        action: BlocklistAction,
+        channel: discord.TextChannel | None = None,
+    ) -> None:
+        """Set the guild's action for links to blocklisted domains.
+
+        Args:
+            ctx: The command context.
+            action: ``drop`` skips the links, ``quarantine`` moves them to
+                ``channel`` and deletes the message, ``alert`` skips them and
+                reports the message in ``channel``, ``off`` forwards them.
+            channel: The quarantine or alert channel; defaults to the one
+                set before.
+        """
+        assert ctx.guild is not None
+        current = await self.db.guild_settings.get_blocklist_policy(
+            ctx.guild.id, consistent_read=True
+        )
+        channel_id = channel.id if channel is not None else current.channel_id
+        if action in ("quarantine", "alert") and channel_id is None:
+            await ctx.send(f"❌ `{action}` needs a channel.", ephemeral=True)
+            return
+        policy = BlocklistPolicy(action, channel_id)
+        await self.db.guild_settings.set_blocklist_policy(ctx.guild.id, policy)
+
+        descriptions = {
+            "drop": "are not forwarded",
+            "quarantine": f"are moved to <#{channel_id}> and the message deleted",
+            "alert": f"are not forwarded and reported in <#{channel_id}>",
+            "off": "are forwarded like any other link",
+        }
+        await ctx.send(
+            f"🛡️ Links to blocklisted domains {descriptions[action]}.", ephemeral=True
+        )
+
+    @commands.hybrid_command(
+        name="link_rule",
+        description="Allow or block links to a domain or path for a channel.",
+    )
+    @commands.guild_only()
+    @commands.has_permissions(manage_channels=True)
+    async def link_rule(
+        self,
+        ctx: commands.Context[DiscordBot],
+        channel: str,
+        action: Literal["allow", "deny", "remove"],
+        rule: str,
+    ) -> None:
+        """Add or remove a domain or path rule of an output channel.
+
+        Deny rules always win. Once a channel has allow rules, only links
+        matching one of them are forwarded to it.
+
+        Args:
+            ctx: The command context.
+            channel: The output channel to update.
+            action: ``allow`` or ``deny`` adds the rule, ``remove`` drops it.
+            rule: A domain, optionally with a path prefix, e.g. ``github.com/our-org``.
+        """
+        assert ctx.guild is not None
+        resolved = self._resolve_channel(ctx.guild, channel)
+        if resolved is None:
+            await ctx.send(f"❌ Channel `{channel}` not found.", ephemeral=True)
+            return
+        try:
+            normalized = parse_rule(rule)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}", ephemeral=True)
+            return
+
+        config = await self.db.output_channels.get_output_channel(
+            ctx.guild.id, resolved.id, consistent_read=True
+        )
+        if config is None:
+            await ctx.send(
+                f"❌ {resolved.mention} is not configured as an output channel.",
+                ephemeral=True,
+            )
+            return
+        allow = [r for r in config.link_allow if r != normalized]
+        deny = [r for r in config.link_deny if r != normalized]
+        if action == "remove" and len(allow) + len(deny) == len(
+            config.link_allow
+        ) + len(config.link_deny):
+            await ctx.send(
+                f"❌ `{normalized}` is not a rule of {resolved.mention}.",
+                ephemeral=True,
+            )
+            return
+        target = allow if action == "allow" else deny if action == "deny" else None
+        if target is not None:
+            if len(target) >= MAX_RULES:
+                await ctx.send(
+                    f"❌ A channel can have at most {MAX_RULES} {action} rules.",
+                    ephemeral=True,
+                )
+                return
+            target.append(normalized)
+
+        updated = await self.db.output_channels.set_link_rules(
+            ctx.guild.id, resolved.id, allow, deny
+        )
+        if updated is None:
+            await ctx.send(
+                f"❌ {resolved.mention} is not configured as an output channel.",
+                ephemeral=True,
+            )
+            return
+        summary = _describe_rules(allow, deny)
+        await ctx.send(
+            f"✅ Link rules updated for {resolved.mention}\n"
+            + (summary or "No rules: all links of its link types are forwarded."),
+            ephemeral=True,
+        )
+        logger.info(
+            "%s link rule %s for #%s in guild %s",
+            action.capitalize(),
+            normalized,
+            resolved.name,
+            ctx.guild.name,
+        )
+
+    @link_rule.autocomplete("channel")
+    async def _link_rule_channel_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        return await self.output_channel_autocomplete(interaction, current)
+
+    @link_rule.autocomplete("rule")
+    async def _link_rule_rule_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        """Suggest the chosen channel's existing rules, for removing them."""
+        guild = interaction.guild
+        channel = getattr(interaction.namespace, "channel", None)
+        if guild is None or not channel or not str(channel).isdigit():
+            return []
+        configs = await self.db.output_channels.get_cached_output_channels(guild.id)
+        current = current.strip().lower()
+        return [
+            app_commands.Choice(name=f"{kind} {rule}", value=rule)
+            for config in configs
+            if config.channel_id == int(channel)
+            for kind, rules in (
+                ("allow", config.link_allow),
+                ("deny", config.link_deny),
+            )
+            for rule in rules
+            if current in rule
+        ][:MAX_CHOICES]
+
+    @commands.hybrid_command(
+        name="link_digest",
+        description="Send a channel's links as a scheduled digest instead of one by one.",
+    )
+    @commands.guild_only()
+    @commands.has_permissions(manage_channels=True)
+    async def link_digest(
+        self,
+        ctx: commands.Context[DiscordBot],
+        channel: str,
+        mode: Literal["off", "hourly", "daily"],
+    ) -> None:
+        """Switch an output channel between immediate forwards and digests.
+
+        In digest mode links are collected and delivered on the schedule as
+        a few grouped messages, each distinct link once with its count.
+        Turning digests off forwards new links immediately again; links
+        already collected are still delivered on schedule.
+
+        Args:
+            ctx: The command context.
+            channel: The output channel to update.
+            mode: ``hourly`` or ``daily`` digests, or ``off``.
+        """
+        assert ctx.guild is not None
+        resolved = self._resolve_channel(ctx.guild, channel)
+        if resolved is None:
+            await ctx.send(f"❌ Channel `{channel}` not found.", ephemeral=True)
+            return
+        updated = await self.db.output_channels.set_digest_interval(
+            ctx.guild.id, resolved.id, DIGEST_INTERVALS[mode]
+        )
+        if updated is None:
+            await ctx.send(
+                f"❌ {resolved.mention} is not configured as an output channel.",
+                ephemeral=True,
+            )
+            return
+        if mode == "off":
+            message = (
+                f"✅ Links are forwarded to {resolved.mention} as they are posted."
+            )
+        else:
+            message = f"✅ {resolved.mention} now gets a {mode} digest of its links."
+        await ctx.send(message, ephemeral=True)
+        logger.info(
+            "Set %s digest for #%s in guild %s", mode, resolved.name, ctx.guild.name
+        )
+
+    @link_digest.autocomplete("channel")
+    async def _link_digest_channel_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        return await self.output_channel_autocomplete(interaction, current)
+
     @commands.hybrid_command(
         name="support",
         description="Get the link to the support server.",
@@ -5,40 +5,293 @@ This module contains the LinkMonitor cog that processes messages for links,
 categorizes them, and forwards them to configured output channels.
 """
 
+import asyncio
 import logging
-from discord.abc import GuildChannel
+import time
+from collections import Counter
+from typing import Final
+
+import aiohttp
 import discord
-from discord.ext import commands
-from link_utils.categories import categorize_link
-from link_utils.url_tools import extract_urls
-from core.db.models import OutputChannel
-from core.db.db_manager import Database
+from discord.abc import GuildChannel
+from discord.ext import commands, tasks
+
 from core.bot_setup import DiscordBot
 from core.channel_utils import get_or_create_webhook
+from core.db.db_manager import Database
+from core.db.records import OutputChannelRecord
+from core.digest import DigestBuffer, PendingDigest, interval_name
+from core.env import env_bool, env_choice, env_float, env_int, env_str
+from core.payloads import (
+    FORWARD_STYLES,
+    ForwardStyle,
+    build_digest_payloads,
+    build_payloads,
+)
+from core.profiling import message_context
+from core.rate_limit import TokenBucketLimiter
+from core.tracing import span, tracer_from_env
+from core.traffic import TrafficRecorder
+from link_utils.blocklist import BlocklistReloader
+from link_utils.cache import TTLCache
+from link_utils.canonical import canonicalize_url, canonicalize_urls
+from link_utils.categories import CATEGORY_BITS, categorize_link, category_mask
+from link_utils.extraction import LinkSource, extract_message_links, has_link_candidates
+from link_utils.http import create_link_session
+from link_utils.metadata import LinkMetadata, MetadataResolver
+from link_utils.shortlinks import (
+    DEFAULT_SHORTENER_DOMAINS,
+    ShortLinkResolver,
+    parse_domains,
+)
 
 logger: logging.Logger = logging.getLogger(name=__name__)
 
+# Over-limit messages waiting for tokens per guild before further ones are dropped.
+MAX_DEFERRED_PER_GUILD: Final[int] = 50
+# Over-limit messages merged into a single forward per author.
+MAX_COALESCED_MESSAGES: Final[int] = 25
+# Values of LOAD_SHED_ACTION.
+SHED_ACTIONS: Final[tuple[str, ...]] = ("drop", "defer", "coalesce")
+# Webhook name of quarantine and alert posts.
+SCREENING_USERNAME: Final[str] = "Link screening"
+# Webhook name of digest deliveries.
+DIGEST_USERNAME: Final[str] = "Link digest"
+
+
+def _metadata_embed(metadata: LinkMetadata) -> discord.Embed:
+    """Build a link preview embed from resolved page metadata."""
+    embed = discord.Embed(
+        title=(metadata.title or "")[:256],
+        url=metadata.canonical_url or metadata.url,
+        description=(metadata.description or "")[:350] or None,
+    )
+    if metadata.site_name:
+        embed.set_author(name=metadata.site_name[:256])
+    if metadata.image:
+        embed.set_thumbnail(url=metadata.image)
+    return embed
+
+
+def _has_forwarded_attachment(message: discord.Message, forwarded: set[str]) -> bool:
+    """Return whether any of the message's attachments was forwarded as a link."""
+    return any(
+        attachment.url in forwarded or canonicalize_url(attachment.url) in forwarded
+        for attachment in message.attachments
+    )
+
 
 class LinkMonitor(commands.Cog):
     """Monitor messages for links and send them to a dedicated links channel.
 
     This cog detects URLs in messages, categorizes them by type (YouTube, Twitch, etc.),
     and forwards them via webhooks to configured output channels based on ACL filters.
-    Original messages containing links are deleted to keep channels clean.
+    Original messages containing links are deleted to keep channels clean,
+    unless they carry a forwarded attachment, which deleting would remove.
     """
 
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, bot: commands.Bot | None = None) -> None:
         """Initialize the LinkMonitor cog.
         Args:
             db: The database instance for accessing configuration.
+            bot: The bot, used to find the channels digests are delivered to.
         """
         self.db = db
+        self.bot = bot
+        self._webhooks: dict[int, discord.Webhook] = {}
+        self._canonicalize = env_bool("URL_CANONICALIZE", True)
+        self._forward_style: ForwardStyle = env_choice(  # type: ignore[assignment]
+            "FORWARD_STYLE", FORWARD_STYLES, "plain"
+        )
+        record_path = env_str("TRAFFIC_RECORD_PATH", "")
+        self._recorder = TrafficRecorder(record_path) if record_path else None
+        self.tracer = tracer_from_env()
+        self._load_shedding = env_bool("LOAD_SHED_ENABLED", True)
+        self._shed_action = env_choice("LOAD_SHED_ACTION", SHED_ACTIONS, "drop")
+        self._max_defer = env_float("LOAD_SHED_MAX_DEFER", 30.0)
+        self._author_limiter = TokenBucketLimiter(
+            rate=env_float("LOAD_SHED_AUTHOR_RATE", 0.2),
+            burst=env_float("LOAD_SHED_AUTHOR_BURST", 5),
+        )
+        self._guild_limiter = TokenBucketLimiter(
+            rate=env_float("LOAD_SHED_GUILD_RATE", 2.0),
+            burst=env_float("LOAD_SHED_GUILD_BURST", 20),
+        )
+        self._deferred: dict[int, int] = {}
+        self._deferred_authors: dict[tuple[int, int], int] = {}
+        self._coalesced: dict[
+            tuple[int, int], list[tuple[discord.Message, list[str]]]
+        ] = {}
+        self.shed_stats: Counter[str] = Counter()
+        self._http: aiohttp.ClientSession | None = None
+        self._metadata: MetadataResolver | None = None
+        self._metadata_budget = env_float("LINK_METADATA_BUDGET", 0.75)
+        self._shortlinks: ShortLinkResolver | None = None
+        self._shortlink_budget = env_float("SHORTLINK_BUDGET", 0.5)
+        self._edits_enabled = env_bool("EDIT_FORWARDING_ENABLED", True)
+        # Links already handled per message id, so edits only forward new ones.
+        self.ledger: TTLCache[int, frozenset[str]] = TTLCache(
+            maxsize=env_int("EDIT_LEDGER_SIZE", 10_000),
+            ttl=env_float("EDIT_LEDGER_TTL", 3600.0),
+        )
+        self.edit_stats: Counter[str] = Counter()
+        self.link_sources: Counter[str] = Counter()
+        # Links a channel's category accepted but its domain rules rejected.
+        self.filtered_links = 0
+        blocklist_path = env_str("BLOCKLIST_PATH", "")
+        self.blocklist = BlocklistReloader(blocklist_path) if blocklist_path else None
+        # Blocklisted links by the action taken on them.
+        self.blocked_links: Counter[str] = Counter()
+        self.digests = DigestBuffer(
+            env_str("DIGEST_PATH", "digests.log").strip() or None,
+            max_links=env_int("DIGEST_MAX_LINKS", 500),
+        )
+        self._digests_per_tick = env_int("DIGEST_MAX_PER_TICK", 10)
+        self.digest_stats: Counter[str] = Counter()
+        self.flush_removals.change_interval(
+            seconds=env_float("REMOVAL_FLUSH_INTERVAL", 30.0)
+        )
+        self.watch_blocklist.change_interval(
+            seconds=env_float("BLOCKLIST_POLL_INTERVAL", 60.0)
+        )
+        self.flush_digests.change_interval(
+            seconds=env_float("DIGEST_TICK_INTERVAL", 30.0)
+        )
+
+    async def cog_load(self) -> None:
+        """Start background work and the optional link resolvers.
+
+        Pending digests are restored from their log. The blocklist loads in
+        the watcher's first run rather than here, so a large file does not
+        delay start-up; links pass unscreened until then.
+        """
+        await asyncio.to_thread(self.digests.load)
+        self.flush_removals.start()
+        self.flush_digests.start()
+        if self.blocklist is not None:
+            self.watch_blocklist.start()
+        if env_bool("LINK_METADATA_ENABLED") or env_bool("SHORTLINK_EXPAND_ENABLED"):
+            self._http = create_link_session()
+        if env_bool("SHORTLINK_EXPAND_ENABLED"):
+            assert self._http is not None
+            domains = env_str("SHORTLINK_DOMAINS", "")
+            self._shortlinks = ShortLinkResolver(
+                self._http,
+                domains=parse_domains(domains)
+                if domains
+                else DEFAULT_SHORTENER_DOMAINS,
+                concurrency=env_int("SHORTLINK_CONCURRENCY", 8),
+                timeout=env_float("SHORTLINK_TIMEOUT", 3.0),
+                max_hops=env_int("SHORTLINK_MAX_HOPS", 5),
+            )
+            logger.info("Short link expansion enabled")
+        if env_bool("LINK_METADATA_ENABLED"):
+            assert self._http is not None
+            self._metadata = MetadataResolver(
+                self._http,
+                concurrency=env_int("LINK_METADATA_CONCURRENCY", 8),
+                timeout=env_float("LINK_METADATA_TIMEOUT", 5.0),
+            )
+            logger.info("Link metadata previews enabled")
+
+    async def cog_unload(self) -> None:
+        """Stop background work, delete anything still queued and close HTTP sessions."""
+        self.flush_removals.cancel()
+        self.flush_digests.cancel()
+        self.watch_blocklist.cancel()
+        self.digests.close()
+        await self.db.output_channels.flush_removals()
+        if self._http is not None:
+            await self._http.close()
+        if self._recorder is not None:
+            self._recorder.close()
+        await self.tracer.close()
+
+    @tasks.loop(seconds=30.0)
+    async def flush_removals(self) -> None:
+        """Periodically delete rows of channels and guilds that no longer exist."""
+        try:
+            await self.db.output_channels.flush_removals()
+        except Exception:
+            logger.exception("Failed to flush queued config removals")
+
+    @tasks.loop(seconds=30.0)
+    async def flush_digests(self) -> None:
+        """Deliver the digests that are due, a bounded number per tick.
+
+        A digest that could not be sent at all is put back and retried on
+        the next tick; the log is compacted after every round.
+        """
+        due = self.digests.due(limit=self._digests_per_tick)
+        if not due:
+            return
+        for pending in due:
+            digest = self.digests.take(pending.channel_id)
+            if digest is None:
+                continue
+            try:
+                delivered = await self._send_digest(digest)
+            except Exception:
+                logger.exception("Failed to deliver digest to %s", digest.channel_id)
+                delivered = False
+            if not delivered:
+                self.digests.restore(digest)
+        await self._rewrite_digest_log()
+
+    async def _rewrite_digest_log(self) -> None:
+        """Rewrite the digest log with only the pending digests.
+
+        Delivered and discarded digests leave the log, so a restart does not
+        bring them back.
+        """
+        try:
+            await self.digests.rewrite()
+        except OSError as e:
+            logger.error("Failed to rewrite the digest log: %s", e)
+
+    @tasks.loop(seconds=60.0)
+    async def watch_blocklist(self) -> None:
+        """Load the blocklist, then reload it whenever the file changes."""
+        assert self.blocklist is not None
+        await self.blocklist.reload()
 
     @commands.Cog.listener()
     async def on_ready(self) -> None:
         """Log when the cog is ready."""
         logger.info("LinkMonitor cog loaded")
 
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: GuildChannel) -> None:
+        """Forget a deleted channel's webhook, digest and output configuration."""
+        self._webhooks.pop(channel.id, None)
+        if isinstance(channel, discord.TextChannel):
+            self.db.output_channels.queue_removal(channel.guild.id, channel.id)
+        if self.digests.discard(channel.guild.id, channel.id):
+            await self._rewrite_digest_log()
+
+    @commands.Cog.listener()
+    async def on_webhooks_update(self, channel: GuildChannel) -> None:
+        """Drop the cached webhook so it is re-resolved on the next forward."""
+        if self._webhooks.pop(channel.id, None) is not None:
+            logger.debug(
+                "Webhooks changed in #%s, dropped cached webhook", channel.name
+            )
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        """Forget all state for a guild the bot has left and delete its routing."""
+        for channel in guild.channels:
+            self._webhooks.pop(channel.id, None)
+        self.db.output_channels.queue_removal(guild.id)
+        self.db.guild_settings.invalidate_cached(guild.id)
+        if self.digests.discard(guild.id):
+            await self._rewrite_digest_log()
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild) -> None:
+        """Keep a guild's rows if the bot rejoins before they were deleted."""
+        self.db.output_channels.cancel_guild_removal(guild.id)
+
     @commands.Cog.listener()
     @commands.guild_only()
     async def on_message(self, message: discord.Message) -> None:
@@ -46,23 +299,284 @@ class LinkMonitor(commands.Cog):
 
         Detects URLs in messages, categorizes them, and sends them via webhooks to
         output channels that have the corresponding link type enabled in their ACLs.
-        The original message is deleted after successful forwarding.
+        The original message is deleted after successful forwarding. Messages
+        from other bots are read only for guilds that take links from embeds;
+        webhook messages, including our own forwards, are always ignored.
 
         Args:
             message: The Discord message to process.
         """
-        if message.author.bot or not message.guild:
+        if not message.guild or message.webhook_id is not None:
+            return
+        if message.author.bot and not message.embeds:
             return
 
         if not isinstance(message.channel, (discord.TextChannel, discord.Thread)):
             return
 
         assert message.guild is not None
+        message_context.set(
+            f"guild={message.guild.id} channel={message.channel.id} message={message.id}"
+        )
+        if self._recorder is not None and not message.author.bot:
+            self._recorder.record(message)
+        sources = await self._candidate_sources(message)
+        if sources is None:
+            return
+
+        with self.tracer.start_trace(
+            "on_message",
+            guild_id=message.guild.id,
+            channel_id=message.channel.id,
+            message_id=message.id,
+        ) as root:
+            urls = self._extract_urls(message, sources)
+            if not urls:
+                return
+
+            if self._load_shedding and not self._admit(message):
+                root.set("shed", self._shed_action)
+                await self._shed(message, urls)
+                return
 
-        urls: list[str] | None = extract_urls(text=message.content)
-        if not urls:
+            await self._forward_message(message, urls, [message])
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent) -> None:
+        """Forward links that an edit added to a message.
+
+        Uses the raw event so no message cache is needed. The links of each
+        message handled so far are kept in a bounded ledger and only links
+        missing from it are forwarded, so an edit never sends a link twice.
+        Edits to messages older than the ledger TTL are ignored, since their
+        entries may have expired.
+
+        Args:
+            payload: The raw edit event carrying the updated message.
+        """
+        message = payload.message
+        if not self._edits_enabled or payload.guild_id is None or message.author.bot:
+            return
+        # Link preview unfurls also arrive as edits but carry no edit timestamp.
+        if message.edited_at is None:
+            return
+        if not isinstance(message.channel, (discord.TextChannel, discord.Thread)):
+            return
+        sources = await self._candidate_sources(message)
+        if sources is None:
             return
+        age = (discord.utils.utcnow() - message.created_at).total_seconds()
+        if age > self.ledger.ttl:
+            self.edit_stats["too_old"] += 1
+            return
+
+        with self.tracer.start_trace(
+            "on_message_edit",
+            guild_id=payload.guild_id,
+            channel_id=message.channel.id,
+            message_id=message.id,
+        ) as root:
+            urls = self._extract_urls(message, sources)
+            if not urls:
+                return
+            _, seen = self.ledger.lookup(message.id)
+            added = [url for url in urls if not seen or url not in seen]
+            if not added:
+                self.edit_stats["unchanged"] += 1
+                return
+            self.edit_stats["forwarded"] += 1
+
+            assert message.guild is not None
+            message_context.set(
+                f"guild={message.guild.id} channel={message.channel.id} message={message.id} edit"
+            )
+            if self._load_shedding and not self._admit(message):
+                root.set("shed", self._shed_action)
+                await self._shed(message, added)
+                return
+            await self._forward_message(message, added, [message])
+
+    async def _candidate_sources(self, message: discord.Message) -> LinkSource | None:
+        """Return the guild's link sources if the message may carry links from them.
+
+        The check against every source runs first, so guild settings are
+        only looked up for messages that may carry links at all.
+        """
+        assert message.guild is not None
+        if not has_link_candidates(message):
+            return None
+        sources = await self.db.guild_settings.get_cached_link_sources(message.guild.id)
+        if not has_link_candidates(message, sources):
+            return None
+        return sources
+
+    def _extract_urls(
+        self, message: discord.Message, sources: LinkSource
+    ) -> list[str] | None:
+        """Return the (canonicalized) URLs in the message parts the guild reads."""
+        assert message.guild is not None
+        with span("extract") as extract_span:
+            if message.author.bot and (
+                LinkSource.EMBEDS not in sources
+                or message.author.id == message.guild.me.id
+            ):
+                return None
+            links = extract_message_links(message, sources)
+            extract_span.set("urls", len(links))
+            if not links:
+                return None
+            self.link_sources.update(str(source.name) for source in links.values())
+            urls = list(links)
+            if self._canonicalize:
+                urls = canonicalize_urls(urls)
+            return urls
+
+    def _admit(self, message: discord.Message) -> bool:
+        """Take a token from the author's and the guild's bucket.
+
+        Args:
+            message: The message about to be forwarded.
+
+        Returns:
+            True if both buckets had a token, False if the message must be shed.
+        """
+        assert message.guild is not None
+        author_key = (message.guild.id, message.author.id)
+        if not self._author_limiter.acquire(author_key):
+            return False
+        if not self._guild_limiter.acquire(message.guild.id):
+            self._author_limiter.refund(author_key)
+            return False
+        return True
+
+    def _retry_after(self, message: discord.Message) -> float:
+        """Return the seconds until the message would be admitted again."""
+        assert message.guild is not None
+        return max(
+            self._author_limiter.retry_after((message.guild.id, message.author.id)),
+            self._guild_limiter.retry_after(message.guild.id),
+        )
+
+    def _defer_delay(self, message: discord.Message) -> float:
+        """Return when a deferred message should retry, behind those already waiting.
+
+        Each deferred message waiting on a bucket gets its own refill slot,
+        so a burst of deferred messages is admitted one token at a time
+        instead of all waking for the same token.
+        """
+        assert message.guild is not None
+        guild_id = message.guild.id
+        author_key = (guild_id, message.author.id)
+        return max(
+            self._author_limiter.retry_after(author_key)
+            + self._deferred_authors.get(author_key, 0) / self._author_limiter.rate,
+            self._guild_limiter.retry_after(guild_id)
+            + self._deferred.get(guild_id, 0) / self._guild_limiter.rate,
+        )
+
+    async def _shed(self, message: discord.Message, urls: list[str]) -> None:
+        """Handle a message that is over its rate limit.
+
+        Depending on ``LOAD_SHED_ACTION`` the message is dropped, forwarded
+        after the bucket refills, or merged with the author's other
+        over-limit messages into a single forward.
+
+        Args:
+            message: The over-limit message.
+            urls: The URLs extracted from it.
+        """
+        assert message.guild is not None
+        guild_id = message.guild.id
+
+        if self._shed_action == "defer":
+            delay = self._defer_delay(message)
+            if (
+                delay > self._max_defer
+                or self._deferred.get(guild_id, 0) >= MAX_DEFERRED_PER_GUILD
+            ):
+                self._drop(message)
+                return
+            self.shed_stats["deferred"] += 1
+            author_key = (guild_id, message.author.id)
+            deadline = time.monotonic() + self._max_defer
+            self._deferred[guild_id] = self._deferred.get(guild_id, 0) + 1
+            self._deferred_authors[author_key] = (
+                self._deferred_authors.get(author_key, 0) + 1
+            )
+            try:
+                await asyncio.sleep(delay)
+                # Fresh messages may have taken the slot's token meanwhile.
+                while not self._admit(message):
+                    delay = self._retry_after(message)
+                    if time.monotonic() + delay > deadline:
+                        self._drop(message)
+                        return
+                    await asyncio.sleep(delay)
+            finally:
+                for counts, key in (
+                    (self._deferred, guild_id),
+                    (self._deferred_authors, author_key),
+                ):
+                    counts[key] -= 1
+                    if not counts[key]:
+                        del counts[key]
+            await self._forward_message(message, urls, [message])
+
+        elif self._shed_action == "coalesce":
+            delay = self._retry_after(message)
+            key = (guild_id, message.author.id)
+            pending = self._coalesced.get(key)
+            if pending is not None:
+                if len(pending) >= MAX_COALESCED_MESSAGES:
+                    self._drop(message)
+                else:
+                    pending.append((message, urls))
+                    self.shed_stats["coalesced"] += 1
+                return
+
+            pending = self._coalesced[key] = [(message, urls)]
+            self.shed_stats["coalesced"] += 1
+            try:
+                await asyncio.sleep(min(delay, self._max_defer))
+            finally:
+                del self._coalesced[key]
+            merged = list(dict.fromkeys(url for _, batch in pending for url in batch))
+            await self._forward_message(
+                pending[0][0], merged, [original for original, _ in pending]
+            )
+
+        else:
+            self._drop(message)
+
+    def _drop(self, message: discord.Message) -> None:
+        """Count and log a message that will not be forwarded."""
+        self.shed_stats["dropped"] += 1
+        logger.debug(
+            "Dropped over-limit message %s from %s in guild %s",
+            message.id,
+            message.author,
+            message.guild.id if message.guild else None,
+        )
+
+    async def _forward_message(
+        self,
+        message: discord.Message,
+        urls: list[str],
+        originals: list[discord.Message],
+    ) -> None:
+        """Categorize URLs, forward them to output channels and delete the originals.
+
+        Links to blocklisted domains are screened out before routing, once
+        short links are expanded, so a shortened scam link is caught too.
 
+        Args:
+            message: The message whose author the forward is attributed to.
+            urls: The URLs to forward.
+            originals: Messages to delete once anything was forwarded or
+                quarantined.
+        """
+        assert message.guild is not None
+        requested = frozenset(urls)
         channel_name = getattr(message.channel, "name", "unknown")
         logger.info(
             "Detected %d URLs in message from %s in #%s (guild: %s)",
@@ -72,21 +586,53 @@ class LinkMonitor(commands.Cog):
             message.guild.name,
         )
 
-        output_channels = await self.db.output_channels.get_output_channels(
+        output_channels = await self.db.output_channels.get_cached_output_channels(
             message.guild.id
         )
         if not output_channels:
             logger.debug("No output channels configured for guild %s", message.guild.id)
             return
 
+        if self._shortlinks is not None:
+            with span("expand_shortlinks", urls=len(urls)):
+                expanded = await self._shortlinks.expand_many(
+                    urls, self._shortlink_budget
+                )
+            if expanded:
+                urls = [expanded.get(url, url) for url in urls]
+                if self._canonicalize:
+                    urls = canonicalize_urls(urls)
+
+        quarantined = False
+        if self.blocklist is not None:
+            urls, quarantined = await self._screen(message, urls)
+            if not urls:
+                if quarantined:
+                    await self._delete_originals(originals, channel_name)
+                return
+
         links_by_category: dict[str, list[str]] = {}
-        for url in urls:
-            category = categorize_link(url)
-            if category not in links_by_category:
-                links_by_category[category] = []
-            links_by_category[category].append(url)
+        with span("categorize", urls=len(urls)):
+            for url in urls:
+                category = categorize_link(url)
+                if category not in links_by_category:
+                    links_by_category[category] = []
+                links_by_category[category].append(url)
 
         logger.debug("Categorized links: %s", links_by_category)
+        message_mask = category_mask(links_by_category)
+
+        previews: dict[str, discord.Embed] = {}
+        if self._metadata is not None:
+            with span("resolve_metadata", urls=len(urls)):
+                metadata = await self._metadata.resolve_many(
+                    urls, self._metadata_budget
+                )
+            previews = {
+                url: _metadata_embed(data)
+                for url, data in metadata.items()
+                if data.title
+            }
 
         sent_channels: set[int] = set()
 
@@ -94,6 +640,9 @@ class LinkMonitor(commands.Cog):
             if output_channel_config.channel_id in sent_channels:
                 continue
 
+            if not output_channel_config.acl & message_mask:
+                continue
+
             output_channel: GuildChannel | None = message.guild.get_channel(
                 output_channel_config.channel_id
             )
@@ -102,81 +651,352 @@ class LinkMonitor(commands.Cog):
                 output_channel, discord.TextChannel
             ):
                 logger.warning(
-                    "Output channel %s not found or not a text channel",
+                    "Output channel %s not found or not a text channel, skipping it",
                     output_channel_config.channel_id,
                 )
+                self.db.output_channels.invalidate_cached(message.guild.id)
                 continue
 
             if await self._forward_links_to_channel(
-                message, output_channel, output_channel_config, links_by_category
+                message,
+                output_channel,
+                output_channel_config,
+                links_by_category,
+                previews,
             ):
                 sent_channels.add(output_channel_config.channel_id)
 
         if sent_channels:
+            self._remember(originals, requested)
+        if quarantined:
+            await self._delete_originals(originals, channel_name)
+        elif sent_channels:
+            # Deleting a message deletes its attachments, which would leave
+            # the forwarded CDN links dead.
+            forwarded = set(urls)
+            await self._delete_originals(
+                [
+                    original
+                    for original in originals
+                    if not _has_forwarded_attachment(original, forwarded)
+                ],
+                channel_name,
+            )
+
+    def _remember(self, originals: list[discord.Message], urls: frozenset[str]) -> None:
+        """Add forwarded links to the ledger, so later edits skip them."""
+        if not self._edits_enabled:
+            return
+        for original in originals:
+            _, seen = self.ledger.lookup(original.id)
+            self.ledger.set(original.id, urls.union(seen or ()))
+
+    async def _delete_originals(
+        self, originals: list[discord.Message], channel_name: str
+    ) -> None:
+        """Delete messages whose links were forwarded."""
+        for original in originals:
             try:
-                await message.delete()
+                with span("delete", message_id=original.id):
+                    await original.delete()
+                self.ledger.discard(original.id)
                 logger.info("Deleted original message with links in #%s", channel_name)
             except discord.Forbidden:
-                channel_name = message.channel.name
                 logger.warning("Could not delete message in #%s", channel_name)
             except discord.HTTPException as e:
                 logger.error("Error deleting message: %s", e)
 
+    async def _screen(
+        self, message: discord.Message, urls: list[str]
+    ) -> tuple[list[str], bool]:
+        """Take blocklisted links out and apply the guild's blocklist action.
+
+        The guild's policy is only read once a link matched, so screening a
+        clean message costs the table lookups alone. Quarantine and alert
+        fall back to dropping when their channel is missing or unreachable.
+
+        Args:
+            message: The message the links came from.
+            urls: The links about to be routed.
+
+        Returns:
+            ``(urls, quarantined)``: the links that may be forwarded, and
+            whether blocked links were moved to the quarantine channel, in
+            which case the original message is deleted.
+        """
+        assert self.blocklist is not None and message.guild is not None
+        blocklist = self.blocklist.blocklist
+        with span("screen", urls=len(urls)) as screen_span:
+            blocked = {
+                url: domain
+                for url in urls
+                if (domain := blocklist.match(url)) is not None
+            }
+            screen_span.set("blocked", len(blocked))
+        if not blocked:
+            return urls, False
+        policy = await self.db.guild_settings.get_cached_blocklist_policy(
+            message.guild.id
+        )
+        if policy.action == "off":
+            return urls, False
+
+        action = policy.action
+        if action != "drop":
+            channel = (
+                message.guild.get_channel(policy.channel_id)
+                if policy.channel_id is not None
+                else None
+            )
+            if not isinstance(channel, discord.TextChannel) or not (
+                await self._report_blocked(
+                    message, channel, blocked, quarantine=action == "quarantine"
+                )
+            ):
+                action = "drop"
+        self.blocked_links[action] += len(blocked)
+        logger.warning(
+            "Blocklisted links from %s in guild %s (%s): %s",
+            message.author,
+            message.guild.id,
+            action,
+            ", ".join(sorted(set(blocked.values()))),
+        )
+        return [url for url in urls if url not in blocked], action == "quarantine"
+
+    async def _report_blocked(
+        self,
+        message: discord.Message,
+        channel: discord.TextChannel,
+        blocked: dict[str, str],
+        *,
+        quarantine: bool,
+    ) -> bool:
+        """Post blocklisted links, or an alert about them, to a moderation channel.
+
+        Links are wrapped in ``<>`` so Discord shows no preview, and no one
+        is pinged.
 
+        Args:
+            message: The message the links came from.
+            channel: The quarantine or alert channel.
+            blocked: The listed domain by blocked link.
+            quarantine: Post the links themselves rather than an alert.
+
+        Returns:
+            True if the post was sent.
+        """
+        webhook = await self._get_webhook(channel)
+        if webhook is None:
+            return False
+        source = getattr(message.channel, "mention", "a channel")
+        if quarantine:
+            header = f"🚫 Quarantined links from {message.author.mention} in {source}:"
+            lines = [f"<{url}> (`{domain}`)" for url, domain in blocked.items()]
+        else:
+            header = (
+                f"🚨 {message.author.mention} posted blocklisted links in {source}: "
+                f"{message.jump_url}"
+            )
+            lines = [f"`{domain}`" for domain in dict.fromkeys(blocked.values())]
+        content = header
+        for line in lines:
+            if len(content) + len(line) + 1 > 2000:
+                break
+            content += "\n" + line
+        try:
+            with span("webhook.send", channel_id=channel.id, links=len(blocked)):
+                await webhook.send(
+                    content=content,
+                    username=SCREENING_USERNAME,
+                    allowed_mentions=discord.AllowedMentions.none(),
+                )
+        except discord.NotFound:
+            self._webhooks.pop(channel.id, None)
+            return False
+        except discord.HTTPException as e:
+            logger.error("Could not post blocklisted links to #%s: %s", channel.name, e)
+            return False
+        return True
 
     async def _forward_links_to_channel(
         self,
         message: discord.Message,
         output_channel: discord.TextChannel,
-        output_channel_config: OutputChannel,
+        output_channel_config: OutputChannelRecord,
         links_by_category: dict[str, list[str]],
+        previews: dict[str, discord.Embed],
     ) -> bool:
-        """Forward categorized links to a specific output channel.
+        """Forward the links a channel accepts in as few webhook calls as possible.
+
+        Links must pass both the channel's categories and its domain and
+        path rules. All accepted categories share one payload, laid out
+        according to ``FORWARD_STYLE``; it is split only when Discord's
+        message limits require it. Channels in digest mode buffer the links
+        for their next digest instead.
 
         Args:
             message: The original message containing links.
             output_channel: The Discord text channel to send to.
             output_channel_config: The database config for the channel.
             links_by_category: Dict of category to list of URLs.
+            previews: Link preview embeds by URL.
 
         Returns:
-            True if any links were sent, False otherwise.
+            True if any links were sent or buffered, False otherwise.
         """
-
+        accepted = {
+            category: category_urls
+            for category, category_urls in links_by_category.items()
+            if output_channel_config.acl & CATEGORY_BITS[category]
+        }
+        link_filter = output_channel_config.link_filter
+        if link_filter is not None:
+            before = sum(map(len, accepted.values()))
+            accepted = {
+                category: kept
+                for category, category_urls in accepted.items()
+                if (kept := [url for url in category_urls if link_filter.allows(url)])
+            }
+            self.filtered_links += before - sum(map(len, accepted.values()))
+        if not accepted:
+            return False
+        if output_channel_config.digest_interval:
+            assert message.guild is not None
+            self.digests.add(
+                message.guild.id,
+                output_channel.id,
+                output_channel_config.digest_interval,
+                accepted,
+            )
+            self.digest_stats["buffered"] += sum(map(len, accepted.values()))
+            return True
+
+        webhook = await self._get_webhook(output_channel)
+        if webhook is None:
+            logger.error("Could not create webhook for #%s", output_channel.name)
+            return False
+
+        avatar_url = (
+            message.author.avatar.url
+            if message.author.avatar
+            else message.author.default_avatar.url
+        )
         sent = False
-        for category, category_urls in links_by_category.items():
-            if getattr(output_channel_config, category, False):
-                webhook = await get_or_create_webhook(output_channel, self.db)
-                if webhook is None:
-                    logger.error(
-                        "Could not create webhook for #%s", output_channel.name
-                    )
-                    continue
-
-                try:
-                    avatar_url = (
-                        message.author.avatar.url
-                        if message.author.avatar
-                        else message.author.default_avatar.url
-                    )
+        for payload in build_payloads(accepted, self._forward_style, previews):
+            try:
+                with span(
+                    "webhook.send",
+                    channel_id=output_channel.id,
+                    links=len(payload.links),
+                    embeds=len(payload.embeds),
+                ):
                     await webhook.send(
-                        content="\n".join(category_urls),
+                        content=payload.content or None,
                         username=message.author.display_name,
                         avatar_url=avatar_url,
+                        embeds=payload.embeds,
                     )
-                    logger.info(
-                        "Forwarded %d %s links to #%s",
-                        len(category_urls),
-                        category,
-                        output_channel.name,
-                    )
-                    sent = True
-                except discord.Forbidden:
-                    logger.exception("Missing permissions in #%s", output_channel.name)
-                except discord.HTTPException as e:
-                    logger.exception("Error processing link: %s", e)
+                sent = True
+            except discord.NotFound:
+                logger.warning(
+                    "Webhook for #%s was deleted, dropping it", output_channel.name
+                )
+                self._webhooks.pop(output_channel.id, None)
+                break
+            except discord.Forbidden:
+                logger.exception("Missing permissions in #%s", output_channel.name)
+                break
+            except discord.HTTPException:
+                logger.exception("Error processing link")
+        if sent:
+            logger.info(
+                "Forwarded %d links (%s) to #%s",
+                sum(len(category_urls) for category_urls in accepted.values()),
+                ", ".join(accepted),
+                output_channel.name,
+            )
         return sent
 
+    async def _send_digest(self, digest: PendingDigest) -> bool:
+        """Deliver a digest in as few webhook calls as the embed limits allow.
+
+        Args:
+            digest: The digest, already taken from the buffer.
+
+        Returns:
+            False if nothing could be sent and the digest should be retried.
+        """
+        channel = self.bot.get_channel(digest.channel_id) if self.bot else None
+        if not isinstance(channel, discord.TextChannel):
+            self.digest_stats["dropped"] += 1
+            logger.warning("Dropping digest for missing channel %s", digest.channel_id)
+            return True
+        webhook = await self._get_webhook(channel)
+        if webhook is None:
+            logger.error("Could not create webhook for digest in #%s", channel.name)
+            return False
+
+        header = (
+            f"📬 **{interval_name(digest.interval).capitalize()} digest**: "
+            f"{digest.total} links ({digest.distinct} distinct) "
+            f"since <t:{int(digest.first_at)}:f>"
+        )
+        if digest.overflow:
+            header += f", {digest.overflow} not listed"
+        payloads = build_digest_payloads(digest.counts, header)
+        sent = 0
+        for payload in payloads:
+            try:
+                with span(
+                    "webhook.send",
+                    channel_id=channel.id,
+                    links=len(payload.links),
+                    embeds=len(payload.embeds),
+                ):
+                    await webhook.send(
+                        content=payload.content or None,
+                        username=DIGEST_USERNAME,
+                        embeds=payload.embeds,
+                    )
+                sent += 1
+            except discord.NotFound:
+                logger.warning("Webhook for #%s was deleted, dropping it", channel.name)
+                self._webhooks.pop(channel.id, None)
+                break
+            except discord.HTTPException as e:
+                logger.error("Error sending digest to #%s: %s", channel.name, e)
+                break
+        if not sent and payloads:
+            return False
+        self.digest_stats["delivered"] += 1
+        self.digest_stats["calls"] += sent
+        logger.info(
+            "Delivered digest of %d links to #%s in %d calls",
+            digest.total,
+            channel.name,
+            sent,
+        )
+        return True
+
+    async def _get_webhook(
+        self, channel: discord.TextChannel
+    ) -> discord.Webhook | None:
+        """Return the cached webhook for a channel, resolving it on first use.
+
+        Args:
+            channel: The output channel.
+
+        Returns:
+            The webhook, or None if it could not be fetched or created.
+        """
+        webhook = self._webhooks.get(channel.id)
+        if webhook is None:
+            webhook = await get_or_create_webhook(channel, self.db)
+            if webhook is not None:
+                self._webhooks[channel.id] = webhook
+        return webhook
+
 
 async def setup(bot: DiscordBot) -> None:
     """Load the LinkMonitor cog into the bot.
@@ -185,4 +1005,11 @@ async def setup(bot: DiscordBot) -> None:
         bot: The Discord bot instance.
     """
     assert bot.db is not None, "Database not initialized"
-    await bot.add_cog(LinkMonitor(bot.db))
+    cog = LinkMonitor(bot.db, bot)
+    await bot.add_cog(cog)
+    bot.health.add_queue("deferred_messages", lambda: sum(cog._deferred.values()))
+    bot.health.add_queue("coalesced_batches", lambda: len(cog._coalesced))
+    bot.health.add_queue(
+        "pending_removals",
+        lambda: bot.db.output_channels.pending_removals if bot.db else 0,
+    )
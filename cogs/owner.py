@@ -0,0 +1,198 @@
+"""
+Owner-only maintenance commands for Discord bot.
+
+Hot-reloads link category rules from the file named by ``CATEGORY_RULES_PATH``,
+polling it for changes and exposing a manual reload/rollback command, and
+provides on-demand event loop profiling and forwarding counters.
+"""
+
+import asyncio
+import io
+import logging
+import time
+from typing import Final, Literal
+
+import discord
+from discord.ext import commands, tasks
+
+from cogs.link_monitor import LinkMonitor
+from core.bot_setup import DiscordBot
+from core.env import env_float, env_str
+from core.profiling import profile_event_loop
+from link_utils.categories import get_matcher
+from link_utils.category_rules import CategoryRulesReloader
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TOP_N: Final[int] = 25
+
+
+class Owner(commands.Cog):
+    """Commands restricted to the bot owner."""
+
+    def __init__(self) -> None:
+        """Initialize the Owner cog and the optional category rules watcher."""
+        path = env_str("CATEGORY_RULES_PATH", "")
+        self.rules: CategoryRulesReloader | None = (
+            CategoryRulesReloader(path) if path else None
+        )
+        self._profiling = asyncio.Lock()
+        self.watch_category_rules.change_interval(
+            seconds=env_float("CATEGORY_RULES_POLL_INTERVAL", 10.0)
+        )
+
+    async def cog_load(self) -> None:
+        """Load category rules and start watching the file for changes."""
+        if self.rules is not None:
+            await self.rules.reload(force=True)
+            self.watch_category_rules.start()
+
+    async def cog_unload(self) -> None:
+        """Stop watching the category rules file."""
+        self.watch_category_rules.cancel()
+
+    @tasks.loop(seconds=10.0)
+    async def watch_category_rules(self) -> None:
+        """Reload category rules when the file changes."""
+        assert self.rules is not None
+        await self.rules.reload()
+
+    @commands.hybrid_command(
+        name="reload_categories",
+        description="Reload link category rules from file, or roll back the last reload.",
+    )
+    @commands.is_owner()
+    async def reload_categories(
+        self,
+        ctx: commands.Context[DiscordBot],
+        action: Literal["reload", "rollback"] = "reload",
+    ) -> None:
+        """Reload or roll back link category rules.
+
+        Args:
+            ctx: The command context.
+            action: ``reload`` to load the rules file now, ``rollback`` to restore
+                the rules active before the last reload.
+        """
+        if self.rules is None:
+            await ctx.send("❌ `CATEGORY_RULES_PATH` is not set.", ephemeral=True)
+            return
+
+        if action == "rollback":
+            if self.rules.rollback():
+                await ctx.send(
+                    f"↩️ Rolled back to rules from `{get_matcher().source}`.",
+                    ephemeral=True,
+                )
+            else:
+                await ctx.send("❌ Nothing to roll back to.", ephemeral=True)
+            return
+
+        if await self.rules.reload(force=True):
+            matcher = get_matcher()
+            await ctx.send(
+                f"✅ Loaded {len(matcher.patterns)} categories from `{matcher.source}`.",
+                ephemeral=True,
+            )
+        else:
+            await ctx.send(
+                f"❌ Rules rejected, keeping `{get_matcher().source}`: {self.rules.last_error}",
+                ephemeral=True,
+            )
+
+    @commands.hybrid_group(name="debug", description="Owner-only diagnostics.")
+    @commands.is_owner()
+    async def debug(self, ctx: commands.Context[DiscordBot]) -> None:
+        """Owner-only diagnostics.
+
+        Args:
+            ctx: The command context.
+        """
+        await ctx.send_help(ctx.command)
+
+    @debug.command(
+        name="profile",
+        description="Sample the event loop and attach a CPU profile.",
+    )
+    @commands.is_owner()
+    async def debug_profile(
+        self,
+        ctx: commands.Context[DiscordBot],
+        seconds: commands.Range[int, 1, 60] = 10,
+    ) -> None:
+        """Run the sampling profiler and reply with the results as files.
+
+        Attaches a top-N report and the full collapsed stacks, which can be
+        rendered with flamegraph.pl or speedscope.
+
+        Args:
+            ctx: The command context.
+            seconds: How long to sample.
+        """
+        if self._profiling.locked():
+            await ctx.send("⏳ A profile is already running.", ephemeral=True)
+            return
+        await ctx.defer(ephemeral=True)
+        async with self._profiling:
+            logger.info("Profiling event loop for %ds", seconds)
+            profiler = await profile_event_loop(seconds)
+
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        files = [
+            discord.File(
+                io.BytesIO(profiler.report(PROFILE_TOP_N).encode()),
+                filename=f"profile-{stamp}-top.txt",
+            ),
+            discord.File(
+                io.BytesIO(profiler.collapsed().encode()),
+                filename=f"profile-{stamp}.folded",
+            ),
+        ]
+        await ctx.send(
+            f"📈 {profiler.total} samples over {seconds}s.", files=files, ephemeral=True
+        )
+
+    @debug.command(name="stats", description="Show link forwarding counters.")
+    @commands.is_owner()
+    async def debug_stats(self, ctx: commands.Context[DiscordBot]) -> None:
+        """Reply with load shedding, edit forwarding, ledger and tracing counters.
+
+        Args:
+            ctx: The command context.
+        """
+        monitor = ctx.bot.get_cog("LinkMonitor")
+        if not isinstance(monitor, LinkMonitor):
+            await ctx.send("❌ LinkMonitor is not loaded.", ephemeral=True)
+            return
+        ledger = monitor.ledger
+        blocklist_size = "not configured"
+        if monitor.blocklist is not None:
+            table = monitor.blocklist.blocklist
+            blocklist_size = f"{len(table)} domains, {table.nbytes / 2**20:.1f} MiB"
+        lines = [
+            (
+                f"Edit ledger: {len(ledger)}/{ledger.maxsize} messages, "
+                f"{ledger.hits} hits, {ledger.misses} misses, {ledger.evictions} evictions"
+            ),
+            f"Edits: {dict(monitor.edit_stats) or 'none'}",
+            f"Link sources: {dict(monitor.link_sources) or 'none'}",
+            f"Links rejected by channel rules: {monitor.filtered_links}",
+            f"Blocklisted links: {dict(monitor.blocked_links) or 'none'}",
+            f"Blocklist: {blocklist_size}",
+            (
+                f"Digests: {len(monitor.digests)} pending, "
+                f"{dict(monitor.digest_stats) or 'nothing buffered'}"
+            ),
+            f"Load shedding: {dict(monitor.shed_stats) or 'none'}",
+            f"Traces: {dict(monitor.tracer.stats) or 'none'}",
+        ]
+        await ctx.send("📊 " + "\n".join(lines), ephemeral=True)
+
+
+async def setup(bot: DiscordBot) -> None:
+    """Load the Owner cog into the bot.
+
+    Args:
+        bot: The Discord bot instance.
+    """
+    await bot.add_cog(Owner())
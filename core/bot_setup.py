@@ -5,14 +5,36 @@ Defines the DiscordBot class with custom setup, error handling, and integration
 for database and enhanced help command.
 """
 
+import asyncio
 import logging
+import os
+from collections.abc import Awaitable, Coroutine
 from logging import Logger
+from typing import TYPE_CHECKING, Any, Final
 
 import discord
 from discord import Intents
 from discord.ext import commands
+
 from cogs.help import CustomHelpCommand
-from .db.db_manager import Database
+
+from .env import env_float, env_int, env_str
+from .health import HealthMonitor, HealthThresholds
+from .snapshot import (
+    RoutingSnapshot,
+    capture_snapshot,
+    read_snapshot,
+    reconcile_snapshot,
+    restore_snapshot,
+)
+from .startup import STARTUP
+
+if TYPE_CHECKING:
+    from .db.db_manager import Database
+
+# Backoff between slash command sync attempts, in seconds.
+SYNC_RETRY_INITIAL: Final[float] = 5.0
+SYNC_RETRY_MAX: Final[float] = 300.0
 
 
 class DiscordBot(commands.Bot):
@@ -29,24 +51,147 @@ class DiscordBot(commands.Bot):
             help_command=CustomHelpCommand(),
         )
         self.db: Database | None = None
+        # Set by main while the database layer is still importing and connecting.
+        self.pending_db: Awaitable[Database] | None = None
+        self._background_tasks: set[asyncio.Task[Any]] = set()
+        self.snapshot_path = env_str("SNAPSHOT_PATH", "routing.snapshot").strip()
+        self.snapshot: RoutingSnapshot | None = None
+        self.health = HealthMonitor(
+            HealthThresholds(
+                max_loop_lag=env_float("HEALTH_MAX_LOOP_LAG", 1.0),
+                max_latency=env_float("HEALTH_MAX_LATENCY", 5.0),
+                max_queue_depth=env_int("HEALTH_MAX_QUEUE_DEPTH", 1000),
+            ),
+            interval=env_float("HEALTH_INTERVAL", 1.0),
+            latency=lambda: self.latency,
+        )
+
+    def start_background_task(self, coro: Coroutine[Any, Any, Any]) -> None:
+        """Run a coroutine in the background, keeping a reference until it finishes.
+
+        Args:
+            coro: The coroutine to run.
+        """
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_task_done)
+
+    def _on_background_task_done(self, task: asyncio.Task[Any]) -> None:
+        """Drop the task reference and log any failure."""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger: Logger = logging.getLogger(__name__)
+            logger.error("Background task failed", exc_info=task.exception())
 
     async def setup_hook(self) -> None:
-        """Load extensions and sync slash commands on startup."""
+        """Load extensions on startup and sync slash commands in the background.
+
+        Runs after login and before the gateway connects. The database was
+        opened concurrently with the login and is awaited here, since the
+        cogs need it.
+        """
         logger: Logger = logging.getLogger(__name__)
+        STARTUP.mark("login")
+        self.health.add_ready_check("gateway", self.is_ready)
+        self.health.add_queue("background_tasks", lambda: len(self._background_tasks))
+        health_port = env_int("HEALTH_PORT", 8080)
+        await self.health.start(
+            env_str("HEALTH_HOST", "127.0.0.1"), health_port or None
+        )
+        if self.db is None and self.pending_db is not None:
+            self.db = await self.pending_db
+        # Added once the database is set, so its first run can already pass.
+        self.health.add_probe(
+            "database",
+            self._ping_database,
+            env_float("HEALTH_PROBE_INTERVAL", 30.0),
+        )
         logger.info("Loading cogs...")
         await self.load_extension("cogs.link_monitor")
         logger.info("LinkMonitor cog loaded successfully")
         await self.load_extension("cogs.link_manager")
         logger.info("LinkManager cog loaded successfully")
+        await self.load_extension("cogs.link_export")
+        logger.info("LinkExport cog loaded successfully")
         await self.load_extension("cogs.general")
         logger.info("General cog loaded successfully")
-        logger.info("Syncing slash commands...")
-        await self.tree.sync()
-        logger.info("Slash commands synced!")
+        await self.load_extension("cogs.owner")
+        logger.info("Owner cog loaded successfully")
+        self._restore_snapshot()
+        if self.db is not None and os.getenv("MIGRATE_ACL_BITMASK"):
+            logger.info("Starting background ACL bitmask migration...")
+            self.start_background_task(self.db.output_channels.migrate_acl_bitmask())
+        STARTUP.mark("cogs")
+        # Registered commands keep working meanwhile; only changes wait for the sync.
+        self.start_background_task(self._sync_commands())
+
+    async def _ping_database(self) -> bool:
+        """Readiness probe: whether the database is open and reachable."""
+        return self.db is not None and await self.db.ping()
+
+    async def _sync_commands(self) -> None:
+        """Sync slash commands without holding up the gateway connection.
+
+        Failures are retried with exponential backoff, since a transient
+        Discord error would otherwise leave command changes unsynced until
+        the next restart.
+        """
+        logger: Logger = logging.getLogger(__name__)
+        delay = SYNC_RETRY_INITIAL
+        while True:
+            logger.info("Syncing slash commands...")
+            try:
+                await self.tree.sync()
+            except discord.HTTPException as e:
+                logger.warning(
+                    "Slash command sync failed, retrying in %.0fs: %s", delay, e
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, SYNC_RETRY_MAX)
+                continue
+            logger.info("Slash commands synced!")
+            return
+
+    def _restore_snapshot(self) -> None:
+        """Warm the caches from the last shutdown's snapshot and reconcile it.
+
+        Runs after the cogs load and before the gateway connects, so the
+        first messages are routed from the snapshot while the database is
+        re-read in the background.
+        """
+        monitor = self.get_cog("LinkMonitor")
+        if self.db is None or monitor is None or not self.snapshot_path:
+            return
+        snapshot = read_snapshot(
+            self.snapshot_path, env_float("SNAPSHOT_MAX_AGE", 3600.0)
+        )
+        if snapshot is None:
+            return
+        webhooks = monitor._webhooks
+        restore_snapshot(
+            self.db,
+            webhooks,
+            snapshot,
+            lambda url: discord.Webhook.from_url(url, client=self),
+        )
+        self.start_background_task(reconcile_snapshot(self.db, webhooks, snapshot))
+
+    async def close(self) -> None:
+        """Capture the routing snapshot, stop the health monitor and close the bot.
+
+        The snapshot is taken first because closing unloads the cogs that
+        hold the webhook cache; ``main`` writes it once the bot is closed.
+        """
+        monitor = self.get_cog("LinkMonitor")
+        if self.db is not None and monitor is not None and self.snapshot_path:
+            self.snapshot = capture_snapshot(self.db, monitor._webhooks)
+        await self.health.stop()
+        await super().close()
 
     async def on_ready(self) -> None:
         """Log bot readiness and registered slash commands."""
         logger: Logger = logging.getLogger(__name__)
+        STARTUP.finish(env_float("STARTUP_BUDGET", 10.0))
         if self.user:
             logger.info("Logged in as %s (ID: %s)", self.user, self.user.id)
         logger.info("Connected to %d guilds", len(self.guilds))
@@ -91,7 +236,7 @@ class DiscordBot(commands.Bot):
                 logger.warning("Check failed: %s", error)
                 await ctx.send("❌ Command requirements not met.")
             else:
-                logger.error("Unexpected error: %s", error, exc_info=True)
+                logger.error("Unexpected error: %s", error, exc_info=error)
                 await ctx.send("❌ An unexpected error occurred.")
         except discord.NotFound:
             logger.warning("Could not send error message - interaction expired")
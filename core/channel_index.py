@@ -0,0 +1,122 @@
+"""Prefix index over text channel names for fast autocomplete.
+
+Discord drops an autocomplete response that takes longer than three
+seconds, and scanning every channel of a large guild per keystroke is
+wasteful. Each guild gets a sorted list of name keys that is searched with
+bisection and kept current from channel create, update and delete events.
+"""
+
+import re
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+
+import discord
+
+_WORD_START = re.compile(r"(?<=[-_ ])\w")
+
+
+def _keys(name: str) -> list[str]:
+    """Return the searchable suffixes of a name: the whole name and each word."""
+    lowered = name.lower()
+    return [lowered] + [lowered[m.start() :] for m in _WORD_START.finditer(lowered)]
+
+
+class ChannelNameIndex:
+    """Sorted prefix index over one guild's text channels."""
+
+    def __init__(self, channels: Iterable[tuple[int, str]] = ()) -> None:
+        """Build the index.
+
+        Args:
+            channels: ``(channel_id, name)`` pairs to index.
+        """
+        self._names: dict[int, str] = {}
+        self._keys: list[tuple[str, int]] = []
+        for channel_id, name in channels:
+            self._names[channel_id] = name
+            self._keys.extend((key, channel_id) for key in _keys(name))
+        self._keys.sort()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def name(self, channel_id: int) -> str | None:
+        """Return the indexed name of a channel."""
+        return self._names.get(channel_id)
+
+    def add(self, channel_id: int, name: str) -> None:
+        """Index a channel, replacing its previous name if it was renamed."""
+        self.remove(channel_id)
+        self._names[channel_id] = name
+        for key in _keys(name):
+            insort(self._keys, (key, channel_id))
+
+    def remove(self, channel_id: int) -> None:
+        """Drop a channel from the index."""
+        name = self._names.pop(channel_id, None)
+        if name is None:
+            return
+        for key in _keys(name):
+            i = bisect_left(self._keys, (key, channel_id))
+            if i < len(self._keys) and self._keys[i] == (key, channel_id):
+                del self._keys[i]
+
+    def search(self, prefix: str, limit: int = 25) -> list[int]:
+        """Return channels whose name or any word of it starts with ``prefix``.
+
+        Args:
+            prefix: What the user typed so far; a leading ``#`` is ignored.
+            limit: Maximum number of results (Discord shows at most 25).
+
+        Returns:
+            Matching channel ids, whole-name matches first, then by name.
+        """
+        prefix = prefix.strip().lstrip("#").lower()
+        if not prefix:
+            return sorted(self._names, key=lambda c: self._names[c].lower())[:limit]
+        whole: list[int] = []
+        words: list[int] = []
+        seen: set[int] = set()
+        i = bisect_left(self._keys, (prefix,))
+        while i < len(self._keys) and len(whole) < limit:
+            key, channel_id = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            if channel_id not in seen:
+                seen.add(channel_id)
+                is_whole = key == self._names[channel_id].lower()
+                (whole if is_whole else words).append(channel_id)
+            i += 1
+        return (whole + words)[:limit]
+
+
+class GuildChannelIndexes:
+    """Per-guild channel name indexes, built on first use."""
+
+    def __init__(self) -> None:
+        self._indexes: dict[int, ChannelNameIndex] = {}
+
+    def get(self, guild: discord.Guild) -> ChannelNameIndex:
+        """Return the guild's index, building it from the channel cache if needed."""
+        index = self._indexes.get(guild.id)
+        if index is None:
+            index = self._indexes[guild.id] = ChannelNameIndex(
+                (channel.id, channel.name) for channel in guild.text_channels
+            )
+        return index
+
+    def update(self, channel: discord.abc.GuildChannel) -> None:
+        """Reflect a created or renamed channel in an already built index."""
+        index = self._indexes.get(channel.guild.id)
+        if index is not None and isinstance(channel, discord.TextChannel):
+            index.add(channel.id, channel.name)
+
+    def remove(self, channel: discord.abc.GuildChannel) -> None:
+        """Reflect a deleted channel in an already built index."""
+        index = self._indexes.get(channel.guild.id)
+        if index is not None:
+            index.remove(channel.id)
+
+    def drop(self, guild_id: int) -> None:
+        """Forget a guild's index."""
+        self._indexes.pop(guild_id, None)
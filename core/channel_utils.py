@@ -5,9 +5,16 @@ This module contains common functionality used across multiple cogs.
 """
 
 import logging
+from typing import TYPE_CHECKING
+
 import discord
 from discord.ext import commands
 
+from core.tracing import traced
+
+if TYPE_CHECKING:
+    from core.db.db_manager import Database
+
 logger = logging.getLogger(__name__)
 
 # Mapping of parameter names to ACL keys
@@ -115,6 +122,7 @@ def create_acls(
     return {PARAM_TO_KEY[param]: locals()[param] for param in PARAM_TO_KEY}
 
 
+@traced()
 async def get_or_create_webhook(
     channel: discord.TextChannel, db: "Database"
 ) -> discord.Webhook | None:
@@ -130,7 +138,6 @@ async def get_or_create_webhook(
     Returns:
         A Discord webhook instance or None if creation/fetching fails.
     """
-    from core.db.db_manager import Database  # Avoid circular import
 
     try:
         webhooks = await channel.webhooks()
@@ -0,0 +1,468 @@
+"""Offline admin CLI for bulk config export, import and consistency repair.
+
+Usage:
+    python -m core.db.admin export --out configs.jsonl
+    python -m core.db.admin import configs.jsonl --dry-run
+    python -m core.db.admin check
+    python -m core.db.admin purge --dry-run
+
+Every command works against any DynamoDB-compatible backend; pass
+``--endpoint-url`` (or set ``DYNAMODB_ENDPOINT_URL``) to target DynamoDB Local
+or another stand-in. ``DISCORD_TOKEN`` enables the orphaned channel check.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from typing import Any, TextIO
+
+import aioboto3
+import aiohttp
+from pydantic import ValidationError
+
+from core.db.models import GuildSettings, OutputChannel
+
+logger = logging.getLogger(__name__)
+
+DISCORD_API = "https://discord.com/api/v10"
+MAX_DISCORD_RETRIES = 3
+# Upper bound on queued API checks so memory stays flat on large tables.
+MAX_PENDING_CHECKS = 256
+
+
+class Throttle:
+    """Shared rate limiter that spaces operations evenly over time."""
+
+    def __init__(self, rate: float) -> None:
+        """Initialize the throttle.
+
+        Args:
+            rate: Maximum operations per second; 0 disables throttling.
+        """
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        """Wait until the next operation is allowed."""
+        if not self._interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self._interval
+
+
+@dataclass(frozen=True)
+class Finding:
+    """An inconsistent item found by ``check``."""
+
+    pk: str
+    sk: str
+    reason: str
+
+
+def _to_json(value: Any) -> Any:
+    """Encode DynamoDB numbers for JSON output."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _validate(item: dict[str, Any]) -> None:
+    """Validate an item with the pydantic model for its key type.
+
+    Raises:
+        ValueError: If the item is missing keys or fails validation.
+    """
+    sk = item.get("sk")
+    if not item.get("pk") or not sk:
+        raise ValueError("item has no pk/sk")
+    if sk.startswith("CHANNEL#"):
+        OutputChannel(**item)
+    elif sk == "SETTINGS":
+        GuildSettings(**item)
+
+
+async def scan_items(
+    table: Any, segments: int, throttle: Throttle, **scan_kwargs: Any
+) -> AsyncIterator[dict[str, Any]]:
+    """Scan the table with parallel segments.
+
+    Each segment paginates independently; pages are handed over through a
+    bounded queue so memory stays flat however large the table is.
+
+    Args:
+        table: The DynamoDB table resource.
+        segments: Number of parallel scan segments.
+        throttle: Throttle applied to every scan request.
+        **scan_kwargs: Extra arguments passed to ``scan``.
+
+    Yields:
+        Raw DynamoDB items.
+    """
+    queue: asyncio.Queue[list[dict[str, Any]] | None] = asyncio.Queue(
+        maxsize=segments * 2
+    )
+
+    async def worker(segment: int) -> None:
+        kwargs: dict[str, Any] = dict(
+            scan_kwargs, Segment=segment, TotalSegments=segments
+        )
+        try:
+            while True:
+                await throttle.wait()
+                response = await table.scan(**kwargs)
+                await queue.put(response.get("Items", []))
+                last_key = response.get("LastEvaluatedKey")
+                if not last_key:
+                    return
+                kwargs["ExclusiveStartKey"] = last_key
+        finally:
+            await queue.put(None)
+
+    tasks = [asyncio.create_task(worker(segment)) for segment in range(segments)]
+    try:
+        remaining = segments
+        while remaining:
+            page = await queue.get()
+            if page is None:
+                remaining -= 1
+                continue
+            for item in page:
+                yield item
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def export_items(
+    table: Any, out: TextIO, segments: int, throttle: Throttle
+) -> int:
+    """Write every item in the table to ``out`` as JSONL.
+
+    Returns:
+        The number of items exported.
+    """
+    count = 0
+    async for item in scan_items(table, segments, throttle):
+        out.write(json.dumps(item, default=_to_json, sort_keys=True))
+        out.write("\n")
+        count += 1
+    return count
+
+
+async def import_items(
+    table: Any, lines: Iterable[str], dry_run: bool, throttle: Throttle
+) -> int:
+    """Validate JSONL items and write them with BatchWriteItem.
+
+    Invalid lines are logged and skipped.
+
+    Returns:
+        The number of valid items (written unless ``dry_run``).
+    """
+    items: list[dict[str, Any]] = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line, parse_float=Decimal)
+            _validate(item)
+        except (ValueError, ValidationError) as e:
+            logger.error("Skipping line %d: %s", line_number, e)
+            continue
+        items.append(item)
+
+    if dry_run:
+        logger.info("Dry run: would import %d items", len(items))
+        return len(items)
+
+    async with table.batch_writer(overwrite_by_pkeys=["pk", "sk"]) as batch:
+        for item in items:
+            await throttle.wait()
+            await batch.put_item(Item=item)
+    return len(items)
+
+
+class DiscordChecker:
+    """Check channels and webhooks against the Discord API."""
+
+    def __init__(
+        self, session: aiohttp.ClientSession, token: str | None, concurrency: int
+    ) -> None:
+        """Initialize the checker.
+
+        Args:
+            session: HTTP session for API requests.
+            token: Bot token; without it only webhooks can be checked.
+            concurrency: Maximum number of requests in flight.
+        """
+        self._session = session
+        self._token = token
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @property
+    def can_check_channels(self) -> bool:
+        """Whether a bot token is available for channel lookups."""
+        return self._token is not None
+
+    async def _status(self, url: str, headers: dict[str, str]) -> int:
+        """GET a URL and return the status code, honouring 429 responses."""
+        async with self._semaphore:
+            for _ in range(MAX_DISCORD_RETRIES):
+                async with self._session.get(url, headers=headers) as response:
+                    if response.status != 429:
+                        return response.status
+                    retry_after = await self._retry_after(response)
+                await asyncio.sleep(retry_after)
+            return 429
+
+    @staticmethod
+    async def _retry_after(response: aiohttp.ClientResponse) -> float:
+        """Return how long a 429 asks to wait; proxies may send a non-JSON body."""
+        try:
+            header = response.headers.get("Retry-After")
+            if header is not None:
+                return float(header)
+            if response.content_type == "application/json":
+                return float((await response.json()).get("retry_after", 1.0))
+        except (ValueError, AttributeError, aiohttp.ClientError):
+            pass
+        return 1.0
+
+    async def channel_missing(self, channel_id: int) -> bool:
+        """Return True if Discord reports the channel as unknown."""
+        headers = {"Authorization": f"Bot {self._token}"}
+        return (
+            await self._status(f"{DISCORD_API}/channels/{channel_id}", headers) == 404
+        )
+
+    async def webhook_stale(self, webhook_url: str) -> bool:
+        """Return True if the webhook was deleted or its token is no longer valid."""
+        return await self._status(webhook_url, {}) in (401, 404)
+
+
+async def find_inconsistencies(
+    table: Any,
+    checker: DiscordChecker | None,
+    segments: int,
+    throttle: Throttle,
+) -> list[Finding]:
+    """Find orphaned output channel items and stale webhook URLs.
+
+    Args:
+        table: The DynamoDB table resource.
+        checker: Discord API checker, or None to only report malformed items.
+        segments: Number of parallel scan segments.
+        throttle: Throttle applied to scan requests.
+
+    Items whose API check fails are reported as ``check_failed``, which
+    ``purge`` leaves alone.
+
+    Returns:
+        The list of findings.
+    """
+    findings: list[Finding] = []
+    pending: set[asyncio.Task[None]] = set()
+
+    async def check(item: dict[str, Any]) -> None:
+        assert checker is not None
+        pk, sk = item["pk"], item["sk"]
+        try:
+            if checker.can_check_channels and await checker.channel_missing(
+                int(item["channel_id"])
+            ):
+                findings.append(Finding(pk, sk, "orphaned_channel"))
+                return
+            webhook_url = item.get("webhook_url")
+            if webhook_url and await checker.webhook_stale(webhook_url):
+                findings.append(Finding(pk, sk, "stale_webhook"))
+        except (aiohttp.ClientError, TimeoutError, ValueError) as e:
+            logger.warning("Could not check %s %s: %r", pk, sk, e)
+            findings.append(Finding(pk, sk, "check_failed"))
+
+    try:
+        async for item in scan_items(table, segments, throttle):
+            if not str(item.get("sk", "")).startswith("CHANNEL#"):
+                continue
+            if "channel_id" not in item:
+                findings.append(Finding(item["pk"], item["sk"], "malformed"))
+                continue
+            if checker is not None:
+                if len(pending) >= MAX_PENDING_CHECKS:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        task.result()
+                pending.add(asyncio.create_task(check(item)))
+
+        await asyncio.gather(*pending)
+    finally:
+        for task in pending:
+            task.cancel()
+    return findings
+
+
+async def purge(
+    table: Any, findings: Iterable[Finding], dry_run: bool, throttle: Throttle
+) -> int:
+    """Repair findings: delete orphaned items and clear stale webhook URLs.
+
+    Returns:
+        The number of items repaired (or that would be, with ``dry_run``).
+    """
+    deletes = [f for f in findings if f.reason in ("orphaned_channel", "malformed")]
+    stale = [f for f in findings if f.reason == "stale_webhook"]
+    if dry_run:
+        logger.info(
+            "Dry run: would delete %d items and clear %d webhook URLs",
+            len(deletes),
+            len(stale),
+        )
+        return len(deletes) + len(stale)
+
+    async with table.batch_writer() as batch:
+        for finding in deletes:
+            await throttle.wait()
+            await batch.delete_item(Key={"pk": finding.pk, "sk": finding.sk})
+    for finding in stale:
+        await throttle.wait()
+        await table.update_item(
+            Key={"pk": finding.pk, "sk": finding.sk},
+            UpdateExpression="REMOVE webhook_url",
+        )
+    return len(deletes) + len(stale)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(
+        prog="python -m core.db.admin", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument(
+        "--table", default=os.getenv("DYNAMODB_TABLE_NAME", "discord-bot-table")
+    )
+    parser.add_argument("--region", default=os.getenv("AWS_REGION", "us-east-1"))
+    parser.add_argument(
+        "--endpoint-url",
+        default=os.getenv("DYNAMODB_ENDPOINT_URL"),
+        help="DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local",
+    )
+    parser.add_argument(
+        "--segments", type=int, default=4, help="parallel scan segments"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="concurrent Discord API checks"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=25.0,
+        help="maximum DynamoDB requests per second (0 = unlimited)",
+    )
+    writes = argparse.ArgumentParser(add_help=False)
+    writes.add_argument(
+        "--dry-run", action="store_true", help="report changes without writing"
+    )
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="export all items to JSONL")
+    export.add_argument("--out", default="-", help="output file (default: stdout)")
+    import_ = commands.add_parser(
+        "import", parents=[writes], help="import items from JSONL"
+    )
+    import_.add_argument("path", help="JSONL file to import ('-' for stdin)")
+    commands.add_parser("check", help="report orphaned items and stale webhooks")
+    commands.add_parser(
+        "purge", parents=[writes], help="repair items reported by check"
+    )
+    return parser
+
+
+async def run(args: argparse.Namespace, stream: TextIO | None = None) -> int:
+    """Execute a parsed command.
+
+    Args:
+        args: The parsed command line.
+        stream: The JSONL output of ``export`` or input of ``import``.
+
+    Returns:
+        The process exit code.
+    """
+    throttle = Throttle(args.rate)
+    session = aioboto3.Session()
+    async with session.resource(
+        "dynamodb", region_name=args.region, endpoint_url=args.endpoint_url
+    ) as dynamodb:
+        table = await dynamodb.Table(args.table)
+
+        if args.command == "export":
+            assert stream is not None
+            count = await export_items(table, stream, args.segments, throttle)
+            logger.info("Exported %d items", count)
+            return 0
+
+        if args.command == "import":
+            assert stream is not None
+            count = await import_items(table, stream, args.dry_run, throttle)
+            logger.info("Imported %d items", count)
+            return 0
+
+        token = os.getenv("DISCORD_TOKEN")
+        if token is None:
+            logger.warning("DISCORD_TOKEN not set, skipping orphaned channel check")
+        async with aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=15)
+        ) as http:
+            checker = DiscordChecker(http, token, args.concurrency)
+            findings = await find_inconsistencies(
+                table, checker, args.segments, throttle
+            )
+        for finding in findings:
+            print(json.dumps(asdict(finding)))
+        logger.info("Found %d inconsistent items", len(findings))
+
+        if args.command == "purge":
+            repaired = await purge(table, findings, args.dry_run, throttle)
+            logger.info("Repaired %d items", repaired)
+        return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """CLI entry point."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stderr,
+    )
+    args = build_parser().parse_args(argv)
+    with contextlib.ExitStack() as stack:
+        stream: TextIO | None = None
+        if args.command == "export":
+            stream = (
+                sys.stdout
+                if args.out == "-"
+                else stack.enter_context(open(args.out, "w"))
+            )
+        elif args.command == "import":
+            stream = (
+                sys.stdin if args.path == "-" else stack.enter_context(open(args.path))
+            )
+        return asyncio.run(run(args, stream))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
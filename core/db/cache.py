@@ -0,0 +1,102 @@
+"""In-memory cache of per-guild output channel configuration."""
+
+import logging
+import time
+from collections.abc import Iterable
+
+from core.db.records import OutputChannelRecord
+
+logger = logging.getLogger(__name__)
+
+
+class GuildConfigCache:
+    """TTL cache mapping guild IDs to their output channel records.
+
+    Every invalidation bumps a per-guild version. Loaders read the version
+    before querying and pass it to ``put``, so a load that raced with an
+    invalidation never re-inserts stale data.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds an entry stays valid; changes made by other writers
+                (e.g. the admin CLI) become visible after at most this long.
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[int, tuple[float, tuple[OutputChannelRecord, ...]]] = {}
+        self._versions: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def version(self, guild_id: int) -> int:
+        """Return the current version of a guild's entry."""
+        return self._versions.get(guild_id, 0)
+
+    def get(self, guild_id: int) -> tuple[OutputChannelRecord, ...] | None:
+        """Return the cached records for a guild, or None if absent or expired."""
+        entry = self._entries.get(guild_id)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(
+        self,
+        guild_id: int,
+        records: Iterable[OutputChannelRecord],
+        version: int | None = None,
+    ) -> None:
+        """Store records for a guild.
+
+        Args:
+            guild_id: The guild ID.
+            records: The guild's output channel records.
+            version: Version read before loading; the entry is dropped if the
+                guild was invalidated since.
+        """
+        if version is not None and version != self.version(guild_id):
+            logger.debug("Discarding stale config load for guild %s", guild_id)
+            return
+        self._entries[guild_id] = (time.monotonic() + self.ttl, tuple(records))
+
+    def invalidate(self, guild_id: int) -> None:
+        """Drop a guild's entry."""
+        self._entries.pop(guild_id, None)
+        self._versions[guild_id] = self.version(guild_id) + 1
+
+    def discard_channel(self, guild_id: int, channel_id: int) -> None:
+        """Remove a single output channel from a guild's cached entry.
+
+        The rest of the entry stays warm, so routing for the guild keeps
+        hitting the cache while the deleted channel stops being considered.
+        """
+        self._versions[guild_id] = self.version(guild_id) + 1
+        entry = self._entries.get(guild_id)
+        if entry is None:
+            return
+        expires, records = entry
+        self._entries[guild_id] = (
+            expires,
+            tuple(r for r in records if r.channel_id != channel_id),
+        )
+
+    def entries(self) -> dict[int, tuple[OutputChannelRecord, ...]]:
+        """Return every unexpired entry."""
+        now = time.monotonic()
+        return {
+            guild_id: records
+            for guild_id, (expires, records) in self._entries.items()
+            if expires >= now
+        }
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        for guild_id in self._entries:
+            self._versions[guild_id] = self.version(guild_id) + 1
+        self._entries.clear()
@@ -1,30 +1,135 @@
 import logging
-from typing import Optional, Any, AsyncGenerator
-from datetime import datetime, timezone
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
 from contextlib import asynccontextmanager
-from core.db.models import GuildSettings
+from datetime import UTC, datetime
+from typing import Any
+
+from core.env import env_float
+from core.tracing import current_span, traced
+from link_utils.blocklist import (
+    BLOCKLIST_ACTIONS,
+    DEFAULT_BLOCKLIST_POLICY,
+    BlocklistPolicy,
+)
+from link_utils.cache import TTLCache
+from link_utils.extraction import DEFAULT_LINK_SOURCES, LinkSource
 
 logger = logging.getLogger(__name__)
 
 
 class BaseDAO:
-    def __init__(self, session: Any, table_name: str, region_name: str) -> None:
+    def __init__(
+        self,
+        session: Any,
+        table_name: str,
+        region_name: str,
+        endpoint_url: str | None = None,
+    ) -> None:
         self._session = session
         self.table_name = table_name
         self.region_name = region_name
+        self.endpoint_url = endpoint_url
+        self.read_requests = 0
+        self.read_units = 0.0
+
+    @staticmethod
+    def _projection(*attributes: str) -> dict[str, Any]:
+        """Build ProjectionExpression arguments for the given attributes.
+
+        Every name goes through ExpressionAttributeNames, so attributes that
+        collide with DynamoDB reserved words can be projected too.
+        """
+        names = {f"#p{i}": attribute for i, attribute in enumerate(attributes)}
+        return {
+            "ProjectionExpression": ", ".join(names),
+            "ExpressionAttributeNames": names,
+        }
+
+    def _record_read(self, response: dict[str, Any]) -> None:
+        """Count a read request and the capacity it consumed."""
+        self.read_requests += 1
+        self.read_units += response.get("ConsumedCapacity", {}).get("CapacityUnits", 0)
+
+    async def _paginate(
+        self, operation: Callable[..., Awaitable[dict[str, Any]]], **kwargs: Any
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield the items of every page of a query or scan.
+
+        Args:
+            operation: The table's ``query`` or ``scan`` method.
+            **kwargs: Arguments for the operation.
+        """
+        kwargs.setdefault("ReturnConsumedCapacity", "TOTAL")
+        while True:
+            response = await operation(**kwargs)
+            self._record_read(response)
+            for item in response.get("Items", []):
+                yield item
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return
+            kwargs["ExclusiveStartKey"] = last_key
 
     @asynccontextmanager
-    async def _table(self) -> AsyncGenerator[Any, None]:
+    async def _table(self) -> AsyncGenerator[Any]:
         """Provide an async context manager for the DynamoDB table."""
         async with self._session.resource(
-            "dynamodb", region_name=self.region_name
+            "dynamodb", region_name=self.region_name, endpoint_url=self.endpoint_url
         ) as dynamodb:
             yield await dynamodb.Table(self.table_name)
 
 
 class GuildSettingsDAO(BaseDAO):
-    async def get_links_channel(self, guild_id: int) -> Optional[int]:
+    def __init__(
+        self,
+        session: Any,
+        table_name: str,
+        region_name: str,
+        endpoint_url: str | None = None,
+    ) -> None:
+        super().__init__(session, table_name, region_name, endpoint_url)
+        self.link_sources_cache: TTLCache[int, LinkSource] = TTLCache(
+            maxsize=100_000, ttl=env_float("CONFIG_CACHE_TTL", 300.0)
+        )
+        self.blocklist_policy_cache: TTLCache[int, BlocklistPolicy] = TTLCache(
+            maxsize=10_000, ttl=env_float("CONFIG_CACHE_TTL", 300.0)
+        )
+
+    async def _update_settings(
+        self, guild_id: int, assignments: dict[str, Any], remove: tuple[str, ...] = ()
+    ) -> None:
+        """Set (and remove) attributes of a guild's settings item, keeping the rest.
+
+        Args:
+            guild_id: The guild ID.
+            assignments: Attribute values to set.
+            remove: Attributes to remove.
+        """
+        now = datetime.now(UTC).isoformat()
+        names = {f"#a{i}": name for i, name in enumerate(assignments)}
+        values = {f":a{i}": value for i, value in enumerate(assignments.values())}
+        expression = (
+            "SET guild_id = :guild_id, updated_at = :now, "
+            "created_at = if_not_exists(created_at, :now)"
+        ) + "".join(f", #a{i} = :a{i}" for i in range(len(assignments)))
+        if remove:
+            names |= {f"#r{i}": name for i, name in enumerate(remove)}
+            expression += " REMOVE " + ", ".join(f"#r{i}" for i in range(len(remove)))
+        kwargs: dict[str, Any] = {
+            "Key": {"pk": f"GUILD#{guild_id}", "sk": "SETTINGS"},
+            "UpdateExpression": expression,
+            "ExpressionAttributeValues": {":guild_id": guild_id, ":now": now, **values},
+        }
+        if names:
+            kwargs["ExpressionAttributeNames"] = names
+        async with self._table() as table:
+            await table.update_item(**kwargs)
+
+    @traced()
+    async def get_links_channel(self, guild_id: int) -> int | None:
         """Return the links channel ID for a guild."""
+        from core.db.models import GuildSettings
+
         async with self._table() as table:
             response = await table.get_item(
                 Key={"pk": f"GUILD#{guild_id}", "sk": "SETTINGS"}
@@ -35,25 +140,100 @@ class GuildSettingsDAO(BaseDAO):
                 return settings.links_channel_id
             return None
 
+    @traced()
     async def set_links_channel(self, guild_id: int, channel_id: int) -> None:
         """Set or update the links channel for a guild."""
+        await self._update_settings(guild_id, {"links_channel_id": channel_id})
+        logger.info("Set links channel %s for guild %s", channel_id, guild_id)
+
+    @traced()
+    async def remove_links_channel(self, guild_id: int) -> None:
+        """Remove the links channel setting for a guild, keeping its other settings."""
+        await self._update_settings(guild_id, {}, remove=("links_channel_id",))
+        logger.info("Removed links channel setting for guild %s", guild_id)
+
+    @traced()
+    async def get_link_sources(
+        self, guild_id: int, *, consistent_read: bool = False
+    ) -> LinkSource:
+        """Return the message parts a guild takes links from."""
         async with self._table() as table:
-            settings = GuildSettings(
-                guild_id=guild_id,
-                links_channel_id=channel_id,
-                updated_at=datetime.now(timezone.utc),
+            response = await table.get_item(
+                Key={"pk": f"GUILD#{guild_id}", "sk": "SETTINGS"},
+                ConsistentRead=consistent_read,
+                **self._projection("link_sources"),
             )
-            item = settings.model_dump()
-            item["pk"] = f"GUILD#{guild_id}"
-            item["sk"] = "SETTINGS"
-            item["created_at"] = item["created_at"].isoformat()
-            item["updated_at"] = item["updated_at"].isoformat()
+        value = response.get("Item", {}).get("link_sources")
+        return DEFAULT_LINK_SOURCES if value is None else LinkSource(int(value))
 
-            await table.put_item(Item=item)
-            logger.info("Set links channel %s for guild %s", channel_id, guild_id)
+    @traced()
+    async def get_cached_link_sources(self, guild_id: int) -> LinkSource:
+        """Return a guild's link sources, served from the cache when warm."""
+        found, sources = self.link_sources_cache.lookup(guild_id)
+        current_span().set("cache_hit", found and sources is not None)
+        if not found or sources is None:
+            sources = await self.get_link_sources(guild_id)
+            self.link_sources_cache.set(guild_id, sources)
+        return sources
 
-    async def remove_links_channel(self, guild_id: int) -> None:
-        """Remove the links channel setting for a guild."""
+    @traced()
+    async def set_link_sources(self, guild_id: int, sources: LinkSource) -> None:
+        """Choose which message parts a guild takes links from."""
+        await self._update_settings(guild_id, {"link_sources": int(sources)})
+        self.link_sources_cache.set(guild_id, sources)
+        logger.info("Set link sources %s for guild %s", sources, guild_id)
+
+    def invalidate_cached(self, guild_id: int) -> None:
+        """Reload a guild's link sources and blocklist policy on next use."""
+        self.link_sources_cache.discard(guild_id)
+        self.blocklist_policy_cache.discard(guild_id)
+
+    @traced()
+    async def get_blocklist_policy(
+        self, guild_id: int, *, consistent_read: bool = False
+    ) -> BlocklistPolicy:
+        """Return what a guild does with links to blocklisted domains."""
         async with self._table() as table:
-            await table.delete_item(Key={"pk": f"GUILD#{guild_id}", "sk": "SETTINGS"})
-            logger.info("Removed links channel setting for guild %s", guild_id)
+            response = await table.get_item(
+                Key={"pk": f"GUILD#{guild_id}", "sk": "SETTINGS"},
+                ConsistentRead=consistent_read,
+                **self._projection("blocklist_action", "blocklist_channel_id"),
+            )
+        item = response.get("Item", {})
+        action = item.get("blocklist_action")
+        if action not in BLOCKLIST_ACTIONS:
+            return DEFAULT_BLOCKLIST_POLICY
+        channel_id = item.get("blocklist_channel_id")
+        return BlocklistPolicy(action, None if channel_id is None else int(channel_id))
+
+    @traced()
+    async def get_cached_blocklist_policy(self, guild_id: int) -> BlocklistPolicy:
+        """Return a guild's blocklist policy, served from the cache when warm."""
+        found, policy = self.blocklist_policy_cache.lookup(guild_id)
+        current_span().set("cache_hit", found and policy is not None)
+        if not found or policy is None:
+            policy = await self.get_blocklist_policy(guild_id)
+            self.blocklist_policy_cache.set(guild_id, policy)
+        return policy
+
+    @traced()
+    async def set_blocklist_policy(
+        self, guild_id: int, policy: BlocklistPolicy
+    ) -> None:
+        """Choose what a guild does with links to blocklisted domains."""
+        if policy.channel_id is None:
+            await self._update_settings(
+                guild_id,
+                {"blocklist_action": policy.action},
+                remove=("blocklist_channel_id",),
+            )
+        else:
+            await self._update_settings(
+                guild_id,
+                {
+                    "blocklist_action": policy.action,
+                    "blocklist_channel_id": policy.channel_id,
+                },
+            )
+        self.blocklist_policy_cache.set(guild_id, policy)
+        logger.info("Set blocklist policy %s for guild %s", policy, guild_id)
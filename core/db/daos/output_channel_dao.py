@@ -1,18 +1,79 @@
+import asyncio
 import logging
-from typing import List, Optional
-from datetime import datetime, timezone
-from boto3.dynamodb.conditions import Key
-from core.db.models import OutputChannel
+import time
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any, Final, Optional
+
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from core.db.cache import GuildConfigCache
 from core.db.daos.guild_settings_dao import BaseDAO
+from core.db.records import OutputChannelRecord
+from core.env import env_float
+from core.tracing import current_span, traced
+from link_utils.categories import CATEGORY_BITS, acl_mask
+
+if TYPE_CHECKING:
+    # pydantic is only needed on the admin write paths, so it is not
+    # imported at start-up.
+    from core.db.models import OutputChannel
 
 logger = logging.getLogger(__name__)
 
+# Attributes the forwarding path needs; timestamps are left behind. The legacy
+# per-category booleans are projected too so unmigrated items still route.
+ROUTING_ATTRIBUTES: Final[tuple[str, ...]] = (
+    "guild_id",
+    "channel_id",
+    "webhook_url",
+    "acl",
+    "link_allow",
+    "link_deny",
+    "digest_interval",
+    *CATEGORY_BITS,
+)
+
+# Seconds after a write during which reads of that guild are strongly consistent.
+STRONG_READ_WINDOW: Final[float] = 5.0
+
 
 class OutputChannelDAO(BaseDAO):
+    def __init__(
+        self,
+        session: Any,
+        table_name: str,
+        region_name: str,
+        endpoint_url: str | None = None,
+    ) -> None:
+        super().__init__(session, table_name, region_name, endpoint_url)
+        self.cache = GuildConfigCache(ttl=env_float("CONFIG_CACHE_TTL", 300.0))
+        self._pending_channel_removals: set[tuple[int, int]] = set()
+        self._pending_guild_removals: set[int] = set()
+        self._written_at: dict[int, float] = {}
+
+    def _mark_written(self, guild_id: int) -> None:
+        """Note a write so the next reads of the guild see it."""
+        self._written_at[guild_id] = time.monotonic() + STRONG_READ_WINDOW
+
+    def _recently_written(self, guild_id: int) -> bool:
+        """Return whether the guild was written within ``STRONG_READ_WINDOW``."""
+        deadline = self._written_at.get(guild_id)
+        if deadline is None:
+            return False
+        if deadline < time.monotonic():
+            del self._written_at[guild_id]
+            return False
+        return True
+
+    @traced()
     async def add_output_channel(
         self, guild_id: int, channel_id: int, **acls: bool
-    ) -> OutputChannel:
+    ) -> "OutputChannel":
         """Add or update an output channel with ACL configuration."""
+        from core.db.models import OutputChannel
+
         async with self._table() as table:
             response = await table.get_item(
                 Key={"pk": f"GUILD#{guild_id}", "sk": f"CHANNEL#{channel_id}"}
@@ -22,16 +83,16 @@ class OutputChannelDAO(BaseDAO):
             if existing_item:
                 model = OutputChannel(**existing_item)
                 for k, v in acls.items():
-                    if hasattr(model, k):
-                        setattr(model, k, v)
+                    if k in CATEGORY_BITS:
+                        model.set_category(k, v)
                     else:
                         logger.warning("Ignoring invalid ACL key: %s", k)
-                model.updated_at = datetime.now(timezone.utc)
+                model.updated_at = datetime.now(UTC)
             else:
                 model = OutputChannel(guild_id=guild_id, channel_id=channel_id)
                 for k, v in acls.items():
-                    if hasattr(model, k):
-                        setattr(model, k, v)
+                    if k in CATEGORY_BITS:
+                        model.set_category(k, v)
                     else:
                         logger.warning("Ignoring invalid ACL key: %s", k)
 
@@ -43,6 +104,9 @@ class OutputChannelDAO(BaseDAO):
 
             try:
                 await table.put_item(Item=item)
+                self._pending_channel_removals.discard((guild_id, channel_id))
+                self._mark_written(guild_id)
+                self.cache.invalidate(guild_id)
                 logger.info(
                     "Updated output channel %s for guild %s", channel_id, guild_id
                 )
@@ -51,54 +115,126 @@ class OutputChannelDAO(BaseDAO):
                 logger.error("Failed to save output channel %s: %s", channel_id, e)
                 raise
 
-    async def get_output_channels(
-        self, guild_id: int, link_type: Optional[str] = None
-    ) -> List[OutputChannel]:
-        """Return all output channels for a guild, optionally filtered by link type."""
+    async def iter_output_channels(
+        self, guild_id: int, *, consistent_read: bool = False
+    ) -> AsyncIterator[OutputChannelRecord]:
+        """Yield every output channel of a guild, following all result pages.
+
+        Args:
+            guild_id: The guild ID.
+            consistent_read: Use a strongly consistent read (twice the read
+                cost) to see writes made moments ago.
+        """
         async with self._table() as table:
-            response = await table.query(
+            async for item in self._paginate(
+                table.query,
                 KeyConditionExpression=Key("pk").eq(f"GUILD#{guild_id}")
-                & Key("sk").begins_with("CHANNEL#")
+                & Key("sk").begins_with("CHANNEL#"),
+                ConsistentRead=consistent_read,
+                **self._projection(*ROUTING_ATTRIBUTES),
+            ):
+                try:
+                    yield OutputChannelRecord.from_item(item)
+                except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+                    logger.error("Failed to parse output channel item: %s", e)
+
+    @traced()
+    async def get_output_channels(
+        self,
+        guild_id: int,
+        link_type: str | None = None,
+        *,
+        consistent_read: bool = False,
+    ) -> list[OutputChannelRecord]:
+        """Return all output channels for a guild, optionally filtered by link type.
+
+        The link type filter runs here rather than as a FilterExpression:
+        DynamoDB has no bitwise operators to test the ``acl`` mask, and a
+        filter would not reduce the capacity consumed anyway.
+        """
+        mask = CATEGORY_BITS.get(link_type, 0) if link_type else 0
+        return [
+            channel
+            async for channel in self.iter_output_channels(
+                guild_id, consistent_read=consistent_read
             )
-            items = response.get("Items", [])
+            if not link_type or channel.acl & mask
+        ]
 
-            channels = []
-            for item in items:
-                try:
-                    channel = OutputChannel(**item)
-                    if link_type:
-                        if getattr(channel, link_type, False) is True:
-                            channels.append(channel)
-                    else:
-                        channels.append(channel)
-                except Exception as e:
-                    logger.error(f"Failed to parse output channel item: {e}")
-                    continue
+    @traced()
+    async def get_cached_output_channels(
+        self, guild_id: int
+    ) -> tuple[OutputChannelRecord, ...]:
+        """Return a guild's output channels, served from the cache when warm.
 
-            return channels
+        Refills right after a write to the guild use a strongly consistent
+        read so the change is not missed; all others are eventually consistent.
+        """
+        records = self.cache.get(guild_id)
+        current_span().set("cache_hit", records is not None)
+        if records is None:
+            version = self.cache.version(guild_id)
+            records = tuple(
+                await self.get_output_channels(
+                    guild_id, consistent_read=self._recently_written(guild_id)
+                )
+            )
+            self.cache.put(guild_id, records, version)
+        return records
 
-    async def get_all_output_channels(self) -> List[OutputChannel]:
-        """Return all output channels across all guilds."""
+    async def iter_all_output_channels(
+        self, *, consistent_read: bool = False
+    ) -> AsyncIterator[OutputChannelRecord]:
+        """Yield every output channel across all guilds, following all scan pages."""
         async with self._table() as table:
-            response = await table.scan()
-            items = response.get("Items", [])
+            async for item in self._paginate(
+                table.scan,
+                FilterExpression=Attr("sk").begins_with("CHANNEL#"),
+                ConsistentRead=consistent_read,
+                **self._projection(*ROUTING_ATTRIBUTES),
+            ):
+                try:
+                    yield OutputChannelRecord.from_item(item)
+                except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+                    logger.error(
+                        "Failed to parse output channel item during scan: %s", e
+                    )
 
-            channels = []
-            for item in items:
-                if item.get("sk", "").startswith("CHANNEL#"):
-                    try:
-                        channels.append(OutputChannel(**item))
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to parse output channel item during scan: {e}"
-                        )
-                        continue
-            return channels
+    @traced()
+    async def get_all_output_channels(
+        self, *, consistent_read: bool = False
+    ) -> list[OutputChannelRecord]:
+        """Return all output channels across all guilds."""
+        return [
+            channel
+            async for channel in self.iter_all_output_channels(
+                consistent_read=consistent_read
+            )
+        ]
 
+    @traced()
     async def get_output_channel(
-        self, guild_id: int, channel_id: int
-    ) -> Optional[OutputChannel]:
+        self, guild_id: int, channel_id: int, *, consistent_read: bool = False
+    ) -> OutputChannelRecord | None:
         """Return a specific output channel configuration."""
+        async with self._table() as table:
+            response = await table.get_item(
+                Key={"pk": f"GUILD#{guild_id}", "sk": f"CHANNEL#{channel_id}"},
+                ConsistentRead=consistent_read,
+                ReturnConsumedCapacity="TOTAL",
+            )
+            self._record_read(response)
+            item = response.get("Item")
+            if item:
+                return OutputChannelRecord.from_item(item)
+            return None
+
+    async def _get_output_channel_model(
+        self, guild_id: int, channel_id: int
+    ) -> Optional["OutputChannel"]:
+        """Return a validated output channel model for read-modify-write updates."""
+        from core.db.models import OutputChannel
+
         async with self._table() as table:
             response = await table.get_item(
                 Key={"pk": f"GUILD#{guild_id}", "sk": f"CHANNEL#{channel_id}"}
@@ -108,43 +244,117 @@ class OutputChannelDAO(BaseDAO):
                 return OutputChannel(**item)
             return None
 
+    @traced()
     async def remove_output_channel(self, guild_id: int, channel_id: int) -> bool:
         """Remove an output channel configuration."""
         async with self._table() as table:
             await table.delete_item(
                 Key={"pk": f"GUILD#{guild_id}", "sk": f"CHANNEL#{channel_id}"}
             )
+            self._mark_written(guild_id)
+            self.cache.discard_channel(guild_id, channel_id)
             logger.info("Removed output channel %s for guild %s", channel_id, guild_id)
             return True
 
+    @traced()
     async def update_output_channel_acl(
         self, guild_id: int, channel_id: int, link_type: str, enabled: bool
-    ) -> Optional[OutputChannel]:
+    ) -> Optional["OutputChannel"]:
         """Update the ACL for a specific output channel and link type."""
-        channel = await self.get_output_channel(guild_id, channel_id)
-        if channel:
-            if hasattr(channel, link_type):
-                setattr(channel, link_type, enabled)
-                channel.updated_at = datetime.now(timezone.utc)
-
-                async with self._table() as table:
-                    item = channel.model_dump()
-                    item["pk"] = f"GUILD#{guild_id}"
-                    item["sk"] = f"CHANNEL#{channel_id}"
-                    item["created_at"] = item["created_at"].isoformat()
-                    item["updated_at"] = item["updated_at"].isoformat()
-                    await table.put_item(Item=item)
-                return channel
+        channel = await self._get_output_channel_model(guild_id, channel_id)
+        if channel and link_type in CATEGORY_BITS:
+            channel.set_category(link_type, enabled)
+            channel.updated_at = datetime.now(UTC)
+
+            async with self._table() as table:
+                item = channel.model_dump()
+                item["pk"] = f"GUILD#{guild_id}"
+                item["sk"] = f"CHANNEL#{channel_id}"
+                item["created_at"] = item["created_at"].isoformat()
+                item["updated_at"] = item["updated_at"].isoformat()
+                await table.put_item(Item=item)
+            self._mark_written(guild_id)
+            self.cache.invalidate(guild_id)
+            return channel
         return None
 
+    @traced()
+    async def set_link_rules(
+        self,
+        guild_id: int,
+        channel_id: int,
+        allow: list[str],
+        deny: list[str],
+    ) -> Optional["OutputChannel"]:
+        """Replace the domain and path rules of an output channel.
+
+        Args:
+            guild_id: The guild ID.
+            channel_id: The output channel ID.
+            allow: Normalized allow rules (see ``link_utils.link_filters``).
+            deny: Normalized deny rules.
+
+        Returns:
+            The updated channel, or None if it is not an output channel.
+        """
+        channel = await self._get_output_channel_model(guild_id, channel_id)
+        if channel is None:
+            return None
+        channel.link_allow = allow
+        channel.link_deny = deny
+        channel.updated_at = datetime.now(UTC)
+
+        async with self._table() as table:
+            item = channel.model_dump()
+            item["pk"] = f"GUILD#{guild_id}"
+            item["sk"] = f"CHANNEL#{channel_id}"
+            item["created_at"] = item["created_at"].isoformat()
+            item["updated_at"] = item["updated_at"].isoformat()
+            await table.put_item(Item=item)
+        self._mark_written(guild_id)
+        self.cache.invalidate(guild_id)
+        return channel
+
+    @traced()
+    async def set_digest_interval(
+        self, guild_id: int, channel_id: int, interval: int
+    ) -> Optional["OutputChannel"]:
+        """Switch an output channel between immediate forwards and digests.
+
+        Args:
+            guild_id: The guild ID.
+            channel_id: The output channel ID.
+            interval: Seconds between digests, or 0 to forward immediately.
+
+        Returns:
+            The updated channel, or None if it is not an output channel.
+        """
+        channel = await self._get_output_channel_model(guild_id, channel_id)
+        if channel is None:
+            return None
+        channel.digest_interval = interval
+        channel.updated_at = datetime.now(UTC)
+
+        async with self._table() as table:
+            item = channel.model_dump()
+            item["pk"] = f"GUILD#{guild_id}"
+            item["sk"] = f"CHANNEL#{channel_id}"
+            item["created_at"] = item["created_at"].isoformat()
+            item["updated_at"] = item["updated_at"].isoformat()
+            await table.put_item(Item=item)
+        self._mark_written(guild_id)
+        self.cache.invalidate(guild_id)
+        return channel
+
+    @traced()
     async def set_webhook_url(
         self, guild_id: int, channel_id: int, webhook_url: str | None
     ) -> None:
         """Store the webhook URL for an output channel."""
-        channel = await self.get_output_channel(guild_id, channel_id)
+        channel = await self._get_output_channel_model(guild_id, channel_id)
         if channel:
             channel.webhook_url = webhook_url
-            channel.updated_at = datetime.now(timezone.utc)
+            channel.updated_at = datetime.now(UTC)
 
             async with self._table() as table:
                 item = channel.model_dump()
@@ -153,10 +363,169 @@ class OutputChannelDAO(BaseDAO):
                 item["created_at"] = item["created_at"].isoformat()
                 item["updated_at"] = item["updated_at"].isoformat()
                 await table.put_item(Item=item)
+            self._mark_written(guild_id)
+            self.cache.invalidate(guild_id)
 
-    async def get_webhook_url(self, guild_id: int, channel_id: int) -> str | None:
-        """Retrieve the webhook URL for an output channel."""
-        channel = await self.get_output_channel(guild_id, channel_id)
-        if channel:
-            return channel.webhook_url
-        return None
+    @traced()
+    async def get_webhook_url(
+        self, guild_id: int, channel_id: int, *, consistent_read: bool = False
+    ) -> str | None:
+        """Retrieve the webhook URL for an output channel.
+
+        Only the ``webhook_url`` attribute is fetched; the item is not decoded.
+        """
+        async with self._table() as table:
+            response = await table.get_item(
+                Key={"pk": f"GUILD#{guild_id}", "sk": f"CHANNEL#{channel_id}"},
+                ConsistentRead=consistent_read,
+                ReturnConsumedCapacity="TOTAL",
+                **self._projection("webhook_url"),
+            )
+        self._record_read(response)
+        return response.get("Item", {}).get("webhook_url")
+
+    async def migrate_acl_bitmask(
+        self, batch_size: int = 25, delay: float = 1.0
+    ) -> int:
+        """Rewrite legacy boolean ACL items into the bitmask format.
+
+        Scans the table one page at a time and sleeps between pages so the
+        migration never competes with live traffic for capacity. Items that
+        were already migrated (for example by a concurrent admin write) are
+        skipped via a condition on the ``acl`` attribute.
+
+        Args:
+            batch_size: Maximum number of items evaluated per scan page.
+            delay: Seconds to sleep between pages.
+
+        Returns:
+            The number of items migrated.
+        """
+        names = {f"#c{i}": category for i, category in enumerate(CATEGORY_BITS)}
+        update_expression = "SET acl = :acl REMOVE " + ", ".join(names)
+        scan_kwargs: dict[str, Any] = {
+            "FilterExpression": Attr("sk").begins_with("CHANNEL#")
+            & Attr("acl").not_exists(),
+            "Limit": batch_size,
+        }
+        migrated = 0
+        async with self._table() as table:
+            while True:
+                response = await table.scan(**scan_kwargs)
+                for item in response.get("Items", []):
+                    try:
+                        await table.update_item(
+                            Key={"pk": item["pk"], "sk": item["sk"]},
+                            UpdateExpression=update_expression,
+                            ConditionExpression="attribute_not_exists(acl)",
+                            ExpressionAttributeNames=names,
+                            ExpressionAttributeValues={":acl": acl_mask(item)},
+                        )
+                        migrated += 1
+                    except ClientError as e:
+                        code = e.response.get("Error", {}).get("Code")
+                        if code != "ConditionalCheckFailedException":
+                            raise
+
+                last_key = response.get("LastEvaluatedKey")
+                if not last_key:
+                    break
+                scan_kwargs["ExclusiveStartKey"] = last_key
+                await asyncio.sleep(delay)
+
+        logger.info("Migrated %d output channels to ACL bitmask format", migrated)
+        return migrated
+
+    def queue_removal(self, guild_id: int, channel_id: int | None = None) -> None:
+        """Forget a dead destination now and delete its rows in the next flush.
+
+        Removing a guild deletes its output channels only; its settings item
+        is kept so that a guild re-adding the bot finds its configuration.
+
+        Args:
+            guild_id: The guild ID.
+            channel_id: The deleted output channel, or None to remove every
+                output channel of the guild.
+        """
+        if channel_id is None:
+            self._pending_guild_removals.add(guild_id)
+            self.cache.invalidate(guild_id)
+        else:
+            self._pending_channel_removals.add((guild_id, channel_id))
+            self.cache.discard_channel(guild_id, channel_id)
+
+    def invalidate_cached(self, guild_id: int) -> None:
+        """Reload a guild's routing from the table on its next forward.
+
+        Used when a configured channel is missing from the gateway cache,
+        which does not mean it was deleted; deletions are handled by
+        :meth:`queue_removal`.
+        """
+        self.cache.invalidate(guild_id)
+
+    def cancel_guild_removal(self, guild_id: int) -> None:
+        """Keep a guild's rows, e.g. when the bot rejoins before the next flush."""
+        self._pending_guild_removals.discard(guild_id)
+        self.cache.invalidate(guild_id)
+
+    @property
+    def pending_removals(self) -> int:
+        """Number of queued channel and guild removals."""
+        return len(self._pending_channel_removals) + len(self._pending_guild_removals)
+
+    @traced()
+    async def flush_removals(self) -> int:
+        """Delete all queued rows with batched writes.
+
+        Returns:
+            The number of items deleted.
+        """
+        channels, self._pending_channel_removals = self._pending_channel_removals, set()
+        guilds, self._pending_guild_removals = self._pending_guild_removals, set()
+        if not channels and not guilds:
+            return 0
+
+        try:
+            deleted = await self._delete_removed(channels, guilds)
+        except Exception:
+            self._pending_channel_removals |= channels
+            self._pending_guild_removals |= guilds
+            raise
+        logger.info(
+            "Deleted %d items for %d removed channels and %d removed guilds",
+            deleted,
+            len(channels),
+            len(guilds),
+        )
+        return deleted
+
+    async def _delete_removed(
+        self, channels: set[tuple[int, int]], guilds: set[int]
+    ) -> int:
+        """Delete the output channels of removed channels and guilds in one batch."""
+        keys = {
+            (f"GUILD#{guild_id}", f"CHANNEL#{channel_id}")
+            for guild_id, channel_id in channels
+            if guild_id not in guilds
+        }
+        async with self._table() as table:
+            for guild_id in guilds:
+                query_kwargs: dict[str, Any] = {
+                    "KeyConditionExpression": Key("pk").eq(f"GUILD#{guild_id}")
+                    & Key("sk").begins_with("CHANNEL#"),
+                    "ProjectionExpression": "pk, sk",
+                }
+                while True:
+                    response = await table.query(**query_kwargs)
+                    keys.update(
+                        (item["pk"], item["sk"]) for item in response.get("Items", [])
+                    )
+                    last_key = response.get("LastEvaluatedKey")
+                    if not last_key:
+                        break
+                    query_kwargs["ExclusiveStartKey"] = last_key
+
+            async with table.batch_writer() as batch:
+                for pk, sk in keys:
+                    await batch.delete_item(Key={"pk": pk, "sk": sk})
+        return len(keys)
@@ -1,12 +1,15 @@
 """Database manager for Discord bot using DynamoDB (aioboto3) and Pydantic."""
 
+import asyncio
 import logging
 import os
+from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, Any
+from typing import Any
 
 import aioboto3
 from boto3.dynamodb.conditions import Key
+from botocore.exceptions import BotoCoreError, ClientError
 
 from core.db.daos.guild_settings_dao import GuildSettingsDAO
 from core.db.daos.output_channel_dao import OutputChannelDAO
@@ -17,11 +20,15 @@ logger: logging.Logger = logging.getLogger(name=__name__)
 class Database:
     """Database manager using DynamoDB for persistent bot state."""
 
-    def __init__(self, table_name: str | None = None) -> None:
+    def __init__(
+        self, table_name: str | None = None, endpoint_url: str | None = None
+    ) -> None:
         """Initialize the Database manager.
 
         Args:
             table_name: The name of the DynamoDB table. If None, reads from DYNAMODB_TABLE_NAME env var.
+            endpoint_url: Custom DynamoDB endpoint (e.g. DynamoDB Local). If None, reads from
+                DYNAMODB_ENDPOINT_URL env var.
         """
         self.table_name = table_name or os.getenv("DYNAMODB_TABLE_NAME")
         if not self.table_name:
@@ -32,24 +39,30 @@ class Database:
             self.table_name = "discord-bot-table"
 
         self.region_name = os.getenv("AWS_REGION", "us-east-1")
+        self.endpoint_url = endpoint_url or os.getenv("DYNAMODB_ENDPOINT_URL")
         self._session = aioboto3.Session()
         self._initialized: bool = False
 
         # Initialize DAOs
         self.guild_settings = GuildSettingsDAO(
-            self._session, self.table_name, self.region_name
+            self._session, self.table_name, self.region_name, self.endpoint_url
         )
         self.output_channels = OutputChannelDAO(
-            self._session, self.table_name, self.region_name
+            self._session, self.table_name, self.region_name, self.endpoint_url
         )
 
+    @property
+    def initialized(self) -> bool:
+        """Whether the table has been reached since startup."""
+        return self._initialized
+
     async def initialize(self) -> None:
         """Initialize the database connection (check table existence)."""
         if self._initialized:
             return
 
         async with self._session.resource(
-            "dynamodb", region_name=self.region_name
+            "dynamodb", region_name=self.region_name, endpoint_url=self.endpoint_url
         ) as dynamodb:
             table = await dynamodb.Table(self.table_name)
             try:
@@ -63,19 +76,42 @@ class Database:
                 )
                 raise
 
+    async def ping(self, timeout: float = 5.0) -> bool:
+        """Check that the table can be reached now.
+
+        Args:
+            timeout: Seconds to wait for DynamoDB.
+
+        Returns:
+            True if the table was described successfully.
+        """
+        try:
+            async with asyncio.timeout(timeout):
+                async with self._session.resource(
+                    "dynamodb",
+                    region_name=self.region_name,
+                    endpoint_url=self.endpoint_url,
+                ) as dynamodb:
+                    table = await dynamodb.Table(self.table_name)
+                    await table.load()
+        except (BotoCoreError, ClientError, TimeoutError) as e:
+            logger.warning("DynamoDB table %s unreachable: %s", self.table_name, e)
+            return False
+        return True
+
     async def close(self) -> None:
         """Close database connections."""
         self._initialized = False
         logger.info("Database connection closed")
 
     @asynccontextmanager
-    async def _table(self) -> AsyncGenerator[Any, None]:
+    async def _table(self) -> AsyncGenerator[Any]:
         """Provide an async context manager for the DynamoDB table."""
         if not self._initialized:
             await self.initialize()
 
         async with self._session.resource(
-            "dynamodb", region_name=self.region_name
+            "dynamodb", region_name=self.region_name, endpoint_url=self.endpoint_url
         ) as dynamodb:
             yield await dynamodb.Table(self.table_name)
 
@@ -89,4 +125,6 @@ class Database:
 
             for item in items:
                 await table.delete_item(Key={"pk": item["pk"], "sk": item["sk"]})
+            self.output_channels.cache.invalidate(guild_id)
+            self.guild_settings.invalidate_cached(guild_id)
             logger.info("Cleared all data for guild %s", guild_id)
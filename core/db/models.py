@@ -1,33 +1,62 @@
 """Pydantic models for Discord bot database."""
 
-from datetime import datetime, timezone
-from typing import Optional
-from pydantic import BaseModel, Field
+from datetime import UTC, datetime
+from typing import Any
+
+from pydantic import BaseModel, Field, model_validator
+
+from link_utils.categories import CATEGORY_BITS, acl_mask
+from link_utils.extraction import DEFAULT_LINK_SOURCES
 
 
 class GuildSettings(BaseModel):
     """Guild-specific settings."""
 
     guild_id: int
-    links_channel_id: Optional[int] = None
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    links_channel_id: int | None = None
+    link_sources: int = int(DEFAULT_LINK_SOURCES)
+    blocklist_action: str = "drop"
+    blocklist_channel_id: int | None = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
 
 
 class OutputChannel(BaseModel):
-    """Output channel configuration with ACLs for link types."""
+    """Output channel configuration with ACLs for link types.
+
+    ACLs are stored as a single bitmask; see ``link_utils.categories.CATEGORY_BITS``.
+    """
 
     guild_id: int
     channel_id: int
-    webhook_url: Optional[str] = None
-    youtube: bool = False
-    twitch: bool = False
-    twitter: bool = False
-    instagram: bool = False
-    tiktok: bool = False
-    reddit: bool = False
-    github: bool = False
-    discord: bool = False
-    other: bool = False
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    webhook_url: str | None = None
+    acl: int = 0
+    link_allow: list[str] = Field(default_factory=list)
+    link_deny: list[str] = Field(default_factory=list)
+    digest_interval: int = 0
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+    @model_validator(mode="before")
+    @classmethod
+    def _fold_legacy_acls(cls, data: Any) -> Any:
+        """Convert legacy per-category boolean attributes into a bitmask."""
+        if isinstance(data, dict) and "acl" not in data:
+            mask = acl_mask(data)
+            data = {k: v for k, v in data.items() if k not in CATEGORY_BITS}
+            data["acl"] = mask
+        return data
+
+    def allows(self, category: str) -> bool:
+        """Return whether the given link category is enabled."""
+        return bool(self.acl & CATEGORY_BITS.get(category, 0))
+
+    def set_category(self, category: str, enabled: bool) -> None:
+        """Enable or disable a link category.
+
+        Args:
+            category: The category name.
+            enabled: Whether links of this category should be forwarded.
+        """
+        bit = CATEGORY_BITS[category]
+        self.acl = self.acl | bit if enabled else self.acl & ~bit
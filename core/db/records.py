@@ -0,0 +1,83 @@
+"""Lightweight read-only records for the forwarding hot path.
+
+The pydantic models in ``core.db.models`` validate every field and parse the
+ISO timestamps on construction. Items read back from our own table are
+already well-formed, so the forwarding path decodes them into these slotted,
+immutable records instead and only parses timestamps when they are accessed.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from link_utils.categories import CATEGORY_BITS, acl_mask
+from link_utils.link_filters import LinkFilter, compile_link_filter
+
+
+@dataclass(frozen=True, slots=True)
+class OutputChannelRecord:
+    """Immutable output channel configuration used when routing links."""
+
+    guild_id: int
+    channel_id: int
+    webhook_url: str | None = None
+    acl: int = 0
+    created_at_raw: str | None = None
+    updated_at_raw: str | None = None
+    link_allow: tuple[str, ...] = ()
+    link_deny: tuple[str, ...] = ()
+    digest_interval: int = 0
+
+    @classmethod
+    def from_item(cls, item: Mapping[str, Any]) -> "OutputChannelRecord":
+        """Decode a DynamoDB item without validation.
+
+        Only use this for items written by this bot; numbers come back from
+        DynamoDB as ``Decimal`` and are converted with ``int``. Legacy items
+        with one boolean attribute per category are packed into a bitmask.
+
+        Args:
+            item: The raw DynamoDB item.
+
+        Returns:
+            The decoded record.
+        """
+        get = item.get
+        acl = get("acl")
+        return cls(
+            int(item["guild_id"]),
+            int(item["channel_id"]),
+            get("webhook_url"),
+            acl_mask(item) if acl is None else int(acl),
+            get("created_at"),
+            get("updated_at"),
+            tuple(get("link_allow") or ()),
+            tuple(get("link_deny") or ()),
+            int(get("digest_interval") or 0),
+        )
+
+    def allows(self, category: str) -> bool:
+        """Return whether the given link category is enabled."""
+        return bool(self.acl & CATEGORY_BITS.get(category, 0))
+
+    @property
+    def link_filter(self) -> LinkFilter | None:
+        """The compiled domain and path rules, or None if the channel has none."""
+        if not self.link_allow and not self.link_deny:
+            return None
+        return compile_link_filter(self.link_allow, self.link_deny)
+
+    @property
+    def created_at(self) -> datetime | None:
+        """Creation time, parsed on access."""
+        if self.created_at_raw is None:
+            return None
+        return datetime.fromisoformat(self.created_at_raw)
+
+    @property
+    def updated_at(self) -> datetime | None:
+        """Last update time, parsed on access."""
+        if self.updated_at_raw is None:
+            return None
+        return datetime.fromisoformat(self.updated_at_raw)
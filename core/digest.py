@@ -0,0 +1,323 @@
+"""Buffer links for output channels in digest mode and schedule their delivery.
+
+A channel in digest mode does not get a webhook call per forward. Its links
+are counted in a :class:`DigestBuffer` and delivered on the channel's
+schedule as a few grouped messages, one line per distinct link with the
+number of times it was posted.
+
+The buffer survives restarts through an append-only JSONL log: every
+buffered forward appends one line, and the log is rewritten with just the
+pending digests after each round of deliveries and when digests are
+discarded. A digest that was sent right before a crash may be sent again;
+none is lost.
+
+Deliveries are spread out. Each guild gets a fixed offset within the
+interval, so hourly digests of different guilds fall on different minutes
+and daily ones at different times of day. Each scheduler tick also
+delivers a bounded number of digests.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import IO, Final
+
+logger = logging.getLogger(__name__)
+
+DIGEST_INTERVALS: Final[dict[str, int]] = {"off": 0, "hourly": 3600, "daily": 86400}
+
+_MIX: Final[int] = 0x9E3779B97F4A7C15
+_MASK64: Final[int] = 2**64 - 1
+
+
+def digest_offset(guild_id: int, interval: int) -> int:
+    """Return the guild's fixed delivery offset within an interval, in seconds."""
+    return ((guild_id * _MIX) & _MASK64) % interval
+
+
+def next_delivery(guild_id: int, interval: int, after: float) -> float:
+    """Return the first delivery time of a guild's schedule after ``after``."""
+    offset = digest_offset(guild_id, interval)
+    return (math.floor((after - offset) / interval) + 1) * interval + offset
+
+
+def interval_name(interval: int) -> str:
+    """Return the name of a digest interval, e.g. ``hourly``."""
+    for name, seconds in DIGEST_INTERVALS.items():
+        if seconds == interval:
+            return name
+    return f"every {interval}s"
+
+
+@dataclass(slots=True)
+class PendingDigest:
+    """Links buffered for one output channel.
+
+    Attributes:
+        guild_id: The guild.
+        channel_id: The output channel.
+        interval: Seconds between deliveries.
+        first_at: When the oldest buffered link arrived (UNIX seconds).
+        counts: Times each link was posted, by category then URL.
+        overflow: Links not listed because the digest was full.
+    """
+
+    guild_id: int
+    channel_id: int
+    interval: int
+    first_at: float
+    counts: dict[str, dict[str, int]] = field(default_factory=dict)
+    overflow: int = 0
+
+    @property
+    def due_at(self) -> float:
+        """When the digest is delivered."""
+        return next_delivery(self.guild_id, self.interval, self.first_at)
+
+    @property
+    def distinct(self) -> int:
+        """Number of distinct links listed."""
+        return sum(map(len, self.counts.values()))
+
+    @property
+    def total(self) -> int:
+        """Number of links posted, counting repeats and overflow."""
+        return sum(sum(urls.values()) for urls in self.counts.values()) + self.overflow
+
+    def add(self, category: str, url: str, count: int, max_links: int) -> None:
+        """Count a link, or add it to the overflow if the digest is full."""
+        urls = self.counts.setdefault(category, {})
+        if url in urls:
+            urls[url] += count
+        elif self.distinct < max_links:
+            urls[url] = count
+        else:
+            self.overflow += count
+            if not urls:
+                del self.counts[category]
+
+    def to_line(self) -> str:
+        """Encode the digest as one log line."""
+        return json.dumps(
+            {
+                "g": self.guild_id,
+                "c": self.channel_id,
+                "i": self.interval,
+                "t": self.first_at,
+                "l": [
+                    [category, url, count]
+                    for category, urls in self.counts.items()
+                    for url, count in urls.items()
+                ],
+                "o": self.overflow,
+            },
+            separators=(",", ":"),
+        )
+
+
+class DigestBuffer:
+    """Pending digests of every output channel in digest mode, persisted to a log."""
+
+    def __init__(
+        self, path: str | os.PathLike[str] | None, max_links: int = 500
+    ) -> None:
+        """Initialize an empty buffer; call :meth:`load` to restore the log.
+
+        Args:
+            path: The log file, or None to keep digests in memory only.
+            max_links: Distinct links listed per digest; further ones are
+                only counted.
+        """
+        self.path = path
+        self.max_links = max_links
+        self._pending: dict[int, PendingDigest] = {}
+        self._file: IO[str] | None = None
+        self._files = contextlib.ExitStack()
+        # Lines buffered while a rewrite is writing the log in a thread.
+        self._held: list[str] | None = None
+        self._rewrite_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __iter__(self) -> Iterator[PendingDigest]:
+        return iter(list(self._pending.values()))
+
+    def _merge(self, digest: PendingDigest) -> None:
+        """Fold a digest (or part of one) into the pending digest of its channel."""
+        pending = self._pending.get(digest.channel_id)
+        if pending is None:
+            pending = self._pending[digest.channel_id] = PendingDigest(
+                digest.guild_id, digest.channel_id, digest.interval, digest.first_at
+            )
+        else:
+            pending.first_at = min(pending.first_at, digest.first_at)
+        for category, urls in digest.counts.items():
+            for url, count in urls.items():
+                pending.add(category, url, count, self.max_links)
+        pending.overflow += digest.overflow
+
+    def load(self) -> int:
+        """Restore pending digests from the log and compact it.
+
+        Returns:
+            The number of digests restored.
+        """
+        if self.path is None:
+            return 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        data = json.loads(line)
+                        digest = PendingDigest(
+                            int(data["g"]),
+                            int(data["c"]),
+                            int(data["i"]),
+                            float(data["t"]),
+                        )
+                        for category, url, count in data["l"]:
+                            digest.counts.setdefault(category, {})[url] = int(count)
+                        digest.overflow = int(data.get("o", 0))
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.warning("Skipping digest log line %d: %s", number, e)
+                        continue
+                    self._merge(digest)
+        except FileNotFoundError:
+            pass
+        self.compact()
+        if self._pending:
+            logger.info("Restored %d pending link digests", len(self._pending))
+        return len(self._pending)
+
+    def add(
+        self,
+        guild_id: int,
+        channel_id: int,
+        interval: int,
+        links_by_category: dict[str, list[str]],
+        now: float | None = None,
+    ) -> None:
+        """Buffer links for a channel and append them to the log.
+
+        Args:
+            guild_id: The guild.
+            channel_id: The output channel.
+            interval: The channel's digest interval, in seconds.
+            links_by_category: The links the channel accepted, by category.
+            now: The current time; defaults to ``time.time()``.
+        """
+        digest = PendingDigest(
+            guild_id, channel_id, interval, time.time() if now is None else now
+        )
+        for category, urls in links_by_category.items():
+            for url in urls:
+                digest.add(category, url, 1, self.max_links)
+        self._merge(digest)
+        if self.path is None:
+            return
+        if self._held is not None:
+            self._held.append(digest.to_line())
+        else:
+            self._append([digest.to_line()])
+
+    def _append(self, lines: list[str]) -> None:
+        """Append lines to the log."""
+        assert self.path is not None
+        if self._file is None:
+            with contextlib.ExitStack() as stack:
+                self._file = stack.enter_context(open(self.path, "a", encoding="utf-8"))
+                # Kept open between appends; close() releases it.
+                self._files = stack.pop_all()
+        self._file.write("".join(line + "\n" for line in lines))
+        self._file.flush()
+
+    def due(
+        self, now: float | None = None, limit: int | None = None
+    ) -> list[PendingDigest]:
+        """Return the digests whose delivery time has come, oldest first."""
+        now = time.time() if now is None else now
+        due = sorted(
+            (digest for digest in self._pending.values() if digest.due_at <= now),
+            key=lambda digest: digest.due_at,
+        )
+        return due[:limit]
+
+    def take(self, channel_id: int) -> PendingDigest | None:
+        """Remove a channel's digest for delivery; :meth:`compact` persists it."""
+        return self._pending.pop(channel_id, None)
+
+    def restore(self, digest: PendingDigest) -> None:
+        """Put back a digest whose delivery failed."""
+        self._merge(digest)
+
+    def discard(self, guild_id: int, channel_id: int | None = None) -> int:
+        """Drop the digests of a deleted channel, or of every channel of a guild.
+
+        The log still lists them until the next rewrite; call :meth:`rewrite`.
+
+        Returns:
+            The number of digests dropped.
+        """
+        dropped = [
+            digest.channel_id
+            for digest in self._pending.values()
+            if digest.guild_id == guild_id and channel_id in (None, digest.channel_id)
+        ]
+        for dropped_id in dropped:
+            del self._pending[dropped_id]
+        return len(dropped)
+
+    def _contents(self) -> str:
+        """Return the log contents that hold exactly the pending digests."""
+        return "".join(digest.to_line() + "\n" for digest in self._pending.values())
+
+    def _replace_log(self, contents: str) -> None:
+        """Atomically replace the log file with ``contents``."""
+        assert self.path is not None
+        tmp = f"{os.fspath(self.path)}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(contents)
+        os.replace(tmp, self.path)
+
+    def compact(self) -> None:
+        """Rewrite the log with only the pending digests, blocking."""
+        if self.path is None:
+            return
+        self.close()
+        self._replace_log(self._contents())
+
+    async def rewrite(self) -> None:
+        """Rewrite the log like :meth:`compact`, writing the file in a thread.
+
+        The contents are taken on the event loop. Links buffered while the
+        file is written are held in memory and appended to the new log
+        afterwards, so none lands in the file being replaced. Concurrent
+        rewrites run one after the other.
+        """
+        if self.path is None:
+            return
+        async with self._rewrite_lock:
+            contents = self._contents()
+            self.close()
+            self._held = []
+            try:
+                await asyncio.to_thread(self._replace_log, contents)
+            finally:
+                held, self._held = self._held, None
+                if held:
+                    self._append(held)
+
+    def close(self) -> None:
+        """Close the log; pending digests are delivered after the next start."""
+        if self._file is not None:
+            self._files.close()
+            self._file = None
@@ -0,0 +1,57 @@
+"""Helpers for reading typed configuration from environment variables."""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+_TRUE_VALUES = frozenset({"1", "true", "yes", "on"})
+
+
+def env_str(name: str, default: str) -> str:
+    """Return a string environment variable, or the default if unset or empty."""
+    return os.getenv(name) or default
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """Return a boolean environment variable ("1", "true", "yes", "on")."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in _TRUE_VALUES
+
+
+def env_int(name: str, default: int) -> int:
+    """Return an integer environment variable, falling back on invalid values."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("Invalid integer for %s: %r, using %d", name, value, default)
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Return a float environment variable, falling back on invalid values."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning("Invalid number for %s: %r, using %s", name, value, default)
+        return default
+
+
+def env_choice(name: str, choices: tuple[str, ...], default: str) -> str:
+    """Return an environment variable restricted to ``choices``, falling back on others."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    value = value.strip().lower()
+    if value not in choices:
+        logger.warning("Invalid value for %s: %r, using %s", name, value, default)
+        return default
+    return value
@@ -0,0 +1,212 @@
+"""Event loop lag monitoring and ``/healthz``/``/readyz`` HTTP endpoints."""
+
+import asyncio
+import logging
+import math
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class HealthThresholds:
+    """Limits beyond which the bot is reported unhealthy or not ready.
+
+    Attributes:
+        max_loop_lag: Seconds the event loop may lag before liveness fails.
+        max_latency: Gateway heartbeat latency in seconds before readiness fails.
+        max_queue_depth: Largest tolerated depth of any registered queue.
+        stale_after: Seconds without a lag sample before liveness fails.
+    """
+
+    max_loop_lag: float = 1.0
+    max_latency: float = 5.0
+    max_queue_depth: int = 1000
+    stale_after: float = 10.0
+
+
+class HealthMonitor:
+    """Sample event loop lag and serve liveness/readiness probes.
+
+    A background task sleeps for ``interval`` and measures how late it wakes
+    up; a wedged loop stops producing samples, which liveness treats as a
+    failure. Everything else (gateway latency, queue depths, readiness flags)
+    is read from cheap callables when a probe arrives, so probing every
+    second costs a few attribute reads. Checks that need I/O, such as
+    reaching the database, run on their own interval in the background and
+    readiness reports their latest result.
+    """
+
+    def __init__(
+        self,
+        thresholds: HealthThresholds | None = None,
+        interval: float = 1.0,
+        latency: Callable[[], float] | None = None,
+    ) -> None:
+        """Initialize the monitor.
+
+        Args:
+            thresholds: Limits for the probes; defaults apply if None.
+            interval: Seconds between loop lag samples.
+            latency: Returns the gateway latency in seconds (``bot.latency``).
+        """
+        self.thresholds = thresholds or HealthThresholds()
+        self.interval = interval
+        self.loop_lag = 0.0
+        self.max_loop_lag_seen = 0.0
+        self.last_sample: float | None = None
+        self._latency = latency
+        self._ready_checks: dict[str, Callable[[], bool]] = {}
+        self._queues: dict[str, Callable[[], int]] = {}
+        self._probes: dict[str, tuple[Callable[[], Awaitable[bool]], float]] = {}
+        self._probe_results: dict[str, bool] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._probe_tasks: list[asyncio.Task[None]] = []
+        self._runner: web.AppRunner | None = None
+
+    def add_ready_check(self, name: str, check: Callable[[], bool]) -> None:
+        """Register a condition that must hold for readiness."""
+        self._ready_checks[name] = check
+
+    def add_probe(
+        self, name: str, probe: Callable[[], Awaitable[bool]], interval: float = 30.0
+    ) -> None:
+        """Register an async readiness check, run every ``interval`` seconds.
+
+        The check fails until its first run succeeds; an exception counts
+        as a failure. A probe added after :meth:`start` runs right away.
+        """
+        self._probes[name] = (probe, interval)
+        self._probe_results[name] = False
+        if self._task is not None:
+            self._start_probe(name)
+
+    def add_queue(self, name: str, depth: Callable[[], int]) -> None:
+        """Register a queue whose depth is reported and bounded for readiness."""
+        self._queues[name] = depth
+
+    async def _sample(self) -> None:
+        """Measure loop lag until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.loop_lag = lag
+            self.max_loop_lag_seen = max(self.max_loop_lag_seen, lag)
+            self.last_sample = time.monotonic()
+            if lag > self.thresholds.max_loop_lag:
+                logger.warning("Event loop lag %.3fs", lag)
+
+    def _start_probe(self, name: str) -> None:
+        """Start the background task of a registered probe."""
+        probe, interval = self._probes[name]
+        self._probe_tasks.append(
+            asyncio.create_task(
+                self._run_probe(name, probe, interval), name=f"probe-{name}"
+            )
+        )
+
+    async def _run_probe(
+        self, name: str, probe: Callable[[], Awaitable[bool]], interval: float
+    ) -> None:
+        """Run a registered probe until cancelled, keeping its latest result."""
+        while True:
+            try:
+                ok = bool(await probe())
+            except Exception:
+                logger.warning("Readiness probe %s raised", name, exc_info=True)
+                ok = False
+            if ok != self._probe_results[name]:
+                state = "passing" if ok else "failing"
+                logger.info("Readiness probe %s is now %s", name, state)
+            self._probe_results[name] = ok
+            await asyncio.sleep(interval)
+
+    def liveness(self) -> tuple[bool, dict[str, Any]]:
+        """Return whether the event loop is running and responsive."""
+        age = None if self.last_sample is None else time.monotonic() - self.last_sample
+        # Before the first sample the loop is alive by definition: this runs on it.
+        fresh = age is None or age <= self.thresholds.stale_after
+        ok = fresh and self.loop_lag <= self.thresholds.max_loop_lag
+        return ok, {
+            "loop_lag": round(self.loop_lag, 4),
+            "max_loop_lag_seen": round(self.max_loop_lag_seen, 4),
+            "sample_age": None if age is None else round(age, 3),
+        }
+
+    def readiness(self) -> tuple[bool, dict[str, Any]]:
+        """Return whether the bot is live, connected and within every threshold."""
+        ok, details = self.liveness()
+        checks = {name: bool(check()) for name, check in self._ready_checks.items()}
+        checks.update(self._probe_results)
+        ok = ok and all(checks.values())
+
+        if self._latency is not None:
+            latency = self._latency()
+            latency_ok = (
+                math.isfinite(latency) and latency <= self.thresholds.max_latency
+            )
+            details["latency"] = round(latency, 4) if math.isfinite(latency) else None
+            checks["latency"] = latency_ok
+            ok = ok and latency_ok
+
+        queues = {name: depth() for name, depth in self._queues.items()}
+        queues_ok = all(d <= self.thresholds.max_queue_depth for d in queues.values())
+        checks["queues"] = queues_ok
+        details["checks"] = checks
+        details["queues"] = queues
+        return ok and queues_ok, details
+
+    async def _healthz(self, request: web.Request) -> web.Response:
+        ok, details = self.liveness()
+        return web.json_response({"ok": ok, **details}, status=200 if ok else 503)
+
+    async def _readyz(self, request: web.Request) -> web.Response:
+        ok, details = self.readiness()
+        return web.json_response({"ok": ok, **details}, status=200 if ok else 503)
+
+    async def start(self, host: str = "127.0.0.1", port: int | None = 8080) -> None:
+        """Start lag sampling and the probe HTTP server.
+
+        Args:
+            host: Interface to listen on.
+            port: Port to listen on (0 for any free port); None starts
+                sampling without a server.
+        """
+        self._task = asyncio.create_task(self._sample(), name="health-monitor")
+        for name in self._probes:
+            self._start_probe(name)
+        if port is None:
+            return
+        app = web.Application()
+        app.router.add_get("/healthz", self._healthz)
+        app.router.add_get("/readyz", self._readyz)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info("Health endpoints listening on http://%s:%d", host, port)
+
+    async def stop(self) -> None:
+        """Stop sampling and shut down the HTTP server."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in self._probe_tasks:
+            task.cancel()
+        self._probe_tasks = []
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def port(self) -> int | None:
+        """Return the port the server is bound to, if running."""
+        if self._runner is None or not self._runner.addresses:
+            return None
+        return self._runner.addresses[0][1]
@@ -0,0 +1,180 @@
+"""Build webhook payloads that fit Discord's message limits.
+
+All links bound for one destination go out in as few webhook calls as
+possible: one, unless the content or embed limits force a split.
+"""
+
+from dataclasses import dataclass, field
+from typing import Final, Literal
+
+import discord
+
+ForwardStyle = Literal["plain", "grouped", "embeds"]
+FORWARD_STYLES: Final[tuple[str, ...]] = ("plain", "grouped", "embeds")
+
+MAX_CONTENT: Final[int] = 2000
+MAX_EMBEDS: Final[int] = 10
+MAX_EMBED_DESCRIPTION: Final[int] = 4096
+MAX_EMBED_TOTAL: Final[int] = 6000
+
+
+@dataclass(slots=True)
+class WebhookPayload:
+    """Content and embeds of one webhook call, and the links it carries."""
+
+    content: str = ""
+    embeds: list[discord.Embed] = field(default_factory=list)
+    links: list[str] = field(default_factory=list)
+
+    def embed_chars(self) -> int:
+        """Return the characters counted against the per-message embed limit."""
+        return sum(len(embed) for embed in self.embeds)
+
+    def fits(self, embed: discord.Embed) -> bool:
+        """Return whether another embed can be added without breaking a limit."""
+        return (
+            len(self.embeds) < MAX_EMBEDS
+            and self.embed_chars() + len(embed) <= MAX_EMBED_TOTAL
+        )
+
+
+def _label(category: str) -> str:
+    return category.capitalize()
+
+
+def _clip(line: str, limit: int) -> str:
+    """Shorten a line that could never fit in a message on its own."""
+    return line if len(line) <= limit else line[: limit - 1] + "…"
+
+
+def _pack_lines(lines: list[str], limit: int) -> list[list[str]]:
+    """Group lines into chunks whose newline-joined length stays within ``limit``.
+
+    A line longer than ``limit`` by itself is clipped.
+    """
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    size = -1
+    for line in lines:
+        line = _clip(line, limit)
+        if current and size + 1 + len(line) > limit:
+            chunks.append(current)
+            current, size = [], -1
+        current.append(line)
+        size += 1 + len(line)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _content_payloads(
+    links_by_category: dict[str, list[str]], grouped: bool
+) -> list[WebhookPayload]:
+    """Lay links out as message content, repeating a category header after a split.
+
+    A link too long for a message even under its header is clipped in the
+    content; the payload still records the full link.
+    """
+    payloads: list[WebhookPayload] = []
+    current = WebhookPayload()
+    lines: list[str] = []
+    size = -1
+
+    def flush() -> None:
+        nonlocal current, lines, size
+        current.content = "\n".join(lines)
+        payloads.append(current)
+        current, lines, size = WebhookPayload(), [], -1
+
+    for category, urls in links_by_category.items():
+        header = f"**{_label(category)}**" if grouped else None
+        block_header = header
+        room = MAX_CONTENT - (len(header) + 1 if header else 0)
+        for url in urls:
+            line = _clip(url, room)
+            block = [block_header, line] if block_header else [line]
+            added = sum(len(line) + 1 for line in block)
+            if lines and size + added > MAX_CONTENT:
+                flush()
+                block = [header, line] if header else [line]
+                added = sum(len(line) + 1 for line in block)
+            lines.extend(block)
+            current.links.append(url)
+            size += added
+            block_header = None
+    if lines:
+        flush()
+    return payloads
+
+
+def _embed_payloads(links_by_category: dict[str, list[str]]) -> list[WebhookPayload]:
+    """Lay links out as one embed per category, continuing in more embeds if long."""
+    payloads = [WebhookPayload()]
+    for category, urls in links_by_category.items():
+        for chunk in _pack_lines(urls, MAX_EMBED_DESCRIPTION):
+            embed = discord.Embed(title=_label(category), description="\n".join(chunk))
+            if not payloads[-1].fits(embed):
+                payloads.append(WebhookPayload())
+            payloads[-1].embeds.append(embed)
+            payloads[-1].links.extend(chunk)
+    return payloads if payloads[0].embeds else []
+
+
+def build_payloads(
+    links_by_category: dict[str, list[str]],
+    style: ForwardStyle = "plain",
+    previews: dict[str, discord.Embed] | None = None,
+) -> list[WebhookPayload]:
+    """Build the webhook calls that deliver links to one destination.
+
+    Args:
+        links_by_category: The links the destination accepts, by category.
+        style: ``plain`` lists the links, ``grouped`` puts them under
+            category headers and ``embeds`` sends one embed per category.
+        previews: Link preview embeds by URL; each is attached to the call
+            carrying its link while the embed limits allow.
+
+    Returns:
+        The payloads, usually exactly one.
+    """
+    if style == "embeds":
+        payloads = _embed_payloads(links_by_category)
+    else:
+        payloads = _content_payloads(links_by_category, grouped=style == "grouped")
+    if previews:
+        for payload in payloads:
+            for url in payload.links:
+                preview = previews.get(url)
+                if preview is not None and payload.fits(preview):
+                    payload.embeds.append(preview)
+    return payloads
+
+
+def build_digest_payloads(
+    counts_by_category: dict[str, dict[str, int]], header: str
+) -> list[WebhookPayload]:
+    """Build the webhook calls that deliver a digest.
+
+    Each category becomes one or more embeds listing its links, most posted
+    first, with a repeat count; embeds are packed up to Discord's per-message
+    limits, so a digest of hundreds of links takes a handful of calls.
+
+    Args:
+        counts_by_category: Times each link was posted, by category then URL.
+        header: Content of the first call.
+
+    Returns:
+        The payloads; empty if there are no links.
+    """
+    lines = {
+        category: [
+            f"{url} ×{count}" if count > 1 else url
+            for url, count in sorted(counts.items(), key=lambda item: -item[1])
+        ]
+        for category, counts in counts_by_category.items()
+        if counts
+    }
+    payloads = _embed_payloads(lines)
+    if payloads:
+        payloads[0].content = header
+    return payloads
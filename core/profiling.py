@@ -0,0 +1,208 @@
+"""Event loop diagnostics: a sampling profiler and a slow-callback detector."""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from contextvars import ContextVar
+from types import FrameType
+from typing import Any, Final
+
+logger = logging.getLogger(__name__)
+
+# Set by handlers to describe what they are working on; reported together
+# with any callback that blocks the event loop.
+message_context: ContextVar[str | None] = ContextVar("message_context", default=None)
+
+DEFAULT_SAMPLE_INTERVAL: Final[float] = 0.005
+MAX_STACK_DEPTH: Final[int] = 128
+
+
+def _frame_label(frame: FrameType) -> str:
+    """Return a flamegraph-friendly ``module:function`` label for a frame."""
+    code = frame.f_code
+    module = frame.f_globals.get("__name__") or os.path.basename(code.co_filename)
+    return f"{module}:{code.co_qualname}"
+
+
+class SamplingProfiler:
+    """Statistical profiler that samples one thread's stack from a helper thread.
+
+    Samples are aggregated as collapsed stacks (``root;...;leaf count``), the
+    input format of flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(
+        self, thread_id: int | None = None, interval: float = DEFAULT_SAMPLE_INTERVAL
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            thread_id: The thread to sample; defaults to the calling thread.
+            interval: Seconds between samples.
+        """
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def total(self) -> int:
+        """Return the number of samples taken."""
+        return sum(self.samples.values())
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Sample the target thread until stopped."""
+        started = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack: list[str] = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples[";".join(stack)] += 1
+        self.duration = time.perf_counter() - started
+
+    def collapsed(self) -> str:
+        """Return the samples as collapsed stacks, most frequent first."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+    def top(self, n: int = 20) -> tuple[list[tuple[str, int]], list[tuple[str, int]]]:
+        """Return the hottest functions.
+
+        Args:
+            n: Number of entries per list.
+
+        Returns:
+            ``(self_time, inclusive)``: functions ranked by samples where they
+            were the leaf frame, and by samples where they were on the stack.
+        """
+        leaf: Counter[str] = Counter()
+        inclusive: Counter[str] = Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(";")
+            leaf[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+        return leaf.most_common(n), inclusive.most_common(n)
+
+    def report(self, n: int = 20) -> str:
+        """Return a plain-text top-N report."""
+        total = self.total or 1
+        self_time, inclusive = self.top(n)
+        lines = [
+            (
+                f"{self.total} samples over {self.duration:.1f}s "
+                f"(interval {self.interval * 1000:.1f}ms)"
+            ),
+            "",
+            "Self time:",
+            *(f"{count / total:7.1%}  {label}" for label, count in self_time),
+            "",
+            "Inclusive time:",
+            *(f"{count / total:7.1%}  {label}" for label, count in inclusive),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+async def profile_event_loop(
+    seconds: float, interval: float = DEFAULT_SAMPLE_INTERVAL
+) -> SamplingProfiler:
+    """Sample the running event loop's thread for a number of seconds.
+
+    Args:
+        seconds: How long to sample.
+        interval: Seconds between samples.
+
+    Returns:
+        The stopped profiler holding the samples.
+    """
+    profiler = SamplingProfiler(threading.get_ident(), interval)
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        await asyncio.to_thread(profiler.stop)
+    return profiler
+
+
+_original_handle_run: Callable[[asyncio.Handle], None] | None = None
+
+
+def _describe_callback(handle: asyncio.Handle) -> str:
+    """Return a readable name for the callback behind a handle."""
+    callback: Any = getattr(handle, "_callback", None)
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        name = getattr(coro, "__qualname__", repr(coro))
+        return f"task {owner.get_name()} ({name})"
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+def install_slow_callback_detector(threshold: float) -> None:
+    """Log every event loop callback that runs longer than ``threshold``.
+
+    Times ``asyncio.Handle._run``, the same hook asyncio debug mode uses for
+    ``slow_callback_duration``, without the rest of debug mode's overhead.
+    The warning names the task or callback and includes ``message_context``
+    as seen by that callback. Only applies to the stdlib event loop.
+
+    Args:
+        threshold: Seconds a callback may block the loop before it is logged.
+    """
+    global _original_handle_run
+    if _original_handle_run is not None:
+        uninstall_slow_callback_detector()
+    original = asyncio.Handle._run
+    _original_handle_run = original
+
+    def _run(handle: asyncio.Handle) -> None:
+        start = time.perf_counter()
+        original(handle)
+        elapsed = time.perf_counter() - start
+        if elapsed >= threshold:
+            context = handle._context.get(message_context)  # type: ignore[attr-defined]
+            logger.warning(
+                "Event loop blocked for %.3fs by %s%s",
+                elapsed,
+                _describe_callback(handle),
+                f" [{context}]" if context else "",
+            )
+
+    asyncio.Handle._run = _run  # type: ignore[method-assign]
+    logger.info("Slow callback detector installed (threshold %.3fs)", threshold)
+
+
+def uninstall_slow_callback_detector() -> None:
+    """Restore the original callback runner."""
+    global _original_handle_run
+    if _original_handle_run is not None:
+        asyncio.Handle._run = _original_handle_run  # type: ignore[method-assign]
+        _original_handle_run = None
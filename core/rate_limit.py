@@ -0,0 +1,102 @@
+"""Keyed token-bucket rate limiting for load shedding."""
+
+import logging
+import time
+from collections.abc import Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketLimiter:
+    """A token bucket per key, refilled lazily on access.
+
+    Each active key costs one small list (tokens, last update time); nothing
+    runs in the background. Buckets that have refilled completely carry no
+    state worth keeping, so they are evicted by a sweep that runs at most once
+    per ``sweep_interval`` from ``acquire``.
+    """
+
+    def __init__(self, rate: float, burst: float, sweep_interval: float = 60.0) -> None:
+        """Initialize the limiter.
+
+        Args:
+            rate: Tokens added per second.
+            burst: Bucket capacity (and initial tokens for a new key).
+            sweep_interval: Minimum seconds between idle-key sweeps.
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.sweep_interval = sweep_interval
+        self._buckets: dict[Hashable, list[float]] = {}
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _refill(self, key: Hashable, now: float) -> list[float]:
+        """Return the key's bucket with tokens brought up to date."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        return bucket
+
+    def acquire(self, key: Hashable, now: float | None = None) -> bool:
+        """Take one token for a key if available.
+
+        Args:
+            key: The bucket key.
+            now: Current monotonic time (for tests).
+
+        Returns:
+            True if a token was taken, False if the key is over its limit.
+        """
+        if now is None:
+            now = time.monotonic()
+        if now >= self._next_sweep:
+            self.evict_idle(now)
+        bucket = self._refill(key, now)
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return True
+        return False
+
+    def refund(self, key: Hashable) -> None:
+        """Return a token taken by :meth:`acquire` that was not used."""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket[0] = min(self.burst, bucket[0] + 1.0)
+
+    def retry_after(self, key: Hashable, now: float | None = None) -> float:
+        """Return the seconds until the key has a token again."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0.0
+        if now is None:
+            now = time.monotonic()
+        tokens = bucket[0] + (now - bucket[1]) * self.rate
+        return max(0.0, (1.0 - tokens) / self.rate)
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Drop buckets that have refilled to capacity.
+
+        Returns:
+            The number of evicted keys.
+        """
+        if now is None:
+            now = time.monotonic()
+        self._next_sweep = now + self.sweep_interval
+        idle = [
+            key
+            for key, (tokens, last) in self._buckets.items()
+            if tokens + (now - last) * self.rate >= self.burst
+        ]
+        for key in idle:
+            del self._buckets[key]
+        if idle:
+            logger.debug("Evicted %d idle rate limit buckets", len(idle))
+        return len(idle)
@@ -0,0 +1,308 @@
+"""Warm-start snapshot of routing state across restarts.
+
+On graceful shutdown the cached output channel configuration, per-guild
+link sources and resolved webhook URLs are written to a small binary file.
+The next start loads it before the gateway connects, so the first messages
+of every guild are routed without waiting for DynamoDB or Discord's webhook
+endpoints, then re-reads each snapshotted guild from the database in the
+background. Reloads go through the config cache's version check, so an
+admin change made during reconciliation is never overwritten.
+
+File layout: a ``<4sBd`` header (magic, format version, creation time)
+followed by a zlib-compressed body of length-prefixed little-endian
+records.
+"""
+
+import asyncio
+import logging
+import os
+import struct
+import time
+import zlib
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Final
+
+import discord
+
+from core.db.records import OutputChannelRecord
+from link_utils.extraction import LinkSource
+
+if TYPE_CHECKING:
+    from core.db.db_manager import Database
+
+logger = logging.getLogger(__name__)
+
+MAGIC: Final[bytes] = b"LBSS"
+FORMAT_VERSION: Final[int] = 3
+
+_HEADER = struct.Struct("<4sBd")
+_COUNT = struct.Struct("<I")
+_GUILD = struct.Struct("<QH")
+_CHANNEL = struct.Struct("<QIIH")
+_RULE_COUNTS = struct.Struct("<BB")
+_RULE = struct.Struct("<H")
+_SOURCES = struct.Struct("<QB")
+_WEBHOOK = struct.Struct("<QH")
+
+
+@dataclass(slots=True)
+class RoutingSnapshot:
+    """Routing state captured at shutdown.
+
+    Attributes:
+        created_at: When the snapshot was taken (UNIX seconds).
+        channels: Output channel records by guild, including guilds with none.
+        link_sources: Link source bitmask by guild.
+        webhooks: Webhook URL by output channel.
+    """
+
+    created_at: float = field(default_factory=time.time)
+    channels: dict[int, tuple[OutputChannelRecord, ...]] = field(default_factory=dict)
+    link_sources: dict[int, int] = field(default_factory=dict)
+    webhooks: dict[int, str] = field(default_factory=dict)
+
+
+def encode_snapshot(snapshot: RoutingSnapshot) -> bytes:
+    """Serialize a snapshot to its binary file format."""
+    body = bytearray(_COUNT.pack(len(snapshot.channels)))
+    for guild_id, records in snapshot.channels.items():
+        body += _GUILD.pack(guild_id, len(records))
+        for record in records:
+            url = (record.webhook_url or "").encode()
+            body += _CHANNEL.pack(
+                record.channel_id, record.acl, record.digest_interval, len(url)
+            )
+            body += url
+            body += _RULE_COUNTS.pack(len(record.link_allow), len(record.link_deny))
+            for rule in (*record.link_allow, *record.link_deny):
+                encoded = rule.encode()
+                body += _RULE.pack(len(encoded)) + encoded
+    body += _COUNT.pack(len(snapshot.link_sources))
+    for guild_id, sources in snapshot.link_sources.items():
+        body += _SOURCES.pack(guild_id, sources)
+    body += _COUNT.pack(len(snapshot.webhooks))
+    for channel_id, webhook_url in snapshot.webhooks.items():
+        url = webhook_url.encode()
+        body += _WEBHOOK.pack(channel_id, len(url)) + url
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, snapshot.created_at)
+    return header + zlib.compress(bytes(body), 6)
+
+
+def decode_snapshot(data: bytes) -> RoutingSnapshot:
+    """Parse a snapshot file.
+
+    Raises:
+        ValueError: If the data is not a snapshot of this format version or
+            is truncated or corrupt.
+    """
+    try:
+        magic, version, created_at = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"not a version {FORMAT_VERSION} routing snapshot")
+        body = zlib.decompress(data[_HEADER.size :])
+        snapshot = RoutingSnapshot(created_at=created_at)
+        offset = 0
+
+        def read(fmt: struct.Struct) -> tuple[int, ...]:
+            nonlocal offset
+            values = fmt.unpack_from(body, offset)
+            offset += fmt.size
+            return values
+
+        def read_str(length: int) -> str:
+            nonlocal offset
+            value = body[offset : offset + length].decode()
+            offset += length
+            return value
+
+        for _ in range(read(_COUNT)[0]):
+            guild_id, count = read(_GUILD)
+            records = []
+            for _ in range(count):
+                channel_id, acl, digest_interval, url_length = read(_CHANNEL)
+                url = read_str(url_length) or None
+                allow_count, deny_count = read(_RULE_COUNTS)
+                rules = [
+                    read_str(read(_RULE)[0]) for _ in range(allow_count + deny_count)
+                ]
+                records.append(
+                    OutputChannelRecord(
+                        guild_id,
+                        channel_id,
+                        url,
+                        acl,
+                        link_allow=tuple(rules[:allow_count]),
+                        link_deny=tuple(rules[allow_count:]),
+                        digest_interval=digest_interval,
+                    )
+                )
+            snapshot.channels[guild_id] = tuple(records)
+        for _ in range(read(_COUNT)[0]):
+            guild_id, sources = read(_SOURCES)
+            snapshot.link_sources[guild_id] = sources
+        for _ in range(read(_COUNT)[0]):
+            channel_id, url_length = read(_WEBHOOK)
+            snapshot.webhooks[channel_id] = read_str(url_length)
+    except (struct.error, zlib.error, UnicodeDecodeError) as e:
+        raise ValueError(f"corrupt routing snapshot: {e}") from e
+    return snapshot
+
+
+def write_snapshot(path: str | os.PathLike[str], snapshot: RoutingSnapshot) -> int:
+    """Atomically write a snapshot file, readable by the owner only.
+
+    The snapshot holds webhook URLs, which include their tokens.
+
+    Returns:
+        The size of the file in bytes.
+    """
+    data = encode_snapshot(snapshot)
+    tmp = f"{os.fspath(path)}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        os.fchmod(fd, 0o600)
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def read_snapshot(
+    path: str | os.PathLike[str], max_age: float
+) -> RoutingSnapshot | None:
+    """Read a snapshot file, ignoring missing, corrupt or stale ones.
+
+    Args:
+        path: The snapshot file.
+        max_age: Seconds after which a snapshot is too old to trust.
+
+    Returns:
+        The snapshot, or None.
+    """
+    try:
+        with open(path, "rb") as f:
+            snapshot = decode_snapshot(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring routing snapshot %s: %s", path, e)
+        return None
+    age = time.time() - snapshot.created_at
+    if age > max_age:
+        logger.info("Ignoring routing snapshot %s, %.0fs old", path, age)
+        return None
+    return snapshot
+
+
+def capture_snapshot(
+    db: "Database", webhooks: Mapping[int, discord.Webhook]
+) -> RoutingSnapshot:
+    """Collect the warm routing state of a running bot.
+
+    Args:
+        db: The database, whose caches hold the configuration.
+        webhooks: Resolved webhooks by output channel.
+    """
+    return RoutingSnapshot(
+        channels=db.output_channels.cache.entries(),
+        link_sources={
+            guild_id: int(sources)
+            for guild_id, sources in db.guild_settings.link_sources_cache.items()
+        },
+        webhooks={channel_id: webhook.url for channel_id, webhook in webhooks.items()},
+    )
+
+
+def restore_snapshot(
+    db: "Database",
+    webhooks: dict[int, discord.Webhook],
+    snapshot: RoutingSnapshot,
+    make_webhook: Callable[[str], discord.Webhook],
+) -> None:
+    """Load a snapshot into the caches of a starting bot.
+
+    Args:
+        db: The database, whose caches are filled.
+        webhooks: The webhook cache to fill.
+        snapshot: The snapshot to load.
+        make_webhook: Builds a webhook from its URL without an API call.
+    """
+    for guild_id, records in snapshot.channels.items():
+        db.output_channels.cache.put(guild_id, records)
+    for guild_id, sources in snapshot.link_sources.items():
+        db.guild_settings.link_sources_cache.set(guild_id, LinkSource(sources))
+    for channel_id, url in snapshot.webhooks.items():
+        webhooks.setdefault(channel_id, make_webhook(url))
+    logger.info(
+        "Restored routing snapshot: %d guilds, %d webhooks, %.0fs old",
+        len(snapshot.channels),
+        len(snapshot.webhooks),
+        time.time() - snapshot.created_at,
+    )
+
+
+async def reconcile_snapshot(
+    db: "Database",
+    webhooks: dict[int, discord.Webhook],
+    snapshot: RoutingSnapshot,
+    concurrency: int = 4,
+) -> int:
+    """Re-read every snapshotted guild from the database and fix the caches.
+
+    A reload only replaces a cache entry if the guild was not invalidated
+    while it ran. Cached webhooks whose channel is no longer an output
+    channel, or whose stored URL changed, are dropped and re-resolved on the
+    next forward.
+
+    Args:
+        db: The database.
+        webhooks: The webhook cache.
+        snapshot: The snapshot that was restored.
+        concurrency: Guilds reloaded in parallel, kept low so a restart does
+            not burst read capacity.
+
+    Returns:
+        The number of guilds whose configuration had changed.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    live_urls: dict[int, str | None] = {}
+    changed = 0
+
+    async def reload(guild_id: int) -> None:
+        nonlocal changed
+        async with semaphore:
+            version = db.output_channels.cache.version(guild_id)
+            records = tuple(await db.output_channels.get_output_channels(guild_id))
+            if guild_id in snapshot.link_sources:
+                sources = await db.guild_settings.get_link_sources(guild_id)
+                cache = db.guild_settings.link_sources_cache
+                _, current = cache.lookup(guild_id)
+                # Leave a value set by /link_sources during the read alone.
+                if current in (None, snapshot.link_sources[guild_id]):
+                    cache.set(guild_id, sources)
+        db.output_channels.cache.put(guild_id, records, version)
+        if records != snapshot.channels.get(guild_id):
+            changed += 1
+        live_urls.update((record.channel_id, record.webhook_url) for record in records)
+
+    results = await asyncio.gather(
+        *(reload(guild_id) for guild_id in snapshot.channels), return_exceptions=True
+    )
+    for error in results:
+        if isinstance(error, Exception):
+            logger.warning("Snapshot reconciliation failed for a guild: %s", error)
+
+    for channel_id, url in snapshot.webhooks.items():
+        webhook = webhooks.get(channel_id)
+        if (
+            webhook is not None
+            and webhook.url == url
+            and live_urls.get(channel_id) != url
+        ):
+            del webhooks[channel_id]
+    logger.info(
+        "Reconciled routing snapshot: %d of %d guilds changed",
+        changed,
+        len(snapshot.channels),
+    )
+    return changed
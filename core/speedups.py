@@ -0,0 +1,52 @@
+"""Opt-in speed mode: the uvloop event loop.
+
+Both accelerators come from the ``speed`` extra (``uv sync --extra speed``).
+Speed mode switches the event loop to uvloop if it imports; orjson is not
+controlled by it, discord.py picks it up by itself whenever it is installed
+and falls back to ``json`` otherwise.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+
+import discord.utils
+
+logger = logging.getLogger(__name__)
+
+
+def event_loop_factory(enabled: bool) -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """Return a uvloop event loop factory for ``asyncio.run``, if enabled and installed.
+
+    Args:
+        enabled: Whether speed mode is on.
+
+    Returns:
+        ``uvloop.new_event_loop``, or None to use the default loop.
+    """
+    if not enabled:
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        logger.info("uvloop not installed, using the default event loop")
+        return None
+    return uvloop.new_event_loop
+
+
+def fast_json_enabled() -> bool:
+    """Return whether discord.py encodes and decodes payloads with orjson.
+
+    discord.py switches to orjson by itself when it is installed at import
+    time; speed mode only reports whether that happened.
+    """
+    if not discord.utils.HAS_ORJSON:
+        logger.info("orjson not installed, using the stdlib json module")
+    return discord.utils.HAS_ORJSON
+
+
+def describe_runtime() -> str:
+    """Return a short description of the active event loop and JSON backend."""
+    loop = type(asyncio.get_running_loop())
+    json_backend = "orjson" if discord.utils.HAS_ORJSON else "json"
+    return f"{loop.__module__}.{loop.__qualname__}, {json_backend}"
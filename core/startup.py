@@ -0,0 +1,72 @@
+"""Cold-start timing from process creation to ``on_ready``.
+
+Every deploy and spot replacement is an outage lasting as long as the bot
+takes to start, so each phase is timed against the moment the OS created
+the process (interpreter start-up included) and the total is checked
+against ``STARTUP_BUDGET``. ``benchmarks/bench_startup.py`` reads the
+summary line to compare runs.
+"""
+
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the summary line logged once the bot is ready.
+READY_MESSAGE = "Startup complete in"
+
+
+def process_age() -> float:
+    """Return seconds since the OS created this process, or 0 where unknown."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the parenthesized command name; starttime is field 22.
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class StartupTimer:
+    """Records when each start-up phase finished, relative to process creation."""
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter() - process_age()
+        self.marks: dict[str, float] = {}
+
+    def elapsed(self) -> float:
+        """Return seconds since the process was created."""
+        return time.perf_counter() - self.origin
+
+    def mark(self, phase: str) -> None:
+        """Record that a phase finished; later marks of the same phase are ignored."""
+        self.marks.setdefault(phase, self.elapsed())
+
+    @property
+    def finished(self) -> bool:
+        """Whether the bot has become ready."""
+        return "ready" in self.marks
+
+    def report(self) -> str:
+        """Return the phases in order as ``name 1.23s`` pairs."""
+        return ", ".join(f"{phase} {at:.2f}s" for phase, at in self.marks.items())
+
+    def finish(self, budget: float) -> None:
+        """Mark the bot ready and log the timings, warning if over budget.
+
+        Args:
+            budget: Seconds start-up may take; 0 disables the check.
+        """
+        if self.finished:
+            return
+        self.mark("ready")
+        total = self.marks["ready"]
+        logger.info("%s %.2fs (%s)", READY_MESSAGE, total, self.report())
+        if budget > 0 and total > budget:
+            logger.warning("Startup took %.2fs, over the %.2fs budget", total, budget)
+
+
+STARTUP = StartupTimer()
@@ -0,0 +1,504 @@
+"""Lightweight request tracing for the forwarding path.
+
+Each handled message gets a root span; code below it opens child spans
+with :func:`span` or the :func:`traced` decorator, and the active span is
+carried in a context variable so it follows ``await`` and the tasks that
+inherit the context. Nothing is recorded unless the message was head
+sampled (``TRACE_SAMPLE_RATE``) or tail sampling (``TRACE_SLOW_THRESHOLD``)
+is enabled; in that case every trace is recorded but only slow or failed
+ones are exported. With both off, :func:`span` is a context variable
+lookup returning a shared no-op span.
+
+Kept traces are written to a JSONL file or posted as OTLP/HTTP JSON to a
+collector such as the OpenTelemetry Collector or Jaeger.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from types import TracebackType
+from typing import Any, Final, Protocol, Self, TypeVar
+
+import aiohttp
+
+from core.env import env_float, env_int, env_str
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_SPANS: Final[int] = 256
+SERVICE_NAME: Final[str] = "discord-link-bot"
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+Attribute = str | int | float | bool
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "_token",
+        "attributes",
+        "end_ns",
+        "error",
+        "name",
+        "parent_id",
+        "span_id",
+        "start_ns",
+        "trace",
+    )
+
+    def __init__(
+        self,
+        trace: "Trace",
+        name: str,
+        parent_id: int | None,
+        attributes: dict[str, Attribute],
+    ) -> None:
+        self.trace = trace
+        self.span_id = random.getrandbits(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: str | None = None
+
+    @property
+    def duration(self) -> float:
+        """Return the span's duration in seconds."""
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def set(self, key: str, value: Attribute) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    def __enter__(self) -> Self:
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.end_ns = time.time_ns()
+        if exc is not None and not isinstance(exc, asyncio.CancelledError):
+            self.error = f"{type(exc).__name__}: {exc}"
+        _current_span.reset(self._token)
+        if self.parent_id is None:
+            self.trace.tracer._finish(self.trace, self)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the span as one JSONL record."""
+        return {
+            "trace_id": f"{self.trace.trace_id:032x}",
+            "span_id": f"{self.span_id:016x}",
+            "parent_id": f"{self.parent_id:016x}" if self.parent_id else None,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned when nothing is being traced."""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Attribute) -> None:
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        pass
+
+
+NOOP_SPAN: Final = _NoopSpan()
+
+
+class Trace:
+    """The spans recorded for one message."""
+
+    __slots__ = ("dropped", "sampled", "spans", "trace_id", "tracer")
+
+    def __init__(self, tracer: "Tracer", sampled: bool) -> None:
+        self.tracer = tracer
+        self.trace_id = random.getrandbits(128)
+        self.sampled = sampled
+        self.spans: list[Span] = []
+        self.dropped = 0
+
+    def span(
+        self, name: str, parent: Span | None, attributes: dict[str, Attribute]
+    ) -> Span | _NoopSpan:
+        """Open a span in this trace, unless it already holds too many."""
+        if len(self.spans) >= self.tracer.max_spans:
+            self.dropped += 1
+            return NOOP_SPAN
+        child = Span(self, name, parent.span_id if parent else None, attributes)
+        self.spans.append(child)
+        return child
+
+
+class SpanExporter(Protocol):
+    """Destination for kept traces."""
+
+    def export(self, spans: list[Span]) -> None:
+        """Hand over the spans of one finished trace without blocking."""
+        ...
+
+    async def close(self) -> None:
+        """Flush anything buffered and release resources."""
+        ...
+
+
+class JsonlSpanExporter:
+    """Buffer spans and append them to a JSONL file, one span per line.
+
+    Spans are encoded as they arrive and written in a worker thread every
+    ``interval`` seconds, so a slow disk never stalls the event loop.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        interval: float = 1.0,
+        max_queue: int = 10_000,
+    ) -> None:
+        """Initialize the exporter.
+
+        Args:
+            path: The file spans are appended to.
+            interval: Seconds between writes.
+            max_queue: Spans buffered before new ones are dropped.
+        """
+        self.path = path
+        self.interval = interval
+        self.max_queue = max_queue
+        self.stats: Counter[str] = Counter()
+        self._queue: list[str] = []
+        self._task: asyncio.Task[None] | None = None
+        self._lock = asyncio.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        room = self.max_queue - len(self._queue)
+        if room < len(spans):
+            self.stats["dropped"] += len(spans) - max(room, 0)
+            spans = spans[: max(room, 0)]
+        self._queue.extend(
+            json.dumps(s.to_dict(), separators=(",", ":")) + "\n" for s in spans
+        )
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Write batches until closed."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def _append(self, lines: list[str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    async def flush(self) -> None:
+        """Append all buffered spans to the file."""
+        async with self._lock:
+            if not self._queue:
+                return
+            batch, self._queue = self._queue, []
+            try:
+                await asyncio.to_thread(self._append, batch)
+            except OSError as e:
+                self.stats["failed"] += len(batch)
+                logger.warning("Could not write %d spans: %s", len(batch), e)
+            else:
+                self.stats["exported"] += len(batch)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+def _otlp_value(value: Attribute) -> dict[str, Any]:
+    """Encode an attribute value as an OTLP ``AnyValue``."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_span(span: Span) -> dict[str, Any]:
+    """Encode a span in the OTLP/HTTP JSON format."""
+    encoded: dict[str, Any] = {
+        "traceId": f"{span.trace.trace_id:032x}",
+        "spanId": f"{span.span_id:016x}",
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [
+            {"key": key, "value": _otlp_value(value)}
+            for key, value in span.attributes.items()
+        ],
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = f"{span.parent_id:016x}"
+    if span.error:
+        encoded["status"] = {"code": 2, "message": span.error}
+    return encoded
+
+
+class OtlpSpanExporter:
+    """Batch spans and post them to an OTLP/HTTP collector as JSON."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        interval: float = 5.0,
+        max_queue: int = 10_000,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        """Initialize the exporter.
+
+        Args:
+            endpoint: The collector's traces URL, e.g.
+                ``http://localhost:4318/v1/traces``.
+            interval: Seconds between batch uploads.
+            max_queue: Spans buffered before new ones are dropped.
+            session: HTTP session to use; one is created if None.
+        """
+        self.endpoint = endpoint
+        self.interval = interval
+        self.max_queue = max_queue
+        self.stats: Counter[str] = Counter()
+        self._session = session
+        self._owns_session = session is None
+        self._queue: list[dict[str, Any]] = []
+        self._task: asyncio.Task[None] | None = None
+
+    def export(self, spans: list[Span]) -> None:
+        room = self.max_queue - len(self._queue)
+        if room < len(spans):
+            self.stats["dropped"] += len(spans) - max(room, 0)
+            spans = spans[: max(room, 0)]
+        self._queue.extend(otlp_span(s) for s in spans)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Upload batches until closed."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Post all buffered spans in one request."""
+        if not self._queue:
+            return
+        batch, self._queue = self._queue, []
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": SERVICE_NAME},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": batch}],
+                }
+            ]
+        }
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        try:
+            async with self._session.post(
+                self.endpoint, json=body, timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status >= 300:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info, (), status=response.status
+                    )
+            self.stats["exported"] += len(batch)
+        except (TimeoutError, aiohttp.ClientError) as e:
+            self.stats["failed"] += len(batch)
+            logger.warning("Could not export %d spans: %s", len(batch), e)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class Tracer:
+    """Starts traces and decides which ones are exported."""
+
+    def __init__(
+        self,
+        exporter: SpanExporter | None = None,
+        sample_rate: float = 0.0,
+        slow_threshold: float = 0.0,
+        max_spans: int = DEFAULT_MAX_SPANS,
+    ) -> None:
+        """Initialize the tracer.
+
+        Args:
+            exporter: Where kept traces go; tracing is off without one.
+            sample_rate: Fraction of traces kept regardless of duration.
+            slow_threshold: Seconds after which an unsampled trace is kept
+                anyway, as is any trace that failed; 0 disables tail sampling.
+            max_spans: Spans recorded per trace; further ones are not.
+        """
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.max_spans = max_spans
+        self.stats: Counter[str] = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any trace can be kept."""
+        return self.exporter is not None and (
+            self.sample_rate > 0 or self.slow_threshold > 0
+        )
+
+    def start_trace(self, name: str, **attributes: Attribute) -> Span | _NoopSpan:
+        """Return the root span of a new trace, to be used as a context manager.
+
+        Args:
+            name: The root span name.
+            **attributes: Attributes of the root span.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        sampled = random.random() < self.sample_rate
+        if not sampled and self.slow_threshold <= 0:
+            return NOOP_SPAN
+        return Trace(self, sampled).span(name, None, attributes)
+
+    def _finish(self, trace: Trace, root: Span) -> None:
+        """Export a finished trace if it was sampled, slow or failed."""
+        if trace.sampled:
+            reason = "head"
+        elif self.slow_threshold > 0 and root.duration >= self.slow_threshold:
+            reason = "slow"
+        elif any(s.error for s in trace.spans):
+            reason = "error"
+        else:
+            self.stats["discarded"] += 1
+            return
+        self.stats[reason] += 1
+        if trace.dropped:
+            root.set("dropped_spans", trace.dropped)
+        assert self.exporter is not None
+        try:
+            self.exporter.export(trace.spans)
+        except Exception:
+            logger.warning("Could not export trace", exc_info=True)
+
+    async def close(self) -> None:
+        """Close the exporter."""
+        if self.exporter is not None:
+            await self.exporter.close()
+
+
+def span(name: str, **attributes: Attribute) -> Span | _NoopSpan:
+    """Open a child of the current span, or a no-op span outside any trace.
+
+    Args:
+        name: The span name.
+        **attributes: Span attributes.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return parent.trace.span(name, parent, attributes)
+
+
+def current_span() -> Span | _NoopSpan:
+    """Return the active span, to attach attributes to it."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(
+    name: str | None = None,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Wrap a coroutine function in a span named after it.
+
+    Args:
+        name: The span name; defaults to the function's qualified name.
+    """
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            parent = _current_span.get()
+            if parent is None:
+                return await fn(*args, **kwargs)
+            with parent.trace.span(span_name, parent, {}):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def tracer_from_env() -> Tracer:
+    """Build the tracer configured by the ``TRACE_*`` environment variables."""
+    sample_rate = env_float("TRACE_SAMPLE_RATE", 0.0)
+    slow_threshold = env_float("TRACE_SLOW_THRESHOLD", 0.0)
+    if sample_rate <= 0 and slow_threshold <= 0:
+        return Tracer()
+    endpoint = env_str("TRACE_OTLP_ENDPOINT", "")
+    exporter: SpanExporter
+    if endpoint:
+        exporter = OtlpSpanExporter(endpoint)
+    else:
+        exporter = JsonlSpanExporter(env_str("TRACE_PATH", "traces.jsonl"))
+    logger.info(
+        "Tracing enabled: sample rate %s, slow threshold %ss, exporting to %s",
+        sample_rate,
+        slow_threshold,
+        endpoint or "JSONL",
+    )
+    return Tracer(
+        exporter,
+        sample_rate,
+        slow_threshold,
+        max_spans=env_int("TRACE_MAX_SPANS", DEFAULT_MAX_SPANS),
+    )
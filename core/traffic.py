@@ -0,0 +1,153 @@
+"""Record anonymized ``on_message`` traffic for replay load tests.
+
+Each line of a recording is a JSON object describing one message as
+LinkMonitor saw it, with identifiers replaced by salted hashes and the text
+reduced to its shape: its length and its links, with hosts and query
+parameter names kept (they drive categorization and canonicalization) and
+every path segment and parameter value replaced by a hash of equal length.
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import secrets
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from typing import IO, Any
+from urllib.parse import urlsplit, urlunsplit
+
+import discord
+
+from link_utils.url_tools import extract_urls
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class TrafficRecord:
+    """One anonymized message.
+
+    Attributes:
+        ts: Message creation time (UNIX seconds).
+        guild: Hashed guild id.
+        channel: Hashed channel id.
+        author: Hashed author id.
+        length: Length of the original content.
+        urls: Anonymized links in the content.
+    """
+
+    ts: float
+    guild: int
+    channel: int
+    author: int
+    length: int
+    urls: list[str]
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "TrafficRecord":
+        """Decode a record read from a recording."""
+        return cls(
+            float(data["ts"]),
+            int(data["guild"]),
+            int(data["channel"]),
+            int(data["author"]),
+            int(data["length"]),
+            list(data.get("urls", [])),
+        )
+
+
+def _digest(salt: bytes, value: str, size: int = 8) -> bytes:
+    """Return a salted BLAKE2 digest of a value."""
+    return hashlib.blake2b(value.encode(), key=salt, digest_size=size).digest()
+
+
+def hash_id(salt: bytes, value: int) -> int:
+    """Map a snowflake to a stable, anonymous 63-bit id."""
+    return int.from_bytes(_digest(salt, str(value)), "big") >> 1
+
+
+def _mask(salt: bytes, value: str) -> str:
+    """Replace a string with a hex hash of the same length (at most 32)."""
+    if not value:
+        return value
+    return _digest(salt, value, 16).hex()[: min(len(value), 32)]
+
+
+def anonymize_url(salt: bytes, url: str) -> str:
+    """Hide the path and parameter values of a URL, keeping its shape.
+
+    Args:
+        salt: Secret hashing key.
+        url: The link as extracted from a message.
+
+    Returns:
+        The URL with host and parameter names intact.
+    """
+    bare = url[:4].lower() == "www."
+    if bare:
+        url = "https://" + url
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return "https://invalid.example/"
+    path = "/".join(_mask(salt, segment) for segment in parts.path.split("/"))
+    query = "&".join(
+        f"{name}={_mask(salt, value)}" if sep else name
+        for name, sep, value in (p.partition("=") for p in parts.query.split("&") if p)
+    )
+    anonymized = urlunsplit((parts.scheme, parts.netloc, path, query, ""))
+    return anonymized.removeprefix("https://") if bare else anonymized
+
+
+class TrafficRecorder:
+    """Append anonymized message records to a JSONL file."""
+
+    def __init__(self, path: str | os.PathLike[str], salt: bytes | None = None) -> None:
+        """Open the recording for appending.
+
+        Args:
+            path: The JSONL file to write.
+            salt: Hashing key; a random one is used if None, so recordings
+                cannot be joined with other data.
+        """
+        self.path = path
+        self.salt = salt or secrets.token_bytes(16)
+        self.count = 0
+        self._file: IO[str] | None
+        with contextlib.ExitStack() as stack:
+            self._file = stack.enter_context(open(path, "a", encoding="utf-8"))
+            # Kept open for the recorder's lifetime; close() releases it.
+            self._files = stack.pop_all()
+
+    def record(self, message: discord.Message) -> None:
+        """Append one message to the recording."""
+        if self._file is None or message.guild is None:
+            return
+        urls = extract_urls(message.content) or []
+        record = TrafficRecord(
+            ts=message.created_at.timestamp(),
+            guild=hash_id(self.salt, message.guild.id),
+            channel=hash_id(self.salt, message.channel.id),
+            author=hash_id(self.salt, message.author.id),
+            length=len(message.content),
+            urls=[anonymize_url(self.salt, url) for url in urls],
+        )
+        self._file.write(json.dumps(asdict(record), separators=(",", ":")) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        """Flush and close the recording."""
+        if self._file is not None:
+            self._files.close()
+            self._file = None
+            logger.info("Recorded %d messages to %s", self.count, self.path)
+
+
+def read_traffic(path: str | os.PathLike[str]) -> Iterator[TrafficRecord]:
+    """Yield the records of a recording in file order."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield TrafficRecord.from_dict(json.loads(line))
@@ -0,0 +1,245 @@
+"""Screen links against a large blocklist of malicious domains.
+
+The blocklist file lists one domain per line. Blank lines and ``#``
+comments are skipped, and hosts-file lines (``0.0.0.0 evil.example``) are
+accepted, so published phishing and malware lists can be used as they
+are. A listed domain also blocks all of its subdomains.
+
+Domains are not kept as strings. Each one is reduced to its 64-bit string
+hash, stored in an open-addressing table: one flat ``array('Q')`` with
+linear probing, sized to a power of two and at most half full. Checking a
+link hashes its host and each parent domain and probes the table once per
+label, so a lookup costs O(host labels) whatever the list size. For
+1,000,000 domains the table is 2**21 slots of 8 bytes, 16 MiB, against
+about 90 MiB for a ``set`` of the same strings (measure with
+``python -m benchmarks.bench_blocklist``). A false positive needs a 64-bit
+hash collision, about one in 2**44 lookups at that size.
+
+:class:`BlocklistReloader` rebuilds the table in a worker thread when the
+file changes and swaps it in whole, so a refresh needs no restart and
+lookups never see a half-built table.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Final, Literal
+
+logger = logging.getLogger(__name__)
+
+BlocklistAction = Literal["drop", "quarantine", "alert", "off"]
+BLOCKLIST_ACTIONS: Final[tuple[BlocklistAction, ...]] = (
+    "drop",
+    "quarantine",
+    "alert",
+    "off",
+)
+
+# Addresses hosts-file blocklists point blocked names at.
+_SINKHOLES = frozenset({"0.0.0.0", "127.0.0.1", "::", "::1"})
+_MASK64: Final[int] = 2**64 - 1
+# Scheme, user info and host of a link; urlsplit is several times slower.
+_HOST = re.compile(
+    r"(?:[a-z][a-z0-9+.-]*://)?(?:[^/?#@\s]*@)?([^/?#:@\s]+)", re.IGNORECASE
+)
+
+
+@dataclass(frozen=True, slots=True)
+class BlocklistPolicy:
+    """What a guild does with links to blocklisted domains.
+
+    Attributes:
+        action: ``drop`` skips them, ``quarantine`` moves them to
+            ``channel_id`` and deletes the original message, ``alert``
+            skips them and reports the message in ``channel_id``, ``off``
+            forwards them like any other link.
+        channel_id: The quarantine or alert channel.
+    """
+
+    action: BlocklistAction = "drop"
+    channel_id: int | None = None
+
+
+DEFAULT_BLOCKLIST_POLICY: Final[BlocklistPolicy] = BlocklistPolicy()
+
+
+def domain_hash(domain: str) -> int:
+    """Return the non-zero 64-bit hash a domain is stored under.
+
+    This is the interpreter's string hash (SipHash), which is randomized per
+    process; tables are rebuilt on every start, so it never needs to be
+    stable.
+    """
+    return hash(domain) & _MASK64 or 1
+
+
+def parse_blocklist_line(line: str) -> str | None:
+    """Return the domain listed on a line, or None for blanks and comments."""
+    fields = line.split("#", 1)[0].lower().split()
+    if len(fields) == 2 and fields[0] in _SINKHOLES:
+        fields = fields[1:]
+    if len(fields) != 1:
+        return None
+    domain = fields[0].strip(".").removeprefix("*.")
+    if "." not in domain or domain in _SINKHOLES:
+        return None
+    return domain
+
+
+def _host(url: str) -> str:
+    """Return the lowercase ASCII host of a link, or "" if it has none."""
+    match = _HOST.match(url)
+    host = match.group(1).lower() if match else ""
+    if not host.isascii():
+        try:
+            host = host.encode("idna").decode()
+        except UnicodeError:
+            pass
+    return host.rstrip(".")
+
+
+class DomainBlocklist:
+    """Compact, immutable set of blocked domains."""
+
+    __slots__ = ("_mask", "_size", "_table", "source")
+
+    def __init__(self, domains: Iterable[str] = (), source: str = "<memory>") -> None:
+        """Hash domains into the table.
+
+        Args:
+            domains: Normalized domains (see :func:`parse_blocklist_line`).
+            source: Where the domains came from, for logging.
+        """
+        self.source = source
+        hashes = array("Q", map(domain_hash, domains))
+        capacity = 8
+        while capacity < 2 * len(hashes):
+            capacity *= 2
+        table = array("Q", bytes(8 * capacity))
+        mask = capacity - 1
+        size = 0
+        for value in hashes:
+            i = value & mask
+            while table[i] and table[i] != value:
+                i = (i + 1) & mask
+            if not table[i]:
+                table[i] = value
+                size += 1
+        self._table = table
+        self._mask = mask
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the table."""
+        return len(self._table) * self._table.itemsize
+
+    def _has(self, value: int) -> bool:
+        table = self._table
+        i = value & self._mask
+        while slot := table[i]:
+            if slot == value:
+                return True
+            i = (i + 1) & self._mask
+        return False
+
+    def __contains__(self, domain: object) -> bool:
+        return isinstance(domain, str) and self._has(domain_hash(domain))
+
+    def match(self, url: str) -> str | None:
+        """Return the listed domain a link's host falls under, if any."""
+        if not self._size:
+            return None
+        labels = _host(url).split(".")
+        for i in range(len(labels) - 1):
+            domain = ".".join(labels[i:])
+            if self._has(domain_hash(domain)):
+                return domain
+        return None
+
+
+def load_blocklist_file(path: str | os.PathLike[str]) -> DomainBlocklist:
+    """Read a blocklist file line by line into a table.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    with open(path, encoding="utf-8", errors="replace") as f:
+        domains = (domain for line in f if (domain := parse_blocklist_line(line)))
+        return DomainBlocklist(domains, source=str(path))
+
+
+class BlocklistReloader:
+    """Watch a blocklist file and swap in a new table when it changes.
+
+    Until the first load finishes the blocklist is empty and every link
+    passes; a file that fails to load leaves the previous table in place.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Initialize the reloader.
+
+        Args:
+            path: The blocklist file to watch.
+        """
+        self.path = Path(path)
+        self.blocklist = DomainBlocklist()
+        self.last_error: str | None = None
+        self.loaded_at: float | None = None
+        self._stamp: tuple[int, int] | None = None
+        self._lock = asyncio.Lock()
+
+    def _file_stamp(self) -> tuple[int, int] | None:
+        """Return the file's modification time and size, or None if missing."""
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    async def reload(self, force: bool = False) -> bool:
+        """Load the blocklist file if it changed since the last attempt.
+
+        Args:
+            force: Reload even if the file looks unchanged.
+
+        Returns:
+            True if a new table was swapped in.
+        """
+        async with self._lock:
+            stamp = self._file_stamp()
+            if not force and stamp == self._stamp:
+                return False
+            self._stamp = stamp
+            started = time.perf_counter()
+            try:
+                blocklist = await asyncio.to_thread(load_blocklist_file, self.path)
+            except OSError as e:
+                self.last_error = str(e)
+                logger.error(
+                    "Could not load blocklist %s, keeping %d domains: %s",
+                    self.path,
+                    len(self.blocklist),
+                    e,
+                )
+                return False
+            self.last_error = None
+            self.loaded_at = time.time()
+            self.blocklist = blocklist
+            logger.info(
+                "Loaded %d blocked domains from %s in %.1fs (%.1f MiB)",
+                len(blocklist),
+                self.path,
+                time.perf_counter() - started,
+                blocklist.nbytes / 2**20,
+            )
+            return True
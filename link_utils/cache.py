@@ -0,0 +1,109 @@
+"""Small async-friendly caching primitives shared by link resolvers."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+
+
+class TTLCache[K: Hashable, V]:
+    """Size-bounded LRU cache whose entries also expire after a TTL.
+
+    Entries can be given their own TTL, which is how resolvers cache
+    failures (negative caching) for a shorter time than successes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries; the least recently used entry
+                is evicted first.
+            ttl: Default seconds an entry stays valid.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def lookup(self, key: K) -> tuple[bool, V | None]:
+        """Look up a key.
+
+        Returns:
+            ``(True, value)`` on a hit (the value may itself be None for a
+            cached failure), ``(False, None)`` on a miss.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return False, None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def items(self) -> list[tuple[K, V]]:
+        """Return every unexpired entry, least recently used first."""
+        now = time.monotonic()
+        return [
+            (key, value)
+            for key, (expires, value) in self._data.items()
+            if expires >= now
+        ]
+
+    def discard(self, key: K) -> None:
+        """Drop an entry if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._data.clear()
+
+
+class SingleFlight[K: Hashable, V]:
+    """Collapse concurrent calls for the same key into one in-flight task.
+
+    The work runs in its own task and callers await it through
+    ``asyncio.shield``, so a caller that gives up (e.g. on a latency budget)
+    does not cancel the work for everyone else.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[K, asyncio.Task[V]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        """Run ``fn`` for ``key`` unless a call for the same key is in flight.
+
+        Args:
+            key: Deduplication key.
+            fn: Factory for the awaitable doing the work.
+
+        Returns:
+            The shared result.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
@@ -0,0 +1,182 @@
+"""URL canonicalization: tracking-parameter stripping and host alias folding."""
+
+import logging
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Final
+from urllib.parse import urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only ever carry tracking data, on any site.
+TRACKING_PARAMS: Final[frozenset[str]] = frozenset(
+    {
+        "fbclid",
+        "gclid",
+        "dclid",
+        "gbraid",
+        "wbraid",
+        "msclkid",
+        "yclid",
+        "mc_cid",
+        "mc_eid",
+        "igshid",
+        "_ga",
+        "_gl",
+    }
+)
+TRACKING_PREFIXES: Final[tuple[str, ...]] = ("utm_",)
+DEFAULT_PORTS: Final[dict[str, int]] = {"http": 80, "https": 443}
+
+Rewrite = Callable[[str, list[str]], tuple[str, list[str]]]
+
+
+@dataclass(frozen=True, slots=True)
+class PlatformRule:
+    """Canonicalization rule for one platform.
+
+    Attributes:
+        host: The canonical host every alias is folded into.
+        aliases: Other hosts serving the same content.
+        keep_params: If set, only these query parameters are kept.
+        drop_params: Platform-specific tracking parameters to remove.
+        rewrite: Optional path/query rewrite applied before filtering.
+    """
+
+    host: str
+    aliases: tuple[str, ...] = ()
+    keep_params: frozenset[str] | None = None
+    drop_params: frozenset[str] = field(default_factory=frozenset)
+    rewrite: Rewrite | None = None
+
+
+def _youtu_be(path: str, params: list[str]) -> tuple[str, list[str]]:
+    """Rewrite ``youtu.be/<id>`` to ``/watch?v=<id>``."""
+    video_id = path.strip("/").split("/", 1)[0]
+    if not video_id:
+        return path, params
+    return "/watch", [f"v={video_id}", *params]
+
+
+PLATFORM_RULES: Final[tuple[PlatformRule, ...]] = (
+    PlatformRule(
+        "www.youtube.com",
+        aliases=("youtube.com", "m.youtube.com"),
+        keep_params=frozenset({"v", "t", "list", "index", "start"}),
+    ),
+    PlatformRule(
+        "www.youtube.com",
+        aliases=("youtu.be", "www.youtu.be"),
+        keep_params=frozenset({"v", "t", "list", "index", "start"}),
+        rewrite=_youtu_be,
+    ),
+    PlatformRule(
+        "x.com",
+        aliases=(
+            "www.x.com",
+            "mobile.x.com",
+            "twitter.com",
+            "www.twitter.com",
+            "mobile.twitter.com",
+        ),
+        keep_params=frozenset(),
+    ),
+    PlatformRule(
+        "www.reddit.com",
+        aliases=("reddit.com", "m.reddit.com", "np.reddit.com", "old.reddit.com"),
+        drop_params=frozenset({"share_id", "rdt", "ref", "ref_source"}),
+    ),
+    PlatformRule(
+        "www.instagram.com",
+        aliases=("instagram.com", "m.instagram.com"),
+        drop_params=frozenset({"igsh", "img_index"}),
+    ),
+    PlatformRule(
+        "www.tiktok.com",
+        aliases=("tiktok.com", "m.tiktok.com"),
+        drop_params=frozenset({"is_from_webapp", "sender_device", "_r", "_t"}),
+    ),
+    PlatformRule(
+        "www.twitch.tv",
+        aliases=("twitch.tv", "m.twitch.tv"),
+        drop_params=frozenset({"sr"}),
+    ),
+    PlatformRule("github.com", aliases=("www.github.com",)),
+    PlatformRule("open.spotify.com", drop_params=frozenset({"si", "context"})),
+)
+
+
+def _build_host_index(rules: Iterable[PlatformRule]) -> dict[str, PlatformRule]:
+    """Map every canonical host and alias to its rule."""
+    index: dict[str, PlatformRule] = {}
+    for rule in rules:
+        for host in (rule.host, *rule.aliases):
+            index.setdefault(host, rule)
+    return index
+
+
+RULES_BY_HOST: Final[dict[str, PlatformRule]] = _build_host_index(PLATFORM_RULES)
+
+
+def _keep_param(name: str, rule: PlatformRule | None) -> bool:
+    """Return whether a query parameter survives canonicalization."""
+    if name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES):
+        return False
+    if rule is None:
+        return True
+    if rule.keep_params is not None:
+        return name in rule.keep_params
+    return name not in rule.drop_params
+
+
+def canonicalize_url(url: str) -> str:
+    """Return the canonical form of a URL.
+
+    Lowercases the scheme and host, drops default ports and tracking
+    parameters, and for known platforms folds host aliases, forces https,
+    applies path rewrites and strips trailing slashes. URLs that cannot be
+    parsed are returned unchanged.
+
+    Args:
+        url: The URL to canonicalize (``www.`` links without a scheme are accepted).
+
+    Returns:
+        The canonical URL.
+    """
+    if url[:4].lower() == "www.":
+        url = "https://" + url
+    try:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = parts.hostname
+        port = parts.port
+    except ValueError:
+        return url
+    if scheme not in DEFAULT_PORTS or not host or parts.username is not None:
+        return url
+
+    rule = RULES_BY_HOST.get(host)
+    path = parts.path or "/"
+    params = [p for p in parts.query.split("&") if p] if parts.query else []
+
+    if rule is not None:
+        scheme = "https"
+        host = rule.host
+        port = None
+        if rule.rewrite is not None:
+            path, params = rule.rewrite(path, params)
+        if len(path) > 1:
+            path = path.rstrip("/") or "/"
+
+    if params:
+        params = [p for p in params if _keep_param(p.partition("=")[0], rule)]
+
+    if ":" in host:
+        host = f"[{host}]"  # urlsplit strips the brackets of IPv6 literals
+    netloc = host if port is None or port == DEFAULT_PORTS[scheme] else f"{host}:{port}"
+    return urlunsplit((scheme, netloc, path, "&".join(params), parts.fragment))
+
+
+def canonicalize_urls(urls: Iterable[str]) -> list[str]:
+    """Canonicalize URLs and drop duplicates, keeping first-seen order."""
+    return list(dict.fromkeys(canonicalize_url(url) for url in urls))
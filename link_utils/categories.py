@@ -1,13 +1,14 @@
 """URL category patterns and helpers for link detection."""
 
 import logging
-from re import Pattern
 import re
-from typing import Final, Dict, List
+from collections.abc import Iterable, Mapping
+from re import Pattern
+from typing import Any, Final
 
 logger = logging.getLogger(__name__)
 
-link_categories: Dict[str, List[str]] = {
+link_categories: dict[str, list[str]] = {
     "youtube": [
         r"(?:https?://)?(?:www\.)?(?:youtube\.com|youtu\.be)/",
         r"(?:https?://)?(?:www\.)?youtube\.com/watch",
@@ -49,20 +50,172 @@ LINK_TYPE_TWITCH: Final[str] = "twitch"
 LINK_TYPE_DISCORD: Final[str] = "discord"
 LINK_TYPE_OTHER: Final[str] = "other"
 
+# Bit assigned to each category in stored ACL masks. Bits are persisted in
+# DynamoDB, so new categories must be appended and existing bits never reused.
+CATEGORY_BITS: Final[dict[str, int]] = {
+    LINK_TYPE_YOUTUBE: 1 << 0,
+    LINK_TYPE_TWITCH: 1 << 1,
+    LINK_TYPE_TWITTER: 1 << 2,
+    LINK_TYPE_INSTAGRAM: 1 << 3,
+    LINK_TYPE_TIKTOK: 1 << 4,
+    LINK_TYPE_REDDIT: 1 << 5,
+    LINK_TYPE_GITHUB: 1 << 6,
+    LINK_TYPE_DISCORD: 1 << 7,
+    LINK_TYPE_OTHER: 1 << 8,
+}
+
+ALL_CATEGORIES_MASK: Final[int] = sum(CATEGORY_BITS.values())
+
+
+def category_mask(categories: Iterable[str]) -> int:
+    """Combine categories into a single ACL bitmask.
 
-def _compile_patterns() -> dict[str, list[Pattern[str]]]:
-    """Compile regex patterns for each link category in link_categories.
+    Args:
+        categories: Category names; unknown names are ignored.
 
     Returns:
-        A dictionary mapping category names to lists of compiled regex patterns.
+        The bitmask with the bit of every known category set.
     """
-    return {
-        category: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
-        for category, patterns in link_categories.items()
-    }
+    mask = 0
+    for category in categories:
+        mask |= CATEGORY_BITS.get(category, 0)
+    return mask
+
+
+def acl_mask(acls: Mapping[str, Any]) -> int:
+    """Pack per-category flags into an ACL bitmask.
+
+    Also used to read legacy items that store one boolean attribute per
+    category.
+
+    Args:
+        acls: Mapping of category name to a truthy/falsy flag.
+
+    Returns:
+        The packed bitmask.
+    """
+    mask = 0
+    for category, bit in CATEGORY_BITS.items():
+        if acls.get(category):
+            mask |= bit
+    return mask
+
+
+def acl_flags(mask: int) -> dict[str, bool]:
+    """Unpack an ACL bitmask into per-category flags.
+
+    Args:
+        mask: The packed bitmask.
+
+    Returns:
+        Dictionary of category name to enabled flag.
+    """
+    return {category: bool(mask & bit) for category, bit in CATEGORY_BITS.items()}
+
 
+class CategoryMatcher:
+    """Compiled category rules.
 
-COMPILED_PATTERNS: Final[dict[str, list[Pattern[str]]]] = _compile_patterns()
+    A matcher is never modified after construction, so the active one can be
+    replaced with a single assignment while forwards are in flight; each
+    ``categorize_link`` call sees either the old rules or the new ones.
+    """
+
+    __slots__ = ("patterns", "source")
+
+    def __init__(
+        self, rules: Mapping[str, Iterable[str]], source: str = "builtin"
+    ) -> None:
+        """Validate and compile category rules.
+
+        Args:
+            rules: Mapping of category name to regex patterns, in priority order.
+            source: Where the rules came from, for logging.
+
+        Raises:
+            ValueError: If a category is unknown, has no patterns, or a pattern
+                does not compile or matches the empty string.
+            TypeError: If a category's patterns are not a list.
+        """
+        patterns: dict[str, list[Pattern[str]]] = {}
+        for category, category_patterns in rules.items():
+            if category not in CATEGORY_BITS or category == LINK_TYPE_OTHER:
+                raise ValueError(f"Unknown link category: {category!r}")
+            if isinstance(category_patterns, str):
+                raise TypeError(f"Patterns for {category!r} must be a list")
+            compiled: list[Pattern[str]] = []
+            for pattern in category_patterns:
+                try:
+                    regex = re.compile(pattern, re.IGNORECASE)
+                except (re.error, TypeError) as e:
+                    raise ValueError(
+                        f"Bad pattern for {category!r}: {pattern!r}: {e}"
+                    ) from e
+                if regex.search(""):
+                    raise ValueError(
+                        f"Pattern for {category!r} matches everything: {pattern!r}"
+                    )
+                compiled.append(regex)
+            if not compiled:
+                raise ValueError(f"No patterns for {category!r}")
+            patterns[category] = compiled
+        self.patterns = patterns
+        self.source = source
+
+    def categorize(self, url: str) -> str:
+        """Return the first category with a pattern matching the URL."""
+        for category, regexes in self.patterns.items():
+            if any(regex.search(url) for regex in regexes):
+                return category
+        return LINK_TYPE_OTHER
+
+    def check_examples(self, examples: Mapping[str, str]) -> None:
+        """Verify the rules categorize example URLs as expected.
+
+        Args:
+            examples: Mapping of URL to expected category.
+
+        Raises:
+            ValueError: If any example is categorized differently.
+        """
+        for url, expected in examples.items():
+            actual = self.categorize(url)
+            if actual != expected:
+                raise ValueError(
+                    f"{url} categorized as {actual!r}, expected {expected!r}"
+                )
+
+
+_matcher: CategoryMatcher = CategoryMatcher(link_categories)
+
+
+def get_matcher() -> CategoryMatcher:
+    """Return the active category matcher."""
+    return _matcher
+
+
+def compiled_patterns() -> dict[str, list[Pattern[str]]]:
+    """Return the compiled patterns of the active matcher, by category."""
+    return _matcher.patterns
+
+
+def set_matcher(matcher: CategoryMatcher) -> CategoryMatcher:
+    """Replace the active category matcher.
+
+    Args:
+        matcher: The new, already compiled matcher.
+
+    Returns:
+        The previously active matcher.
+    """
+    global _matcher
+    previous, _matcher = _matcher, matcher
+    logger.info(
+        "Category rules from %s active (%d categories)",
+        matcher.source,
+        len(matcher.patterns),
+    )
+    return previous
 
 
 def categorize_link(url: str) -> str:
@@ -74,9 +227,6 @@ def categorize_link(url: str) -> str:
     Returns:
         The link type category (e.g., 'youtube', 'other').
     """
-    for category, regexes in COMPILED_PATTERNS.items():
-        if any(regex.search(url) for regex in regexes):
-            logger.debug("Categorized URL as %s: %s", category, url)
-            return category
-    logger.debug("Categorized URL as %s: %s", LINK_TYPE_OTHER, url)
-    return LINK_TYPE_OTHER
+    category = _matcher.categorize(url)
+    logger.debug("Categorized URL as %s: %s", category, url)
+    return category
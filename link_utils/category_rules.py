@@ -0,0 +1,150 @@
+"""Load link category rules from a JSON or TOML file and hot-reload them.
+
+File format (TOML shown; JSON uses the same structure)::
+
+    [categories]
+    youtube = ['(?:https?://)?(?:www\\.)?(?:youtube\\.com|youtu\\.be)/']
+    github = ['(?:https?://)?(?:www\\.)?github\\.com/']
+
+    [examples]
+    "https://youtu.be/abc" = "youtube"
+
+Categories are checked in file order. ``examples`` are optional; a file
+whose rules do not categorize every example as listed is rejected.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import tomllib
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from link_utils.categories import CategoryMatcher, get_matcher, set_matcher
+
+logger = logging.getLogger(__name__)
+
+
+def parse_rules(data: Mapping[str, Any], source: str) -> CategoryMatcher:
+    """Build and validate a matcher from decoded rules data.
+
+    Args:
+        data: The decoded file contents.
+        source: Where the data came from, for logging.
+
+    Returns:
+        The compiled matcher.
+
+    Raises:
+        ValueError: If the data is malformed or fails validation.
+        TypeError: If 'examples' or a category's patterns have the wrong type.
+    """
+    categories = data.get("categories")
+    if not isinstance(categories, dict) or not categories:
+        raise ValueError("Rules must contain a non-empty 'categories' table")
+    examples = data.get("examples", {})
+    if not isinstance(examples, dict):
+        raise TypeError("'examples' must map URLs to categories")
+    matcher = CategoryMatcher(categories, source=source)
+    matcher.check_examples(examples)
+    return matcher
+
+
+def load_rules_file(path: str | os.PathLike[str]) -> CategoryMatcher:
+    """Read, compile and validate a rules file.
+
+    Args:
+        path: A ``.json`` or ``.toml`` file.
+
+    Returns:
+        The compiled matcher.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file cannot be parsed or fails validation.
+        TypeError: If the file does not hold an object or has mistyped fields.
+    """
+    path = Path(path)
+    raw = path.read_bytes()
+    if path.suffix.lower() == ".toml":
+        data = tomllib.loads(raw.decode("utf-8"))
+    else:
+        data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise TypeError("Rules file must contain an object")
+    return parse_rules(data, source=str(path))
+
+
+class CategoryRulesReloader:
+    """Watch a rules file and swap in a new matcher when it changes.
+
+    New rules are compiled in a worker thread; the active matcher is only
+    replaced once the new one has compiled and passed validation, so a bad
+    edit leaves the previous rules in place.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Initialize the reloader.
+
+        Args:
+            path: The rules file to watch.
+        """
+        self.path = Path(path)
+        self.last_error: str | None = None
+        self.loaded_at: float | None = None
+        self._previous: CategoryMatcher | None = None
+        self._stamp: tuple[int, int] | None = None
+        self._lock = asyncio.Lock()
+
+    def _file_stamp(self) -> tuple[int, int] | None:
+        """Return the file's modification time and size, or None if missing."""
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    async def reload(self, force: bool = False) -> bool:
+        """Load the rules file if it changed since the last attempt.
+
+        Args:
+            force: Reload even if the file looks unchanged.
+
+        Returns:
+            True if new rules were swapped in.
+        """
+        async with self._lock:
+            stamp = self._file_stamp()
+            if not force and stamp == self._stamp:
+                return False
+            self._stamp = stamp
+            try:
+                matcher = await asyncio.to_thread(load_rules_file, self.path)
+            except (OSError, ValueError, TypeError) as e:
+                self.last_error = str(e)
+                logger.error(
+                    "Rejected category rules from %s, keeping %s: %s",
+                    self.path,
+                    get_matcher().source,
+                    e,
+                )
+                return False
+            self.last_error = None
+            self.loaded_at = time.time()
+            self._previous = set_matcher(matcher)
+            return True
+
+    def rollback(self) -> bool:
+        """Restore the rules that were active before the last reload.
+
+        Returns:
+            True if there was a previous matcher to restore.
+        """
+        if self._previous is None:
+            return False
+        set_matcher(self._previous)
+        self._previous = None
+        return True
@@ -0,0 +1,173 @@
+"""Streaming export helpers for forwarded links.
+
+Writes link records into gzip-compressed CSV or JSONL parts that are rolled
+over before they reach a size limit, so an export of any length only ever
+holds one part (spooled to disk past a small threshold) at a time.
+"""
+
+import contextlib
+import csv
+import gzip
+import io
+import json
+import logging
+import tempfile
+from dataclasses import dataclass
+from typing import IO, Any, Final, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS: Final[tuple[str, ...]] = ("csv", "jsonl")
+CSV_HEADER: Final[tuple[str, ...]] = (
+    "timestamp",
+    "message_id",
+    "author",
+    "category",
+    "url",
+)
+
+# Compressed bytes zlib may still be holding when a part is closed.
+FLUSH_HEADROOM: Final[int] = 256 * 1024
+# Parts are kept in memory up to this size, then spooled to a temp file.
+SPOOL_MAX_MEMORY: Final[int] = 1024 * 1024
+
+
+class ExportRecord(NamedTuple):
+    """A single forwarded link."""
+
+    timestamp: str
+    message_id: int
+    author: str
+    category: str
+    url: str
+
+
+@dataclass
+class ExportPart:
+    """A finished, compressed export part ready to be uploaded."""
+
+    filename: str
+    fileobj: IO[bytes]
+    record_count: int
+    size: int
+
+    def close(self) -> None:
+        """Release the underlying buffer."""
+        self.fileobj.close()
+
+
+class ChunkedExportWriter:
+    """Stream export records into size-limited gzip parts.
+
+    ``write`` returns a finished part whenever the current one would exceed
+    ``max_bytes``; the caller uploads and closes it before continuing.
+    """
+
+    def __init__(self, fmt: str, max_bytes: int, basename: str) -> None:
+        """Initialize the writer.
+
+        Args:
+            fmt: Output format, one of ``EXPORT_FORMATS``.
+            max_bytes: Maximum compressed size of a single part.
+            basename: Filename prefix for generated parts.
+
+        Raises:
+            ValueError: If the format is unknown or the limit is too small.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        if max_bytes <= FLUSH_HEADROOM:
+            raise ValueError(f"max_bytes must be larger than {FLUSH_HEADROOM}")
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.basename = basename
+        self.total_records = 0
+        self.parts_written = 0
+        self._raw: IO[bytes] | None = None
+        self._gzip: gzip.GzipFile | None = None
+        self._text: io.TextIOWrapper | None = None
+        self._csv: Any = None
+        self._count = 0
+
+    def _open_part(self) -> None:
+        """Start a new part; the spool is closed again if setting it up fails."""
+        with contextlib.ExitStack() as stack:
+            raw = stack.enter_context(
+                tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+            )
+            self._gzip = gzip.GzipFile(fileobj=raw, mode="wb")
+            self._text = io.TextIOWrapper(self._gzip, encoding="utf-8", newline="")
+            # The part owns the spool from here until it is uploaded.
+            stack.pop_all()
+        self._raw = raw
+        self._count = 0
+        if self.fmt == "csv":
+            self._csv = csv.writer(self._text)
+            self._csv.writerow(CSV_HEADER)
+
+    def _close_part(self) -> ExportPart | None:
+        """Finish the current part and return it, or None if nothing is open."""
+        if self._raw is None or self._text is None:
+            return None
+        self._text.flush()
+        self._text.detach()
+        assert self._gzip is not None
+        self._gzip.close()
+        raw = self._raw
+        size = raw.tell()
+        raw.seek(0)
+        self.parts_written += 1
+        part = ExportPart(
+            filename=f"{self.basename}-part{self.parts_written:03d}.{self.fmt}.gz",
+            fileobj=raw,
+            record_count=self._count,
+            size=size,
+        )
+        self._raw = self._gzip = self._text = self._csv = None
+        logger.debug(
+            "Closed export part %s (%d records, %d bytes)",
+            part.filename,
+            part.record_count,
+            part.size,
+        )
+        return part
+
+    def write(self, record: ExportRecord) -> ExportPart | None:
+        """Append a record, rolling over to a new part if needed.
+
+        Args:
+            record: The record to write.
+
+        Returns:
+            The finished previous part if a rollover happened, otherwise None.
+        """
+        finished: ExportPart | None = None
+        if (
+            self._raw is not None
+            and self._raw.tell() >= self.max_bytes - FLUSH_HEADROOM
+        ):
+            finished = self._close_part()
+        if self._raw is None:
+            self._open_part()
+
+        assert self._text is not None
+        if self._csv is not None:
+            self._csv.writerow(record)
+        else:
+            self._text.write(json.dumps(record._asdict(), ensure_ascii=False))
+            self._text.write("\n")
+        self._count += 1
+        self.total_records += 1
+        return finished
+
+    def close(self) -> ExportPart | None:
+        """Finish the export.
+
+        Returns:
+            The last part, or None if no records were written to it.
+        """
+        if self._count == 0 and self._raw is not None:
+            self._raw.close()
+            self._raw = self._gzip = self._text = self._csv = None
+            return None
+        return self._close_part()
@@ -0,0 +1,91 @@
+"""Extract links from every relevant part of a Discord message.
+
+Each guild chooses which parts count as link sources. The message body is
+scanned the same way as before; embeds, attachments and forwarded message
+snapshots are only walked when the message has any, so a message without
+links costs a single regex search, as it did when only the body was read.
+"""
+
+import enum
+from typing import Final
+
+import discord
+
+from link_utils.url_tools import url_pattern
+
+
+class LinkSource(enum.IntFlag):
+    """Parts of a message that links are taken from."""
+
+    CONTENT = 1
+    EMBEDS = 2
+    ATTACHMENTS = 4
+    SNAPSHOTS = 8
+
+
+DEFAULT_LINK_SOURCES: Final[LinkSource] = LinkSource.CONTENT | LinkSource.SNAPSHOTS
+ALL_LINK_SOURCES: Final[LinkSource] = LinkSource(sum(LinkSource))
+
+
+def _scan(links: dict[str, LinkSource], text: str | None, source: LinkSource) -> None:
+    """Add the URLs in ``text`` that were not seen in an earlier field."""
+    if text:
+        for url in url_pattern.findall(text):
+            links.setdefault(url, source)
+
+
+def has_link_candidates(
+    message: discord.Message, sources: LinkSource = ALL_LINK_SOURCES
+) -> bool:
+    """Return whether a part of the message that counts could contain a link.
+
+    Cheap enough to run on every message before per-guild settings are
+    looked up, with the default of every source.
+
+    Args:
+        message: The message to check.
+        sources: The parts of the message that count.
+    """
+    return bool(
+        (LinkSource.ATTACHMENTS in sources and message.attachments)
+        or (LinkSource.SNAPSHOTS in sources and message.message_snapshots)
+        or (LinkSource.EMBEDS in sources and message.embeds and message.author.bot)
+        or (LinkSource.CONTENT in sources and url_pattern.search(message.content))
+    )
+
+
+def extract_message_links(
+    message: discord.Message, sources: LinkSource = DEFAULT_LINK_SOURCES
+) -> dict[str, LinkSource]:
+    """Extract links from the selected parts of a message in one pass.
+
+    Embeds are read only from bot-authored messages: on a user's message
+    they are Discord's previews of links already in the body.
+
+    Args:
+        message: The message to read.
+        sources: The parts of the message that count.
+
+    Returns:
+        Each distinct URL mapped to the source it was first found in, in
+        order of appearance.
+    """
+    links: dict[str, LinkSource] = {}
+    if LinkSource.CONTENT in sources:
+        _scan(links, message.content, LinkSource.CONTENT)
+    if LinkSource.EMBEDS in sources and message.embeds and message.author.bot:
+        for embed in message.embeds:
+            if embed.url:
+                links.setdefault(embed.url, LinkSource.EMBEDS)
+            if embed.author.url:
+                links.setdefault(embed.author.url, LinkSource.EMBEDS)
+            _scan(links, embed.description, LinkSource.EMBEDS)
+            for field in embed.fields:
+                _scan(links, field.value, LinkSource.EMBEDS)
+    if LinkSource.ATTACHMENTS in sources:
+        for attachment in message.attachments:
+            links.setdefault(attachment.url, LinkSource.ATTACHMENTS)
+    if LinkSource.SNAPSHOTS in sources:
+        for snapshot in message.message_snapshots:
+            _scan(links, snapshot.content, LinkSource.SNAPSHOTS)
+    return links
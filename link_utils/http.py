@@ -0,0 +1,78 @@
+"""HTTP helpers for fetching user-supplied URLs safely."""
+
+import ipaddress
+import logging
+import socket
+from typing import Any
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp.abc import ResolveResult
+from aiohttp.resolver import ThreadedResolver
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (compatible; DiscordLinkBot/0.1)"
+
+
+def is_public_address(address: str) -> bool:
+    """Return whether an IP address is globally routable."""
+    try:
+        return ipaddress.ip_address(address).is_global
+    except ValueError:
+        return False
+
+
+def normalize_fetch_url(url: str, allow_private: bool = False) -> str | None:
+    """Return an absolute http(s) URL for a link, or None if it cannot be fetched.
+
+    Links extracted as ``www.example.com`` get an ``https://`` scheme, and
+    URLs pointing straight at a private IP literal are refused unless
+    ``allow_private`` is set (local test servers).
+    """
+    if url.lower().startswith("www."):
+        url = "https://" + url
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None
+    try:
+        ipaddress.ip_address(parts.hostname)
+    except ValueError:
+        return url
+    return url if allow_private or is_public_address(parts.hostname) else None
+
+
+class PublicResolver(ThreadedResolver):
+    """DNS resolver that refuses private, loopback and link-local addresses.
+
+    Used for every connection to a user-supplied URL so links cannot reach
+    the instance metadata endpoint or other internal services.
+    """
+
+    async def resolve(
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> list[ResolveResult]:
+        results = await super().resolve(host, port, family)
+        public = [r for r in results if is_public_address(r["host"])]
+        if not public:
+            raise OSError(f"{host} does not resolve to a public address")
+        return public
+
+
+def create_link_session(**kwargs: Any) -> aiohttp.ClientSession:
+    """Create a client session for fetching user-supplied links.
+
+    Args:
+        **kwargs: Extra arguments for ``aiohttp.ClientSession``.
+
+    Returns:
+        A session whose connector only connects to public addresses.
+    """
+    connector = aiohttp.TCPConnector(
+        resolver=PublicResolver(), limit=32, ttl_dns_cache=300
+    )
+    headers = {"User-Agent": USER_AGENT}
+    return aiohttp.ClientSession(connector=connector, headers=headers, **kwargs)
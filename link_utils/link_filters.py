@@ -0,0 +1,129 @@
+"""Per-output-channel allow and deny rules for domains and path prefixes.
+
+A rule is a domain, optionally followed by a path prefix: ``clips.twitch.tv``
+matches that host and its subdomains, ``github.com/our-org`` matches
+``github.com/our-org`` and everything below it but not ``/our-org2``. A
+link is rejected if any deny rule matches; if the channel has allow rules,
+it must also match one of them.
+
+Each channel's rules compile to one :class:`LinkFilter`: a trie over the
+reversed host labels whose nodes hold one combined path pattern, so
+checking a link costs a walk over its host labels and a regex match per
+matching domain, however many rules the channel has. Compiled filters are
+cached by rule set and replaced when the configuration changes.
+"""
+
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Final
+from urllib.parse import urlsplit
+
+MAX_RULES: Final[int] = 50
+MAX_RULE_LENGTH: Final[int] = 200
+
+_DOMAIN = re.compile(r"^(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)*[a-z0-9-]{1,63}$")
+
+
+def parse_rule(rule: str) -> str:
+    """Normalize a rule to ``domain`` or ``domain/path-prefix``.
+
+    Accepts a scheme, ``www.`` and a trailing slash, which are dropped.
+
+    Raises:
+        ValueError: If the rule has no valid domain or is too long.
+    """
+    text = rule.strip().lower()
+    if len(text) > MAX_RULE_LENGTH:
+        raise ValueError(f"Rules can be at most {MAX_RULE_LENGTH} characters")
+    text = re.sub(r"^[a-z][a-z0-9+.-]*://", "", text).removeprefix("www.")
+    domain, slash, path = text.partition("/")
+    domain = domain.split(":", 1)[0]
+    if not _DOMAIN.match(domain) or "." not in domain:
+        raise ValueError(f"`{rule}` does not start with a domain such as github.com")
+    path = path.split("?", 1)[0].split("#", 1)[0].rstrip("/")
+    return f"{domain}/{path}" if slash and path else domain
+
+
+def _host_and_path(url: str) -> tuple[str, str]:
+    """Return the lowercase host (without ``www.``) and path of a link."""
+    if "://" not in url[:12]:
+        url = "https://" + url
+    try:
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+    except ValueError:
+        return "", ""
+    return host.removeprefix("www."), parts.path.lower()
+
+
+def _path_pattern(prefixes: set[str]) -> re.Pattern[str] | None:
+    """Combine path prefixes into one anchored pattern; None matches any path."""
+    if "" in prefixes:
+        return None
+    alternatives = sorted((re.escape("/" + p) for p in prefixes), key=len, reverse=True)
+    return re.compile(f"(?:{'|'.join(alternatives)})(?:/|$)")
+
+
+class _Node:
+    __slots__ = ("allow", "children", "deny")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        # Compiled path patterns of rules ending at this domain: absent if
+        # there are none, None if one of them covers every path.
+        self.allow: re.Pattern[str] | None | bool = False
+        self.deny: re.Pattern[str] | None | bool = False
+
+
+def _matches(pattern: re.Pattern[str] | None | bool, path: str) -> bool:
+    if pattern is False:
+        return False
+    return pattern is None or bool(pattern.match(path))  # type: ignore[union-attr]
+
+
+class LinkFilter:
+    """Compiled allow and deny rules of one output channel."""
+
+    __slots__ = ("_root", "allow_rules", "deny_rules")
+
+    def __init__(self, allow: Iterable[str] = (), deny: Iterable[str] = ()) -> None:
+        """Compile normalized rules (see :func:`parse_rule`)."""
+        self.allow_rules = tuple(allow)
+        self.deny_rules = tuple(deny)
+        prefixes: dict[tuple[_Node, str], set[str]] = {}
+        self._root = _Node()
+        for kind, rules in (("allow", self.allow_rules), ("deny", self.deny_rules)):
+            for rule in rules:
+                domain, _, path = rule.partition("/")
+                node = self._root
+                for label in reversed(domain.split(".")):
+                    node = node.children.setdefault(label, _Node())
+                prefixes.setdefault((node, kind), set()).add(path)
+        for (node, kind), paths in prefixes.items():
+            setattr(node, kind, _path_pattern(paths))
+
+    def __bool__(self) -> bool:
+        return bool(self.allow_rules or self.deny_rules)
+
+    def allows(self, url: str) -> bool:
+        """Return whether a link passes the rules."""
+        host, path = _host_and_path(url)
+        allowed = not self.allow_rules
+        node = self._root
+        for label in reversed(host.split(".")):
+            child = node.children.get(label)
+            if child is None:
+                break
+            node = child
+            if _matches(node.deny, path):
+                return False
+            if not allowed and _matches(node.allow, path):
+                allowed = True
+        return allowed
+
+
+@lru_cache(maxsize=4096)
+def compile_link_filter(allow: tuple[str, ...], deny: tuple[str, ...]) -> LinkFilter:
+    """Return the compiled filter for a rule set, shared by equal rule sets."""
+    return LinkFilter(allow, deny)
@@ -0,0 +1,248 @@
+"""Cached page metadata (title, OpenGraph, canonical URL) for forwarded links."""
+
+import asyncio
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from html.parser import HTMLParser
+from typing import Final
+from urllib.parse import urljoin
+
+import aiohttp
+
+from link_utils.cache import SingleFlight, TTLCache
+from link_utils.http import normalize_fetch_url
+
+logger = logging.getLogger(__name__)
+
+MAX_REDIRECTS: Final[int] = 3
+READ_CHUNK: Final[int] = 16 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class LinkMetadata:
+    """Metadata extracted from a page's ``<head>``."""
+
+    url: str
+    canonical_url: str | None = None
+    title: str | None = None
+    description: str | None = None
+    site_name: str | None = None
+    image: str | None = None
+
+
+class _HeadParser(HTMLParser):
+    """Collect title, OpenGraph and canonical link tags until ``</head>``."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.meta: dict[str, str] = {}
+        self.title: str | None = None
+        self.canonical: str | None = None
+        self.done = False
+        self._in_title = False
+        self._title_parts: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self.done:
+            return
+        attributes = {k: v for k, v in attrs if v is not None}
+        if tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            key = attributes.get("property") or attributes.get("name")
+            content = attributes.get("content")
+            if key and content and key.lower() not in self.meta:
+                self.meta[key.lower()] = content.strip()
+        elif tag == "link" and "canonical" in attributes.get("rel", "").lower().split():
+            self.canonical = attributes.get("href")
+        elif tag == "body":
+            self.done = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title" and self._in_title:
+            self._in_title = False
+            self.title = "".join(self._title_parts).strip() or None
+        elif tag == "head":
+            self.done = True
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self._title_parts.append(data)
+
+
+def parse_metadata(url: str, html: str) -> LinkMetadata:
+    """Extract metadata from an HTML document.
+
+    OpenGraph values win over plain ``<title>``/``description``; the
+    canonical URL is taken from ``og:url`` or ``<link rel=canonical>``.
+
+    Args:
+        url: The URL the document was fetched from (for relative links).
+        html: The (possibly truncated) HTML document.
+
+    Returns:
+        The extracted metadata.
+    """
+    parser = _HeadParser()
+    parser.feed(html)
+    meta = parser.meta
+    canonical = meta.get("og:url") or parser.canonical
+    image = meta.get("og:image")
+    return LinkMetadata(
+        url=url,
+        canonical_url=urljoin(url, canonical) if canonical else None,
+        title=meta.get("og:title") or parser.title,
+        description=meta.get("og:description") or meta.get("description"),
+        site_name=meta.get("og:site_name"),
+        image=urljoin(url, image) if image else None,
+    )
+
+
+class MetadataResolver:
+    """Resolve link metadata with caching, deduplication and hard limits.
+
+    Concurrent requests for the same URL share one fetch, results (including
+    failures, for a shorter time) are kept in a TTL+LRU cache, and only the
+    first ``max_bytes`` of an HTML response are ever read.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        *,
+        concurrency: int = 8,
+        timeout: float = 5.0,
+        max_bytes: int = 256 * 1024,
+        cache_size: int = 4096,
+        ttl: float = 3600.0,
+        negative_ttl: float = 300.0,
+        allow_private: bool = False,
+    ) -> None:
+        """Initialize the resolver.
+
+        Args:
+            session: Shared HTTP session (see ``link_utils.http.create_link_session``).
+            concurrency: Maximum fetches in flight.
+            timeout: Total seconds allowed per fetch, including redirects.
+            max_bytes: Maximum response bytes read per page.
+            cache_size: Maximum cached URLs.
+            ttl: Seconds successful lookups are cached.
+            negative_ttl: Seconds failed lookups are cached.
+            allow_private: Allow private IP literals (for local test servers).
+        """
+        self._session = session
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._max_bytes = max_bytes
+        self._negative_ttl = negative_ttl
+        self._allow_private = allow_private
+        self.cache: TTLCache[str, LinkMetadata | None] = TTLCache(cache_size, ttl)
+        self._flights: SingleFlight[str, LinkMetadata | None] = SingleFlight()
+
+    async def resolve(self, url: str) -> LinkMetadata | None:
+        """Return metadata for a URL, or None if it could not be fetched."""
+        found, cached = self.cache.lookup(url)
+        if found:
+            return cached
+        return await self._flights.do(url, lambda: self._fetch_and_cache(url))
+
+    async def resolve_many(
+        self, urls: Iterable[str], budget: float
+    ) -> dict[str, LinkMetadata]:
+        """Resolve several URLs, giving up on whatever is not ready in time.
+
+        Cache hits are returned without waiting. Fetches that miss the budget
+        keep running in the background so the next forward finds them cached.
+
+        Args:
+            urls: The URLs to resolve.
+            budget: Maximum seconds to wait.
+
+        Returns:
+            Metadata for the URLs that resolved within the budget.
+        """
+        results: dict[str, LinkMetadata] = {}
+        pending: dict[asyncio.Future[LinkMetadata | None], str] = {}
+        for url in dict.fromkeys(urls):
+            found, cached = self.cache.lookup(url)
+            if found:
+                if cached is not None:
+                    results[url] = cached
+            else:
+                future = asyncio.ensure_future(
+                    self._flights.do(url, lambda u=url: self._fetch_and_cache(u))
+                )
+                pending[future] = url
+
+        if pending:
+            done, _ = await asyncio.wait(pending, timeout=budget)
+            for future in done:
+                metadata = future.result()
+                if metadata is not None:
+                    results[pending[future]] = metadata
+            if len(done) < len(pending):
+                logger.debug(
+                    "Metadata for %d links missed the %.2fs budget",
+                    len(pending) - len(done),
+                    budget,
+                )
+        return results
+
+    async def _fetch_and_cache(self, url: str) -> LinkMetadata | None:
+        """Fetch a URL and cache the outcome."""
+        try:
+            metadata = await self._fetch(url)
+        except (TimeoutError, aiohttp.ClientError, OSError, ValueError) as e:
+            logger.debug("Metadata fetch failed for %s: %s", url, e)
+            metadata = None
+        self.cache.set(url, metadata, None if metadata else self._negative_ttl)
+        return metadata
+
+    async def _fetch(self, url: str) -> LinkMetadata | None:
+        """Fetch and parse a page, following a bounded number of redirects."""
+        target = normalize_fetch_url(url, self._allow_private)
+        async with self._semaphore, asyncio.timeout(self._timeout.total):
+            for _ in range(MAX_REDIRECTS + 1):
+                if target is None:
+                    return None
+                async with self._session.get(
+                    target, allow_redirects=False, timeout=self._timeout
+                ) as response:
+                    if response.status in (301, 302, 303, 307, 308):
+                        location = response.headers.get("Location")
+                        target = (
+                            normalize_fetch_url(
+                                urljoin(target, location), self._allow_private
+                            )
+                            if location
+                            else None
+                        )
+                        continue
+                    if response.status != 200:
+                        return None
+                    if "html" not in response.headers.get("Content-Type", ""):
+                        return LinkMetadata(url=url, canonical_url=target)
+                    html = await self._read_capped(response)
+                    metadata = parse_metadata(target, html)
+                    return replace(
+                        metadata,
+                        url=url,
+                        canonical_url=metadata.canonical_url or target,
+                    )
+        return None
+
+    async def _read_capped(self, response: aiohttp.ClientResponse) -> str:
+        """Read at most ``max_bytes`` of a response body, stopping after ``</head>``."""
+        chunks: list[bytes] = []
+        size = 0
+        async for chunk in response.content.iter_chunked(READ_CHUNK):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self._max_bytes or b"</head>" in chunk.lower():
+                break
+        body = b"".join(chunks)[: self._max_bytes]
+        try:
+            return body.decode(response.charset or "utf-8", "replace")
+        except LookupError:
+            return body.decode("utf-8", "replace")
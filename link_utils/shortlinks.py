@@ -0,0 +1,191 @@
+"""Short-link expansion so shortened URLs are categorized by their destination."""
+
+import asyncio
+import logging
+from collections.abc import Iterable
+from typing import Final
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+
+from link_utils.cache import SingleFlight, TTLCache
+from link_utils.http import normalize_fetch_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHORTENER_DOMAINS: Final[frozenset[str]] = frozenset(
+    {
+        "bit.ly",
+        "buff.ly",
+        "cutt.ly",
+        "goo.gl",
+        "is.gd",
+        "lnkd.in",
+        "ow.ly",
+        "rebrand.ly",
+        "shorturl.at",
+        "t.co",
+        "t.ly",
+        "tiny.cc",
+        "tinyurl.com",
+    }
+)
+REDIRECT_STATUSES: Final[frozenset[int]] = frozenset({301, 302, 303, 307, 308})
+
+
+def parse_domains(value: str) -> frozenset[str]:
+    """Parse a comma-separated list of domains into a lowercase set."""
+    return frozenset(d.strip().lower() for d in value.split(",") if d.strip())
+
+
+class ShortLinkResolver:
+    """Expand short links by following redirects with HEAD requests.
+
+    Concurrent expansions of the same link share one request chain, results
+    are cached by short URL (failures for a shorter time), and only the
+    response headers are ever read.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        *,
+        domains: Iterable[str] = DEFAULT_SHORTENER_DOMAINS,
+        concurrency: int = 8,
+        timeout: float = 3.0,
+        max_hops: int = 5,
+        cache_size: int = 4096,
+        ttl: float = 86400.0,
+        negative_ttl: float = 600.0,
+        allow_private: bool = False,
+    ) -> None:
+        """Initialize the resolver.
+
+        Args:
+            session: Shared HTTP session (see ``link_utils.http.create_link_session``).
+            domains: Hosts treated as link shorteners.
+            concurrency: Maximum expansions in flight.
+            timeout: Total seconds allowed per expansion, across all hops.
+            max_hops: Maximum redirects followed per link.
+            cache_size: Maximum cached short links.
+            ttl: Seconds successful expansions are cached.
+            negative_ttl: Seconds failed expansions are cached.
+            allow_private: Allow private IP literals (for local test servers).
+        """
+        self._session = session
+        self.domains = frozenset(d.lower() for d in domains)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._timeout = timeout
+        self._max_hops = max_hops
+        self._negative_ttl = negative_ttl
+        self._allow_private = allow_private
+        self.cache: TTLCache[str, str | None] = TTLCache(cache_size, ttl)
+        self._flights: SingleFlight[str, str | None] = SingleFlight()
+
+    def is_short(self, url: str) -> bool:
+        """Return whether a URL points at a configured shortener."""
+        try:
+            host = urlsplit(url if "://" in url else "https://" + url).hostname
+        except ValueError:
+            return False
+        if not host:
+            return False
+        return host in self.domains or host.removeprefix("www.") in self.domains
+
+    async def expand(self, url: str) -> str | None:
+        """Return the final destination of a short link, or None on failure."""
+        found, cached = self.cache.lookup(url)
+        if found:
+            return cached
+        return await self._flights.do(url, lambda: self._expand_and_cache(url))
+
+    async def expand_many(self, urls: Iterable[str], budget: float) -> dict[str, str]:
+        """Expand the short links among ``urls`` within a latency budget.
+
+        Links that are not expanded in time keep resolving in the background
+        so the next message with the same link hits the cache.
+
+        Args:
+            urls: URLs to check; links not on a shortener domain are skipped.
+            budget: Maximum seconds to wait.
+
+        Returns:
+            A mapping of short URL to destination for the links expanded in time.
+        """
+        results: dict[str, str] = {}
+        pending: dict[asyncio.Future[str | None], str] = {}
+        for url in dict.fromkeys(urls):
+            if not self.is_short(url):
+                continue
+            found, cached = self.cache.lookup(url)
+            if found:
+                if cached is not None:
+                    results[url] = cached
+            else:
+                future = asyncio.ensure_future(
+                    self._flights.do(url, lambda u=url: self._expand_and_cache(u))
+                )
+                pending[future] = url
+
+        if pending:
+            done, _ = await asyncio.wait(pending, timeout=budget)
+            for future in done:
+                final = future.result()
+                if final is not None:
+                    results[pending[future]] = final
+            if len(done) < len(pending):
+                logger.debug(
+                    "%d short links missed the %.2fs budget, routing by short URL",
+                    len(pending) - len(done),
+                    budget,
+                )
+        return results
+
+    async def _expand_and_cache(self, url: str) -> str | None:
+        """Expand a link and cache the outcome."""
+        try:
+            final = await self._follow(url)
+        except (TimeoutError, aiohttp.ClientError, OSError, ValueError) as e:
+            logger.debug("Short link expansion failed for %s: %s", url, e)
+            final = None
+        self.cache.set(url, final, None if final else self._negative_ttl)
+        return final
+
+    async def _follow(self, url: str) -> str | None:
+        """Follow redirects from a short link up to the hop limit."""
+        start = normalize_fetch_url(url, self._allow_private)
+        if start is None:
+            return None
+        target = start
+        async with self._semaphore, asyncio.timeout(self._timeout):
+            for _ in range(self._max_hops):
+                location = await self._location(target)
+                if location is None:
+                    break
+                next_target = normalize_fetch_url(
+                    urljoin(target, location), self._allow_private
+                )
+                if next_target is None:
+                    break
+                target = next_target
+                if not self.is_short(target):
+                    break
+            else:
+                logger.debug("Short link %s exceeded %d redirects", url, self._max_hops)
+                return None
+        return None if target == start else target
+
+    async def _location(self, url: str) -> str | None:
+        """Return the redirect target of a URL, or None if it does not redirect.
+
+        Falls back to a GET (without reading the body) for shorteners that
+        reject HEAD requests.
+        """
+        async with self._session.head(url, allow_redirects=False) as response:
+            status = response.status
+            location = response.headers.get("Location")
+        if status in (403, 405, 501):
+            async with self._session.get(url, allow_redirects=False) as response:
+                status = response.status
+                location = response.headers.get("Location")
+        return location if status in REDIRECT_STATUSES else None
@@ -2,15 +2,67 @@
 Main entry point for the Discord link bot.
 
 Initializes logging, loads environment variables, sets up the bot and database, and starts the bot.
+
+The database layer (aioboto3, botocore, pydantic) is imported and connected
+in the background while the bot logs in to Discord, rather than before it.
 """
 
 import asyncio
-import os
 import logging
+import os
+import signal
+from typing import TYPE_CHECKING
+
 from dotenv import load_dotenv
+
 from core.bot_setup import DiscordBot
-from core.db.db_manager import Database
+from core.env import env_bool, env_float
 from core.logging_setup import setup_logging
+from core.profiling import install_slow_callback_detector
+from core.snapshot import write_snapshot
+from core.speedups import describe_runtime, event_loop_factory, fast_json_enabled
+from core.startup import STARTUP
+
+if TYPE_CHECKING:
+    from core.db.db_manager import Database
+
+
+def _create_database() -> "Database":
+    """Import the database layer and build the manager; runs in a worker thread."""
+    from core.db.db_manager import Database
+
+    return Database()
+
+
+async def open_database() -> "Database":
+    """Create and connect the database without blocking the event loop.
+
+    The imports take a few hundred milliseconds of mostly CPU time, so they
+    run in a thread that overlaps with the Discord login's network waits.
+    """
+    db = await asyncio.to_thread(_create_database)
+    await db.initialize()
+    STARTUP.mark("database")
+    logging.getLogger(__name__).info("Database initialized")
+    return db
+
+
+def install_shutdown_handler(bot: DiscordBot) -> None:
+    """Close the bot on SIGTERM so ``docker stop`` runs the normal shutdown.
+
+    Without a handler SIGTERM ends the process at once and the routing
+    snapshot is never written.
+    """
+
+    def on_sigterm() -> None:
+        logging.getLogger(__name__).info("Received SIGTERM, shutting down...")
+        bot.start_background_task(bot.close())
+
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, on_sigterm)
+    except NotImplementedError:
+        # Windows event loops do not support signal handlers.
+        pass
 
 
 async def main() -> None:
@@ -28,12 +80,16 @@ async def main() -> None:
     load_dotenv()
     logger.info("Environment variables loaded")
 
-    logger.info("Initializing bot...")
-    bot: DiscordBot = DiscordBot()
-    db: Database = Database()
-    bot.db = db
-    await db.initialize()
-    logger.info("Database initialized")
+    if env_bool("SPEED_MODE"):
+        fast_json_enabled()
+    logger.info("Runtime: %s", describe_runtime())
+
+    slow_callback_threshold = env_float("SLOW_CALLBACK_THRESHOLD", 0.25)
+    if slow_callback_threshold > 0:
+        if isinstance(asyncio.get_running_loop(), asyncio.BaseEventLoop):
+            install_slow_callback_detector(slow_callback_threshold)
+        else:
+            logger.info("Slow callback detector needs the stdlib event loop, skipping")
 
     token: str | None = os.getenv("DISCORD_TOKEN")
     if token is None:
@@ -41,14 +97,32 @@ async def main() -> None:
         return
     logger.info(f"Discord token found (length: {len(token)}), starting bot...")
 
+    logger.info("Initializing bot...")
+    STARTUP.mark("imports")
+    bot: DiscordBot = DiscordBot()
+    pending_db = asyncio.create_task(open_database())
+    bot.pending_db = pending_db
+    install_shutdown_handler(bot)
+
     try:
         async with bot:
             await bot.start(token=token)
     finally:
         logger.info("Bot shutting down, closing database connections...")
-        await db.close()
+        if bot.snapshot is not None:
+            try:
+                size = write_snapshot(bot.snapshot_path, bot.snapshot)
+                logger.info("Wrote routing snapshot (%d bytes)", size)
+            except OSError as e:
+                logger.warning("Could not write routing snapshot: %s", e)
+        if not pending_db.done():
+            pending_db.cancel()
+        elif not pending_db.cancelled() and pending_db.exception() is None:
+            await pending_db.result().close()
         logger.info("Shutdown complete")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Loaded here as well because the event loop is chosen before main() runs.
+    load_dotenv()
+    asyncio.run(main(), loop_factory=event_loop_factory(env_bool("SPEED_MODE")))
@@ -18,6 +18,10 @@ docker pull "$IMAGE_URI"
 
 echo "Starting container..."
 DISCORD_TOKEN=$(aws ssm get-parameter --name /$BOT_GROUP/$BOT_NAME/discord_token --with-decryption --query Parameter.Value --output text --region "$REGION" | tr -d '\n')
-docker run -d --name "$BOT_NAME" --restart unless-stopped -p 80:80 -e DISCORD_TOKEN="$DISCORD_TOKEN" -e DYNAMODB_TABLE_NAME="$BOT_NAME-table" "$IMAGE_URI"
+# State that must survive redeploys (routing snapshot, digest log) lives on this volume.
+DATA_DIR=${DATA_DIR:-/var/lib/$BOT_NAME}
+mkdir -p "$DATA_DIR"
+chmod 700 "$DATA_DIR"
+docker run -d --name "$BOT_NAME" --restart unless-stopped -p 80:80 -v "$DATA_DIR:/data" -e DISCORD_TOKEN="$DISCORD_TOKEN" -e DYNAMODB_TABLE_NAME="$BOT_NAME-table" "$IMAGE_URI"
 
 echo "Container started."
\ No newline at end of file
@@ -0,0 +1,22 @@
+#!/bin/bash
+set -e
+
+echo "Waiting for Discord bot to become ready..."
+
+BOT_NAME=${BOT_NAME:-discord-link-bot}
+HEALTH_PORT=${HEALTH_PORT:-8080}
+READY_TIMEOUT=${READY_TIMEOUT:-150}
+
+# The probe server listens on localhost inside the container.
+for ((waited = 0; waited < READY_TIMEOUT; waited += 5)); do
+  if docker exec "$BOT_NAME" python -c "import urllib.request; urllib.request.urlopen('http://127.0.0.1:$HEALTH_PORT/readyz', timeout=3)" 2>/dev/null; then
+    echo "Bot is ready."
+    exit 0
+  fi
+  sleep 5
+done
+
+echo "Bot did not become ready within ${READY_TIMEOUT}s"
+docker exec "$BOT_NAME" python -c "import urllib.request; print(urllib.request.urlopen('http://127.0.0.1:$HEALTH_PORT/healthz', timeout=3).read().decode())" || true
+docker logs --tail 50 "$BOT_NAME" || true
+exit 1
@@ -0,0 +1,228 @@
+"""Tests for the offline admin CLI."""
+
+import asyncio
+import io
+import json
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from typing import Any
+
+import aiohttp
+
+from core.db.admin import (
+    DiscordChecker,
+    Finding,
+    Throttle,
+    build_parser,
+    export_items,
+    find_inconsistencies,
+    import_items,
+    purge,
+)
+
+
+class FakeBatch:
+    """In-memory stand-in for a DynamoDB batch writer."""
+
+    def __init__(self, table: "FakeTable") -> None:
+        self.table = table
+
+    async def put_item(self, Item: dict[str, Any]) -> None:
+        self.table.items[(Item["pk"], Item["sk"])] = Item
+
+    async def delete_item(self, Key: dict[str, Any]) -> None:
+        self.table.items.pop((Key["pk"], Key["sk"]), None)
+
+
+class FakeTable:
+    """In-memory stand-in for a DynamoDB table resource."""
+
+    def __init__(self, items: list[dict[str, Any]], page_size: int = 2) -> None:
+        self.items = {(i["pk"], i["sk"]): i for i in items}
+        self.page_size = page_size
+        self.scans = 0
+
+    async def scan(self, **kwargs: Any) -> dict[str, Any]:
+        self.scans += 1
+        segment, total = kwargs["Segment"], kwargs["TotalSegments"]
+        keys = sorted(k for k in self.items if hash(k) % total == segment)
+        start = kwargs.get("ExclusiveStartKey", -1) + 1
+        page = keys[start : start + self.page_size]
+        response: dict[str, Any] = {"Items": [self.items[k] for k in page]}
+        if start + self.page_size < len(keys):
+            response["LastEvaluatedKey"] = start + self.page_size - 1
+        return response
+
+    @asynccontextmanager
+    async def batch_writer(self, **kwargs: Any) -> AsyncGenerator[FakeBatch]:
+        yield FakeBatch(self)
+
+    async def update_item(self, Key: dict[str, Any], UpdateExpression: str) -> None:
+        assert UpdateExpression == "REMOVE webhook_url"
+        self.items[(Key["pk"], Key["sk"])].pop("webhook_url", None)
+
+
+class FakeChecker:
+    """Discord checker with canned answers."""
+
+    can_check_channels = True
+
+    def __init__(self, missing: set[int], stale: set[str]) -> None:
+        self.missing = missing
+        self.stale = stale
+
+    async def channel_missing(self, channel_id: int) -> bool:
+        return channel_id in self.missing
+
+    async def webhook_stale(self, webhook_url: str) -> bool:
+        return webhook_url in self.stale
+
+
+def _channel(channel_id: int, webhook_url: str | None = None) -> dict[str, Any]:
+    item: dict[str, Any] = {
+        "pk": "GUILD#1",
+        "sk": f"CHANNEL#{channel_id}",
+        "guild_id": Decimal(1),
+        "channel_id": Decimal(channel_id),
+        "acl": Decimal(3),
+    }
+    if webhook_url:
+        item["webhook_url"] = webhook_url
+    return item
+
+
+def _table() -> FakeTable:
+    items = [_channel(i) for i in range(10)]
+    items.append({"pk": "GUILD#1", "sk": "SETTINGS", "guild_id": Decimal(1)})
+    items.append(_channel(20, "https://discord.com/api/webhooks/20/gone"))
+    return FakeTable(items)
+
+
+class TestExportImport:
+    """Test export and import round trips."""
+
+    def test_export_all_items(self) -> None:
+        """Test every item is exported once across segments and pages."""
+        table = _table()
+        out = io.StringIO()
+        count = asyncio.run(export_items(table, out, segments=3, throttle=Throttle(0)))
+        lines = out.getvalue().splitlines()
+        assert count == len(table.items) == len(lines)
+        assert {json.loads(line)["sk"] for line in lines} == {
+            sk for _, sk in table.items
+        }
+        assert table.scans > 3
+
+    def test_import_round_trip(self) -> None:
+        """Test exported items import into an empty table."""
+        source = _table()
+        out = io.StringIO()
+        asyncio.run(export_items(source, out, segments=2, throttle=Throttle(0)))
+        target = FakeTable([])
+        lines = out.getvalue().splitlines() + ["not json", '{"pk": "x"}']
+        count = asyncio.run(import_items(target, lines, False, Throttle(0)))
+        assert count == len(source.items)
+        assert target.items.keys() == source.items.keys()
+
+    def test_import_dry_run(self) -> None:
+        """Test dry runs write nothing."""
+        target = FakeTable([])
+        lines = [
+            json.dumps(
+                {"pk": "GUILD#1", "sk": "CHANNEL#5", "guild_id": 1, "channel_id": 5}
+            )
+        ]
+        assert asyncio.run(import_items(target, lines, True, Throttle(0))) == 1
+        assert not target.items
+
+
+class TestRepair:
+    """Test consistency checks and purging."""
+
+    def test_find_and_purge(self) -> None:
+        """Test orphaned channels are deleted and stale webhooks cleared."""
+        table = _table()
+        checker = FakeChecker(
+            missing={3, 4}, stale={"https://discord.com/api/webhooks/20/gone"}
+        )
+        findings = asyncio.run(
+            find_inconsistencies(table, checker, segments=2, throttle=Throttle(0))  # type: ignore[arg-type]
+        )
+        assert sorted(findings, key=lambda f: f.sk) == [
+            Finding("GUILD#1", "CHANNEL#20", "stale_webhook"),
+            Finding("GUILD#1", "CHANNEL#3", "orphaned_channel"),
+            Finding("GUILD#1", "CHANNEL#4", "orphaned_channel"),
+        ]
+
+        assert asyncio.run(purge(table, findings, True, Throttle(0))) == 3
+        assert ("GUILD#1", "CHANNEL#3") in table.items
+
+        assert asyncio.run(purge(table, findings, False, Throttle(0))) == 3
+        assert ("GUILD#1", "CHANNEL#3") not in table.items
+        assert "webhook_url" not in table.items[("GUILD#1", "CHANNEL#20")]
+
+
+class FlakyChecker(FakeChecker):
+    """Checker whose API call fails for one channel."""
+
+    async def channel_missing(self, channel_id: int) -> bool:
+        if channel_id == 5:
+            raise aiohttp.ClientConnectionError("connection reset")
+        return await super().channel_missing(channel_id)
+
+
+class FakeResponse:
+    """A 429 response from a proxy with an HTML body."""
+
+    def __init__(self, headers: dict[str, str]) -> None:
+        self.headers = headers
+        self.content_type = "text/html"
+
+    async def json(self) -> Any:
+        raise AssertionError("body is not JSON")
+
+
+class TestCheckErrors:
+    """Test API failures during checks."""
+
+    def test_failed_check_is_reported(self) -> None:
+        """Test one failing API call does not abort the scan."""
+        table = _table()
+        checker = FlakyChecker(missing={3}, stale=set())
+        findings = asyncio.run(
+            find_inconsistencies(table, checker, segments=2, throttle=Throttle(0))  # type: ignore[arg-type]
+        )
+        assert sorted(findings, key=lambda f: f.sk) == [
+            Finding("GUILD#1", "CHANNEL#3", "orphaned_channel"),
+            Finding("GUILD#1", "CHANNEL#5", "check_failed"),
+        ]
+        assert asyncio.run(purge(table, findings, False, Throttle(0))) == 1
+        assert ("GUILD#1", "CHANNEL#5") in table.items
+
+    def test_retry_after_without_json(self) -> None:
+        """Test a non-JSON 429 falls back to the header or a default."""
+        retry_after = DiscordChecker._retry_after
+        assert asyncio.run(retry_after(FakeResponse({"Retry-After": "2.5"}))) == 2.5  # type: ignore[arg-type]
+        assert asyncio.run(retry_after(FakeResponse({}))) == 1.0  # type: ignore[arg-type]
+
+
+class TestParser:
+    """Test command line parsing."""
+
+    def test_global_options(self) -> None:
+        """Test throttling and backend options are parsed."""
+        args = build_parser().parse_args(
+            ["--endpoint-url", "http://localhost:8000", "--rate", "5", "check"]
+        )
+        assert args.command == "check"
+        assert args.endpoint_url == "http://localhost:8000"
+        assert args.rate == 5.0
+
+    def test_dry_run_after_command(self) -> None:
+        """Test the documented ``purge --dry-run`` and ``import --dry-run``."""
+        parser = build_parser()
+        assert parser.parse_args(["purge", "--dry-run"]).dry_run is True
+        assert parser.parse_args(["purge"]).dry_run is False
+        args = parser.parse_args(["import", "configs.jsonl", "--dry-run"])
+        assert args.dry_run is True
@@ -0,0 +1,166 @@
+"""Tests for malicious-domain blocklist screening."""
+
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from benchmarks.replay import (
+    FakeAuthor,
+    FakeMessage,
+    FakeWebhook,
+    Replayer,
+    _text_channel,
+)
+from link_utils.blocklist import (
+    BlocklistPolicy,
+    BlocklistReloader,
+    DomainBlocklist,
+    load_blocklist_file,
+    parse_blocklist_line,
+)
+
+BLOCKLIST_FILE = """\
+# Phishing domains
+discord-nitro-gift.xyz
+0.0.0.0 steamcommunlty.com  # hosts-file format
+*.free-skins.ru
+0.0.0.0 localhost
+
+"""
+
+
+class TestDomainBlocklist:
+    """Test parsing, the hashed table and matching."""
+
+    @pytest.mark.parametrize(
+        ("line", "expected"),
+        [
+            ("Evil.Example.\n", "evil.example"),
+            ("127.0.0.1 evil.example", "evil.example"),
+            ("*.evil.example", "evil.example"),
+            ("# comment", None),
+            ("", None),
+            ("0.0.0.0 localhost", None),
+            ("0.0.0.0", None),
+            ("two fields.example", None),
+        ],
+    )
+    def test_parse_line(self, line: str, expected: str | None) -> None:
+        """Test plain, hosts-file and wildcard lines and what is skipped."""
+        assert parse_blocklist_line(line) == expected
+
+    def test_matches_host_and_subdomains(self) -> None:
+        """Test a listed domain blocks itself and subdomains, not lookalikes."""
+        blocklist = DomainBlocklist(["evil.example", "phish.co.uk"])
+        assert blocklist.match("https://evil.example/login") == "evil.example"
+        assert blocklist.match("https://cdn.login.EVIL.example:443/x") == "evil.example"
+        assert blocklist.match("evil.example") == "evil.example"
+        assert blocklist.match("https://user@phish.co.uk/?a=b") == "phish.co.uk"
+        assert blocklist.match("https://notevil.example/") is None
+        assert blocklist.match("https://evil.example.com/") is None
+        assert blocklist.match("https://co.uk/") is None
+
+    def test_table_stays_compact(self) -> None:
+        """Test the table is at most half full and stores duplicates once."""
+        domains = [f"site{i}.example" for i in range(1000)]
+        blocklist = DomainBlocklist(domains)
+        assert len(blocklist) == 1000
+        assert blocklist.nbytes == 2048 * 8
+        assert len(DomainBlocklist(domains + domains[:100])) == 1000
+        assert all(domain in blocklist for domain in domains)
+        assert "site1000.example" not in blocklist
+        assert len(DomainBlocklist()) == 0
+        assert DomainBlocklist().match("https://evil.example") is None
+
+    def test_reloader_swaps_table_when_file_changes(self, tmp_path: Path) -> None:
+        """Test the file is loaded, reloaded on change and kept on errors."""
+        path = tmp_path / "blocklist.txt"
+        path.write_text(BLOCKLIST_FILE)
+        assert "free-skins.ru" in load_blocklist_file(path)
+        reloader = BlocklistReloader(path)
+
+        async def run() -> None:
+            assert await reloader.reload()
+            assert len(reloader.blocklist) == 3
+            assert not await reloader.reload()
+            path.write_text(BLOCKLIST_FILE + "new-scam.example\n")
+            os.utime(path, ns=(0, 10**18))
+            assert await reloader.reload()
+            assert "new-scam.example" in reloader.blocklist
+            path.unlink()
+            assert not await reloader.reload()
+            assert reloader.last_error
+            assert len(reloader.blocklist) == 4
+
+        asyncio.run(run())
+
+
+class TestScreening:
+    """Test the per-guild blocklist actions in LinkMonitor."""
+
+    QUARANTINE = 900
+
+    def _replayer(self, policy: BlocklistPolicy) -> Replayer:
+        replayer = Replayer(
+            [], outputs_per_guild=1, load_shedding=False, webhook_latency=0
+        )
+        guild = replayer._guild(1)
+        guild.channels[self.QUARANTINE] = _text_channel(guild, self.QUARANTINE)
+        webhook = FakeWebhook(replayer.sink, self.QUARANTINE)
+        replayer.cog._webhooks[self.QUARANTINE] = webhook  # type: ignore[assignment]
+        replayer.cog.blocklist = BlocklistReloader("unused")
+        replayer.cog.blocklist.blocklist = DomainBlocklist(["steamcommunlty.com"])
+        replayer.db.guild_settings.blocklist_policies[1] = policy
+        return replayer
+
+    def _post(self, replayer: Replayer, content: str) -> None:
+        guild = replayer._guild(1)
+        message = FakeMessage(
+            100, content, guild, _text_channel(guild, 50), FakeAuthor(7), replayer.sink
+        )
+        asyncio.run(replayer.cog.on_message(message))  # type: ignore[arg-type]
+
+    def test_drop_forwards_only_clean_links(self) -> None:
+        """Test blocked links are skipped and clean ones still forwarded."""
+        replayer = self._replayer(BlocklistPolicy("drop"))
+        self._post(replayer, "https://steamcommunlty.com/gift https://youtu.be/abc")
+        assert sum(replayer.sink.sends.values()) == 1
+        assert replayer.sink.sends[self.QUARANTINE] == 0
+        assert replayer.cog.blocked_links == {"drop": 1}
+
+        replayer = self._replayer(BlocklistPolicy("drop"))
+        self._post(replayer, "https://login.steamcommunlty.com/gift")
+        assert sum(replayer.sink.sends.values()) == 0
+        assert replayer.sink.deletes == 0
+
+    def test_quarantine_moves_links_and_deletes_message(self) -> None:
+        """Test quarantined links go to the quarantine channel only."""
+        replayer = self._replayer(BlocklistPolicy("quarantine", self.QUARANTINE))
+        self._post(replayer, "https://steamcommunlty.com/gift")
+        assert replayer.sink.sends == {self.QUARANTINE: 1}
+        assert replayer.sink.deletes == 1
+        assert replayer.cog.blocked_links == {"quarantine": 1}
+
+    def test_alert_reports_and_keeps_message(self) -> None:
+        """Test an alert is posted and the message left for moderators."""
+        replayer = self._replayer(BlocklistPolicy("alert", self.QUARANTINE))
+        self._post(replayer, "https://steamcommunlty.com/gift")
+        assert replayer.sink.sends == {self.QUARANTINE: 1}
+        assert replayer.sink.deletes == 0
+
+    def test_missing_channel_falls_back_to_drop(self) -> None:
+        """Test quarantine without a reachable channel drops the links."""
+        replayer = self._replayer(BlocklistPolicy("quarantine", 12345))
+        self._post(replayer, "https://steamcommunlty.com/gift")
+        assert sum(replayer.sink.sends.values()) == 0
+        assert replayer.sink.deletes == 0
+        assert replayer.cog.blocked_links == {"drop": 1}
+
+    def test_off_forwards_blocked_links(self) -> None:
+        """Test a guild can opt out of screening."""
+        replayer = self._replayer(BlocklistPolicy("off"))
+        self._post(replayer, "https://steamcommunlty.com/gift")
+        assert sum(replayer.sink.sends.values()) == 1
+        assert not replayer.cog.blocked_links
@@ -0,0 +1,90 @@
+"""Tests for URL canonicalization."""
+
+from link_utils.canonical import canonicalize_url, canonicalize_urls
+from link_utils.categories import LINK_TYPE_TWITTER, LINK_TYPE_YOUTUBE, categorize_link
+
+
+class TestCanonicalizeUrl:
+    """Test canonicalize_url function."""
+
+    def test_youtube_forms_fold(self) -> None:
+        """Test every YouTube share form maps to one URL."""
+        expected = "https://www.youtube.com/watch?v=abc123"
+        assert canonicalize_url("https://youtu.be/abc123?si=XyZ") == expected
+        assert (
+            canonicalize_url("https://youtube.com/watch?v=abc123&feature=share")
+            == expected
+        )
+        assert canonicalize_url("http://m.youtube.com/watch?v=abc123") == expected
+
+    def test_youtube_keeps_timestamp(self) -> None:
+        """Test meaningful YouTube parameters survive."""
+        assert (
+            canonicalize_url("https://youtu.be/abc123?t=42")
+            == "https://www.youtube.com/watch?v=abc123&t=42"
+        )
+
+    def test_twitter_aliases(self) -> None:
+        """Test twitter.com and x.com fold together."""
+        expected = "https://x.com/user/status/1"
+        assert canonicalize_url("https://twitter.com/user/status/1?s=20") == expected
+        assert canonicalize_url("https://mobile.x.com/user/status/1/") == expected
+
+    def test_tracking_params_dropped(self) -> None:
+        """Test global tracking parameters are removed from any site."""
+        assert (
+            canonicalize_url("https://Example.COM/a?utm_source=x&id=5&fbclid=y")
+            == "https://example.com/a?id=5"
+        )
+
+    def test_unknown_site_path_untouched(self) -> None:
+        """Test unknown sites keep their path, trailing slash and fragment."""
+        assert (
+            canonicalize_url("https://example.com/Docs/#Intro")
+            == "https://example.com/Docs/#Intro"
+        )
+
+    def test_default_port_and_scheme(self) -> None:
+        """Test default ports are dropped and www links get a scheme."""
+        assert canonicalize_url("HTTPS://example.com:443") == "https://example.com/"
+        assert (
+            canonicalize_url("http://example.com:8080/x") == "http://example.com:8080/x"
+        )
+        assert (
+            canonicalize_url("www.github.com/user/repo/")
+            == "https://github.com/user/repo"
+        )
+
+    def test_ipv6_literals_keep_brackets(self) -> None:
+        """Test IPv6 hosts are written back in brackets, with or without a port."""
+        assert canonicalize_url("http://[::1]:8080/") == "http://[::1]:8080/"
+        assert canonicalize_url("https://[2001:DB8::1]:443/a?utm_source=x") == (
+            "https://[2001:db8::1]/a"
+        )
+
+    def test_unparseable_returned_unchanged(self) -> None:
+        """Test invalid URLs pass through."""
+        assert canonicalize_url("https://[bad/x") == "https://[bad/x"
+        assert canonicalize_url("mailto:me@example.com") == "mailto:me@example.com"
+
+    def test_canonical_forms_still_categorize(self) -> None:
+        """Test canonical hosts match the category patterns."""
+        assert (
+            categorize_link(canonicalize_url("https://youtu.be/a")) == LINK_TYPE_YOUTUBE
+        )
+        assert (
+            categorize_link(canonicalize_url("https://twitter.com/a"))
+            == LINK_TYPE_TWITTER
+        )
+
+    def test_dedup(self) -> None:
+        """Test different forms of one link collapse into one."""
+        urls = [
+            "https://youtu.be/a",
+            "https://www.youtube.com/watch?v=a&si=1",
+            "https://x.com/b",
+        ]
+        assert canonicalize_urls(urls) == [
+            "https://www.youtube.com/watch?v=a",
+            "https://x.com/b",
+        ]
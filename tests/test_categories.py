@@ -1,12 +1,17 @@
 """Tests for URL categories."""
 
 from link_utils.categories import (
-    categorize_link,
-    LINK_TYPE_YOUTUBE,
-    LINK_TYPE_TWITTER,
+    ALL_CATEGORIES_MASK,
+    CATEGORY_BITS,
+    LINK_TYPE_GITHUB,
     LINK_TYPE_OTHER,
     LINK_TYPE_TWITCH,
-    LINK_TYPE_GITHUB,
+    LINK_TYPE_TWITTER,
+    LINK_TYPE_YOUTUBE,
+    acl_flags,
+    acl_mask,
+    categorize_link,
+    category_mask,
 )
 
 
@@ -44,3 +49,30 @@ class TestCategorizeLink:
     def test_invalid_url(self) -> None:
         """Test invalid URL."""
         assert categorize_link("not a url") == LINK_TYPE_OTHER
+
+
+class TestCategoryBits:
+    """Test the ACL bitmask category registry."""
+
+    def test_bits_are_unique(self) -> None:
+        """Test every category has its own single bit."""
+        bits = list(CATEGORY_BITS.values())
+        assert len(set(bits)) == len(bits)
+        assert all(bit & (bit - 1) == 0 for bit in bits)
+
+    def test_bits_are_stable(self) -> None:
+        """Test persisted bit assignments do not change."""
+        assert CATEGORY_BITS[LINK_TYPE_YOUTUBE] == 1
+        assert CATEGORY_BITS[LINK_TYPE_OTHER] == 1 << 8
+
+    def test_round_trip(self) -> None:
+        """Test packing and unpacking flags."""
+        flags = acl_flags(acl_mask({"youtube": True, "github": True, "twitch": False}))
+        assert flags["youtube"] and flags["github"]
+        assert not flags["twitch"]
+
+    def test_category_mask(self) -> None:
+        """Test routing masks ignore unknown categories."""
+        mask = category_mask([LINK_TYPE_GITHUB, "unknown"])
+        assert mask == CATEGORY_BITS[LINK_TYPE_GITHUB]
+        assert category_mask(CATEGORY_BITS) == ALL_CATEGORIES_MASK
@@ -0,0 +1,142 @@
+"""Tests for loading and hot-reloading link category rules."""
+
+import asyncio
+import json
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from link_utils.categories import (
+    LINK_TYPE_GITHUB,
+    LINK_TYPE_OTHER,
+    LINK_TYPE_YOUTUBE,
+    CategoryMatcher,
+    categorize_link,
+    compiled_patterns,
+    get_matcher,
+    set_matcher,
+)
+from link_utils.category_rules import CategoryRulesReloader, load_rules_file
+
+TOML_RULES = """
+[categories]
+github = ['(?:https?://)?(?:www\\.)?(?:github\\.com|gitlab\\.com)/']
+
+[examples]
+"https://gitlab.com/a" = "github"
+"""
+
+
+@pytest.fixture(autouse=True)
+def restore_matcher() -> Iterator[None]:
+    """Put the built-in rules back after each test."""
+    original = get_matcher()
+    yield
+    set_matcher(original)
+
+
+def _write(path: Path, text: str) -> None:
+    """Write a rules file and make sure its stamp changes."""
+    path.write_text(text)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+class TestCategoryMatcher:
+    """Test CategoryMatcher validation."""
+
+    def test_unknown_category(self) -> None:
+        """Test categories without an ACL bit are rejected."""
+        with pytest.raises(ValueError, match="Unknown"):
+            CategoryMatcher({"mastodon": [r"mastodon\.social/"]})
+
+    def test_bad_regex(self) -> None:
+        """Test patterns that do not compile are rejected."""
+        with pytest.raises(ValueError, match="Bad pattern"):
+            CategoryMatcher({"github": [r"github\.com/("]})
+
+    def test_match_everything(self) -> None:
+        """Test patterns that match any string are rejected."""
+        with pytest.raises(ValueError, match="matches everything"):
+            CategoryMatcher({"github": [r".*"]})
+
+    def test_failed_example(self) -> None:
+        """Test examples catch rules that categorize wrongly."""
+        matcher = CategoryMatcher({"github": [r"github\.com/"]})
+        with pytest.raises(ValueError, match="expected"):
+            matcher.check_examples({"https://youtu.be/a": LINK_TYPE_YOUTUBE})
+
+
+class TestLoadRulesFile:
+    """Test load_rules_file function."""
+
+    def test_toml(self, tmp_path: Path) -> None:
+        """Test TOML rules load in file order."""
+        path = tmp_path / "rules.toml"
+        path.write_text(TOML_RULES)
+        matcher = load_rules_file(path)
+        assert matcher.categorize("https://gitlab.com/a") == LINK_TYPE_GITHUB
+        assert matcher.categorize("https://youtu.be/a") == LINK_TYPE_OTHER
+
+    def test_json(self, tmp_path: Path) -> None:
+        """Test JSON rules load."""
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps({"categories": {"youtube": [r"youtu\.be/"]}}))
+        assert load_rules_file(path).categorize("youtu.be/x") == LINK_TYPE_YOUTUBE
+
+    def test_missing_categories(self, tmp_path: Path) -> None:
+        """Test files without categories are rejected."""
+        path = tmp_path / "rules.json"
+        path.write_text("{}")
+        with pytest.raises(ValueError):
+            load_rules_file(path)
+
+
+class TestCategoryRulesReloader:
+    """Test CategoryRulesReloader swapping and rollback."""
+
+    def test_reload_swaps_and_skips_unchanged(self, tmp_path: Path) -> None:
+        """Test a valid file goes live and an unchanged file is not reloaded."""
+        path = tmp_path / "rules.toml"
+        path.write_text(TOML_RULES)
+        reloader = CategoryRulesReloader(path)
+
+        async def run() -> None:
+            assert await reloader.reload()
+            assert categorize_link("https://gitlab.com/a") == LINK_TYPE_GITHUB
+            assert list(compiled_patterns()) == [LINK_TYPE_GITHUB]
+            assert not await reloader.reload()
+
+        asyncio.run(run())
+
+    def test_bad_rules_keep_previous(self, tmp_path: Path) -> None:
+        """Test an invalid edit leaves the active rules in place."""
+        path = tmp_path / "rules.toml"
+        path.write_text(TOML_RULES)
+        reloader = CategoryRulesReloader(path)
+
+        async def run() -> None:
+            assert await reloader.reload()
+            _write(path, "[categories]\ngithub = ['(']\n")
+            assert not await reloader.reload()
+            assert reloader.last_error is not None
+            assert categorize_link("https://gitlab.com/a") == LINK_TYPE_GITHUB
+
+        asyncio.run(run())
+
+    def test_rollback(self, tmp_path: Path) -> None:
+        """Test rollback restores the rules active before the last reload."""
+        path = tmp_path / "rules.toml"
+        path.write_text(TOML_RULES)
+        reloader = CategoryRulesReloader(path)
+        builtin = get_matcher()
+
+        async def run() -> None:
+            assert await reloader.reload()
+
+        asyncio.run(run())
+        assert reloader.rollback()
+        assert get_matcher() is builtin
+        assert not reloader.rollback()
@@ -0,0 +1,78 @@
+"""Tests for the channel name autocomplete index."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from cogs.link_manager import LinkManager
+from core.channel_index import ChannelNameIndex
+from core.db.records import OutputChannelRecord
+
+
+def _index() -> ChannelNameIndex:
+    return ChannelNameIndex(
+        [(1, "general"), (2, "yt-links"), (3, "links"), (4, "game_links"), (5, "memes")]
+    )
+
+
+class TestChannelNameIndex:
+    """Test ChannelNameIndex."""
+
+    def test_whole_name_matches_first(self) -> None:
+        """Test names starting with the prefix rank before word matches."""
+        assert _index().search("lin") == [3, 2, 4]
+        assert _index().search("#GEN") == [1]
+
+    def test_empty_prefix_lists_by_name(self) -> None:
+        """Test an empty query returns channels sorted by name, capped."""
+        assert _index().search("", limit=2) == [4, 1]
+
+    def test_rename_and_remove(self) -> None:
+        """Test updates keep the index consistent."""
+        index = _index()
+        index.add(5, "link-dump")
+        assert index.search("memes") == []
+        assert index.search("link")[:2] == [5, 3]
+        index.remove(3)
+        assert 3 not in index.search("l")
+        assert len(index) == 4
+
+    def test_large_guild_is_fast(self) -> None:
+        """Test searching 1000 channels stays far below the autocomplete deadline."""
+        index = ChannelNameIndex((i, f"channel-{i:04d}-links") for i in range(1000))
+        start = time.perf_counter()
+        for prefix in ("c", "channel-05", "links", "zzz"):
+            index.search(prefix)
+        assert time.perf_counter() - start < 0.05
+
+
+class FakeOutputChannels:
+    async def get_cached_output_channels(
+        self, guild_id: int
+    ) -> list[OutputChannelRecord]:
+        return [OutputChannelRecord(guild_id, 2), OutputChannelRecord(guild_id, 4)]
+
+
+class TestAutocomplete:
+    """Test LinkManager autocomplete handlers."""
+
+    def _cog_and_interaction(self) -> tuple[LinkManager, SimpleNamespace]:
+        channels = [
+            SimpleNamespace(id=i, name=n)
+            for i, n in [(1, "general"), (2, "yt-links"), (4, "game_links")]
+        ]
+        guild = SimpleNamespace(id=9, text_channels=channels)
+        cog = LinkManager(SimpleNamespace(output_channels=FakeOutputChannels()))  # type: ignore[arg-type]
+        return cog, SimpleNamespace(guild=guild)
+
+    def test_only_output_channels_suggested(self) -> None:
+        """Test channel suggestions are limited to configured output channels."""
+        cog, interaction = self._cog_and_interaction()
+        choices = asyncio.run(cog.output_channel_autocomplete(interaction, "li"))  # type: ignore[arg-type]
+        assert [c.value for c in choices] == ["2", "4"]
+
+    def test_link_types(self) -> None:
+        """Test link types are suggested from the category registry."""
+        cog, interaction = self._cog_and_interaction()
+        choices = asyncio.run(cog.link_type_autocomplete(interaction, "t"))  # type: ignore[arg-type]
+        assert {c.value for c in choices} == {"twitch", "twitter", "tiktok"}
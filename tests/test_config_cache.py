@@ -0,0 +1,51 @@
+"""Tests for the guild config cache."""
+
+import time
+
+from core.db.cache import GuildConfigCache
+from core.db.records import OutputChannelRecord
+
+
+def _records(*channel_ids: int) -> tuple[OutputChannelRecord, ...]:
+    return tuple(OutputChannelRecord(guild_id=1, channel_id=c) for c in channel_ids)
+
+
+class TestGuildConfigCache:
+    """Test GuildConfigCache."""
+
+    def test_put_and_get(self) -> None:
+        """Test cached records are returned and counted as hits."""
+        cache = GuildConfigCache(ttl=60)
+        assert cache.get(1) is None
+        cache.put(1, _records(10, 11))
+        assert [r.channel_id for r in cache.get(1) or ()] == [10, 11]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_expiry(self) -> None:
+        """Test entries expire after the TTL."""
+        cache = GuildConfigCache(ttl=0.01)
+        cache.put(1, _records(10))
+        time.sleep(0.02)
+        assert cache.get(1) is None
+
+    def test_invalidate(self) -> None:
+        """Test invalidation drops the entry."""
+        cache = GuildConfigCache(ttl=60)
+        cache.put(1, _records(10))
+        cache.invalidate(1)
+        assert cache.get(1) is None
+
+    def test_stale_load_discarded(self) -> None:
+        """Test a load that raced with an invalidation is not stored."""
+        cache = GuildConfigCache(ttl=60)
+        version = cache.version(1)
+        cache.invalidate(1)
+        cache.put(1, _records(10), version)
+        assert cache.get(1) is None
+
+    def test_discard_channel_keeps_rest_warm(self) -> None:
+        """Test removing one channel keeps the rest of the entry cached."""
+        cache = GuildConfigCache(ttl=60)
+        cache.put(1, _records(10, 11))
+        cache.discard_channel(1, 10)
+        assert [r.channel_id for r in cache.get(1) or ()] == [11]
@@ -0,0 +1,183 @@
+"""Tests for digest delivery of output channels."""
+
+import asyncio
+import dataclasses
+from pathlib import Path
+
+from benchmarks.replay import FakeAuthor, FakeMessage, Replayer, _text_channel
+from core.digest import DIGEST_INTERVALS, DigestBuffer, digest_offset, next_delivery
+from core.payloads import MAX_EMBED_TOTAL, build_digest_payloads
+
+HOUR = DIGEST_INTERVALS["hourly"]
+
+
+class TestSchedule:
+    """Test delivery times are fixed per guild and spread across guilds."""
+
+    def test_next_delivery_is_within_one_interval(self) -> None:
+        """Test the next slot follows the given time by at most one interval."""
+        for guild_id in (1, 2, 80351110224678912):
+            due = next_delivery(guild_id, HOUR, 1_700_000_000.5)
+            assert 1_700_000_000.5 < due <= 1_700_000_000.5 + HOUR
+            assert (due - digest_offset(guild_id, HOUR)) % HOUR == 0
+            assert next_delivery(guild_id, HOUR, due) == due + HOUR
+
+    def test_guilds_are_spread_over_the_interval(self) -> None:
+        """Test consecutive guild ids do not share delivery minutes."""
+        minutes = {digest_offset(guild_id, HOUR) // 60 for guild_id in range(100)}
+        assert len(minutes) > 45
+
+
+class TestDigestBuffer:
+    """Test buffering, deduplication and the persistent log."""
+
+    def test_counts_repeats_and_overflow(self) -> None:
+        """Test repeats are counted once and links past the limit only counted."""
+        buffer = DigestBuffer(None, max_links=2)
+        buffer.add(1, 10, HOUR, {"youtube": ["https://youtu.be/a"]}, now=100.0)
+        buffer.add(1, 10, HOUR, {"youtube": ["https://youtu.be/a"]}, now=200.0)
+        buffer.add(1, 10, HOUR, {"github": ["https://github.com/x"]}, now=300.0)
+        buffer.add(1, 10, HOUR, {"other": ["https://example.com"]}, now=400.0)
+        [digest] = buffer
+        assert digest.first_at == 100.0
+        assert digest.counts == {
+            "youtube": {"https://youtu.be/a": 2},
+            "github": {"https://github.com/x": 1},
+        }
+        assert (digest.distinct, digest.overflow, digest.total) == (2, 1, 4)
+
+    def test_due_take_and_restore(self) -> None:
+        """Test only due digests are returned, oldest first, and can be put back."""
+        buffer = DigestBuffer(None)
+        buffer.add(1, 10, HOUR, {"other": ["https://a.example"]}, now=0.0)
+        buffer.add(2, 20, HOUR, {"other": ["https://b.example"]}, now=10.0 * HOUR)
+        assert [d.channel_id for d in buffer.due(now=2.0 * HOUR)] == [10]
+        assert buffer.due(now=12.0 * HOUR, limit=1)[0].channel_id == 10
+        digest = buffer.take(10)
+        assert digest is not None and buffer.take(10) is None
+        buffer.restore(digest)
+        assert len(buffer) == 2
+        buffer.discard(2)
+        assert [d.channel_id for d in buffer] == [10]
+
+    def test_log_survives_restart_and_is_compacted(self, tmp_path: Path) -> None:
+        """Test pending digests are restored from the log and delivered ones dropped."""
+        path = tmp_path / "digests.log"
+        buffer = DigestBuffer(path)
+        for _ in range(3):
+            buffer.add(1, 10, HOUR, {"other": ["https://a.example"]}, now=5.0)
+        buffer.add(1, 11, HOUR, {"other": ["https://b.example"]}, now=6.0)
+        buffer.close()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("not json\n")
+        assert len(path.read_text().splitlines()) == 5
+
+        restored = DigestBuffer(path)
+        assert restored.load() == 2
+        assert {d.channel_id: d.total for d in restored} == {10: 3, 11: 1}
+        assert len(path.read_text().splitlines()) == 2
+        restored.take(10)
+        restored.compact()
+        again = DigestBuffer(path)
+        again.load()
+        assert [d.channel_id for d in again] == [11]
+
+    def test_adds_during_rewrite_reach_the_new_log(self, tmp_path: Path) -> None:
+        """Test links buffered while the log is rewritten are not lost."""
+        path = tmp_path / "digests.log"
+        buffer = DigestBuffer(path)
+        buffer.add(1, 10, HOUR, {"other": ["https://a.example"]}, now=5.0)
+
+        async def run() -> None:
+            rewrite = asyncio.create_task(buffer.rewrite())
+            await asyncio.sleep(0)
+            buffer.add(1, 11, HOUR, {"other": ["https://b.example"]}, now=6.0)
+            await rewrite
+
+        asyncio.run(run())
+        buffer.close()
+        restored = DigestBuffer(path)
+        assert restored.load() == 2
+
+    def test_discarded_digests_stay_gone_after_rewrite(self, tmp_path: Path) -> None:
+        """Test a rewrite after discard keeps dropped digests out of the log."""
+        path = tmp_path / "digests.log"
+        buffer = DigestBuffer(path)
+        buffer.add(1, 10, HOUR, {"other": ["https://a.example"]}, now=5.0)
+        buffer.add(2, 20, HOUR, {"other": ["https://b.example"]}, now=5.0)
+        assert buffer.discard(1) == 1
+        assert buffer.discard(1) == 0
+        asyncio.run(buffer.rewrite())
+        buffer.close()
+        restored = DigestBuffer(path)
+        restored.load()
+        assert [d.channel_id for d in restored] == [20]
+
+
+class TestDigestPayloads:
+    """Test digests are laid out compactly."""
+
+    def test_most_posted_first_with_counts(self) -> None:
+        """Test links are ordered by count and repeats are marked."""
+        [payload] = build_digest_payloads(
+            {"youtube": {"https://youtu.be/a": 1, "https://youtu.be/b": 4}}, "Digest"
+        )
+        assert payload.content == "Digest"
+        description = payload.embeds[0].description
+        assert description == "https://youtu.be/b ×4\nhttps://youtu.be/a"
+
+    def test_hundreds_of_links_take_a_few_calls(self) -> None:
+        """Test a large digest is packed into far fewer calls than links."""
+        counts = {
+            "youtube": {f"https://youtu.be/{i:011d}": 1 for i in range(300)},
+            "github": {f"https://github.com/org/repo{i}": 2 for i in range(200)},
+        }
+        payloads = build_digest_payloads(counts, "Digest")
+        assert len(payloads) <= 5
+        assert all(p.embed_chars() <= MAX_EMBED_TOTAL for p in payloads)
+        assert sum(len(p.links) for p in payloads) == 500
+
+
+class TestDigestForwarding:
+    """Test LinkMonitor buffers digest channels and delivers them on schedule."""
+
+    def test_forwards_are_buffered_then_delivered_once(self, tmp_path: Path) -> None:
+        """Test many forwards become one delivery and the originals are deleted."""
+        replayer = Replayer(
+            [], outputs_per_guild=1, load_shedding=False, webhook_latency=0
+        )
+        cog = replayer.cog
+        cog.digests = DigestBuffer(tmp_path / "digests.log")
+        guild = replayer._guild(1)
+        configs = replayer.db.output_channels.configs[1]
+        configs[0] = dataclasses.replace(configs[0], digest_interval=HOUR)
+        channel_id = configs[0].channel_id
+        source = _text_channel(guild, 50)
+
+        for i in range(40):
+            url = f"https://youtu.be/{i % 4}"
+            message = FakeMessage(i, url, guild, source, FakeAuthor(i), replayer.sink)
+            asyncio.run(cog.on_message(message))  # type: ignore[arg-type]
+        assert sum(replayer.sink.sends.values()) == 0
+        assert replayer.sink.deletes == 40
+        [digest] = cog.digests
+        assert (digest.total, digest.distinct) == (40, 4)
+
+        asyncio.run(cog.flush_digests())
+        assert sum(replayer.sink.sends.values()) == 0
+        digest.first_at -= 2 * HOUR
+        asyncio.run(cog.flush_digests())
+        assert replayer.sink.sends == {channel_id: 1}
+        assert len(cog.digests) == 0
+        assert (tmp_path / "digests.log").read_text() == ""
+
+    def test_deleted_channel_digest_leaves_the_log(self, tmp_path: Path) -> None:
+        """Test deleting a digest channel drops its digest from the log too."""
+        replayer = Replayer([], outputs_per_guild=1, load_shedding=False)
+        cog = replayer.cog
+        cog.digests = DigestBuffer(tmp_path / "digests.log")
+        guild = replayer._guild(1)
+        channel_id = replayer.db.output_channels.configs[1][0].channel_id
+        cog.digests.add(1, channel_id, HOUR, {"other": ["https://a.example"]})
+        asyncio.run(cog.on_guild_channel_delete(guild.channels[channel_id]))
+        assert (tmp_path / "digests.log").read_text() == ""
@@ -0,0 +1,90 @@
+"""Tests for link export helpers."""
+
+import csv
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+from link_utils.export import (
+    CSV_HEADER,
+    FLUSH_HEADROOM,
+    ChunkedExportWriter,
+    ExportPart,
+    ExportRecord,
+)
+
+
+def _record(i: int, url: str = "https://example.com") -> ExportRecord:
+    return ExportRecord(
+        timestamp="2024-01-01T00:00:00+00:00",
+        message_id=i,
+        author="user",
+        category="other",
+        url=f"{url}/{i}",
+    )
+
+
+def _read(part: ExportPart) -> str:
+    return gzip.decompress(part.fileobj.read()).decode("utf-8")
+
+
+class TestChunkedExportWriter:
+    """Test ChunkedExportWriter."""
+
+    def test_csv_single_part(self) -> None:
+        """Test a small CSV export fits in one part."""
+        writer = ChunkedExportWriter("csv", 10 * 1024 * 1024, "links")
+        for i in range(3):
+            assert writer.write(_record(i)) is None
+        part = writer.close()
+        assert part is not None
+        assert part.filename == "links-part001.csv.gz"
+        assert part.record_count == 3
+        rows = list(csv.reader(io.StringIO(_read(part))))
+        assert tuple(rows[0]) == CSV_HEADER
+        assert rows[1][4] == "https://example.com/0"
+        assert len(rows) == 4
+
+    def test_jsonl(self) -> None:
+        """Test JSONL output."""
+        writer = ChunkedExportWriter("jsonl", 10 * 1024 * 1024, "links")
+        writer.write(_record(1))
+        part = writer.close()
+        assert part is not None
+        lines = _read(part).splitlines()
+        assert json.loads(lines[0])["message_id"] == 1
+
+    def test_empty_export(self) -> None:
+        """Test closing without records produces no part."""
+        writer = ChunkedExportWriter("csv", 10 * 1024 * 1024, "links")
+        assert writer.close() is None
+        assert writer.parts_written == 0
+
+    def test_rollover_respects_limit(self) -> None:
+        """Test incompressible data is split into parts under the limit."""
+        max_bytes = FLUSH_HEADROOM + 256 * 1024
+        writer = ChunkedExportWriter("jsonl", max_bytes, "links")
+        parts: list[ExportPart] = []
+        total = 3000
+        for i in range(total):
+            part = writer.write(
+                _record(i, url="https://e.com/" + os.urandom(256).hex())
+            )
+            if part is not None:
+                parts.append(part)
+        last = writer.close()
+        assert last is not None
+        parts.append(last)
+
+        assert len(parts) > 1
+        assert all(p.size <= max_bytes for p in parts)
+        assert sum(p.record_count for p in parts) == total
+        assert sum(len(_read(p).splitlines()) for p in parts) == total
+
+    def test_invalid_format(self) -> None:
+        """Test unknown formats are rejected."""
+        with pytest.raises(ValueError):
+            ChunkedExportWriter("xml", 10 * 1024 * 1024, "links")
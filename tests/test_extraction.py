@@ -0,0 +1,156 @@
+"""Tests for link extraction across message parts."""
+
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from benchmarks.replay import (
+    FakeAuthor,
+    FakeGuild,
+    FakeMessage,
+    Replayer,
+    Sink,
+    _text_channel,
+)
+from cogs.link_export import EXPORT_LINK_SOURCES
+from core.payloads import build_digest_payloads, build_payloads
+from link_utils.extraction import (
+    ALL_LINK_SOURCES,
+    DEFAULT_LINK_SOURCES,
+    LinkSource,
+    extract_message_links,
+    has_link_candidates,
+)
+
+
+def _message(content: str = "", bot: bool = False) -> FakeMessage:
+    guild = FakeGuild(1)
+    author = FakeAuthor(7)
+    author.bot = bot  # type: ignore[misc]
+    return FakeMessage(
+        100, content, guild, _text_channel(guild, 50), author, Sink(0, 0)
+    )
+
+
+def _bot_embed() -> discord.Embed:
+    embed = discord.Embed(
+        title="New release",
+        url="https://github.com/a/b/releases",
+        description="see https://a.com/x",
+    )
+    embed.add_field(name="mirror", value="https://b.com/y and https://a.com/x")
+    return embed
+
+
+class TestExtractMessageLinks:
+    """Test extract_message_links function."""
+
+    def test_content_only_by_default(self) -> None:
+        """Test the default sources ignore attachments and embeds."""
+        message = _message("hi https://a.com/x")
+        message.attachments = [SimpleNamespace(url="https://cdn.discordapp.com/f.png")]  # type: ignore[list-item]
+        assert extract_message_links(message) == {"https://a.com/x": LinkSource.CONTENT}  # type: ignore[arg-type]
+
+    def test_all_sources_tagged_and_deduplicated(self) -> None:
+        """Test each URL is reported once with the field it first appeared in."""
+        message = _message("https://a.com/x", bot=True)
+        message.embeds = [_bot_embed()]
+        message.attachments = [SimpleNamespace(url="https://cdn.discordapp.com/f.png")]  # type: ignore[list-item]
+        message.message_snapshots = [SimpleNamespace(content="fwd https://c.com/z")]  # type: ignore[list-item]
+        links = extract_message_links(message, ALL_LINK_SOURCES)  # type: ignore[arg-type]
+        assert links == {
+            "https://a.com/x": LinkSource.CONTENT,
+            "https://github.com/a/b/releases": LinkSource.EMBEDS,
+            "https://b.com/y": LinkSource.EMBEDS,
+            "https://cdn.discordapp.com/f.png": LinkSource.ATTACHMENTS,
+            "https://c.com/z": LinkSource.SNAPSHOTS,
+        }
+
+    def test_user_embeds_are_previews(self) -> None:
+        """Test embeds on user messages are not read."""
+        message = _message("")
+        message.embeds = [_bot_embed()]
+        assert not has_link_candidates(message)  # type: ignore[arg-type]
+        assert extract_message_links(message, ALL_LINK_SOURCES) == {}  # type: ignore[arg-type]
+
+    def test_reads_forwards_posted_as_embeds(self) -> None:
+        """Test embed-style forwards and digests yield their links for export."""
+        message = _message("Link digest", bot=True)
+        message.embeds = [
+            *build_payloads({"github": ["https://github.com/a/b"]}, "embeds")[0].embeds,
+            *build_digest_payloads({"youtube": {"https://youtu.be/x": 3}}, "")[
+                0
+            ].embeds,
+        ]
+        links = extract_message_links(message, EXPORT_LINK_SOURCES)  # type: ignore[arg-type]
+        assert list(links) == ["https://github.com/a/b", "https://youtu.be/x"]
+
+    def test_no_candidates(self) -> None:
+        """Test plain text messages are rejected by the cheap check."""
+        assert not has_link_candidates(_message("just chatting"))  # type: ignore[arg-type]
+
+    def test_candidates_follow_sources(self) -> None:
+        """Test attachments and embeds only count when their source is read."""
+        message = _message("just chatting", bot=True)
+        message.attachments = [SimpleNamespace(url="https://cdn.discordapp.com/f.png")]  # type: ignore[list-item]
+        message.embeds = [_bot_embed()]
+        assert has_link_candidates(message)  # type: ignore[arg-type]
+        assert not has_link_candidates(message, DEFAULT_LINK_SOURCES)  # type: ignore[arg-type]
+        assert has_link_candidates(message, LinkSource.EMBEDS)  # type: ignore[arg-type]
+        message.embeds = []
+        assert has_link_candidates(message, LinkSource.ATTACHMENTS)  # type: ignore[arg-type]
+        assert not has_link_candidates(message, LinkSource.EMBEDS)  # type: ignore[arg-type]
+
+
+class TestBotEmbedForwarding:
+    """Test LinkMonitor reads other bots' embeds only when the guild opts in."""
+
+    def _run(self, sources: LinkSource, webhook: bool = False) -> int:
+        replayer = Replayer([], outputs_per_guild=1, load_shedding=False)
+        guild = replayer._guild(1)
+        author = FakeAuthor(9)
+        author.bot = True  # type: ignore[misc]
+        message = FakeMessage(
+            5, "", guild, _text_channel(guild, 50), author, replayer.sink
+        )
+        message.embeds = [_bot_embed()]
+        message.webhook_id = 1 if webhook else None
+        replayer.db.guild_settings.link_sources[1] = sources
+        asyncio.run(replayer.cog.on_message(message))  # type: ignore[arg-type]
+        return sum(replayer.sink.sends.values())
+
+    def test_opt_in(self) -> None:
+        """Test bot embeds are forwarded only with the embeds source enabled."""
+        assert self._run(LinkSource.CONTENT) == 0
+        assert self._run(LinkSource.CONTENT | LinkSource.EMBEDS) > 0
+
+    def test_webhooks_ignored(self) -> None:
+        """Test webhook messages, such as our own forwards, are never read."""
+        assert self._run(ALL_LINK_SOURCES, webhook=True) == 0
+
+
+class TestAttachmentForwarding:
+    """Test messages whose attachments are forwarded are not deleted."""
+
+    def test_original_kept_when_attachment_forwarded(self) -> None:
+        """Test the message stays so the forwarded attachment link keeps working."""
+        replayer = Replayer(
+            [], outputs_per_guild=1, load_shedding=False, webhook_latency=0
+        )
+        guild = replayer._guild(1)
+        message = FakeMessage(
+            5, "", guild, _text_channel(guild, 50), FakeAuthor(7), replayer.sink
+        )
+        message.attachments = [
+            SimpleNamespace(url="https://cdn.discordapp.com/attachments/1/2/f.png")
+        ]  # type: ignore[list-item]
+        replayer.db.guild_settings.link_sources[1] = ALL_LINK_SOURCES
+        asyncio.run(replayer.cog.on_message(message))  # type: ignore[arg-type]
+        assert sum(replayer.sink.sends.values()) == 1
+        assert replayer.sink.deletes == 0
+
+        message.id, message.attachments = 6, []
+        message.content = "https://youtu.be/abc"
+        asyncio.run(replayer.cog.on_message(message))  # type: ignore[arg-type]
+        assert replayer.sink.deletes == 1
@@ -0,0 +1,130 @@
+"""Tests for the health monitor and probe endpoints."""
+
+import asyncio
+import time
+from typing import Any
+
+import aiohttp
+
+from core.health import HealthMonitor, HealthThresholds
+
+
+async def _get(port: int, path: str) -> tuple[int, dict[str, Any]]:
+    """Fetch a probe endpoint."""
+    async with (
+        aiohttp.ClientSession() as session,
+        session.get(f"http://127.0.0.1:{port}{path}") as response,
+    ):
+        return response.status, await response.json()
+
+
+class TestHealthMonitor:
+    """Test HealthMonitor probes."""
+
+    def test_endpoints(self) -> None:
+        """Test liveness passes while readiness waits on its checks."""
+        ready = {"gateway": False}
+
+        async def run() -> None:
+            monitor = HealthMonitor(interval=0.01, latency=lambda: 0.05)
+            monitor.add_ready_check("gateway", lambda: ready["gateway"])
+            monitor.add_queue("deferred", lambda: 3)
+            await monitor.start(port=0)
+            try:
+                await asyncio.sleep(0.05)
+                assert monitor.port is not None
+                status, body = await _get(monitor.port, "/healthz")
+                assert status == 200 and body["ok"]
+                status, body = await _get(monitor.port, "/readyz")
+                assert status == 503
+                assert body["checks"]["gateway"] is False
+                assert body["queues"] == {"deferred": 3}
+                ready["gateway"] = True
+                status, body = await _get(monitor.port, "/readyz")
+                assert status == 200 and body["ok"]
+            finally:
+                await monitor.stop()
+
+        asyncio.run(run())
+
+    def test_loop_lag_fails_liveness(self) -> None:
+        """Test a blocked loop is reported as lagging."""
+
+        async def run() -> None:
+            monitor = HealthMonitor(HealthThresholds(max_loop_lag=0.05), interval=0.05)
+            await monitor.start(port=None)
+            try:
+                # Block the loop from a callback, as slow synchronous code would.
+                asyncio.get_running_loop().call_soon(time.sleep, 0.2)
+                await asyncio.sleep(0.01)
+                await asyncio.sleep(0.01)
+                ok, details = monitor.liveness()
+                assert not ok
+                assert details["max_loop_lag_seen"] >= 0.1
+            finally:
+                await monitor.stop()
+
+        asyncio.run(run())
+
+    def test_thresholds(self) -> None:
+        """Test latency and queue depth limits fail readiness."""
+        monitor = HealthMonitor(
+            HealthThresholds(max_latency=1.0, max_queue_depth=10),
+            latency=lambda: float("inf"),
+        )
+        monitor.add_queue("deferred", lambda: 11)
+        ok, details = monitor.readiness()
+        assert not ok
+        assert details["checks"] == {"latency": False, "queues": False}
+        assert details["latency"] is None
+
+    def test_stale_samples_fail_liveness(self) -> None:
+        """Test liveness fails when sampling stopped."""
+        monitor = HealthMonitor(HealthThresholds(stale_after=1.0))
+        monitor.last_sample = time.monotonic() - 5
+        assert not monitor.liveness()[0]
+
+    def test_probes_run_in_background(self) -> None:
+        """Test async probes gate readiness on their latest result."""
+        results = [False, True]
+
+        async def probe() -> bool:
+            if not results:
+                raise ConnectionError("unreachable")
+            return results.pop(0)
+
+        async def run() -> None:
+            monitor = HealthMonitor(interval=0.01)
+            monitor.add_probe("database", probe, interval=0.1)
+            assert monitor.readiness()[1]["checks"]["database"] is False
+            await monitor.start(port=None)
+            try:
+                await asyncio.sleep(0.05)
+                assert not monitor.readiness()[0]
+                await asyncio.sleep(0.1)
+                ok, details = monitor.readiness()
+                assert ok and details["checks"]["database"] is True
+                await asyncio.sleep(0.1)
+                assert not monitor.readiness()[0]
+            finally:
+                await monitor.stop()
+
+        asyncio.run(run())
+
+    def test_probe_added_after_start_runs_immediately(self) -> None:
+        """Test a probe registered on a running monitor does not wait an interval."""
+
+        async def probe() -> bool:
+            return True
+
+        async def run() -> None:
+            monitor = HealthMonitor(interval=0.01)
+            await monitor.start(port=None)
+            try:
+                monitor.add_probe("database", probe, interval=30.0)
+                await asyncio.sleep(0.01)
+                assert monitor.readiness()[1]["checks"]["database"] is True
+            finally:
+                await monitor.stop()
+
+        asyncio.run(run())
@@ -0,0 +1,99 @@
+"""Tests for the LinkExport cog."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import Any
+
+import discord
+import pytest
+
+from cogs import link_export
+from cogs.link_export import ExportReplies, LinkExport
+
+
+class FakeChannel:
+    """A text channel whose history is a list of forwarded links."""
+
+    def __init__(self, count: int) -> None:
+        self.name = "links"
+        self.mention = "#links"
+        self.count = count
+        self.sent: list[tuple[str, str | None]] = []
+
+    async def history(self, **kwargs: Any) -> AsyncIterator[SimpleNamespace]:
+        for i in range(self.count):
+            yield SimpleNamespace(
+                id=i,
+                webhook_id=1,
+                content=f"https://example.com/{i}",
+                embeds=[],
+                attachments=[],
+                message_snapshots=[],
+                created_at=datetime(2024, 1, 1, tzinfo=UTC),
+                author=SimpleNamespace(bot=True, display_name="forwarder"),
+            )
+
+    async def send(
+        self, content: str, *, file: discord.File | None = None
+    ) -> SimpleNamespace:
+        self.sent.append((content, file.filename if file else None))
+        return SimpleNamespace(edit=self.send)
+
+
+class ExpiredContext:
+    """A command context whose interaction token has expired."""
+
+    def __init__(self, channel: FakeChannel) -> None:
+        self.guild = SimpleNamespace(id=1, filesize_limit=10 * 1024 * 1024)
+        self.channel = channel
+        self.attempts = 0
+
+    async def send(self, *args: Any, **kwargs: Any) -> None:
+        self.attempts += 1
+        raise discord.NotFound(
+            SimpleNamespace(status=404, reason="Not Found"),  # type: ignore[arg-type]
+            "Unknown Webhook",
+        )
+
+
+class TestExpiredInteraction:
+    """Test exports outlive the interaction token."""
+
+    def test_parts_and_progress_go_to_channel(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test an expired token sends everything through the channel."""
+        monkeypatch.setattr(link_export, "HISTORY_PAGE_DELAY", 0.0)
+        monkeypatch.setattr(link_export, "PROGRESS_EVERY_PAGES", 1)
+        channel = FakeChannel(250)
+        ctx = ExpiredContext(channel)
+        cog = LinkExport()
+
+        asyncio.run(cog._export(ctx, ExportReplies(ctx), channel, "csv"))  # type: ignore[arg-type]
+
+        assert ctx.attempts == 1
+        files = [filename for _, filename in channel.sent if filename]
+        assert len(files) == 1 and files[0].endswith("-part001.csv.gz")
+        assert channel.sent[0][0].startswith("⏳ Exporting... 100 messages")
+        assert channel.sent[-1][0].startswith("✅ Export Complete\nExported 250 links")
+
+    def test_first_reply_answers_interaction(self) -> None:
+        """Test only the first reply uses the interaction."""
+        channel = FakeChannel(0)
+        sent: list[str] = []
+
+        async def send(content: str, **kwargs: Any) -> None:
+            sent.append(content)
+
+        ctx = SimpleNamespace(send=send, channel=channel)
+        replies = ExportReplies(ctx)  # type: ignore[arg-type]
+
+        async def run() -> None:
+            await replies.send("first")
+            await replies.send("second")
+
+        asyncio.run(run())
+        assert sent == ["first"]
+        assert channel.sent == [("second", None)]
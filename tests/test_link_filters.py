@@ -0,0 +1,141 @@
+"""Tests for per-output-channel domain and path rules."""
+
+import asyncio
+import dataclasses
+
+import pytest
+
+from benchmarks.bench_dao_reads import SimulatedSession, build_table
+from benchmarks.replay import FakeAuthor, FakeMessage, Replayer, _text_channel
+from core.db.daos.output_channel_dao import OutputChannelDAO
+from core.db.records import OutputChannelRecord
+from link_utils.link_filters import LinkFilter, compile_link_filter, parse_rule
+
+
+class TestParseRule:
+    """Test rule normalization and validation."""
+
+    @pytest.mark.parametrize(
+        ("rule", "expected"),
+        [
+            ("github.com", "github.com"),
+            ("https://www.GitHub.com/Our-Org/", "github.com/our-org"),
+            ("clips.twitch.tv/", "clips.twitch.tv"),
+            ("example.com:8080/a/b?x=1", "example.com/a/b"),
+        ],
+    )
+    def test_normalizes(self, rule: str, expected: str) -> None:
+        """Test schemes, www., ports, queries and trailing slashes are dropped."""
+        assert parse_rule(rule) == expected
+
+    @pytest.mark.parametrize(
+        "rule", ["", "github", "/path/only", "-bad-.com", "x" * 300]
+    )
+    def test_rejects_invalid(self, rule: str) -> None:
+        """Test rules without a valid domain are rejected."""
+        with pytest.raises(ValueError):
+            parse_rule(rule)
+
+
+class TestLinkFilter:
+    """Test matching of compiled rules."""
+
+    def test_deny_domain_covers_subdomains_only(self) -> None:
+        """Test a domain rule matches its subdomains but not lookalike hosts."""
+        rules = LinkFilter(deny=["twitch.tv"])
+        assert not rules.allows("https://clips.twitch.tv/abc")
+        assert not rules.allows("https://www.twitch.tv/streamer")
+        assert rules.allows("https://nottwitch.tv/streamer")
+        assert rules.allows("https://youtu.be/abc")
+
+    def test_path_prefix_stops_at_segment_boundary(self) -> None:
+        """Test an allowed path prefix does not match longer segment names."""
+        rules = LinkFilter(allow=["github.com/our-org"])
+        assert rules.allows("https://github.com/our-org")
+        assert rules.allows("https://github.com/Our-Org/repo/pull/1")
+        assert rules.allows("www.github.com/our-org/repo")
+        assert not rules.allows("https://github.com/our-org2/repo")
+        assert not rules.allows("https://github.com/other/repo")
+        assert not rules.allows("https://youtu.be/abc")
+
+    def test_deny_wins_over_allow(self) -> None:
+        """Test a deny rule rejects links an allow rule would accept."""
+        rules = LinkFilter(
+            allow=["twitch.tv", "github.com/our-org"],
+            deny=["clips.twitch.tv", "github.com/our-org/secret"],
+        )
+        assert rules.allows("https://twitch.tv/streamer")
+        assert not rules.allows("https://clips.twitch.tv/abc")
+        assert rules.allows("https://github.com/our-org/public")
+        assert not rules.allows("https://github.com/our-org/secret/issues")
+
+    def test_unparsable_links_only_pass_without_allow_rules(self) -> None:
+        """Test links without a host are treated like any other unmatched link."""
+        assert LinkFilter(deny=["example.com"]).allows("https://[::1")
+        assert not LinkFilter(allow=["example.com"]).allows("https://[::1")
+
+    def test_compiled_filters_are_shared(self) -> None:
+        """Test equal rule sets compile once."""
+        first = compile_link_filter(("github.com/a",), ())
+        assert compile_link_filter(("github.com/a",), ()) is first
+        assert compile_link_filter(("github.com/b",), ()) is not first
+
+    def test_record_filter(self) -> None:
+        """Test records decode their rules and expose a filter only when they have some."""
+        item = {
+            "guild_id": 1,
+            "channel_id": 2,
+            "acl": 1,
+            "link_deny": ["clips.twitch.tv"],
+        }
+        record = OutputChannelRecord.from_item(item)
+        assert record.link_deny == ("clips.twitch.tv",)
+        assert record.link_filter is not None
+        assert not record.link_filter.allows("https://clips.twitch.tv/x")
+        assert OutputChannelRecord(1, 2).link_filter is None
+
+
+class TestLinkRulesForwarding:
+    """Test rules are stored and applied when forwarding."""
+
+    def test_set_link_rules_invalidates_cache(self) -> None:
+        """Test saved rules are returned by the next cached read."""
+        dao = OutputChannelDAO(
+            SimulatedSession(build_table({1: 1})), "links", "us-east-1"
+        )
+        [before] = asyncio.run(dao.get_cached_output_channels(1))
+        assert before.link_filter is None
+        updated = asyncio.run(
+            dao.set_link_rules(1, before.channel_id, ["github.com/our-org"], [])
+        )
+        assert updated is not None and updated.acl == before.acl
+        [after] = asyncio.run(dao.get_cached_output_channels(1))
+        assert after.link_allow == ("github.com/our-org",)
+        assert asyncio.run(dao.set_link_rules(1, 999, [], [])) is None
+
+    def test_forward_skips_rejected_links(self) -> None:
+        """Test only links passing the channel's rules are forwarded."""
+        replayer = Replayer(
+            [], outputs_per_guild=1, load_shedding=False, webhook_latency=0
+        )
+        guild = replayer._guild(1)
+        configs = replayer.db.output_channels.configs[1]
+        configs[0] = dataclasses.replace(configs[0], link_deny=("clips.twitch.tv",))
+
+        def post(message_id: int, content: str) -> None:
+            message = FakeMessage(
+                message_id,
+                content,
+                guild,
+                _text_channel(guild, 50),
+                FakeAuthor(7),
+                replayer.sink,
+            )
+            asyncio.run(replayer.cog.on_message(message))  # type: ignore[arg-type]
+
+        post(100, "https://clips.twitch.tv/abc")
+        assert sum(replayer.sink.sends.values()) == 0
+        assert replayer.sink.deletes == 0
+        post(101, "https://clips.twitch.tv/abc https://twitch.tv/streamer")
+        assert sum(replayer.sink.sends.values()) == 1
+        assert replayer.cog.filtered_links == 2
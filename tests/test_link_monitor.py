@@ -0,0 +1,165 @@
+"""Tests for LinkMonitor edit handling and routing."""
+
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import discord
+
+from benchmarks.replay import FakeAuthor, FakeMessage, Replayer, _text_channel
+from core.rate_limit import TokenBucketLimiter
+
+
+class UndeletableMessage(FakeMessage):
+    """A message the bot lacks permission to delete, so it can still be edited."""
+
+    async def delete(self) -> None:
+        raise discord.Forbidden(SimpleNamespace(status=403, reason="Forbidden"), "no")  # type: ignore[arg-type]
+
+
+def _setup(
+    message_cls: type[FakeMessage] = UndeletableMessage,
+) -> tuple[Replayer, FakeMessage]:
+    replayer = Replayer([], outputs_per_guild=1, load_shedding=False)
+    guild = replayer._guild(1)
+    message = message_cls(
+        100,
+        "https://youtu.be/abc",
+        guild,
+        _text_channel(guild, 50),
+        FakeAuthor(7),
+        replayer.sink,
+    )
+    return replayer, message
+
+
+def _edit(replayer: Replayer, message: FakeMessage, content: str) -> None:
+    message.content = content
+    message.edited_at = message.created_at + timedelta(seconds=5)
+    payload = SimpleNamespace(message=message, guild_id=message.guild.id)
+    asyncio.run(replayer.cog.on_raw_message_edit(payload))  # type: ignore[arg-type]
+
+
+class TestEditForwarding:
+    """Test links added by edits are forwarded exactly once."""
+
+    def test_only_added_links_are_forwarded(self) -> None:
+        """Test an edit forwards new links and not the ones already sent."""
+        replayer, message = _setup()
+        asyncio.run(replayer.cog.on_message(message))  # type: ignore[arg-type]
+        assert sum(replayer.sink.sends.values()) == 1
+
+        _edit(replayer, message, "https://youtu.be/abc https://github.com/a/b")
+        assert sum(replayer.sink.sends.values()) == 2
+        _edit(
+            replayer, message, "https://youtu.be/abc https://github.com/a/b fixed typo"
+        )
+        assert sum(replayer.sink.sends.values()) == 2
+        assert replayer.cog.edit_stats == {"forwarded": 1, "unchanged": 1}
+        _, seen = replayer.cog.ledger.lookup(message.id)
+        assert seen is not None and len(seen) == 2
+
+    def test_dropped_message_is_not_recorded(self) -> None:
+        """Test links of a shed message are forwarded by a later edit."""
+        replayer, message = _setup()
+        replayer.cog._load_shedding = True
+        replayer.cog._guild_limiter = TokenBucketLimiter(rate=0.001, burst=1)
+        replayer.cog._guild_limiter.acquire(1)
+        asyncio.run(replayer.cog.on_message(message))  # type: ignore[arg-type]
+        assert replayer.cog.shed_stats == {"dropped": 1}
+        assert replayer.cog.ledger.lookup(message.id) == (False, None)
+
+        replayer.cog._guild_limiter = TokenBucketLimiter(rate=1000.0, burst=1)
+        _edit(replayer, message, "https://youtu.be/abc fixed typo")
+        assert sum(replayer.sink.sends.values()) == 1
+        assert replayer.cog.edit_stats == {"forwarded": 1}
+
+    def test_unfurl_and_old_edits_ignored(self) -> None:
+        """Test embed unfurls and edits to expired messages are skipped."""
+        replayer, message = _setup()
+        payload = SimpleNamespace(message=message, guild_id=1)
+        asyncio.run(replayer.cog.on_raw_message_edit(payload))  # type: ignore[arg-type]
+        message.created_at -= timedelta(seconds=replayer.cog.ledger.ttl + 1)
+        _edit(replayer, message, "https://github.com/a/b")
+        assert sum(replayer.sink.sends.values()) == 0
+        assert replayer.cog.edit_stats == {"too_old": 1}
+
+    def test_deleted_messages_leave_the_ledger(self) -> None:
+        """Test forwarded and deleted messages do not occupy the ledger."""
+        replayer, message = _setup(FakeMessage)
+        asyncio.run(replayer.cog.on_message(message))  # type: ignore[arg-type]
+        assert replayer.sink.deletes == 1
+        assert len(replayer.cog.ledger) == 0
+
+    def test_ledger_is_bounded(self) -> None:
+        """Test the ledger evicts the oldest messages beyond its size."""
+        replayer, message = _setup()
+        replayer.cog.ledger.maxsize = 2
+        for message_id in range(3):
+            message.id = message_id
+            asyncio.run(replayer.cog.on_message(message))  # type: ignore[arg-type]
+        assert len(replayer.cog.ledger) == 2
+        assert replayer.cog.ledger.evictions == 1
+
+
+class TestMissingOutputChannels:
+    """Test routing when a configured channel is not in the gateway cache."""
+
+    def test_config_kept_and_routing_reloaded(self) -> None:
+        """Test a cache miss skips the channel without deleting its config."""
+        replayer, message = _setup(FakeMessage)
+        [config] = replayer.db.output_channels.configs[1]
+        del replayer._guild(1).channels[config.channel_id]
+        asyncio.run(replayer.cog.on_message(message))  # type: ignore[arg-type]
+        assert sum(replayer.sink.sends.values()) == 0
+        assert replayer.db.output_channels.removed == []
+        assert replayer.db.output_channels.invalidated == [1]
+
+    def test_guild_remove_drops_cached_settings(self) -> None:
+        """Test leaving a guild queues its routing and forgets its settings."""
+        replayer, _ = _setup(FakeMessage)
+        guild = SimpleNamespace(id=1, channels=[])
+        asyncio.run(replayer.cog.on_guild_remove(guild))  # type: ignore[arg-type]
+        assert replayer.db.output_channels.removed == [(1, None)]
+        assert replayer.db.guild_settings.invalidated == [1]
+
+
+class TestLoadShedding:
+    """Test over-limit messages are deferred and limited fairly."""
+
+    def _replayer(self) -> Replayer:
+        replayer = Replayer([], outputs_per_guild=1, webhook_latency=0)
+        replayer.cog._author_limiter = TokenBucketLimiter(rate=1000.0, burst=100)
+        replayer.cog._guild_limiter = TokenBucketLimiter(rate=50.0, burst=1)
+        return replayer
+
+    def test_deferred_burst_is_spread_over_refills(self) -> None:
+        """Test a burst of deferred messages is forwarded, not dropped."""
+        replayer = self._replayer()
+        replayer.cog._shed_action = "defer"
+        guild = replayer._guild(1)
+        source = _text_channel(guild, 50)
+        messages = [
+            FakeMessage(
+                i, f"https://youtu.be/{i}", guild, source, FakeAuthor(i), replayer.sink
+            )
+            for i in range(6)
+        ]
+
+        async def burst() -> None:
+            await asyncio.gather(*(replayer.cog.on_message(m) for m in messages))  # type: ignore[arg-type]
+
+        asyncio.run(burst())
+        assert sum(replayer.sink.sends.values()) == 6
+        assert replayer.cog.shed_stats == {"deferred": 5}
+        assert not replayer.cog._deferred and not replayer.cog._deferred_authors
+
+    def test_guild_rejection_keeps_author_token(self) -> None:
+        """Test an author is not charged for a message the guild bucket shed."""
+        replayer = self._replayer()
+        replayer.cog._author_limiter = TokenBucketLimiter(rate=0.001, burst=1)
+        _, message = _setup(FakeMessage)
+        replayer.cog._guild_limiter.acquire(1)
+        assert not replayer.cog._admit(message)  # type: ignore[arg-type]
+        replayer.cog._guild_limiter.refund(1)
+        assert replayer.cog._admit(message)  # type: ignore[arg-type]
@@ -0,0 +1,220 @@
+"""Tests for the link metadata resolver against a local HTTP stub server."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import aiohttp
+from aiohttp import web
+
+from link_utils.cache import SingleFlight, TTLCache
+from link_utils.http import normalize_fetch_url
+from link_utils.metadata import MetadataResolver, parse_metadata
+
+PAGE = """<html><head>
+<title>Plain title</title>
+<meta property="og:title" content="OG title">
+<meta name="description" content="A page">
+<link rel="canonical" href="/canonical">
+</head><body>ignored</body></html>"""
+
+
+async def _with_stub(
+    test: Callable[[str, dict[str, int], MetadataResolver], Awaitable[None]],
+    **resolver_kwargs: float,
+) -> None:
+    """Run a test against a stub server on an ephemeral local port."""
+    hits: dict[str, int] = {}
+
+    async def page(request: web.Request) -> web.Response:
+        hits[request.path] = hits.get(request.path, 0) + 1
+        if request.path == "/slow":
+            await asyncio.sleep(0.5)
+        return web.Response(text=PAGE, content_type="text/html")
+
+    async def missing(request: web.Request) -> web.Response:
+        hits[request.path] = hits.get(request.path, 0) + 1
+        return web.Response(status=404)
+
+    async def redirect(request: web.Request) -> web.Response:
+        raise web.HTTPFound("/page")
+
+    async def huge(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/html"})
+        await response.prepare(request)
+        await response.write(b"<html><head><title>Big</title>")
+        for _ in range(64):
+            await response.write(b"<!--" + b"x" * 16 * 1024 + b"-->")
+        await response.write(b'<meta property="og:title" content="Too late"></head>')
+        return response
+
+    app = web.Application()
+    app.router.add_get("/page", page)
+    app.router.add_get("/slow", page)
+    app.router.add_get("/missing", missing)
+    app.router.add_get("/redirect", redirect)
+    app.router.add_get("/huge", huge)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        async with aiohttp.ClientSession() as session:
+            resolver = MetadataResolver(
+                session,
+                allow_private=True,
+                **resolver_kwargs,  # type: ignore[arg-type]
+            )
+            await test(f"http://127.0.0.1:{port}", hits, resolver)
+    finally:
+        await runner.cleanup()
+
+
+class TestParseMetadata:
+    """Test HTML head parsing."""
+
+    def test_og_wins_over_title(self) -> None:
+        """Test OpenGraph values and relative canonical links."""
+        metadata = parse_metadata("https://example.com/a?x=1", PAGE)
+        assert metadata.title == "OG title"
+        assert metadata.description == "A page"
+        assert metadata.canonical_url == "https://example.com/canonical"
+
+
+class TestNormalizeFetchUrl:
+    """Test URL normalization for fetching."""
+
+    def test_www_gets_scheme(self) -> None:
+        assert normalize_fetch_url("www.example.com") == "https://www.example.com"
+
+    def test_private_ip_literal_refused(self) -> None:
+        assert normalize_fetch_url("http://169.254.169.254/latest/meta-data") is None
+        assert normalize_fetch_url("ftp://example.com") is None
+
+
+class TestMetadataResolver:
+    """Test MetadataResolver against the stub server."""
+
+    def test_resolve_and_cache(self) -> None:
+        """Test a page is fetched once and then served from cache."""
+
+        async def test(
+            base: str, hits: dict[str, int], resolver: MetadataResolver
+        ) -> None:
+            first = await resolver.resolve(f"{base}/page")
+            second = await resolver.resolve(f"{base}/page")
+            assert first is not None and first == second
+            assert first.title == "OG title"
+            assert first.canonical_url == f"{base}/canonical"
+            assert hits["/page"] == 1
+
+        asyncio.run(_with_stub(test))
+
+    def test_singleflight(self) -> None:
+        """Test concurrent lookups for one URL share a single fetch."""
+
+        async def test(
+            base: str, hits: dict[str, int], resolver: MetadataResolver
+        ) -> None:
+            results = await asyncio.gather(
+                *(resolver.resolve(f"{base}/slow") for _ in range(10))
+            )
+            assert all(r is not None and r.title == "OG title" for r in results)
+            assert hits["/slow"] == 1
+
+        asyncio.run(_with_stub(test))
+
+    def test_negative_cache(self) -> None:
+        """Test failures are cached too."""
+
+        async def test(
+            base: str, hits: dict[str, int], resolver: MetadataResolver
+        ) -> None:
+            assert await resolver.resolve(f"{base}/missing") is None
+            assert await resolver.resolve(f"{base}/missing") is None
+            assert hits["/missing"] == 1
+
+        asyncio.run(_with_stub(test))
+
+    def test_redirect_followed(self) -> None:
+        """Test redirects are followed manually."""
+
+        async def test(
+            base: str, hits: dict[str, int], resolver: MetadataResolver
+        ) -> None:
+            metadata = await resolver.resolve(f"{base}/redirect")
+            assert metadata is not None
+            assert metadata.url == f"{base}/redirect"
+            assert metadata.title == "OG title"
+
+        asyncio.run(_with_stub(test))
+
+    def test_size_cap(self) -> None:
+        """Test only the first max_bytes of a response are parsed."""
+
+        async def test(
+            base: str, hits: dict[str, int], resolver: MetadataResolver
+        ) -> None:
+            metadata = await resolver.resolve(f"{base}/huge")
+            assert metadata is not None
+            assert metadata.title == "Big"
+
+        asyncio.run(_with_stub(test, max_bytes=64 * 1024))
+
+    def test_budget_never_blocks(self) -> None:
+        """Test slow lookups miss the budget but still warm the cache."""
+
+        async def test(
+            base: str, hits: dict[str, int], resolver: MetadataResolver
+        ) -> None:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            results = await resolver.resolve_many([f"{base}/slow"], budget=0.05)
+            assert results == {}
+            assert loop.time() - start < 0.4
+            await asyncio.sleep(0.6)
+            results = await resolver.resolve_many([f"{base}/slow"], budget=0.05)
+            assert f"{base}/slow" in results
+
+        asyncio.run(_with_stub(test))
+
+
+class TestTTLCache:
+    """Test TTLCache."""
+
+    def test_lru_eviction(self) -> None:
+        cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.lookup("a")
+        cache.set("c", 3)
+        assert cache.lookup("b") == (False, None)
+        assert cache.lookup("a") == (True, 1)
+
+    def test_per_entry_ttl(self) -> None:
+        cache: TTLCache[str, int | None] = TTLCache(maxsize=2, ttl=60)
+        cache.set("gone", None, ttl=-1)
+        assert cache.lookup("gone") == (False, None)
+
+
+class TestSingleFlight:
+    """Test SingleFlight."""
+
+    def test_cancelled_caller_does_not_cancel_work(self) -> None:
+        async def run() -> None:
+            flights: SingleFlight[str, int] = SingleFlight()
+            calls = 0
+
+            async def work() -> int:
+                nonlocal calls
+                calls += 1
+                await asyncio.sleep(0.05)
+                return 42
+
+            impatient = asyncio.ensure_future(flights.do("k", work))
+            await asyncio.sleep(0)
+            impatient.cancel()
+            assert await flights.do("k", work) == 42
+            assert calls == 1
+
+        asyncio.run(run())
@@ -0,0 +1,89 @@
+"""Tests for the output channel DAO read paths."""
+
+import asyncio
+
+from benchmarks.bench_dao_reads import SimulatedSession, SimulatedTable, build_table
+from core.db.daos.output_channel_dao import OutputChannelDAO
+
+
+def _dao(table: SimulatedTable) -> OutputChannelDAO:
+    return OutputChannelDAO(SimulatedSession(table), "links", "us-east-1")
+
+
+class TestOutputChannelReads:
+    """Test projections, pagination and read consistency of OutputChannelDAO."""
+
+    def test_query_follows_every_page(self) -> None:
+        """Test a guild spanning several result pages is returned in full."""
+        table = build_table({1: 10, 2: 3}, page_bytes=1000)
+        dao = _dao(table)
+        channels = asyncio.run(dao.get_output_channels(1))
+        assert len(channels) == 10
+        assert {c.guild_id for c in channels} == {1}
+        assert dao.read_requests == table.requests > 1
+        assert dao.read_units == table.read_units
+
+    def test_query_projects_routing_attributes(self) -> None:
+        """Test timestamps are not fetched but routing fields are."""
+        table = build_table({1: 2})
+        channels = asyncio.run(_dao(table).get_output_channels(1))
+        assert all(c.webhook_url and c.acl for c in channels)
+        assert all(c.created_at is None for c in channels)
+
+    def test_link_type_filter(self) -> None:
+        """Test the link type filter keeps only channels allowing it."""
+        table = build_table({1: 2})
+        dao = _dao(table)
+        assert asyncio.run(dao.get_output_channels(1, "youtube"))
+        assert asyncio.run(dao.get_output_channels(1, "twitch")) == []
+
+    def test_consistent_read_costs_double(self) -> None:
+        """Test strongly consistent reads are requested only when asked for."""
+        table = build_table({1: 2})
+        dao = _dao(table)
+        asyncio.run(dao.get_output_channels(1))
+        eventual = table.read_units
+        asyncio.run(dao.get_output_channels(1, consistent_read=True))
+        assert table.consistent_requests == 1
+        assert table.read_units - eventual == 2 * eventual
+
+    def test_cache_refill_after_write_is_consistent(self) -> None:
+        """Test a cache miss right after an admin write uses a strong read."""
+        table = build_table({1: 2})
+        dao = _dao(table)
+        asyncio.run(dao.get_cached_output_channels(1))
+        assert table.consistent_requests == 0
+        asyncio.run(dao.remove_output_channel(1, 10_000))
+        dao.cache.invalidate(1)
+        records = asyncio.run(dao.get_cached_output_channels(1))
+        assert [r.channel_id for r in records] == [10_001]
+        assert table.consistent_requests == 1
+
+    def test_scan_skips_settings_and_pages(self) -> None:
+        """Test the full scan returns only output channels from every page."""
+        table = build_table({1: 4, 2: 4}, page_bytes=600)
+        channels = asyncio.run(_dao(table).get_all_output_channels())
+        assert len(channels) == 8
+        assert table.requests > 1
+
+    def test_webhook_url_projection(self) -> None:
+        """Test the webhook lookup fetches only the webhook URL."""
+        table = build_table({1: 1})
+        dao = _dao(table)
+        url = asyncio.run(dao.get_webhook_url(1, 10_000))
+        assert url is not None and url.startswith("https://discord.com/api/webhooks/")
+        assert table.payload_bytes == len("webhook_url") + len(url)
+        assert asyncio.run(dao.get_webhook_url(1, 99)) is None
+
+
+class TestRemovals:
+    """Test queued removals of deleted channels and left guilds."""
+
+    def test_guild_removal_keeps_settings(self) -> None:
+        """Test leaving a guild deletes its output channels but not its settings."""
+        table = build_table({1: 3, 2: 1})
+        dao = _dao(table)
+        dao.queue_removal(1)
+        dao.queue_removal(2, 20_000)
+        assert asyncio.run(dao.flush_removals()) == 4
+        assert sorted(table.items) == [("GUILD#1", "SETTINGS"), ("GUILD#2", "SETTINGS")]
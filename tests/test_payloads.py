@@ -0,0 +1,87 @@
+"""Tests for webhook payload building."""
+
+import asyncio
+
+import discord
+
+from benchmarks.replay import FakeAuthor, FakeMessage, Replayer, _text_channel
+from core.payloads import (
+    MAX_CONTENT,
+    MAX_EMBED_DESCRIPTION,
+    MAX_EMBEDS,
+    build_payloads,
+)
+
+LINKS = {
+    "youtube": ["https://www.youtube.com/watch?v=abc"],
+    "github": ["https://github.com/a/b", "https://github.com/c/d"],
+}
+
+
+class TestBuildPayloads:
+    """Test build_payloads function."""
+
+    def test_plain_single_call(self) -> None:
+        """Test all categories share one payload."""
+        (payload,) = build_payloads(LINKS)
+        assert payload.content.splitlines() == [
+            u for urls in LINKS.values() for u in urls
+        ]
+        assert payload.embeds == []
+
+    def test_grouped_headers(self) -> None:
+        """Test grouped style puts links under category headers."""
+        (payload,) = build_payloads(LINKS, "grouped")
+        assert payload.content.splitlines()[0] == "**Youtube**"
+        assert "**Github**" in payload.content
+
+    def test_embeds_style(self) -> None:
+        """Test embeds style sends one embed per category."""
+        (payload,) = build_payloads(LINKS, "embeds")
+        assert [e.title for e in payload.embeds] == ["Youtube", "Github"]
+        assert payload.content == ""
+
+    def test_split_only_over_limit(self) -> None:
+        """Test content is split at the limit and headers repeat after a split."""
+        urls = [f"https://github.com/user/{i:04d}/{'x' * 60}" for i in range(100)]
+        payloads = build_payloads({"github": urls}, "grouped")
+        assert len(payloads) > 1
+        assert all(len(p.content) <= MAX_CONTENT for p in payloads)
+        assert all(p.content.startswith("**Github**") for p in payloads)
+        assert [u for p in payloads for u in p.links] == urls
+
+    def test_oversized_link_is_clipped(self) -> None:
+        """Test a link longer than a message is clipped instead of rejected."""
+        url = "https://example.com/?q=" + "x" * 2100
+        for style in ("plain", "grouped"):
+            payloads = build_payloads({"other": ["https://a.com", url]}, style)
+            assert all(len(p.content) <= MAX_CONTENT for p in payloads)
+            assert payloads[-1].content.endswith("…")
+            assert [u for p in payloads for u in p.links] == ["https://a.com", url]
+
+        (payload,) = build_payloads({"other": [url + "y" * 2100]}, "embeds")
+        (embed,) = payload.embeds
+        assert embed.description is not None
+        assert len(embed.description) == MAX_EMBED_DESCRIPTION
+
+    def test_previews_follow_their_links(self) -> None:
+        """Test previews attach to the payload with their link, within the embed cap."""
+        urls = [f"https://example.com/{i}" for i in range(12)]
+        previews = {url: discord.Embed(title=url) for url in urls}
+        (payload,) = build_payloads({"other": urls}, previews=previews)
+        assert len(payload.embeds) == MAX_EMBEDS
+
+
+class TestSingleSendPerDestination:
+    """Test LinkMonitor sends one webhook call per destination."""
+
+    def test_all_in_one_channel(self) -> None:
+        """Test a message with several categories costs one call to a catch-all channel."""
+        replayer = Replayer([], outputs_per_guild=1, load_shedding=False)
+        guild = replayer._guild(1)
+        content = " ".join(u for urls in LINKS.values() for u in urls)
+        message = FakeMessage(
+            5, content, guild, _text_channel(guild, 50), FakeAuthor(7), replayer.sink
+        )
+        asyncio.run(replayer.cog.on_message(message))  # type: ignore[arg-type]
+        assert sum(replayer.sink.sends.values()) == 1
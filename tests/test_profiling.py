@@ -0,0 +1,91 @@
+"""Tests for the sampling profiler and slow-callback detector."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from core.profiling import (
+    install_slow_callback_detector,
+    message_context,
+    profile_event_loop,
+    uninstall_slow_callback_detector,
+)
+
+
+def _spin(seconds: float) -> None:
+    """Burn CPU for a while."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.fixture
+def detector() -> Iterator[None]:
+    """Install the detector for one test."""
+    install_slow_callback_detector(0.05)
+    yield
+    uninstall_slow_callback_detector()
+
+
+class TestSamplingProfiler:
+    """Test profiling the event loop."""
+
+    def test_collapsed_stacks(self) -> None:
+        """Test blocking work shows up in the collapsed stacks and report."""
+
+        async def run() -> str:
+            async def busy() -> None:
+                await asyncio.sleep(0.01)
+                _spin(0.2)
+
+            task = asyncio.create_task(busy())
+            profiler = await profile_event_loop(0.3, interval=0.002)
+            await task
+            assert profiler.total > 0
+            return profiler.collapsed() + profiler.report(5)
+
+        output = asyncio.run(run())
+        assert "test_profiling:_spin" in output
+        assert "Self time:" in output
+        first = output.splitlines()[0]
+        assert first.rsplit(" ", 1)[1].isdigit()
+
+
+class TestSlowCallbackDetector:
+    """Test the slow-callback detector."""
+
+    def test_logs_blocking_task_with_context(
+        self, detector: None, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """Test a blocking handler is logged with its message context."""
+
+        async def handler() -> None:
+            message_context.set("guild=1 message=2")
+            _spin(0.1)
+
+        async def run() -> None:
+            await asyncio.create_task(handler(), name="on_message")
+
+        with caplog.at_level(logging.WARNING, logger="core.profiling"):
+            asyncio.run(run())
+        blocked = [
+            r.getMessage() for r in caplog.records if "blocked" in r.getMessage()
+        ]
+        assert blocked
+        assert "on_message" in blocked[0]
+        assert "guild=1 message=2" in blocked[0]
+
+    def test_fast_callbacks_not_logged(
+        self, detector: None, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """Test callbacks under the threshold are silent."""
+
+        async def run() -> None:
+            await asyncio.sleep(0)
+
+        with caplog.at_level(logging.WARNING, logger="core.profiling"):
+            asyncio.run(run())
+        assert not [r for r in caplog.records if "blocked" in r.getMessage()]
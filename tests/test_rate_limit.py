@@ -0,0 +1,66 @@
+"""Tests for token-bucket rate limiting."""
+
+import pytest
+
+from core.rate_limit import TokenBucketLimiter
+
+
+class TestTokenBucketLimiter:
+    """Test TokenBucketLimiter."""
+
+    def test_burst_then_limit(self) -> None:
+        """Test a new key can spend its burst and is then limited."""
+        limiter = TokenBucketLimiter(rate=1.0, burst=3)
+        assert [limiter.acquire("a", now=0.0) for _ in range(4)] == [
+            True,
+            True,
+            True,
+            False,
+        ]
+
+    def test_lazy_refill(self) -> None:
+        """Test tokens are refilled from elapsed time on access."""
+        limiter = TokenBucketLimiter(rate=2.0, burst=1)
+        assert limiter.acquire("a", now=0.0)
+        assert not limiter.acquire("a", now=0.1)
+        assert limiter.retry_after("a", now=0.1) == pytest.approx(0.4)
+        assert limiter.acquire("a", now=0.6)
+
+    def test_refund(self) -> None:
+        """Test a refunded token can be taken again, up to the burst."""
+        limiter = TokenBucketLimiter(rate=1.0, burst=1)
+        assert limiter.acquire("a", now=0.0)
+        limiter.refund("a")
+        limiter.refund("a")
+        assert limiter.acquire("a", now=0.0)
+        assert not limiter.acquire("a", now=0.0)
+
+    def test_keys_are_independent(self) -> None:
+        """Test one key's exhaustion does not affect another."""
+        limiter = TokenBucketLimiter(rate=1.0, burst=1)
+        assert limiter.acquire("spammer", now=0.0)
+        assert not limiter.acquire("spammer", now=0.0)
+        assert limiter.acquire("other", now=0.0)
+
+    def test_evict_idle(self) -> None:
+        """Test only fully refilled buckets are evicted."""
+        limiter = TokenBucketLimiter(rate=1.0, burst=2)
+        limiter.acquire("idle", now=0.0)
+        limiter.acquire("busy", now=9.5)
+        limiter.acquire("busy", now=9.5)
+        assert limiter.evict_idle(now=10.0) == 1
+        assert len(limiter) == 1
+
+    def test_sweep_runs_from_acquire(self) -> None:
+        """Test idle keys are swept without a background task."""
+        limiter = TokenBucketLimiter(rate=1.0, burst=1, sweep_interval=5.0)
+        start = limiter._next_sweep - 5.0
+        for i in range(100):
+            limiter.acquire(i, now=start)
+        limiter.acquire("late", now=start + 10.0)
+        assert len(limiter) == 1
+
+    def test_invalid_configuration(self) -> None:
+        """Test invalid rates are rejected."""
+        with pytest.raises(ValueError):
+            TokenBucketLimiter(rate=0.0, burst=1)
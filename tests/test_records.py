@@ -0,0 +1,84 @@
+"""Tests for lightweight database records."""
+
+import dataclasses
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+
+from core.db.models import OutputChannel
+from core.db.records import OutputChannelRecord
+from link_utils.categories import CATEGORY_BITS
+
+
+def _item() -> dict:
+    return {
+        "pk": "GUILD#1",
+        "sk": "CHANNEL#2",
+        "guild_id": Decimal(1),
+        "channel_id": Decimal(2),
+        "webhook_url": "https://discord.com/api/webhooks/1/abc",
+        "acl": Decimal(CATEGORY_BITS["youtube"] | CATEGORY_BITS["github"]),
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "updated_at": "2024-06-01T12:30:00+00:00",
+    }
+
+
+class TestOutputChannelRecord:
+    """Test OutputChannelRecord decoding."""
+
+    def test_from_item(self) -> None:
+        """Test decoding a DynamoDB item."""
+        record = OutputChannelRecord.from_item(_item())
+        assert record.guild_id == 1
+        assert isinstance(record.channel_id, int)
+        assert record.webhook_url == "https://discord.com/api/webhooks/1/abc"
+        assert record.allows("youtube") is True
+        assert record.allows("github") is True
+        assert record.allows("twitch") is False
+
+    def test_legacy_boolean_item(self) -> None:
+        """Test legacy items with per-category booleans are packed."""
+        item = {"guild_id": 1, "channel_id": 2, "twitch": True, "other": True}
+        record = OutputChannelRecord.from_item(item)
+        assert record.acl == CATEGORY_BITS["twitch"] | CATEGORY_BITS["other"]
+
+    def test_missing_optional_fields(self) -> None:
+        """Test items without optional attributes use defaults."""
+        record = OutputChannelRecord.from_item({"guild_id": 1, "channel_id": 2})
+        assert record.webhook_url is None
+        assert record.acl == 0
+        assert record.created_at is None
+
+    def test_lazy_timestamps(self) -> None:
+        """Test timestamps are kept raw and parsed on access."""
+        record = OutputChannelRecord.from_item(_item())
+        assert record.created_at_raw == "2024-01-01T00:00:00+00:00"
+        assert record.created_at == datetime(2024, 1, 1, tzinfo=UTC)
+
+    def test_immutable_and_slotted(self) -> None:
+        """Test records are frozen and have no instance dict."""
+        record = OutputChannelRecord.from_item(_item())
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            record.acl = 0  # type: ignore[misc]
+        assert not hasattr(record, "__dict__")
+
+
+class TestOutputChannelModel:
+    """Test OutputChannel ACL handling."""
+
+    def test_legacy_booleans_folded(self) -> None:
+        """Test legacy boolean attributes are folded into the bitmask."""
+        model = OutputChannel(guild_id=1, channel_id=2, youtube=True, reddit=True)
+        assert model.allows("youtube")
+        assert model.allows("reddit")
+        assert not model.allows("github")
+        assert "youtube" not in model.model_dump()
+
+    def test_set_category(self) -> None:
+        """Test enabling and disabling categories."""
+        model = OutputChannel(guild_id=1, channel_id=2)
+        model.set_category("github", True)
+        assert model.acl == CATEGORY_BITS["github"]
+        model.set_category("github", False)
+        assert model.acl == 0
@@ -0,0 +1,148 @@
+"""Tests for short-link expansion against a local redirect stub."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import aiohttp
+from aiohttp import web
+
+from link_utils.shortlinks import ShortLinkResolver, parse_domains
+
+
+async def _with_stub(
+    test: Callable[[str, dict[str, int], ShortLinkResolver], Awaitable[None]],
+    **resolver_kwargs: float,
+) -> None:
+    """Run a test against a redirect stub on an ephemeral local port."""
+    hits: dict[str, int] = {}
+
+    def count(request: web.Request) -> None:
+        hits[request.path] = hits.get(request.path, 0) + 1
+
+    async def short(request: web.Request) -> web.Response:
+        count(request)
+        raise web.HTTPMovedPermanently("/hop")
+
+    async def hop(request: web.Request) -> web.Response:
+        count(request)
+        raise web.HTTPFound("https://www.youtube.com/watch?v=abc")
+
+    async def loop(request: web.Request) -> web.Response:
+        count(request)
+        raise web.HTTPFound("/loop")
+
+    async def slow(request: web.Request) -> web.Response:
+        count(request)
+        await asyncio.sleep(0.5)
+        raise web.HTTPFound("https://x.com/a")
+
+    async def no_head(request: web.Request) -> web.Response:
+        count(request)
+        if request.method == "HEAD":
+            raise web.HTTPMethodNotAllowed("HEAD", ["GET"])
+        raise web.HTTPFound("https://github.com/a")
+
+    app = web.Application()
+    app.router.add_route("HEAD", "/short", short)
+    app.router.add_route("HEAD", "/hop", hop)
+    app.router.add_route("HEAD", "/loop", loop)
+    app.router.add_route("HEAD", "/slow", slow)
+    app.router.add_route("*", "/no-head", no_head)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        async with aiohttp.ClientSession() as session:
+            resolver = ShortLinkResolver(
+                session,
+                domains={"127.0.0.1"},
+                allow_private=True,
+                **resolver_kwargs,  # type: ignore[arg-type]
+            )
+            await test(f"http://127.0.0.1:{port}", hits, resolver)
+    finally:
+        await runner.cleanup()
+
+
+class TestShortLinkResolver:
+    """Test ShortLinkResolver against the stub."""
+
+    def test_follows_chain_and_caches(self) -> None:
+        """Test a multi-hop chain resolves once and is then served from cache."""
+
+        async def check(base: str, hits: dict[str, int], r: ShortLinkResolver) -> None:
+            assert (
+                await r.expand(f"{base}/short") == "https://www.youtube.com/watch?v=abc"
+            )
+            assert (
+                await r.expand(f"{base}/short") == "https://www.youtube.com/watch?v=abc"
+            )
+            assert hits == {"/short": 1, "/hop": 1}
+
+        asyncio.run(_with_stub(check))
+
+    def test_concurrent_expansions_share_request(self) -> None:
+        """Test simultaneous lookups of one link issue one request chain."""
+
+        async def check(base: str, hits: dict[str, int], r: ShortLinkResolver) -> None:
+            results = await asyncio.gather(
+                *(r.expand(f"{base}/short") for _ in range(5))
+            )
+            assert set(results) == {"https://www.youtube.com/watch?v=abc"}
+            assert hits["/short"] == 1
+
+        asyncio.run(_with_stub(check))
+
+    def test_hop_limit(self) -> None:
+        """Test redirect loops give up after the hop limit."""
+
+        async def check(base: str, hits: dict[str, int], r: ShortLinkResolver) -> None:
+            assert await r.expand(f"{base}/loop") is None
+            assert hits["/loop"] == 3
+
+        asyncio.run(_with_stub(check, max_hops=3))
+
+    def test_get_fallback(self) -> None:
+        """Test shorteners rejecting HEAD are retried with GET."""
+
+        async def check(base: str, hits: dict[str, int], r: ShortLinkResolver) -> None:
+            assert await r.expand(f"{base}/no-head") == "https://github.com/a"
+
+        asyncio.run(_with_stub(check))
+
+    def test_budget_routes_by_short_url(self) -> None:
+        """Test slow links are left out but finish in the background."""
+
+        async def check(base: str, hits: dict[str, int], r: ShortLinkResolver) -> None:
+            urls = [f"{base}/short", f"{base}/slow", "https://example.com/x"]
+            expanded = await r.expand_many(urls, budget=0.2)
+            assert expanded == {f"{base}/short": "https://www.youtube.com/watch?v=abc"}
+            await asyncio.sleep(0.5)
+            expanded = await r.expand_many(urls, budget=0.2)
+            assert expanded[f"{base}/slow"] == "https://x.com/a"
+
+        asyncio.run(_with_stub(check))
+
+    def test_timeout_is_negative_cached(self) -> None:
+        """Test an expansion that times out is cached as a failure."""
+
+        async def check(base: str, hits: dict[str, int], r: ShortLinkResolver) -> None:
+            assert await r.expand(f"{base}/slow") is None
+            assert await r.expand(f"{base}/slow") is None
+            assert hits["/slow"] == 1
+
+        asyncio.run(_with_stub(check, timeout=0.1))
+
+
+class TestShortenerDomains:
+    """Test shortener domain matching."""
+
+    def test_is_short(self) -> None:
+        """Test matching ignores scheme and a www. prefix."""
+        resolver = ShortLinkResolver(None, domains=parse_domains("bit.ly, T.co"))  # type: ignore[arg-type]
+        assert resolver.is_short("https://bit.ly/abc")
+        assert resolver.is_short("www.bit.ly/abc")
+        assert resolver.is_short("https://t.co/x")
+        assert not resolver.is_short("https://example.com/bit.ly")
@@ -0,0 +1,170 @@
+"""Tests for the warm-start routing snapshot."""
+
+import asyncio
+import os
+import signal
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.bench_dao_reads import SimulatedSession, build_table
+from core.db.daos.guild_settings_dao import GuildSettingsDAO
+from core.db.daos.output_channel_dao import OutputChannelDAO
+from core.db.records import OutputChannelRecord
+from core.snapshot import (
+    RoutingSnapshot,
+    capture_snapshot,
+    decode_snapshot,
+    encode_snapshot,
+    read_snapshot,
+    reconcile_snapshot,
+    restore_snapshot,
+    write_snapshot,
+)
+from link_utils.extraction import ALL_LINK_SOURCES, DEFAULT_LINK_SOURCES
+
+
+def _snapshot() -> RoutingSnapshot:
+    return RoutingSnapshot(
+        channels={
+            1: (
+                OutputChannelRecord(
+                    1, 10_000, "https://discord.com/api/webhooks/1/a", 5
+                ),
+                OutputChannelRecord(
+                    1,
+                    10_001,
+                    None,
+                    1 << 20,
+                    link_allow=("github.com/org",),
+                    link_deny=("gist.github.com",),
+                    digest_interval=3600,
+                ),
+            ),
+            2: (),
+        },
+        link_sources={1: int(ALL_LINK_SOURCES)},
+        webhooks={10_000: "https://discord.com/api/webhooks/1/a"},
+    )
+
+
+def _db(guilds: dict[int, int]) -> SimpleNamespace:
+    session = SimulatedSession(build_table(guilds))
+    return SimpleNamespace(
+        output_channels=OutputChannelDAO(session, "links", "us-east-1"),
+        guild_settings=GuildSettingsDAO(session, "links", "us-east-1"),
+    )
+
+
+def _webhook(url: str) -> SimpleNamespace:
+    return SimpleNamespace(url=url)
+
+
+class TestSnapshotFormat:
+    """Test encoding, decoding and file handling of snapshots."""
+
+    def test_round_trip(self) -> None:
+        """Test a snapshot decodes to exactly what was encoded."""
+        snapshot = _snapshot()
+        assert decode_snapshot(encode_snapshot(snapshot)) == snapshot
+
+    def test_corrupt_data_raises_value_error(self) -> None:
+        """Test bad magic and truncated bodies are rejected."""
+        data = encode_snapshot(_snapshot())
+        with pytest.raises(ValueError):
+            decode_snapshot(b"XXXX" + data[4:])
+        with pytest.raises(ValueError):
+            decode_snapshot(data[:-5])
+
+    def test_read_ignores_missing_corrupt_and_stale_files(self, tmp_path: Path) -> None:
+        """Test unusable files are skipped instead of failing startup."""
+        path = tmp_path / "routing.snapshot"
+        assert read_snapshot(path, 60) is None
+        path.write_bytes(b"garbage")
+        assert read_snapshot(path, 60) is None
+        write_snapshot(path, RoutingSnapshot(created_at=time.time() - 120))
+        assert read_snapshot(path, 60) is None
+        snapshot = _snapshot()
+        write_snapshot(path, snapshot)
+        assert read_snapshot(path, 60) == snapshot
+        assert not (tmp_path / "routing.snapshot.tmp").exists()
+        assert path.stat().st_mode & 0o777 == 0o600
+
+
+class TestSnapshotRestore:
+    """Test capturing, restoring and reconciling routing state."""
+
+    def test_capture_restore_round_trip(self) -> None:
+        """Test a restored bot serves the captured state without reads."""
+        db = _db({})
+        snapshot = _snapshot()
+        webhooks: dict = {}
+        restore_snapshot(db, webhooks, snapshot, _webhook)
+        records = asyncio.run(db.output_channels.get_cached_output_channels(1))
+        assert records == snapshot.channels[1]
+        sources = asyncio.run(db.guild_settings.get_cached_link_sources(1))
+        assert sources == ALL_LINK_SOURCES
+        assert db.output_channels.read_requests == 0
+        assert webhooks[10_000].url == snapshot.webhooks[10_000]
+        captured = capture_snapshot(db, webhooks)
+        assert captured.channels == snapshot.channels
+        assert captured.link_sources == snapshot.link_sources
+        assert captured.webhooks == snapshot.webhooks
+
+    def test_reconcile_replaces_changed_config(self) -> None:
+        """Test reconciliation loads the database state and drops stale webhooks."""
+        db = _db({1: 1})
+        snapshot = _snapshot()
+        webhooks: dict = {}
+        restore_snapshot(db, webhooks, snapshot, _webhook)
+        changed = asyncio.run(reconcile_snapshot(db, webhooks, snapshot))
+        assert changed == 1
+        records = db.output_channels.cache.get(1)
+        assert [r.channel_id for r in records] == [10_000]
+        assert records[0].webhook_url != snapshot.webhooks[10_000]
+        assert 10_000 not in webhooks
+        assert db.output_channels.cache.get(2) == ()
+        assert db.guild_settings.link_sources_cache.lookup(1)[1] == DEFAULT_LINK_SOURCES
+
+    def test_reconcile_keeps_invalidated_guilds_out(self) -> None:
+        """Test a reload racing with an invalidation does not repopulate the cache."""
+        db = _db({1: 1})
+        snapshot = _snapshot()
+        restore_snapshot(db, {}, snapshot, _webhook)
+        original = db.output_channels.get_output_channels
+
+        async def racing(guild_id: int, *args, **kwargs):
+            db.output_channels.cache.invalidate(guild_id)
+            return await original(guild_id, *args, **kwargs)
+
+        db.output_channels.get_output_channels = racing
+        asyncio.run(reconcile_snapshot(db, {}, snapshot))
+        assert db.output_channels.cache.get(1) is None
+
+
+class TestShutdown:
+    """Test the bot shuts down cleanly when the container is stopped."""
+
+    def test_sigterm_closes_the_bot(self) -> None:
+        """Test SIGTERM closes the bot instead of killing the process."""
+        from main import install_shutdown_handler
+
+        closed = asyncio.Event()
+
+        async def close() -> None:
+            closed.set()
+
+        async def run() -> None:
+            bot = SimpleNamespace(
+                close=close, start_background_task=asyncio.ensure_future
+            )
+            install_shutdown_handler(bot)  # type: ignore[arg-type]
+            try:
+                os.kill(os.getpid(), signal.SIGTERM)
+                await asyncio.wait_for(closed.wait(), 1)
+            finally:
+                asyncio.get_running_loop().remove_signal_handler(signal.SIGTERM)
+
+        asyncio.run(run())
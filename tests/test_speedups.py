@@ -0,0 +1,37 @@
+"""Tests for speed mode runtime selection."""
+
+import asyncio
+import importlib.util
+
+import pytest
+
+from core.speedups import describe_runtime, event_loop_factory, fast_json_enabled
+
+
+class TestSpeedups:
+    """Test speed mode helpers."""
+
+    def test_disabled_uses_default_loop(self) -> None:
+        """Test speed mode off leaves the default loop in place."""
+        assert event_loop_factory(False) is None
+
+    def test_uvloop_factory(self) -> None:
+        """Test speed mode runs on uvloop when installed."""
+        pytest.importorskip("uvloop")
+        factory = event_loop_factory(True)
+        assert factory is not None
+
+        async def loop_module() -> str:
+            return describe_runtime()
+
+        assert asyncio.run(loop_module(), loop_factory=factory).startswith("uvloop")
+
+    def test_fast_json_reports_discord_backend(self) -> None:
+        """Test orjson is reported exactly when discord.py found it."""
+        installed = importlib.util.find_spec("orjson") is not None
+        assert fast_json_enabled() is installed
+
+        async def runtime() -> str:
+            return describe_runtime()
+
+        assert asyncio.run(runtime()).endswith("orjson" if installed else "json")
@@ -0,0 +1,74 @@
+"""Tests for start-up timing and lazy imports."""
+
+import logging
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.bench_startup import ROOT, import_report, parse_importtime
+from core.startup import READY_MESSAGE, StartupTimer, process_age
+
+
+class TestStartupTimer:
+    """Test phase marks and the start-up budget."""
+
+    def test_marks_are_relative_to_process_start(self) -> None:
+        """Test phases are recorded once, in order, after process creation."""
+        timer = StartupTimer()
+        timer.mark("imports")
+        timer.mark("login")
+        timer.mark("imports")
+        assert list(timer.marks) == ["imports", "login"]
+        assert 0 < timer.marks["imports"] <= timer.marks["login"]
+        assert process_age() > 0
+
+    def test_finish_logs_once_and_checks_budget(
+        self, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """Test the ready line is logged once and an overrun is warned about."""
+        timer = StartupTimer()
+        with caplog.at_level(logging.INFO, logger="core.startup"):
+            timer.finish(budget=1e-9)
+            timer.finish(budget=1e-9)
+        messages = [r.getMessage() for r in caplog.records]
+        assert sum(m.startswith(READY_MESSAGE) for m in messages) == 1
+        assert sum("over the" in m for m in messages) == 1
+        assert timer.finished
+
+
+class TestImportReport:
+    """Test the import-time report and that heavy modules stay lazy."""
+
+    def test_parse_importtime(self) -> None:
+        """Test ``-X importtime`` lines are parsed with their nesting depth."""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     yarl\n"
+            "import time:      2000 |       2120 |   aiohttp\n"
+            "import time:       300 |       2420 | core.health\n"
+        )
+        timings = parse_importtime(output)
+        assert [(t.module, t.depth) for t in timings] == [
+            ("yarl", 2),
+            ("aiohttp", 1),
+            ("core.health", 0),
+        ]
+        report = import_report(timings, top=5)
+        assert "Total import time: 2 ms" in report
+        assert "2.4 ms  core.health" in report
+
+    def test_main_defers_database_imports(self) -> None:
+        """Test importing main loads neither the AWS SDK nor pydantic."""
+        code = (
+            "import sys, main; "
+            "print(sorted(m for m in ('aioboto3', 'boto3', 'pydantic') if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == "[]"
@@ -0,0 +1,203 @@
+"""Tests for request tracing."""
+
+import asyncio
+import json
+from pathlib import Path
+
+from aiohttp import web
+
+from benchmarks.replay import FakeAuthor, FakeMessage, Replayer, _text_channel
+from core.tracing import (
+    NOOP_SPAN,
+    JsonlSpanExporter,
+    OtlpSpanExporter,
+    Span,
+    Tracer,
+    span,
+    traced,
+)
+
+
+class MemoryExporter:
+    """Keep exported traces in a list."""
+
+    def __init__(self) -> None:
+        self.traces: list[list[Span]] = []
+
+    def export(self, spans: list[Span]) -> None:
+        self.traces.append(list(spans))
+
+    async def close(self) -> None:
+        pass
+
+
+@traced()
+async def _dao_call() -> int:
+    await asyncio.sleep(0)
+    return 1
+
+
+async def _handle(tracer: Tracer, delay: float = 0.0, fail: bool = False) -> None:
+    with tracer.start_trace("on_message", guild_id=1):
+        with span("extract") as extract:
+            extract.set("urls", 2)
+            await _dao_call()
+        await asyncio.gather(*(_send(i, delay) for i in range(2)))
+        if fail:
+            raise RuntimeError("boom")
+
+
+async def _send(i: int, delay: float) -> None:
+    with span("webhook.send", index=i):
+        await asyncio.sleep(delay)
+
+
+class TestTracer:
+    """Test span propagation and head and tail sampling."""
+
+    def test_disabled_tracer_records_nothing(self) -> None:
+        """Test spans are shared no-ops when tracing is off."""
+        exporter = MemoryExporter()
+        tracer = Tracer(exporter)
+        assert tracer.start_trace("on_message") is NOOP_SPAN
+        assert span("extract") is NOOP_SPAN
+        asyncio.run(_handle(tracer))
+        assert exporter.traces == []
+
+    def test_head_sampled_trace_has_nested_spans(self) -> None:
+        """Test child spans follow awaits and gathered tasks."""
+        exporter = MemoryExporter()
+        asyncio.run(_handle(Tracer(exporter, sample_rate=1.0)))
+        [trace] = exporter.traces
+        by_name = {s.name: s for s in trace}
+        root = by_name["on_message"]
+        assert root.parent_id is None
+        assert by_name["extract"].parent_id == root.span_id
+        assert by_name["_dao_call"].parent_id == by_name["extract"].span_id
+        sends = [s for s in trace if s.name == "webhook.send"]
+        assert [s.parent_id for s in sends] == [root.span_id] * 2
+        assert {s.trace.trace_id for s in trace} == {root.trace.trace_id}
+        assert by_name["extract"].attributes == {"urls": 2}
+        assert span("after") is NOOP_SPAN
+
+    def test_tail_sampling_keeps_slow_and_failed_traces(self) -> None:
+        """Test unsampled traces are exported only when slow or failed."""
+        exporter = MemoryExporter()
+        tracer = Tracer(exporter, sample_rate=0.0, slow_threshold=0.05)
+        asyncio.run(_handle(tracer))
+        asyncio.run(_handle(tracer, delay=0.06))
+        try:
+            asyncio.run(_handle(tracer, fail=True))
+        except RuntimeError:
+            pass
+        assert tracer.stats == {"discarded": 1, "slow": 1, "error": 1}
+        assert len(exporter.traces) == 2
+        root = next(s for s in exporter.traces[1] if s.parent_id is None)
+        assert root.error == "RuntimeError: boom"
+
+    def test_span_limit(self) -> None:
+        """Test a trace stops recording at max_spans and says so."""
+        exporter = MemoryExporter()
+        tracer = Tracer(exporter, sample_rate=1.0, max_spans=3)
+        asyncio.run(_handle(tracer))
+        [trace] = exporter.traces
+        assert len(trace) == 3
+        assert trace[0].attributes["dropped_spans"] == 2
+
+
+class TestExporters:
+    """Test the JSONL and OTLP exporters."""
+
+    def test_jsonl(self, tmp_path: Path) -> None:
+        """Test every span of a kept trace becomes one JSON line."""
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(JsonlSpanExporter(path), sample_rate=1.0)
+        asyncio.run(_handle(tracer))
+        asyncio.run(tracer.close())
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["name"] for line in lines] == [
+            "on_message",
+            "extract",
+            "_dao_call",
+            "webhook.send",
+            "webhook.send",
+        ]
+        assert lines[1]["parent_id"] == lines[0]["span_id"]
+        assert len({line["trace_id"] for line in lines}) == 1
+
+    def test_jsonl_writes_in_batches(self, tmp_path: Path) -> None:
+        """Test export only buffers and the timer writes the batch."""
+        path = tmp_path / "traces.jsonl"
+        exporter = JsonlSpanExporter(path, interval=0.05)
+
+        async def run() -> None:
+            await _handle(Tracer(exporter, sample_rate=1.0))
+            assert not path.exists()
+            await asyncio.sleep(0.2)
+            assert len(path.read_text().splitlines()) == 5
+            await exporter.close()
+
+        asyncio.run(run())
+        assert exporter.stats == {"exported": 5}
+
+    def test_otlp_posts_to_collector(self) -> None:
+        """Test spans are batched into one OTLP/HTTP JSON request."""
+        received: list[dict] = []
+
+        async def collect(request: web.Request) -> web.Response:
+            received.append(await request.json())
+            return web.json_response({})
+
+        async def run() -> None:
+            app = web.Application()
+            app.router.add_post("/v1/traces", collect)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+            exporter = OtlpSpanExporter(
+                f"http://127.0.0.1:{port}/v1/traces", interval=60
+            )
+            tracer = Tracer(exporter, sample_rate=1.0)
+            await _handle(tracer)
+            await _handle(tracer)
+            await tracer.close()
+            await runner.cleanup()
+            assert exporter.stats == {"exported": 10}
+
+        asyncio.run(run())
+        [body] = received
+        spans = body["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert len(spans) == 10
+        root = spans[0]
+        assert root["name"] == "on_message" and "parentSpanId" not in root
+        assert root["attributes"] == [{"key": "guild_id", "value": {"intValue": "1"}}]
+        assert spans[1]["parentSpanId"] == root["spanId"]
+
+
+class TestLinkMonitorTracing:
+    """Test the forwarding path is instrumented end to end."""
+
+    def test_forward_spans(self) -> None:
+        """Test one message yields extraction, categorization, send and delete spans."""
+        replayer = Replayer(
+            [], outputs_per_guild=1, load_shedding=False, webhook_latency=0
+        )
+        exporter = MemoryExporter()
+        replayer.cog.tracer = Tracer(exporter, sample_rate=1.0)
+        guild = replayer._guild(1)
+        message = FakeMessage(
+            100,
+            "https://youtu.be/abc https://github.com/a/b",
+            guild,
+            _text_channel(guild, 50),
+            FakeAuthor(7),
+            replayer.sink,
+        )
+        asyncio.run(replayer.cog.on_message(message))  # type: ignore[arg-type]
+        [trace] = exporter.traces
+        names = [s.name for s in trace]
+        assert names[0] == "on_message"
+        assert {"extract", "categorize", "delete"} <= set(names)
+        assert names.count("webhook.send") == sum(replayer.sink.sends.values())
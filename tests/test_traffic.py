@@ -0,0 +1,110 @@
+"""Tests for traffic recording and the replay harness."""
+
+import asyncio
+from pathlib import Path
+
+from benchmarks.replay import (
+    FakeAuthor,
+    FakeGuild,
+    FakeMessage,
+    Replayer,
+    Sink,
+    _text_channel,
+    percentile,
+    synthesize,
+)
+from core.traffic import (
+    TrafficRecord,
+    TrafficRecorder,
+    anonymize_url,
+    hash_id,
+    read_traffic,
+)
+
+SALT = b"0123456789abcdef"
+
+
+class TestAnonymizeUrl:
+    """Test anonymize_url function."""
+
+    def test_keeps_shape(self) -> None:
+        """Test host and parameter names survive while values are hidden."""
+        url = anonymize_url(SALT, "https://youtu.be/dQw4w9WgXcQ?si=secret&t=42")
+        assert url.startswith("https://youtu.be/")
+        assert "dQw4w9WgXcQ" not in url and "secret" not in url
+        assert "?si=" in url and "&t=" in url
+        assert len(url) == len("https://youtu.be/dQw4w9WgXcQ?si=secret&t=42")
+
+    def test_stable_per_salt(self) -> None:
+        """Test the same input maps to the same output with one salt only."""
+        assert anonymize_url(SALT, "https://a.com/x") == anonymize_url(
+            SALT, "https://a.com/x"
+        )
+        assert hash_id(SALT, 1) != hash_id(b"another-salt-xyz", 1)
+
+    def test_bare_www(self) -> None:
+        """Test links without a scheme stay without one."""
+        assert anonymize_url(SALT, "www.example.com/a").startswith("www.example.com/")
+
+
+class TestRecorder:
+    """Test TrafficRecorder round trips."""
+
+    def test_record_and_read(self, tmp_path: Path) -> None:
+        """Test records are written anonymized and read back."""
+        guild = FakeGuild(123)
+        message = FakeMessage(
+            1,
+            "see https://github.com/me/repo",
+            guild,
+            _text_channel(guild, 456),
+            FakeAuthor(789),
+            Sink(0, 0),
+        )
+        path = tmp_path / "traffic.jsonl"
+        recorder = TrafficRecorder(path, SALT)
+        recorder.record(message)  # type: ignore[arg-type]
+        recorder.close()
+
+        (record,) = read_traffic(path)
+        assert record.guild == hash_id(SALT, 123)
+        assert record.author == hash_id(SALT, 789)
+        assert record.length == len(message.content)
+        assert record.urls[0].startswith("https://github.com/")
+        assert "me/repo" not in path.read_text()
+
+
+class TestReplayer:
+    """Test replaying traffic through LinkMonitor."""
+
+    def test_replay_reports(self) -> None:
+        """Test a fast replay forwards links and reports percentiles."""
+        records = synthesize(300, guilds=3, rate=1000.0)
+        replayer = Replayer(
+            records, speed=100, webhook_latency=0.0, load_shedding=False
+        )
+        report = asyncio.run(replayer.run())
+        assert report["messages"] == 300
+        assert report["sends"] >= report["with_links"]
+        assert report["deletes"] == report["with_links"]
+        assert report["p50_ms"] <= report["p99_ms"] <= report["p999_ms"]
+
+    def test_recorded_links_are_forwarded(self) -> None:
+        """Test anonymized links still categorize and route."""
+        records = [
+            TrafficRecord(
+                0.0, 1, 1, 1, 40, [anonymize_url(SALT, "https://youtu.be/abc")]
+            ),
+        ]
+        replayer = Replayer(
+            records, speed=100, webhook_latency=0.0, outputs_per_guild=1
+        )
+        report = asyncio.run(replayer.run())
+        assert report["sends"] == 1
+
+    def test_percentile(self) -> None:
+        """Test nearest-rank percentiles."""
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 0.5) == 50.0
+        assert percentile(values, 0.99) == 99.0
+        assert percentile([], 0.5) == 0.0